@@ -23,6 +23,7 @@ __license__ = "MIT"
 __all__ = [
     "AttributeResemblesVariableWarning",
     "BeautifulSoup",
+    "SoupFactory",
     "Comment",
     "Declaration",
     "ProcessingInstruction",
@@ -33,12 +34,19 @@ __all__ = [
     "Tag",
     "TemplateString",
     "ElementFilter",
+    "ParseLimits",
     "UnicodeDammit",
+    "aparse",
     "CData",
     "Doctype",
+    "extract_text",
+    "parse_many",
+    "sort_document_order",
 
     # Exceptions
     "FeatureNotFound",
+    "FrozenTreeError",
+    "ParseLimitExceeded",
     "ParserRejectedMarkup",
     "StopParsing",
 
@@ -51,7 +59,13 @@ __all__ = [
 ]
 
 from collections import Counter
+from contextlib import nullcontext
+import io
+import mmap
+import os
+import stat
 import sys
+from time import perf_counter
 import warnings
 
 # The very first thing we do is give a useful error if someone is
@@ -68,6 +82,7 @@ from .builder import (
 from .builder._htmlparser import HTMLParserTreeBuilder
 from .dammit import UnicodeDammit
 from .css import CSS
+from . import instrumentation
 from ._deprecation import (
     _deprecated,
 )
@@ -86,21 +101,31 @@ from .element import (
     Stylesheet,
     Tag,
     TemplateString,
+    sort_document_order,
 )
 from .formatter import Formatter
 from .filter import (
     ElementFilter,
     SoupStrainer,
 )
+from .limits import (
+    ParseLimits,
+    _LimitChecker,
+)
+from .text import extract_text
+from ._frozen import FrozenIndex
+from ._positions import SourcePositions
 from typing import (
     Any,
     cast,
+    ContextManager,
     Counter as CounterType,
     Dict,
     Iterator,
     List,
     Sequence,
     Optional,
+    Tuple,
     Type,
     Union,
 )
@@ -118,6 +143,8 @@ from bs4._typing import (
 # Import all warnings and exceptions into the main package.
 from bs4.exceptions import (
     FeatureNotFound,
+    FrozenTreeError,
+    ParseLimitExceeded,
     ParserRejectedMarkup,
     StopParsing,
 )
@@ -133,6 +160,9 @@ from bs4._warnings import (
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .replacer import SoupReplacer
+    from .stats import ParseStats
+    from ._async import aparse
+    from .parallel import parse_many
 
 
 
@@ -197,6 +227,12 @@ class BeautifulSoup(Tag):
     string_container_stack: List[Tag]  #: :meta private:
     _most_recent_element: Optional[PageElement]  #: :meta private:
 
+    # If the tree builder reports where tags begin and end, the offset
+    # into the markup of whatever is being processed right now, and
+    # the indexes into _document_positions of the tags that are open.
+    _source_offset: Optional[int]  #: :meta private:
+    _open_tag_positions: List[int]  #: :meta private:
+
     #: Beautiful Soup's best guess as to the character encoding of the
     #: original document.
     original_encoding: Optional[_Encoding]
@@ -212,6 +248,22 @@ class BeautifulSoup(Tag):
     #: could not be represented in Unicode.
     contains_replacement_characters: bool
 
+    #: If ``collect_stats=True`` was passed into the constructor,
+    #: statistics about how the document was parsed.
+    parse_stats: "Optional[ParseStats]" = None
+
+    _collect_stats: bool = False  #: :meta private:
+
+    #: If the document was truncated because it went over one of the
+    #: limits passed into the constructor as ``limits``, the
+    #: `ParseLimitExceeded` describing which limit it was.
+    parse_limit_exceeded: Optional[ParseLimitExceeded] = None
+
+    _limits: Optional[ParseLimits] = None  #: :meta private:
+
+    # Only set while a document is being parsed with limits.
+    _limit_checker: Optional[_LimitChecker] = None  #: :meta private:
+
     def __init__(
         self,
         markup: _IncomingMarkup = "",
@@ -222,12 +274,16 @@ class BeautifulSoup(Tag):
         exclude_encodings: Optional[_Encodings] = None,
         element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
         replacer: "Optional[SoupReplacer]" = None,
+        collect_stats: bool = False,
+        limits: Optional[ParseLimits] = None,
         **kwargs: Any,
     ):
         """Constructor.
 
         :param markup: A string or a file-like object representing
-         markup to be parsed.
+         markup to be parsed. With lxml, this can also be a
+         memoryview or a bytearray, which isn't copied into a
+         bytestring first.
 
         :param features: Desirable features of the parser to be
          used. This may be the name of a specific parser ("lxml",
@@ -262,6 +318,16 @@ class BeautifulSoup(Tag):
          built. This is useful for subclassing Tag or NavigableString
          to modify default behavior.
 
+        :param collect_stats: If this is True, time the different
+         phases of parsing and count what was parsed, and make the
+         results available as `BeautifulSoup.parse_stats`, a
+         `bs4.stats.ParseStats` object.
+
+        :param limits: A `bs4.limits.ParseLimits` restricting the size
+         of the document and the time spent parsing it. Going over a
+         limit raises `ParseLimitExceeded`, or truncates the document,
+         depending on the limits.
+
         :param kwargs: For backwards compatibility purposes, the
          constructor accepts certain keyword arguments used in
          Beautiful Soup 3. None of these arguments do anything in
@@ -437,15 +503,12 @@ class BeautifulSoup(Tag):
                     "Keyword arguments to the BeautifulSoup constructor will be ignored. These would normally be passed into the TreeBuilder constructor, but a TreeBuilder instance was passed in as `builder`."
                 )
 
-        self.builder = builder
-        self.is_xml = builder.is_xml
-        self.known_xml = self.is_xml
-        self._namespaces = dict()
-        self.parse_only = parse_only
-        self.replacer = replacer
+        self._configure(builder, parse_only, replacer, collect_stats, limits)
 
         if hasattr(markup, "read"):  # It's a file-type object.
-            markup = markup.read()
+            markup = self._read(markup)
+        elif isinstance(markup, (memoryview, bytearray)):
+            markup = self._buffer(markup)
         elif not isinstance(markup, (bytes, str)) and not hasattr(markup, "__len__"):
             raise TypeError(
                 f"Incoming markup is of an invalid type: {markup!r}. Markup must be a string, a bytestring, or an open filehandle."
@@ -464,38 +527,202 @@ class BeautifulSoup(Tag):
         # At this point we know markup is a string or bytestring.  If
         # it was a file-type object, we've read from it.
         markup = cast(_RawMarkup, markup)
+        self._parse(markup, from_encoding, exclude_encodings)
 
-        rejections = []
-        success = False
-        for (
-            self.markup,
-            self.original_encoding,
-            self.declared_html_encoding,
-            self.contains_replacement_characters,
-        ) in self.builder.prepare_markup(
-            markup, from_encoding, exclude_encodings=exclude_encodings
-        ):
-            self.reset()
-            self.builder.initialize_soup(self)
+    def _configure(
+        self,
+        builder: TreeBuilder,
+        parse_only: Optional[SoupStrainer],
+        replacer: "Optional[SoupReplacer]",
+        collect_stats: bool = False,
+        limits: Optional[ParseLimits] = None,
+    ) -> None:
+        """Set up this object to parse markup with the given
+        `TreeBuilder`, once the constructor's arguments have been
+        processed.
+        """
+        self.builder = builder
+        self.is_xml = builder.is_xml
+        self.known_xml = self.is_xml
+        self._namespaces = dict()
+        self.parse_only = parse_only
+        self.replacer = replacer
+        if collect_stats:
+            self._collect_stats = True
+        if limits is not None:
+            self._limits = limits
+
+    def _read(self, markup: Any) -> _RawMarkup:
+        """Read the markup from a file-like object.
+
+        If the tree builder accepts buffers, a file on disk (or an
+        `mmap.mmap`) isn't read at all: its contents are fed to the
+        parser straight from memory-mapped pages, so the whole
+        document never has to be copied into a bytestring.
+
+        If there's a limit on the size of the input, no more than one
+        byte past the limit is read.
+        """
+        limits = self._limits
+        size = -1
+        if limits is not None and limits.max_input_bytes is not None:
+            size = limits.max_input_bytes + 1
+        if self.builder.ACCEPTS_BUFFERS:
+            view = self._map(markup, size)
+            if view is not None:
+                return cast(_RawMarkup, view)
+        if size >= 0:
+            return markup.read(size)
+        return markup.read()
+
+    @classmethod
+    def _map(cls, markup: Any, size: int) -> Optional[memoryview]:
+        """Map the rest of a binary file into memory.
+
+        :param size: Map no more than this many bytes, unless it's -1.
+        :return: A memoryview of the file, or None if the file can't
+            be mapped, in which case it has to be read instead.
+        """
+        mapped: mmap.mmap
+        if isinstance(markup, mmap.mmap):
+            mapped = markup
+        elif isinstance(markup, (io.BufferedReader, io.FileIO)):
             try:
-                self._feed()
-                success = True
-                break
-            except ParserRejectedMarkup as e:
-                rejections.append(e)
-                pass
-
-        if not success:
-            other_exceptions = [str(e) for e in rejections]
-            raise ParserRejectedMarkup(
-                "The markup you provided was rejected by the parser. Trying a different parser or a different encoding may help.\n\nOriginal exception(s) from parser:\n "
-                + "\n ".join(other_exceptions)
+                fileno = markup.fileno()
+                if not stat.S_ISREG(os.fstat(fileno).st_mode):
+                    return None
+                mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Among other things, an empty file can't be mapped.
+                return None
+        else:
+            return None
+        start = markup.tell()
+        view = memoryview(mapped)[start:]
+        if size >= 0:
+            view = view[:size]
+        # Leave the file where reading it would have left it.
+        markup.seek(start + len(view))
+        return view
+
+    def _buffer(self, markup: Union[memoryview, bytearray]) -> _RawMarkup:
+        """Get a memoryview or bytearray ready to be parsed.
+
+        It's only copied into a bytestring if the tree builder doesn't
+        accept buffers.
+        """
+        if self.builder.ACCEPTS_BUFFERS:
+            return cast(_RawMarkup, markup)
+        return bytes(markup)
+
+    def _parse(
+        self,
+        markup: _RawMarkup,
+        from_encoding: Optional[_Encoding],
+        exclude_encodings: Optional[_Encodings],
+    ) -> None:
+        """Convert markup into a tree, trying each of the encodings
+        suggested by the tree builder in turn.
+        """
+        # The operation is entered here, rather than by calling this
+        # method again, so that warnings issued while parsing always
+        # have the same number of stack frames between them and the
+        # caller.
+        operation: ContextManager[Any] = nullcontext()
+        if instrumentation.enabled and not instrumentation._is_active("parse"):
+            operation = instrumentation._Operation(
+                "parse", len(markup), parser=self.builder.NAME
+            )
+        with operation:
+            limits = self._limits
+            deadline = None
+            if limits is not None:
+                if limits.max_seconds is not None:
+                    deadline = perf_counter() + limits.max_seconds
+                if (
+                    limits.max_input_bytes is not None
+                    and len(markup) > limits.max_input_bytes
+                ):
+                    exceeded = ParseLimitExceeded(
+                        "max_input_bytes", limits.max_input_bytes
+                    )
+                    if limits.on_breach == ParseLimits.RAISE:
+                        raise exceeded
+                    self.parse_limit_exceeded = exceeded
+                    markup = markup[: limits.max_input_bytes]
+
+            rejections = []
+            success = False
+            strategies: Iterator[
+                Tuple[_RawMarkup, Optional[_Encoding], Optional[_Encoding], bool]
+            ] = iter(
+                self.builder.prepare_markup(
+                    markup, from_encoding, exclude_encodings=exclude_encodings
+                )
             )
+            collector = None
+            if self._collect_stats:
+                from bs4.stats import _StatsCollector
+
+                collector = _StatsCollector(self, markup)
+
+            # The strategies are fetched, and the markup is fed, from
+            # this method rather than from a helper, so that warnings
+            # issued while parsing always have the same number of stack
+            # frames between them and the caller.
+            while True:
+                start = perf_counter()
+                strategy = next(strategies, None)
+                if collector is not None:
+                    collector.strategy_found(perf_counter() - start)
+                if strategy is None:
+                    break
+                (
+                    self.markup,
+                    self.original_encoding,
+                    self.declared_html_encoding,
+                    self.contains_replacement_characters,
+                ) = strategy
+                self.reset()
+                self.builder.initialize_soup(self)
+                if limits is not None:
+                    self._limit_checker = _LimitChecker(limits, deadline)
+                if collector is not None:
+                    collector.start_feed()
+                try:
+                    self._feed()
+                    success = True
+                    break
+                except ParserRejectedMarkup as e:
+                    rejections.append(e)
+                finally:
+                    if collector is not None:
+                        collector.end_feed(success)
+
+            if not success:
+                other_exceptions = [str(e) for e in rejections]
+                raise ParserRejectedMarkup(
+                    "The markup you provided was rejected by the parser. Trying a different parser or a different encoding may help.\n\nOriginal exception(s) from parser:\n "
+                    + "\n ".join(other_exceptions)
+                )
+
+            if (
+                self._document_positions is not None
+                and self.builder.store_source_markup
+                and isinstance(self.markup, str)
+            ):
+                self._document_positions.set_markup(
+                    self.markup, markup, self.original_encoding
+                )
+
+            if collector is not None:
+                self.parse_stats = collector.finish()
 
-        # Clear out the markup and remove the builder's circular
-        # reference to this object.
-        self.markup = None
-        self.builder.soup = None
+            # Clear out the markup and remove the builder's circular
+            # reference to this object.
+            self.markup = None
+            self.builder.soup = None
+            self._limit_checker = None
 
     def _apply_replacer(self, tag) -> None:
         """Apply SoupReplacer during parsing in the order:
@@ -545,10 +772,19 @@ class BeautifulSoup(Tag):
         # don't need it.
         if "_most_recent_element" in d:
             del d["_most_recent_element"]
+
+        # The document will be reparsed when it's unpickled, so any
+        # cached text or indexes would be out of date. If the tree was
+        # frozen, it will be frozen again.
+        d.pop("_text_cache", None)
+        d.pop("_order", None)
+        if d.pop("_frozen", None) is not None:
+            d["_frozen"] = True
         return d
 
     def __setstate__(self, state: Dict[str, Any]) -> None:
         # If necessary, restore the TreeBuilder by looking it up.
+        frozen = state.pop("_frozen", None)
         self.__dict__ = state
         if isinstance(self.builder, type):
             self.builder = self.builder()
@@ -559,6 +795,8 @@ class BeautifulSoup(Tag):
         self.builder.soup = self
         self.reset()
         self._feed()
+        if frozen:
+            self.freeze(max(self._text_cache_min_size or 0, 0))
 
     @classmethod
     @_deprecated(
@@ -684,19 +922,40 @@ class BeautifulSoup(Tag):
         self.builder.reset()
 
         if self.markup is not None:
-            self.builder.feed(self.markup)
-        # Close out any unfinished strings and close all the open tags.
+            try:
+                self.builder.feed(self.markup)
+            except ParseLimitExceeded as e:
+                if self._limits is None or self._limits.on_breach == ParseLimits.RAISE:
+                    raise
+                # Keep the part of the tree that was built before the
+                # limit was reached.
+                self.parse_limit_exceeded = e
+                self.current_data = []
+        self._close_document()
+
+    def _close_document(self) -> None:
+        """Called once the tree builder has sent all of its events.
+
+        Closes out any unfinished strings and closes all the open tags.
+        """
         self.endData()
+        if self._document_positions is not None and isinstance(self.markup, str):
+            # Any tags that are still open end at the end of the document.
+            self._source_offset = len(self.markup)
         while (
             self.currentTag is not None and self.currentTag.name != self.ROOT_TAG_NAME
         ):
             self.popTag()
+        self._source_offset = None
 
     def reset(self) -> None:
         """Reset this object to a state as though it had never parsed any
         markup.
         """
         Tag.__init__(self, self, self.builder, self.ROOT_TAG_NAME)
+        self.__dict__.pop("_text_cache", None)
+        if self._order is not None:
+            self._order.forget()
         self.hidden = True
         self.builder.reset()
         self.current_data = []
@@ -706,8 +965,45 @@ class BeautifulSoup(Tag):
         self.preserve_whitespace_tag_stack = []
         self.string_container_stack = []
         self._most_recent_element = None
+        self._document_positions = None
+        self._source_offset = None
+        self._open_tag_positions = []
         self.pushTag(self)
 
+    def freeze(self, text_cache_min_size: int = Tag.DEFAULT_TEXT_CACHE_MIN_SIZE) -> None:
+        """Promise that this tree will never be modified again.
+
+        Once a tree is frozen, any attempt to modify it--with methods
+        like `PageElement.extract`, `Tag.insert`, `Tag.clear` or
+        `PageElement.replace_with`, by setting or deleting an
+        attribute with ``tag[key]``, by setting `Tag.string`, or by
+        giving a `Tag` a new name--raises `FrozenTreeError`. (Changes
+        made directly to `Tag.attrs` can't be detected.)
+
+        In exchange, the tree is indexed: every element is numbered in
+        document order, and tags are indexed by name, ID and CSS
+        class, so that `Tag.find_all` and `Tag.find` can skip the
+        parts of the tree that can't match. The text cache (see
+        `Tag.enable_text_cache`) is also turned on for the whole tree.
+
+        Nothing is calculated lazily after a tree is frozen, except
+        for cached text, so it's safe for multiple threads to search
+        a frozen tree at the same time.
+
+        :param text_cache_min_size: Passed into `Tag.enable_text_cache`.
+        """
+        if self._frozen is not None:
+            return
+        Tag._start_checking_for_frozen_trees()
+        self.enable_text_cache(text_cache_min_size)
+        # Building the index also parses the contents of any lazy tags.
+        self._frozen = FrozenIndex(self)
+
+    @property
+    def is_frozen(self) -> bool:
+        """Has this tree been frozen with `BeautifulSoup.freeze`?"""
+        return self._frozen is not None
+
     def new_tag(
         self,
         name: str,
@@ -821,6 +1117,18 @@ class BeautifulSoup(Tag):
             # Nothing to pop. This shouldn't happen.
             return None
         tag = self.tagStack.pop()
+        positions = self._document_positions
+        open_positions = self._open_tag_positions
+        if (
+            positions is not None
+            and open_positions
+            and positions.elements[open_positions[-1]] is tag
+        ):
+            index = open_positions.pop()
+            if self._source_offset is not None:
+                # This tag was closed by whatever markup is being
+                # processed right now.
+                positions.ends[index] = self._source_offset
         if tag.name in self.open_tag_counter:
             self.open_tag_counter[tag.name] -= 1
         if (
@@ -867,12 +1175,7 @@ class BeautifulSoup(Tag):
             # nothing but ASCII spaces, replace it with a single space
             # or newline.
             if not self.preserve_whitespace_tag_stack:
-                strippable = True
-                for i in current_data:
-                    if i not in self.ASCII_SPACES:
-                        strippable = False
-                        break
-                if strippable:
+                if not current_data.strip(self.ASCII_SPACES):
                     if "\n" in current_data:
                         current_data = "\n"
                     else:
@@ -889,6 +1192,8 @@ class BeautifulSoup(Tag):
             ):
                 return
 
+            if self._limit_checker is not None:
+                self._limit_checker.string_created()
             containerClass = self.string_container(containerClass)
             o = containerClass(current_data)
             self.object_was_parsed(o)
@@ -1022,6 +1327,7 @@ class BeautifulSoup(Tag):
         sourceline: Optional[int] = None,
         sourcepos: Optional[int] = None,
         namespaces: Optional[Dict[str, str]] = None,
+        sourceoffset: Optional[int] = None,
     ) -> Optional[Tag]:
         """Called by the tree builder when a new tag is encountered.
 
@@ -1036,6 +1342,8 @@ class BeautifulSoup(Tag):
             tag was found.
         :param namespaces: A dictionary of all namespace prefix mappings
             currently in scope in the document.
+        :param sourceoffset: The offset into the markup where this tag
+            was found.
 
         If this method returns None, the tag was rejected by an active
         `ElementFilter`. You should proceed as if the tag had not occurred
@@ -1054,6 +1362,9 @@ class BeautifulSoup(Tag):
         ):
             return None
 
+        if self._limit_checker is not None:
+            self._limit_checker.tag_created(len(self.tagStack))
+
         tag_class = self.element_classes.get(Tag, Tag)
         # Assume that this is either Tag or a subclass of Tag. If not,
         # the user brought type-unsafety upon themselves.
@@ -1067,12 +1378,14 @@ class BeautifulSoup(Tag):
             attrs,
             self.currentTag,
             self._most_recent_element,
-            sourceline=sourceline,
-            sourcepos=sourcepos,
             namespaces=namespaces,
         )
         if tag is None:
             return tag
+        if sourceline is not None or sourcepos is not None or sourceoffset is not None:
+            self._open_tag_positions.append(
+                self._record_source_position(tag, sourceline, sourcepos, sourceoffset)
+            )
     
         # >>> NEW: apply replacer at parse-time, after name/attrs are set
         self._apply_replacer(tag)
@@ -1096,7 +1409,24 @@ class BeautifulSoup(Tag):
     #     # print("End tag: " + name)
     #     self.endData()
     #     self._popToTag(name, nsprefix)
-    def handle_endtag(self, name: str, nsprefix: Optional[str] = None) -> None:
+    def handle_endtag(
+        self,
+        name: str,
+        nsprefix: Optional[str] = None,
+        sourceoffset: Optional[int] = None,
+        sourceend: Optional[int] = None,
+    ) -> None:
+        """Called by the tree builder when an ending tag is encountered.
+
+        :param name: Name of the tag.
+        :param nsprefix: Namespace prefix for the tag.
+        :param sourceoffset: The offset into the markup where the
+            ending tag begins.
+        :param sourceend: The offset into the markup just past the
+            end of the ending tag.
+
+        :meta private:
+        """
         self.endData()
 
         name_to_pop = name
@@ -1106,7 +1436,45 @@ class BeautifulSoup(Tag):
             # 若開始標籤被改名了，這裡用改名後的實際名稱來 pop
             name_to_pop = self.currentTag.name
 
+        positions = self._document_positions
+        closing: Optional[int] = None
+        if sourceend is not None and positions is not None:
+            # Find the tag this ending tag belongs to. It ends where
+            # the ending tag ends; any tags it closes implicitly end
+            # where the ending tag begins.
+            for index in reversed(self._open_tag_positions):
+                t = positions.elements[index]
+                if t.name == name_to_pop and t.prefix == nsprefix:
+                    closing = index
+                    break
+
+        self._source_offset = sourceoffset
         self._popToTag(name_to_pop, nsprefix)
+        self._source_offset = None
+        if closing is not None and sourceend is not None and positions is not None:
+            positions.ends[closing] = sourceend
+
+    def _record_source_position(
+        self,
+        tag: Tag,
+        sourceline: Optional[int],
+        sourcepos: Optional[int],
+        sourceoffset: Optional[int] = None,
+    ) -> int:
+        """Record where a tag was found in the document being parsed.
+
+        The information goes into a `SourcePositions` object shared by
+        every tag in the document, rather than being stored on the
+        `Tag` itself.
+
+        :return: The index of the tag's record.
+
+        :meta private:
+        """
+        positions = self._document_positions
+        if positions is None:
+            positions = self._document_positions = SourcePositions()
+        return positions.add(tag, sourceline, sourcepos, sourceoffset)
 
 
     def handle_data(self, data: str) -> None:
@@ -1229,6 +1597,127 @@ class BeautifulStoneSoup(BeautifulSoup):
         super(BeautifulStoneSoup, self).__init__(*args, **kwargs)
 
 
+class SoupFactory(object):
+    """Parses many documents with the same settings, doing the work of
+    processing those settings only once.
+
+    The `BeautifulSoup` constructor has to look up and instantiate a
+    `TreeBuilder`, check its arguments for mistakes, and check the
+    markup for signs of common beginner problems, every time it's
+    called. For a big document, this is nothing compared to the cost
+    of parsing. For a small fragment, it's a noticeable fraction of
+    the total. A `SoupFactory` does that work when it's created, and
+    its `SoupFactory.parse` method only does the per-document work::
+
+     factory = SoupFactory("html.parser")
+     for snippet in snippets:
+         soup = factory.parse(snippet)
+
+    The `BeautifulSoup` objects created by a factory all share a
+    single `TreeBuilder`, so a factory must not be used by more than
+    one thread at a time.
+
+    :param features: Desirable features of the parser to be used, as
+        with the `BeautifulSoup` constructor.
+    :param builder: A `TreeBuilder` subclass to instantiate (or
+        instance to use) instead of looking one up based on `features`.
+    :param parse_only: A `SoupStrainer`. Only parts of each document
+        matching the `SoupStrainer` will be considered.
+    :param element_classes: A dictionary mapping Beautiful Soup
+        classes like `Tag` and `NavigableString` to the classes to be
+        instantiated instead.
+    :param replacer: A `SoupReplacer` to apply to every tag as it's
+        parsed.
+    :param collect_stats: If this is True, each `BeautifulSoup`
+        object will have a `BeautifulSoup.parse_stats`.
+    :param limits: A `bs4.limits.ParseLimits` to enforce on each
+        document.
+    :param kwargs: Keyword arguments for the `TreeBuilder` constructor,
+        as with the `BeautifulSoup` constructor.
+    """
+
+    def __init__(
+        self,
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        parse_only: Optional[SoupStrainer] = None,
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        replacer: "Optional[SoupReplacer]" = None,
+        collect_stats: bool = False,
+        limits: Optional[ParseLimits] = None,
+        **kwargs: Any,
+    ):
+        # Let the BeautifulSoup constructor find the tree builder and
+        # complain about any problems with the arguments.
+        template = BeautifulSoup(
+            "",
+            features,
+            builder=builder,
+            parse_only=parse_only,
+            element_classes=element_classes,
+            replacer=replacer,
+            **kwargs,
+        )
+        self.builder = template.builder
+        self.parse_only = template.parse_only
+        self.element_classes = template.element_classes
+        self.replacer = template.replacer
+        self.collect_stats = collect_stats
+        self.limits = limits
+
+    def parse(
+        self,
+        markup: _IncomingMarkup,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+    ) -> BeautifulSoup:
+        """Parse a document.
+
+        :param markup: A string, bytestring, or open filehandle (or,
+            with lxml, a memoryview or bytearray). Unlike with the
+            `BeautifulSoup` constructor, there's no check for strings
+            that look like URLs or filenames.
+        :param from_encoding: A string indicating the encoding of the
+            document to be parsed.
+        :param exclude_encodings: A list of strings indicating
+            encodings known to be wrong.
+        :return: A `BeautifulSoup` object.
+        """
+        soup = BeautifulSoup.__new__(BeautifulSoup)
+        soup.element_classes = self.element_classes
+        soup._configure(
+            self.builder,
+            self.parse_only,
+            self.replacer,
+            self.collect_stats,
+            self.limits,
+        )
+        if hasattr(markup, "read"):
+            markup = soup._read(markup)
+        elif isinstance(markup, (memoryview, bytearray)):
+            markup = soup._buffer(markup)
+        elif not isinstance(markup, (bytes, str)) and not hasattr(markup, "__len__"):
+            raise TypeError(
+                f"Incoming markup is of an invalid type: {markup!r}. Markup must be a string, a bytestring, or an open filehandle."
+            )
+        soup._parse(markup, from_encoding, exclude_encodings)
+        return soup
+
+
+def __getattr__(name: str) -> Any:
+    # aparse and parse_many are imported the first time they're used,
+    # so that importing bs4 doesn't import asyncio or multiprocessing.
+    if name == "aparse":
+        from ._async import aparse
+
+        return aparse
+    if name == "parse_many":
+        from .parallel import parse_many
+
+        return parse_many
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # If this file is run as a script, act as an HTML pretty-printer.
 if __name__ == "__main__":
     import sys
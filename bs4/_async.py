@@ -0,0 +1,223 @@
+"""Parse a document as it arrives, without blocking an asyncio event loop."""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "aparse",
+]
+
+import asyncio
+import codecs
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from bs4 import BeautifulSoup
+from bs4.builder import TreeBuilder
+from bs4.dammit import EncodingDetector
+from bs4.exceptions import ParserRejectedMarkup
+from bs4._typing import (
+    _Encoding,
+    _Encodings,
+)
+
+#: Bytes are collected until there are at least this many, so that
+#: there's enough of the document to find a byte-order mark or an
+#: encoding declaration.
+ENCODING_DETECTION_SIZE: int = 2048
+
+#: A chunk of the document larger than this is sent to the parser
+#: in pieces of this size, with a chance for other tasks to run in
+#: between.
+DEFAULT_CHUNK_SIZE: int = 64 * 1024
+
+
+async def aparse(
+    stream: Union[AsyncIterable[bytes], AsyncIterable[str]],
+    features: Optional[Union[str, Sequence[str]]] = None,
+    builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+    from_encoding: Optional[_Encoding] = None,
+    exclude_encodings: Optional[_Encodings] = None,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **kwargs: Any,
+) -> BeautifulSoup:
+    """Build a `BeautifulSoup` object from a document that arrives a
+    piece at a time, such as the body of an HTTP response.
+
+    Each piece is sent to the tree builder as soon as it arrives, and
+    the event loop gets a chance to run other tasks after every piece,
+    so a big document doesn't block the loop for the whole time it
+    takes to parse it. The lxml and html.parser tree builders really
+    do parse the document incrementally; html5lib waits until the
+    whole document has arrived.
+
+    If the document arrives as bytes, its encoding is detected (with
+    `EncodingDetector`) from the first `ENCODING_DETECTION_SIZE`
+    bytes, rather than the whole document. Unlike with the
+    `BeautifulSoup` constructor, there's no going back to try a
+    different encoding: any bytes that turn out not to be valid in
+    the chosen encoding are replaced with REPLACEMENT CHARACTER, and
+    ``contains_replacement_characters`` is set.
+
+    :param stream: An asynchronous iterable of bytestrings or strings.
+    :param features: Desirable features of the parser to be used,
+        as with the `BeautifulSoup` constructor.
+    :param builder: A `TreeBuilder` subclass to instantiate (or
+        instance to use) instead of looking one up based on `features`.
+    :param from_encoding: A string indicating the encoding of the
+        document to be parsed.
+    :param exclude_encodings: A list of strings indicating encodings
+        known to be wrong.
+    :param executor: If this is provided, each piece of the document
+        is parsed in this `concurrent.futures.Executor`, rather than
+        on the event loop's thread. This must be a thread pool, since
+        the tree is built in this process's memory.
+    :param chunk_size: Pieces of the document longer than this are
+        parsed this many characters at a time.
+    :param kwargs: Other keyword arguments are passed into the
+        `BeautifulSoup` constructor.
+    :return: A `BeautifulSoup` object.
+    """
+    # Let the BeautifulSoup constructor take care of finding a tree
+    # builder and processing its arguments.
+    soup = BeautifulSoup("", features, builder=builder, **kwargs)
+    tree_builder = soup.builder
+
+    chunks = stream.__aiter__()
+    prefix, rest_is_bytes = await _read_prefix(chunks)
+    decoder = None
+    if rest_is_bytes:
+        assert isinstance(prefix, bytes)
+        decoded, encoding, declared, decoder = _detect_encoding(
+            prefix, from_encoding, exclude_encodings, not tree_builder.is_xml
+        )
+    else:
+        assert isinstance(prefix, str)
+        decoded, encoding, declared = prefix, None, None
+
+    # Give the tree builder a chance to do its usual preparations. The
+    # markup has already been decoded, so there's no encoding for the
+    # tree builder to know about.
+    for _ in tree_builder.prepare_markup(decoded, None, None, None):
+        break
+
+    soup.markup = None
+    soup.original_encoding = encoding
+    soup.declared_html_encoding = declared
+    soup.contains_replacement_characters = False
+    soup.reset()
+    tree_builder.initialize_soup(soup)
+    tree_builder.reset()
+    tree_builder.open_feed()
+
+    loop = asyncio.get_running_loop()
+
+    async def feed(text: str) -> None:
+        if "\N{REPLACEMENT CHARACTER}" in text and decoder is not None:
+            soup.contains_replacement_characters = True
+        for start in range(0, len(text), chunk_size):
+            piece = text[start : start + chunk_size]
+            if executor is None:
+                tree_builder.feed_chunk(piece)
+                await asyncio.sleep(0)
+            else:
+                await loop.run_in_executor(executor, tree_builder.feed_chunk, piece)
+
+    await feed(decoded)
+    async for chunk in chunks:
+        if decoder is not None:
+            if not isinstance(chunk, bytes):
+                raise TypeError("A stream that starts with bytes must only yield bytes.")
+            text = decoder.decode(chunk)
+        elif not isinstance(chunk, str):
+            raise TypeError("A stream that starts with str must only yield str.")
+        else:
+            text = chunk
+        await feed(text)
+    if decoder is not None:
+        await feed(decoder.decode(b"", True))
+
+    tree_builder.close_feed()
+    # Some tree builders set this based on what they were fed, but
+    # the document was fed to them as Unicode.
+    soup.original_encoding = encoding
+    soup._close_document()
+    tree_builder.soup = None
+    return soup
+
+
+async def _read_prefix(
+    chunks: AsyncIterator[Union[bytes, str]],
+) -> Tuple[Union[bytes, str], bool]:
+    """Read the beginning of the document.
+
+    :return: A 2-tuple (prefix, is_bytes). If the document is made of
+        bytestrings, the prefix is at least `ENCODING_DETECTION_SIZE`
+        bytes long, unless the whole document is shorter than that.
+    """
+    first: Union[bytes, str, None] = None
+    async for first in chunks:
+        break
+    if first is None:
+        return "", False
+    if isinstance(first, str):
+        return first, False
+    if not isinstance(first, (bytes, bytearray)):
+        raise TypeError(
+            f"Incoming markup is of an invalid type: {first!r}. The stream must yield strings or bytestrings."
+        )
+    data = [bytes(first)]
+    size = len(first)
+    while size < ENCODING_DETECTION_SIZE:
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            break
+        if not isinstance(chunk, (bytes, bytearray)):
+            raise TypeError("A stream that starts with bytes must only yield bytes.")
+        data.append(bytes(chunk))
+        size += len(chunk)
+    return b"".join(data), True
+
+
+def _detect_encoding(
+    prefix: bytes,
+    from_encoding: Optional[_Encoding],
+    exclude_encodings: Optional[_Encodings],
+    is_html: bool,
+) -> Tuple[str, _Encoding, Optional[_Encoding], codecs.IncrementalDecoder]:
+    """Pick an encoding based on the start of a document.
+
+    :return: A 4-tuple (decoded prefix, encoding, declared encoding,
+        decoder for the rest of the document).
+    """
+    detector = EncodingDetector(
+        prefix,
+        known_definite_encodings=[from_encoding] if from_encoding else None,
+        is_html=is_html,
+        exclude_encodings=exclude_encodings,
+    )
+    markup = detector.markup
+    declared = EncodingDetector.find_declared_encoding(markup, is_html)
+    for encoding in detector.encodings:
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)("replace")
+            strict = codecs.getincrementaldecoder(encoding)("strict")
+            strict.decode(markup)
+        except (UnicodeDecodeError, LookupError):
+            continue
+        return decoder.decode(markup), encoding, declared, decoder
+    raise ParserRejectedMarkup(
+        "Could not find an encoding that can decode the start of the document."
+    )
@@ -0,0 +1,122 @@
+"""Indexes over a tree that has been frozen with `BeautifulSoup.freeze`."""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+)
+
+from bs4.element import (
+    PageElement,
+    Tag,
+)
+from bs4._order import DocumentOrder
+
+
+class FrozenIndex(DocumentOrder):
+    """Information about a tree that can be calculated once, because
+    the tree will never change.
+
+    In addition to numbering the elements in document order (see
+    `DocumentOrder`), tags are indexed by name, ID and CSS class, with
+    each index entry listing the numbers of the matching tags in
+    document order, so that `Tag.find_all` can go straight to the tags
+    that might match, instead of looking at every element in the tree.
+
+    :param root: The root of the tree.
+    """
+
+    #: The numbers of the tags with each name.
+    names: Dict[str, array]
+
+    #: The numbers of the tags with each ID.
+    ids: Dict[str, array]
+
+    #: The numbers of the tags with each CSS class.
+    classes: Dict[str, array]
+
+    def __init__(self, root: Tag):
+        super(FrozenIndex, self).__init__(root)
+
+        names: Dict[str, array] = defaultdict(lambda: array("q"))
+        ids: Dict[str, array] = defaultdict(lambda: array("q"))
+        classes: Dict[str, array] = defaultdict(lambda: array("q"))
+        for i, element in enumerate(self.elements):
+            if i == 0 or not isinstance(element, Tag):
+                continue
+            names[element.name].append(i)
+            attrs = element.attrs
+            if "id" in attrs:
+                self._add(ids, attrs["id"], i)
+            if "class" in attrs:
+                self._add(classes, attrs["class"], i)
+        self.names = dict(names)
+        self.ids = dict(ids)
+        self.classes = dict(classes)
+
+    @classmethod
+    def _add(cls, index: Dict[str, array], value: Any, position: int) -> None:
+        """Add a tag's attribute value to an index.
+
+        A multi-valued attribute is indexed under each of its values,
+        as well as under the whole value.
+        """
+        if isinstance(value, str):
+            index[value].append(position)
+            return
+        for item in value:
+            index[item].append(position)
+        whole = " ".join(value)
+        if whole not in value:
+            index[whole].append(position)
+
+    def candidates(
+        self,
+        tag: Tag,
+        name: Any,
+        attrs: Any,
+        kwargs: Mapping[str, Any],
+    ) -> Optional[List[PageElement]]:
+        """Find the tags beneath ``tag`` that might match the arguments
+        to a `Tag.find_all` call.
+
+        :return: A list of tags in document order that includes every
+            tag that matches, and maybe some that don't; or None if
+            the indexes can't help with this search.
+        """
+        attributes = dict(kwargs)
+        if isinstance(attrs, str):
+            attributes["class"] = attrs
+        elif isinstance(attrs, dict):
+            attributes.update(attrs)
+        if "class_" in attributes:
+            attributes["class"] = attributes.pop("class_")
+
+        found: List[array] = []
+        if isinstance(name, str) and ":" not in name:
+            found.append(self.names.get(name, array("q")))
+        value = attributes.get("id")
+        if isinstance(value, str):
+            found.append(self.ids.get(value, array("q")))
+        value = attributes.get("class")
+        if isinstance(value, str):
+            found.append(self.classes.get(value, array("q")))
+        if not found:
+            return None
+
+        numbers = min(found, key=len)
+        start = self.positions[id(tag)]
+        end = self.ends[start]
+        low = bisect_right(numbers, start)
+        high = bisect_right(numbers, end)
+        elements = self.elements
+        return [elements[i] for i in numbers[low:high]]
@@ -0,0 +1,119 @@
+"""Support for tags whose contents are parsed only when they're needed.
+
+See the ``lazy_tags`` argument to `HTMLParserTreeBuilder`.
+"""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+import copy
+from typing import (
+    Any,
+    Dict,
+    TYPE_CHECKING,
+)
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+if TYPE_CHECKING:
+    from bs4.builder._htmlparser import HTMLParserTreeBuilder
+
+
+class _LazyContent(object):
+    """The unparsed contents of a `Tag`.
+
+    :param markup: The markup for the tag's start tag and its contents,
+        but not its end tag.
+    :param content_start: The offset into ``markup`` where the
+        tag's contents begin.
+    :param name: The tag's name as it appeared in the markup.
+    :param builder: The `TreeBuilder` that parsed the rest of the
+        document. A copy of it will be used to parse ``markup``.
+    :param soup_kwargs: Keyword arguments for the `BeautifulSoup`
+        constructor, so that the contents are parsed the same way as
+        the rest of the document.
+    """
+
+    __slots__ = ("markup", "content_start", "name", "builder", "soup_kwargs")
+
+    def __init__(
+        self,
+        markup: str,
+        content_start: int,
+        name: str,
+        builder: HTMLParserTreeBuilder,
+        soup_kwargs: Dict[str, Any],
+    ):
+        self.markup = markup
+        self.content_start = content_start
+        self.name = name
+        self.builder = builder
+        self.soup_kwargs = soup_kwargs
+
+    def materialize(self, tag: Tag) -> None:
+        """Parse the markup and move the results into ``tag``, which
+        must have an empty `Tag.contents`.
+        """
+        builder = copy.copy(self.builder)
+        builder._lazy_tags_start = self.content_start
+        soup = _FragmentSoup(
+            self.markup + "</%s>" % self.name,
+            builder=builder,
+            context=tag,
+            **self.soup_kwargs,
+        )
+        fragment = soup.contents[0]
+        assert isinstance(fragment, Tag)
+
+        positions = soup._document_positions
+        document_positions, index = tag._source_record()
+        if positions is not None and document_positions is not None:
+            line = document_positions.line(index)
+            column = document_positions.column(index)
+            start = document_positions.start(index)
+            if line is not None and column is not None and start is not None:
+                document_positions.merge(positions, line, column, start)
+
+        # The new children were part of the document all along, so
+        # they're linked in directly rather than through Tag.extend,
+        # which would count this as a change to the tree.
+        new = fragment.contents
+        if not new:
+            return
+        new_last = new[-1]._last_descendant()
+        assert new_last is not None
+        fragment.contents = []
+        fragment.next_element = None
+        for element in new:
+            element.parent = tag
+        tag.contents = new
+
+        following_element = tag.next_element
+        tag.next_element = new[0]
+        new[0].previous_element = tag
+        new_last.next_element = following_element
+        if following_element is not None:
+            following_element.previous_element = new_last
+
+
+class _FragmentSoup(BeautifulSoup):
+    """A `BeautifulSoup` object that parses a piece of a larger
+    document, as though it were still inside the tags that contained it.
+    """
+
+    def __init__(self, *args: Any, context: Tag, **kwargs: Any):
+        self._context = context
+        super(_FragmentSoup, self).__init__(*args, **kwargs)
+
+    def reset(self) -> None:
+        super(_FragmentSoup, self).reset()
+        # The contents of a lazy tag inside e.g. a <pre> tag need to
+        # be treated as though they were inside the <pre> tag.
+        for ancestor in reversed(list(self._context.parents)):
+            if ancestor.name in self.builder.preserve_whitespace_tags:
+                self.preserve_whitespace_tag_stack.append(ancestor)
+            if ancestor.name in self.builder.string_containers:
+                self.string_container_stack.append(ancestor)
+
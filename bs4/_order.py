@@ -0,0 +1,101 @@
+"""Numbering the elements of a tree in document order."""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+from array import array
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+from bs4.element import (
+    PageElement,
+    Tag,
+)
+
+
+class DocumentOrder(object):
+    """The position of every element in a tree.
+
+    Every element in the tree is numbered in document order (the order
+    of `Tag.descendants`), and each `Tag` knows the number of its last
+    descendant, so the elements beneath a `Tag` are a contiguous range
+    of numbers. Once the numbers are calculated, whether one element
+    is inside another, and which of two elements comes first, can be
+    answered without walking the tree.
+
+    Only the root of the tree keeps a reference to this object;
+    everything this knows about the other elements is kept here,
+    keyed by their numbers. The numbers are only good until the tree
+    is modified, at which point `forget` is called.
+
+    Nothing here is used to find an element's parents. `Tag.find_parent`,
+    `Tag.find_parents` and CSS ``closest`` look at each parent once,
+    which takes time proportional to the depth of the element; numbering
+    the tree takes time proportional to its size, so it would only slow
+    them down.
+
+    :param root: The root of the tree.
+    """
+
+    #: False once the tree has been modified.
+    valid: bool
+
+    #: Every element in the tree, in document order, starting with
+    #: the root.
+    elements: List[PageElement]
+
+    #: The number of each element, keyed by the element's ``id()``.
+    positions: Dict[int, int]
+
+    #: For each element, the number of its last descendant (or of the
+    #: element itself, if it has no descendants).
+    ends: array
+
+    def __init__(self, root: Tag):
+        self.valid = True
+        self.elements = [root]
+        self.elements.extend(root.descendants)
+        self.positions = {id(x): i for i, x in enumerate(self.elements)}
+        self.ends = array("q", range(len(self.elements)))
+        root._order = self
+        for i, element in enumerate(self.elements):
+            if isinstance(element, Tag):
+                last = element._last_descendant()
+                if last is not None:
+                    self.ends[i] = self.positions[id(last)]
+
+    def forget(self) -> None:
+        """The tree has been modified, so these numbers are no longer
+        correct. Throw them away.
+        """
+        self.valid = False
+        self.elements = []
+        self.positions = {}
+        self.ends = array("q")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The numbers are keyed by id(), which won't survive pickling.
+        return dict(valid=False, elements=[], positions={}, ends=array("q"))
+
+    def position(self, element: PageElement) -> Optional[int]:
+        """Find an element's number in document order.
+
+        :return: None if the element isn't in this tree.
+        """
+        i = self.positions.get(id(element))
+        if i is None or self.elements[i] is not element:
+            return None
+        return i
+
+    def contains(self, tag: PageElement, element: PageElement) -> bool:
+        """Is ``element`` inside ``tag`` (or ``tag`` itself)?"""
+        start = self.position(tag)
+        position = self.position(element)
+        if start is None or position is None:
+            return False
+        return start <= position <= self.ends[start]
@@ -0,0 +1,289 @@
+"""Compact storage for the positions of tags in their source document."""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+from array import array
+import codecs
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    TYPE_CHECKING,
+    Union,
+)
+
+from bs4._typing import (
+    _Encoding,
+    _RawMarkup,
+)
+
+if TYPE_CHECKING:
+    from bs4.element import Tag
+
+
+class SourcePositions(object):
+    """Where each tag in a document was found in the original markup.
+
+    Rather than storing a handful of Python ints on every `Tag`, a
+    tree builder that knows where tags occur records them here, in
+    one set of arrays per document, in the order the tags were
+    created. Nothing is stored on the `Tag` itself; a tag finds its
+    record through the `BeautifulSoup` object at the root of its tree.
+
+    For every tag this records the line number and column of its
+    start tag, and, if the tree builder knows them, the offsets into
+    the markup where the tag begins and ends. An unknown value is
+    stored as -1.
+
+    If the `TreeBuilder` was created with ``store_source_markup=True``,
+    the markup itself is kept as well, so that `Tag.source_markup`
+    can return the exact text that created a tag.
+    """
+
+    #: The line number of each tag's start tag.
+    lines: array
+
+    #: The column of each tag's start tag within its line.
+    columns: array
+
+    #: The offset into the markup where each tag begins.
+    starts: array
+
+    #: The offset into the markup just past the end of each tag,
+    #: including its end tag, if it has one.
+    ends: array
+
+    #: The Unicode markup the offsets refer to, if it was kept.
+    markup: Optional[str]
+
+    #: The markup as it was originally provided, if it was a
+    #: bytestring and it was kept.
+    raw_markup: Optional[bytes]
+
+    #: The encoding used to convert `raw_markup` into `markup`.
+    encoding: Optional[_Encoding]
+
+    #: The tags themselves, in the same order as the arrays.
+    elements: List[Tag]
+
+    #: When `markup` is converted to bytes, this many characters at a
+    #: time are counted towards `_block_offsets`.
+    BLOCK_SIZE: int = 1024
+
+    def __init__(self) -> None:
+        self.lines = array("i")
+        self.columns = array("i")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.elements = []
+        self.markup = None
+        self.raw_markup = None
+        self.encoding = None
+        self._bom_length: Optional[int] = None
+
+        # Built the first time they're needed: the index of the
+        # record for each tag, keyed by id(); and the offset into
+        # raw_markup (plus the state of the encoder) at the start of
+        # each BLOCK_SIZE characters of markup.
+        self._indexes: Dict[int, int] = {}
+        self._block_offsets: Optional[array] = None
+        self._block_states: List[Any] = []
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The index depends on the ids of the tags, which won't
+        # survive pickling.
+        state = dict(self.__dict__)
+        state["_indexes"] = {}
+        return state
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def add(
+        self,
+        tag: Tag,
+        line: Optional[int],
+        column: Optional[int],
+        start: Optional[int] = None,
+    ) -> int:
+        """Record the position of a newly opened tag.
+
+        :return: The index of the new record.
+        """
+        self.elements.append(tag)
+        self.lines.append(-1 if line is None else line)
+        self.columns.append(-1 if column is None else column)
+        self.starts.append(-1 if start is None else start)
+        self.ends.append(-1)
+        return len(self.lines) - 1
+
+    def index(self, tag: Tag) -> Optional[int]:
+        """Find the record for the given tag.
+
+        :return: An index into the arrays, or None if this object has
+            no record of the tag.
+        """
+        indexes = self._indexes
+        elements = self.elements
+        if len(indexes) < len(elements):
+            # Index any tags recorded since the last time. The tags
+            # are all kept alive by self.elements, so their ids are
+            # unique.
+            for i in range(len(indexes), len(elements)):
+                indexes[id(elements[i])] = i
+        return indexes.get(id(tag))
+
+    @classmethod
+    def _value(cls, values: array, index: int) -> Optional[int]:
+        value = values[index]
+        if value == -1:
+            return None
+        return value
+
+    def line(self, index: int) -> Optional[int]:
+        return self._value(self.lines, index)
+
+    def column(self, index: int) -> Optional[int]:
+        return self._value(self.columns, index)
+
+    def start(self, index: int) -> Optional[int]:
+        return self._value(self.starts, index)
+
+    def end(self, index: int) -> Optional[int]:
+        return self._value(self.ends, index)
+
+    def merge(
+        self, piece: SourcePositions, line: int, column: int, offset: int
+    ) -> None:
+        """Add the positions recorded while parsing a piece of this
+        document, converting them into positions within this
+        document.
+
+        :param piece: The positions recorded for the piece.
+        :param line: The line number where the piece begins.
+        :param column: The column where the piece begins.
+        :param offset: The offset into this document's markup
+            where the piece begins.
+        """
+        lines = piece.lines
+        columns = piece.columns
+        for i in range(len(lines)):
+            if lines[i] == -1:
+                continue
+            if lines[i] == 1 and columns[i] != -1:
+                columns[i] += column
+            lines[i] += line - 1
+        for values in (piece.starts, piece.ends):
+            for i in range(len(values)):
+                if values[i] != -1:
+                    values[i] += offset
+        self.elements.extend(piece.elements)
+        self.lines.extend(lines)
+        self.columns.extend(columns)
+        self.starts.extend(piece.starts)
+        self.ends.extend(piece.ends)
+
+    def set_markup(
+        self,
+        markup: str,
+        raw_markup: Optional[_RawMarkup] = None,
+        encoding: Optional[_Encoding] = None,
+    ) -> None:
+        """Keep the markup the offsets refer to, so slices of it can be
+        retrieved later.
+
+        :param markup: The Unicode markup that was actually parsed.
+        :param raw_markup: The markup as originally provided to
+            `BeautifulSoup`, which may be a bytestring.
+        :param encoding: The encoding used to turn ``raw_markup``
+            into ``markup``.
+        """
+        self.markup = markup
+        if isinstance(raw_markup, bytes) and encoding is not None:
+            self.raw_markup = raw_markup
+            self.encoding = encoding
+        else:
+            self.raw_markup = None
+            self.encoding = None
+        self._bom_length = None
+        self._block_offsets = None
+        self._block_states = []
+
+    def _byte_offset(self, offset: int) -> Optional[int]:
+        """Convert an offset into `markup` to an offset into
+        `raw_markup`.
+
+        :return: The offset, or None if there's no way to do the
+            conversion (e.g. because the conversion to Unicode
+            replaced some bytes with REPLACEMENT CHARACTER).
+        """
+        assert self.markup is not None and self.raw_markup is not None
+        assert self.encoding is not None
+        if self._bom_length is None:
+            try:
+                encoded = self.markup.encode(self.encoding)
+            except (UnicodeEncodeError, LookupError):
+                encoded = None
+            if encoded is not None and self.raw_markup.endswith(encoded):
+                # Any bytes before the encoded markup are a byte-order
+                # mark that was stripped during the conversion.
+                self._bom_length = len(self.raw_markup) - len(encoded)
+            else:
+                self._bom_length = -1
+        if self._bom_length == -1:
+            return None
+        if len(self.markup) + self._bom_length == len(self.raw_markup):
+            # Every character is represented by a single byte.
+            return offset + self._bom_length
+
+        # Count the bytes up to the start of the block containing
+        # the offset, then encode the rest of the way. Only the
+        # first lookup has to encode the whole document.
+        if self._block_offsets is None:
+            self._index_blocks()
+        assert self._block_offsets is not None
+        block = offset // self.BLOCK_SIZE
+        encoder = codecs.getincrementalencoder(self.encoding)()
+        encoder.setstate(self._block_states[block])
+        rest = encoder.encode(self.markup[block * self.BLOCK_SIZE : offset])
+        return self._block_offsets[block] + len(rest) + self._bom_length
+
+    def _index_blocks(self) -> None:
+        """Find the offset into `raw_markup` where each block of
+        `BLOCK_SIZE` characters of `markup` begins.
+        """
+        assert self.markup is not None and self.encoding is not None
+        markup = self.markup
+        size = self.BLOCK_SIZE
+        encoder = codecs.getincrementalencoder(self.encoding)()
+        offsets = array("q")
+        states = []
+        total = 0
+        for start in range(0, len(markup) + 1, size):
+            offsets.append(total)
+            states.append(encoder.getstate())
+            total += len(encoder.encode(markup[start : start + size]))
+        self._block_offsets = offsets
+        self._block_states = states
+
+    def source_markup(self, index: int) -> Optional[Union[str, memoryview]]:
+        """Find the markup that created the tag with the given index.
+
+        :return: A memoryview on the original bytestring if the
+            markup was provided as a bytestring; otherwise a
+            string. None if the markup wasn't kept or the tag's
+            offsets are unknown.
+        """
+        start = self.start(index)
+        end = self.end(index)
+        if self.markup is None or start is None or end is None:
+            return None
+        if self.raw_markup is not None:
+            byte_start = self._byte_offset(start)
+            byte_end = self._byte_offset(end)
+            if byte_start is not None and byte_end is not None:
+                return memoryview(self.raw_markup)[byte_start:byte_end]
+        return self.markup[start:end]
@@ -0,0 +1,160 @@
+"""Remembering the results of searches, until the tree changes."""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from bs4.element import (
+    PageElement,
+    ResultSet,
+    Tag,
+)
+
+
+class QueryCacheInfo(NamedTuple):
+    """Statistics about a cache created by `Tag.enable_query_cache`."""
+
+    #: The number of searches answered from the cache.
+    hits: int
+
+    #: The number of searches that had to look at the tree.
+    misses: int
+
+    #: The most results the cache will hold.
+    max_size: int
+
+    #: The number of results currently in the cache.
+    size: int
+
+
+class QueryCache(object):
+    """The results of recent searches run on a `Tag` and the tags
+    beneath it.
+
+    Each result is stored along with the generation of the tree (see
+    `PageElement.generation`). As soon as the generation changes, all
+    stored results are thrown away. When the cache is full, the result
+    that was used least recently is thrown away.
+
+    :param owner: The `Tag` on which `Tag.enable_query_cache` was called.
+    :param max_size: The most results to hold at once.
+    """
+
+    def __init__(self, owner: Tag, max_size: int):
+        self.owner = owner
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.entries: OrderedDict[Hashable, Tuple[Tag, Any, List[Any]]] = OrderedDict()
+        self.root: Optional[PageElement] = None
+        self.generation = -1
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The keys contain id()s, which won't survive pickling.
+        return dict(
+            owner=self.owner,
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+            entries=OrderedDict(),
+            root=None,
+            generation=-1,
+        )
+
+    def info(self) -> QueryCacheInfo:
+        self._check_generation()
+        return QueryCacheInfo(self.hits, self.misses, self.max_size, len(self.entries))
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def _check_generation(self) -> None:
+        """Throw everything away if the tree has changed since the
+        results were stored.
+        """
+        root: PageElement = self.owner
+        while root.parent is not None:
+            root = root.parent
+        if root is not self.root or root._generation != self.generation:
+            self.entries.clear()
+            self.root = root
+            self.generation = root._generation
+
+    def get(self, tag: Tag, key: Optional[Hashable]) -> Optional[ResultSet[Any]]:
+        """Look up the results of a search.
+
+        :param tag: The `Tag` the search was run on.
+        :param key: A key made by `QueryCache.key`, or None if the
+            search can't be cached.
+        :return: A new `ResultSet` containing the stored results, or
+            None if there aren't any.
+        """
+        if key is not None:
+            self._check_generation()
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] is tag:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return ResultSet(entry[1], list(entry[2]))
+        self.misses += 1
+        return None
+
+    def put(self, tag: Tag, key: Optional[Hashable], results: ResultSet[Any]) -> None:
+        """Store the results of a search."""
+        if key is None or self.max_size == 0:
+            return
+        # Searching can change the generation, if it finds a part of
+        # the tree that hasn't been parsed yet. The results describe
+        # the tree as it is now.
+        self._check_generation()
+        self.entries[key] = (tag, results.source, list(results))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    @classmethod
+    def key(cls, method: str, tag: Tag, *args: Any) -> Optional[Hashable]:
+        """Turn the arguments to a search into a dictionary key.
+
+        :return: None if one of the arguments can't be part of a key,
+            in which case the search won't be cached.
+        """
+        try:
+            key = (method, id(tag), _normalize(args))
+            hash(key)
+        except (TypeError, RecursionError):
+            return None
+        return key
+
+
+def _normalize(value: Any) -> Hashable:
+    """Convert a search argument into something hashable that compares
+    equal to another argument only if the two arguments would find the
+    same things.
+
+    :raise TypeError: If that's not possible.
+    """
+    if isinstance(value, (list, tuple)):
+        return (tuple, tuple(_normalize(x) for x in value))
+    if isinstance(value, (set, frozenset)):
+        return (frozenset, frozenset(_normalize(x) for x in value))
+    if isinstance(value, dict):
+        return (
+            dict,
+            tuple(sorted((k, _normalize(v)) for k, v in value.items())),
+        )
+    # The type is included so that, for instance, True and 1 (which
+    # are equal, but mean different things to a search) get different
+    # keys.
+    return (value.__class__, value)
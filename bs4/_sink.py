@@ -0,0 +1,398 @@
+"""Receive the events sent by a `TreeBuilder` without building a tree.
+
+A `TreeBuilder` normally reports what it finds in a document by
+calling methods like ``handle_starttag`` and ``handle_data`` on a
+`BeautifulSoup` object, which turns those events into `Tag` and
+`NavigableString` objects. A `ParseEventSink` can stand in for the
+`BeautifulSoup` object when the caller only needs to observe the
+events, and has no use for the tree.
+"""
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+from collections import Counter
+from typing import (
+    Any,
+    Counter as CounterType,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from bs4.builder import (
+    TreeBuilder,
+    builder_registry,
+)
+from bs4.element import (
+    NavigableString,
+    Tag,
+)
+from bs4.exceptions import (
+    FeatureNotFound,
+    ParserRejectedMarkup,
+)
+from bs4._typing import (
+    _Encoding,
+    _Encodings,
+    _IncomingMarkup,
+    _RawAttributeValues,
+    _RawMarkup,
+)
+
+#: Used when the caller doesn't specify which parser to use. This
+#: is the same as `BeautifulSoup.DEFAULT_BUILDER_FEATURES`.
+DEFAULT_BUILDER_FEATURES: List[str] = ["html", "fast"]
+
+
+def _builder_for(
+    features: Optional[Union[str, Sequence[str]]] = None,
+    builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+    **kwargs: Any,
+) -> TreeBuilder:
+    """Find and instantiate a `TreeBuilder` the way the `BeautifulSoup`
+    constructor does, minus the warnings.
+
+    :param features: Desirable features of the parser to be used.
+    :param builder: A `TreeBuilder` subclass to instantiate (or
+        instance to use) instead of looking one up based on `features`.
+    :param kwargs: Keyword arguments for the `TreeBuilder` constructor.
+    """
+    if isinstance(builder, TreeBuilder):
+        return builder
+    if builder is None:
+        if isinstance(features, str):
+            features = [features]
+        if not features:
+            features = DEFAULT_BUILDER_FEATURES
+        builder = builder_registry.lookup(*features)
+        if builder is None:
+            raise FeatureNotFound(
+                "Couldn't find a tree builder with the features you "
+                "requested: %s. Do you need to install a parser library?"
+                % ",".join(features)
+            )
+    return builder(**kwargs)
+
+
+class ParseEventSink(object):
+    """An object that can be associated with a `TreeBuilder` in place
+    of a `BeautifulSoup` object.
+
+    This class implements the part of the `BeautifulSoup` API that
+    tree builders call while parsing, and keeps track of the stack of
+    open tags the same way `BeautifulSoup` does. Instead of creating
+    `Tag` and `NavigableString` objects, it calls `tag_started`,
+    `tag_ended` and `string_found`, which subclasses override.
+
+    Tree builders that build their own tree (currently only
+    html5lib) don't send these events. For those builders, the tree
+    is built as usual and then replayed into the sink.
+    """
+
+    #: This is the same as `BeautifulSoup.ROOT_TAG_NAME`.
+    ROOT_TAG_NAME: str = "[document]"
+
+    #: This is the same as `BeautifulSoup.ASCII_SPACES`.
+    ASCII_SPACES: str = "\x20\x0a\x09\x0c\x0d"
+
+    # Tree builders look at these attributes of a BeautifulSoup
+    # object; a sink never filters, transforms or limits the document.
+    parse_only = None
+    replacer = None
+    _limit_checker = None
+
+    builder: TreeBuilder
+    is_xml: bool
+    markup: Optional[_RawMarkup]
+    original_encoding: Optional[_Encoding]
+    declared_html_encoding: Optional[_Encoding]
+    contains_replacement_characters: bool
+
+    #: The names and namespace prefixes of the currently open tags.
+    tagStack: List[Tuple[str, Optional[str]]]
+    open_tag_counter: CounterType[str]
+    current_data: List[str]
+
+    def __init__(self, builder: TreeBuilder):
+        """Constructor.
+
+        :param builder: The `TreeBuilder` that will send events to
+            this object.
+        """
+        self.builder = builder
+        self.is_xml = builder.is_xml
+        self.element_classes: Dict[Any, Any] = {}
+        self.markup = None
+        self.original_encoding = None
+        self.declared_html_encoding = None
+        self.contains_replacement_characters = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset this object to a state as though it had never received
+        any events.
+        """
+        self._namespaces: Dict[str, str] = {}
+        self.current_data = []
+        self.tagStack = []
+        self.open_tag_counter = Counter()
+        self._preserve_whitespace_depth = 0
+        self._string_container_stack: List[str] = []
+
+    def parse(
+        self,
+        markup: _IncomingMarkup,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+    ) -> None:
+        """Run some markup through the tree builder, sending the
+        resulting events to this object.
+
+        This tries the same series of parsing strategies as the
+        `BeautifulSoup` constructor, including character encoding
+        detection with `UnicodeDammit`.
+
+        :param markup: A string, bytestring or open filehandle.
+        :param from_encoding: The encoding of the markup, if known.
+        :param exclude_encodings: Encodings known to be wrong.
+        """
+        if hasattr(markup, "read"):
+            markup = markup.read()
+        markup = cast(_RawMarkup, markup)
+        if isinstance(markup, str):
+            from_encoding = None
+
+        if not self.builder.SENDS_PARSE_EVENTS:
+            self._replay(markup, from_encoding, exclude_encodings)
+            return
+
+        rejections = []
+        try:
+            for (
+                self.markup,
+                self.original_encoding,
+                self.declared_html_encoding,
+                self.contains_replacement_characters,
+            ) in self.builder.prepare_markup(
+                markup, from_encoding, exclude_encodings=exclude_encodings
+            ):
+                self.reset()
+                self.builder.initialize_soup(cast(Any, self))
+                try:
+                    self._feed()
+                    return
+                except ParserRejectedMarkup as e:
+                    rejections.append(e)
+        finally:
+            self.markup = None
+            self.builder.soup = None
+
+        raise ParserRejectedMarkup(
+            "The markup you provided was rejected by the parser. Trying a different parser or a different encoding may help.\n\nOriginal exception(s) from parser:\n "
+            + "\n ".join([str(e) for e in rejections])
+        )
+
+    def _feed(self) -> None:
+        """Feed the current markup to the tree builder, then close any
+        tags that are still open.
+        """
+        self.builder.reset()
+        if self.markup is not None:
+            self.builder.feed(self.markup)
+        self.endData()
+        while self.tagStack:
+            self._pop()
+
+    def _replay(
+        self,
+        markup: _RawMarkup,
+        from_encoding: Optional[_Encoding],
+        exclude_encodings: Optional[_Encodings],
+    ) -> None:
+        """Build a tree with a builder that won't send events, then
+        send this object the events that would have built that tree.
+        """
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(
+            markup,
+            builder=self.builder,
+            from_encoding=from_encoding,
+            exclude_encodings=exclude_encodings,
+        )
+        self.original_encoding = soup.original_encoding
+        self.declared_html_encoding = soup.declared_html_encoding
+        self.contains_replacement_characters = soup.contains_replacement_characters
+        for event, element in soup._event_stream(soup.descendants):
+            if event is Tag.STRING_ELEMENT_EVENT:
+                string = cast(NavigableString, element)
+                self.string_found(str(string), type(string))
+                continue
+            tag = cast(Tag, element)
+            if event is Tag.END_ELEMENT_EVENT:
+                self.tag_ended(tag.name, tag.prefix)
+            else:
+                # Put multi-valued attributes back the way they were
+                # in the markup.
+                attrs = {
+                    key: " ".join(value) if isinstance(value, list) else value
+                    for key, value in tag.attrs.items()
+                }
+                self.tag_started(tag.name, tag.namespace, tag.prefix, attrs)
+                if event is Tag.EMPTY_ELEMENT_EVENT:
+                    self.tag_ended(tag.name, tag.prefix)
+
+    # Subclasses override these methods to find out what's in the
+    # document.
+
+    def tag_started(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: _RawAttributeValues,
+    ) -> None:
+        """Called when a tag is opened.
+
+        :param name: Name of the tag.
+        :param namespace: The URI of the tag's XML namespace, if any.
+        :param nsprefix: The prefix for the tag's XML namespace, if any.
+        :param attrs: A dictionary of attribute values.
+        """
+
+    def tag_ended(self, name: str, nsprefix: Optional[str]) -> None:
+        """Called when a tag is closed, whether or not the document
+        contained an explicit closing tag.
+
+        :param name: Name of the tag.
+        :param nsprefix: The prefix for the tag's XML namespace, if any.
+        """
+
+    def string_found(self, string: str, container: Type[NavigableString]) -> None:
+        """Called when a complete string has been found.
+
+        :param string: The string, with whitespace-only strings
+            collapsed the same way `BeautifulSoup` collapses them.
+        :param container: The `NavigableString` subclass that
+            `BeautifulSoup` would have used to hold this string,
+            e.g. `Comment` or `Script`.
+        """
+
+    # These methods are called by the tree builder.
+
+    def handle_starttag(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: _RawAttributeValues,
+        sourceline: Optional[int] = None,
+        sourcepos: Optional[int] = None,
+        namespaces: Optional[Dict[str, str]] = None,
+        sourceoffset: Optional[int] = None,
+    ) -> None:
+        """Called by the tree builder when a new tag is encountered.
+
+        :meta private:
+        """
+        self.endData()
+        self.tag_started(name, namespace, nsprefix, attrs)
+        empty_element_tags = self.builder.empty_element_tags
+        if empty_element_tags is not None and name in empty_element_tags:
+            # This tag can't contain anything, so it's closed as
+            # soon as it's opened. Any explicit closing tag will be
+            # ignored, since there's no corresponding open tag.
+            self.tag_ended(name, nsprefix)
+            return None
+        self.tagStack.append((name, nsprefix))
+        self.open_tag_counter[name] += 1
+        if name in self.builder.preserve_whitespace_tags:
+            self._preserve_whitespace_depth += 1
+        if name in self.builder.string_containers:
+            self._string_container_stack.append(name)
+        return None
+
+    def handle_endtag(
+        self,
+        name: str,
+        nsprefix: Optional[str] = None,
+        sourceoffset: Optional[int] = None,
+        sourceend: Optional[int] = None,
+    ) -> None:
+        """Called by the tree builder when an ending tag is encountered.
+
+        Like `BeautifulSoup.handle_endtag`, this closes every tag up to
+        and including the most recently opened tag with the name of
+        the *current* tag, whatever the name of the ending tag. So in
+        "<p>a</b>b</p>", the </b> closes the <p>.
+
+        :meta private:
+        """
+        self.endData()
+        empty_element_tags = self.builder.empty_element_tags
+        if (
+            empty_element_tags is not None
+            and name in empty_element_tags
+            and not self.open_tag_counter.get(name)
+        ):
+            # This closes an empty-element tag, which was closed as
+            # soon as it was opened.
+            return
+        if self.tagStack:
+            name = self.tagStack[-1][0]
+        while self.open_tag_counter.get(name):
+            popped_name, popped_prefix = self._pop()
+            if popped_name == name and popped_prefix == nsprefix:
+                break
+
+    def handle_data(self, data: str) -> None:
+        """Called by the tree builder when a chunk of textual data is
+        encountered.
+
+        :meta private:
+        """
+        self.current_data.append(data)
+
+    def endData(self, containerClass: Optional[Type[NavigableString]] = None) -> None:
+        """Called by the tree builder when the end of a data segment
+        occurs.
+
+        :meta private:
+        """
+        if not self.current_data:
+            return
+        current_data = "".join(self.current_data)
+        self.current_data = []
+
+        # Collapse whitespace the way BeautifulSoup.endData does.
+        if not self._preserve_whitespace_depth and not current_data.strip(
+            self.ASCII_SPACES
+        ):
+            if "\n" in current_data:
+                current_data = "\n"
+            else:
+                current_data = " "
+
+        container = containerClass or NavigableString
+        if container is NavigableString and self._string_container_stack:
+            container = self.builder.string_containers.get(
+                self._string_container_stack[-1], container
+            )
+        self.string_found(current_data, container)
+
+    def _pop(self) -> Tuple[str, Optional[str]]:
+        """Close the most recently opened tag."""
+        name, nsprefix = self.tagStack.pop()
+        self.open_tag_counter[name] -= 1
+        if name in self.builder.preserve_whitespace_tags:
+            self._preserve_whitespace_depth -= 1
+        if self._string_container_stack and self._string_container_stack[-1] == name:
+            self._string_container_stack.pop()
+        self.tag_ended(name, nsprefix)
+        return name, nsprefix
@@ -59,8 +59,12 @@ class _RegularExpressionProtocol(Protocol):
 
 # Aliases for markup in various stages of processing.
 #
-#: The rawest form of markup: either a string, bytestring, or an open filehandle.
-_IncomingMarkup: TypeAlias = Union[str, bytes, IO[str], IO[bytes]]
+#: The rawest form of markup: either a string, bytestring, or an open
+#: filehandle. Some tree builders can also parse a memoryview or a
+#: bytearray without copying it.
+_IncomingMarkup: TypeAlias = Union[
+    str, bytes, IO[str], IO[bytes], memoryview, bytearray
+]
 
 #: Markup that is in memory but has (potentially) yet to be converted
 #: to Unicode.
@@ -194,3 +198,7 @@ _StrainableAttributes: TypeAlias = Dict[str, _StrainableAttribute]
 _OneElement: TypeAlias = Union["PageElement", "Tag", "NavigableString"]
 _AtMostOneElement: TypeAlias = Optional[_OneElement]
 _QueryResults: TypeAlias = "ResultSet[_OneElement]"
+
+#: A function called when a tree is modified, with the element that
+#: changed and the kind of change. See `Tag.add_mutation_listener`.
+_MutationListener: TypeAlias = Callable[["PageElement", str], Any]
@@ -0,0 +1,347 @@
+"""A benchmark suite for Beautiful Soup.
+
+The suite times parsing, searching, extracting text, modifying the
+tree and turning it back into markup, with each of the installed
+parsers, on synthetic documents of different sizes (see
+`bs4.benchmarks.corpus`). Run it with::
+
+ python -m bs4.benchmarks --output results.json
+
+and check a later run against those results with::
+
+ python -m bs4.benchmarks --compare results.json
+
+Run ``python -m bs4.benchmarks --help`` for the rest of the options.
+
+`bs4.benchmarks.stress` is a separate suite that checks how Beautiful
+Soup scales on pathological markup.
+"""
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "BENCHMARKS",
+    "DEFAULT_PARSERS",
+    "DEFAULT_SIZES",
+    "Benchmark",
+    "Regression",
+    "Result",
+    "compare",
+    "load",
+    "run",
+    "save",
+]
+
+import json
+import platform
+import statistics
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from bs4 import (
+    BeautifulSoup,
+    ResultSet,
+    Tag,
+    __version__,
+)
+from bs4.builder import builder_registry
+from bs4.benchmarks.corpus import (
+    format_size,
+    generate,
+)
+
+#: The parsers to benchmark, if they're installed.
+DEFAULT_PARSERS: List[str] = ["html.parser", "lxml", "lxml-xml", "html5lib"]
+
+#: The document sizes to benchmark, in bytes: 1 KB to 1 MB. Larger
+#: sizes, up to 100 MB, can be given on the command line.
+DEFAULT_SIZES: List[int] = [1024, 100 * 1024, 1024 * 1024]
+
+
+class Benchmark(object):
+    """One thing to time.
+
+    :param name: The name of the benchmark.
+    :param setup: A function that's called (but not timed) with a
+        freshly parsed `BeautifulSoup` object, and returns whatever
+        ``operation`` needs.
+    :param operation: The function to time. It's called with the
+        `BeautifulSoup` object and whatever ``setup`` returned.
+    :param modifies: If this is True, ``operation`` changes the tree,
+        so each repetition gets a freshly parsed document.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[BeautifulSoup], Any],
+        operation: Callable[[BeautifulSoup, Any], Any],
+        modifies: bool = False,
+    ):
+        self.name = name
+        self.setup = setup
+        self.operation = operation
+        self.modifies = modifies
+
+
+def _names(soup: BeautifulSoup) -> Tuple[str, str, str]:
+    """The names of a tag that occurs often, a tag with several
+    children, and a CSS selector, for either kind of generated document.
+    """
+    if soup.is_xml:
+        return "name", "tags", "item > tags tag"
+    return "a", "p", "div.section p a"
+
+
+def _nothing(soup: BeautifulSoup) -> None:
+    return None
+
+
+def _targets(soup: BeautifulSoup) -> ResultSet[Tag]:
+    # A search by name only finds tags.
+    return cast(ResultSet[Tag], soup.find_all(_names(soup)[0]))
+
+
+def _containers(soup: BeautifulSoup) -> ResultSet[Tag]:
+    return cast(ResultSet[Tag], soup.find_all(_names(soup)[1]))
+
+
+def _insert(soup: BeautifulSoup, tags: List[Tag]) -> None:
+    for tag in tags:
+        tag.insert(0, soup.new_tag("span"))
+
+
+def _replace_with(soup: BeautifulSoup, tags: List[Tag]) -> None:
+    for tag in tags:
+        tag.replace_with(soup.new_tag("i"))
+
+
+#: The benchmarks that make up the suite, apart from parsing, which
+#: is timed separately because it doesn't start with a parsed tree.
+BENCHMARKS: List[Benchmark] = [
+    Benchmark(
+        "find_all", _nothing, lambda soup, x: _targets(soup)
+    ),
+    Benchmark("select", _nothing, lambda soup, x: soup.select(_names(soup)[2])),
+    Benchmark("get_text", _nothing, lambda soup, x: soup.get_text()),
+    Benchmark(
+        "extract",
+        _targets,
+        lambda soup, tags: [tag.extract() for tag in tags],
+        modifies=True,
+    ),
+    Benchmark("insert", _containers, _insert, modifies=True),
+    Benchmark("replace_with", _targets, _replace_with, modifies=True),
+    Benchmark("decode", _nothing, lambda soup, x: soup.decode()),
+    Benchmark("prettify", _nothing, lambda soup, x: soup.prettify()),
+]
+
+
+class Result(NamedTuple):
+    """The timings of one benchmark with one parser and one document."""
+
+    benchmark: str
+    parser: str
+    size: int
+    warmup: int
+    repetitions: int
+
+    #: How long each repetition took, in seconds.
+    times: List[float]
+
+    @property
+    def key(self) -> Tuple[str, str, int]:
+        return (self.benchmark, self.parser, self.size)
+
+    @property
+    def mean(self) -> float:
+        return statistics.mean(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def variance(self) -> float:
+        if len(self.times) < 2:
+            return 0.0
+        return statistics.variance(self.times)
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = self._asdict()
+        data.update(
+            mean=self.mean,
+            median=self.median,
+            minimum=min(self.times),
+            variance=self.variance,
+            stdev=self.variance**0.5,
+        )
+        return data
+
+
+class Regression(NamedTuple):
+    """A benchmark that got slower than it was in the baseline."""
+
+    result: Result
+    baseline: Result
+
+    @property
+    def ratio(self) -> float:
+        """How many times slower the benchmark got."""
+        return self.result.median / self.baseline.median
+
+    def __str__(self) -> str:
+        return "%s with %s on %s: %.4fs, was %.4fs (%.0f%% slower)" % (
+            self.result.benchmark,
+            self.result.parser,
+            format_size(self.result.size),
+            self.result.median,
+            self.baseline.median,
+            (self.ratio - 1) * 100,
+        )
+
+
+def _time(function: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def run(
+    benchmarks: Optional[Iterable[str]] = None,
+    parsers: Iterable[str] = DEFAULT_PARSERS,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    seed: int = 0,
+    warmup: int = 1,
+    repetitions: int = 5,
+    report: Optional[Callable[[Result], Any]] = None,
+) -> List[Result]:
+    """Run the benchmark suite.
+
+    :param benchmarks: The names of the benchmarks to run: "parse"
+        or the name of something in `BENCHMARKS`. By default, all of
+        them are run.
+    :param parsers: The parsers to use. Parsers that aren't
+        installed are skipped.
+    :param sizes: The sizes of the documents to use, in bytes.
+    :param seed: The seed used to generate the documents.
+    :param warmup: How many times to run each benchmark before
+        timing it.
+    :param repetitions: How many times to time each benchmark.
+    :param report: A function to be called with each `Result` as
+        soon as it's ready.
+    :return: A list of `Result` objects.
+    """
+    names = ["parse"] + [benchmark.name for benchmark in BENCHMARKS]
+    if benchmarks is not None:
+        wanted = list(benchmarks)
+        unknown = set(wanted) - set(names)
+        if unknown:
+            raise ValueError("Unknown benchmarks: %s" % ", ".join(sorted(unknown)))
+        names = [name for name in names if name in wanted]
+
+    results = []
+    documents: Dict[Tuple[int, bool], str] = {}
+    for parser in parsers:
+        builder_class = builder_registry.lookup(parser)
+        if builder_class is None:
+            continue
+        xml = builder_class.is_xml
+        for size in sizes:
+            key = (size, xml)
+            if key not in documents:
+                documents[key] = generate(size, seed, xml)
+            markup = documents[key]
+            for name in names:
+                if name == "parse":
+                    timer = lambda: BeautifulSoup(markup, parser)  # noqa: E731
+                    times = [_time(timer) for i in range(warmup + repetitions)]
+                else:
+                    times = _run_benchmark(
+                        _benchmark(name), markup, parser, warmup + repetitions
+                    )
+                result = Result(
+                    name, parser, size, warmup, repetitions, times[warmup:]
+                )
+                if report is not None:
+                    report(result)
+                results.append(result)
+    return results
+
+
+def _benchmark(name: str) -> Benchmark:
+    for benchmark in BENCHMARKS:
+        if benchmark.name == name:
+            return benchmark
+    raise ValueError(name)
+
+
+def _run_benchmark(
+    benchmark: Benchmark, markup: str, parser: str, count: int
+) -> List[float]:
+    times = []
+    soup = None
+    for i in range(count):
+        if soup is None or benchmark.modifies:
+            soup = BeautifulSoup(markup, parser)
+        argument = benchmark.setup(soup)
+        times.append(_time(lambda: benchmark.operation(soup, argument)))
+    return times
+
+
+def compare(
+    results: Sequence[Result], baseline: Sequence[Result], threshold: float = 0.1
+) -> List[Regression]:
+    """Find the benchmarks that got slower.
+
+    Benchmarks are compared by their median times. A benchmark that
+    isn't in the baseline is ignored.
+
+    :param threshold: How much slower a benchmark has to get to count
+        as a regression. The default, 0.1, means 10% slower.
+    """
+    old = {result.key: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = old.get(result.key)
+        if before is None or before.median <= 0:
+            continue
+        if result.median > before.median * (1 + threshold):
+            regressions.append(Regression(result, before))
+    return regressions
+
+
+def save(results: Sequence[Result], filename: str, seed: int = 0) -> None:
+    """Write results to a JSON file."""
+    data = dict(
+        version=__version__,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        seed=seed,
+        results=[result.as_dict() for result in results],
+    )
+    with open(filename, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def load(filename: str) -> List[Result]:
+    """Read results written by `save`."""
+    with open(filename) as f:
+        data = json.load(f)
+    fields = Result._fields
+    return [
+        Result(**{field: result[field] for field in fields})
+        for result in data["results"]
+    ]
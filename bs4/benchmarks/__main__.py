@@ -0,0 +1,134 @@
+"""Run the benchmark suite from the command line.
+
+See ``python -m bs4.benchmarks --help``.
+"""
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+import argparse
+import sys
+from typing import (
+    List,
+    Optional,
+)
+
+from bs4.benchmarks import (
+    BENCHMARKS,
+    DEFAULT_PARSERS,
+    DEFAULT_SIZES,
+    Result,
+    compare,
+    load,
+    run,
+    save,
+)
+from bs4.benchmarks.corpus import (
+    format_size,
+    parse_size,
+)
+
+
+def _comma_separated(value: str) -> List[str]:
+    return [x.strip() for x in value.split(",") if x.strip()]
+
+
+def _print_result(result: Result) -> None:
+    print(
+        "%-12s %-12s %6s  median %.6fs  stdev %.6fs"
+        % (
+            result.benchmark,
+            result.parser,
+            format_size(result.size),
+            result.median,
+            result.variance**0.5,
+        )
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark suite.
+
+    :return: 1 if regressions were found when comparing against a
+        baseline, 0 otherwise.
+    """
+    names = ["parse"] + [benchmark.name for benchmark in BENCHMARKS]
+    parser = argparse.ArgumentParser(
+        prog="python -m bs4.benchmarks",
+        description="Time Beautiful Soup operations on synthetic documents.",
+    )
+    parser.add_argument(
+        "--benchmarks",
+        type=_comma_separated,
+        help="Comma-separated benchmarks to run (default: all of %s)."
+        % ",".join(names),
+    )
+    parser.add_argument(
+        "--parsers",
+        type=_comma_separated,
+        default=DEFAULT_PARSERS,
+        help="Comma-separated parsers to use (default: %s)."
+        % ",".join(DEFAULT_PARSERS),
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [parse_size(x) for x in _comma_separated(value)],
+        default=DEFAULT_SIZES,
+        help="Comma-separated document sizes, e.g. 1KB,10MB,100MB (default: %s)."
+        % ",".join(format_size(x) for x in DEFAULT_SIZES),
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for generating the documents."
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Untimed runs of each benchmark."
+    )
+    parser.add_argument(
+        "--repetitions", type=int, default=5, help="Timed runs of each benchmark."
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--compare", metavar="BASELINE", help="A JSON file of earlier results."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="How much slower counts as a regression (default: 0.1, i.e. 10%%).",
+    )
+    args = parser.parse_args(argv)
+    if args.repetitions < 1:
+        parser.error("--repetitions must be at least 1.")
+
+    baseline = None
+    if args.compare:
+        baseline = load(args.compare)
+
+    try:
+        results = run(
+            args.benchmarks,
+            args.parsers,
+            args.sizes,
+            args.seed,
+            args.warmup,
+            args.repetitions,
+            report=_print_result,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if args.output:
+        save(results, args.output, args.seed)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\n%d regression(s):" % len(regressions))
+            for regression in regressions:
+                print("  " + str(regression))
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
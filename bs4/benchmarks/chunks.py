@@ -0,0 +1,185 @@
+"""How the size of the pieces fed to lxml affects parsing.
+
+The lxml tree builders feed a document to lxml a piece at a time, and
+the size of the pieces grows with the size of the document (see
+`LXMLTreeBuilderForXML.chunk_size`). This suite parses the same
+document with a series of fixed chunk sizes, and with the size the
+tree builder would pick, and reports the throughput of each. Run it
+with::
+
+ python -m bs4.benchmarks.chunks --sizes 1MB,10MB
+
+Bigger pieces mean fewer calls into lxml, but past a certain point
+they stop helping: the cost of building the tree dominates. Meanwhile
+each piece is a copy of part of the document, so it costs as much
+memory as it's long, and a `ParseLimits` time limit is only checked
+between pieces when a piece creates no nodes. The "per chunk" column
+shows how long parsing one piece takes.
+"""
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZES",
+    "ChunkResult",
+    "main",
+    "run",
+]
+
+import argparse
+import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from bs4.benchmarks.corpus import (
+    format_size,
+    generate,
+    parse_size,
+)
+
+#: The fixed chunk sizes to try, in bytes.
+DEFAULT_CHUNK_SIZES: List[int] = [512, 4 * 1024, 64 * 1024, 1024 * 1024]
+
+
+class ChunkResult(NamedTuple):
+    """The timings of parsing one document with one chunk size."""
+
+    parser: str
+
+    #: The size of the document, in bytes.
+    size: int
+
+    #: The size of the pieces the document was fed in.
+    chunk_size: int
+
+    #: True if ``chunk_size`` is the one the tree builder picked.
+    adaptive: bool
+
+    #: The fastest time, in seconds.
+    time: float
+
+    @property
+    def throughput(self) -> float:
+        """How many bytes were parsed per second."""
+        return self.size / max(self.time, 1e-9)
+
+    @property
+    def chunk_time(self) -> float:
+        """Roughly how long it took to parse one piece, in seconds."""
+        chunks = max(1, -(-self.size // self.chunk_size))
+        return self.time / chunks
+
+    def __str__(self) -> str:
+        return "%-9s %9.1fKB  chunks of %8.1fKB%s %7.2f MB/s  %8.2fms per chunk" % (
+            self.parser,
+            self.size / 1024,
+            self.chunk_size / 1024,
+            "*" if self.adaptive else " ",
+            self.throughput / (1024 * 1024),
+            self.chunk_time * 1000,
+        )
+
+
+def run(
+    parsers: Iterable[str] = ("lxml", "lxml-xml"),
+    sizes: Iterable[int] = (1024 * 1024,),
+    chunk_sizes: Sequence[int] = DEFAULT_CHUNK_SIZES,
+    repetitions: int = 3,
+    report: Optional[Callable[[ChunkResult], Any]] = None,
+) -> List[ChunkResult]:
+    """Run the suite.
+
+    :param parsers: The parsers to use. Parsers that aren't
+        installed, or that aren't fed in pieces, are skipped.
+    :param sizes: The sizes of the documents to use, in bytes.
+    :param chunk_sizes: The fixed chunk sizes to try. The chunk size
+        the tree builder picks for each document is tried as well.
+    :param repetitions: How many times to time each chunk size. The
+        fastest time is kept.
+    :param report: A function to be called with each `ChunkResult`
+        as soon as it's ready.
+    :return: A list of `ChunkResult` objects.
+    """
+    results = []
+    for parser in parsers:
+        builder_class = builder_registry.lookup(parser)
+        if builder_class is None or not hasattr(builder_class, "chunk_size"):
+            continue
+        for size in sizes:
+            markup = generate(size, xml=builder_class.is_xml).encode("utf8")
+            builder = builder_class()
+            # Only some tree builders have this method, so it's not
+            # part of the TreeBuilder interface.
+            pick_chunk_size: Callable[[int], int] = getattr(builder, "chunk_size")
+            adaptive = pick_chunk_size(len(markup))
+            for chunk_size in sorted(set(chunk_sizes) | {adaptive}):
+                # Make this builder feed the document in pieces of
+                # this size.
+                setattr(builder, "chunk_size", lambda length, size=chunk_size: size)
+                best = min(_time(markup, builder) for i in range(repetitions))
+                result = ChunkResult(
+                    parser, len(markup), chunk_size, chunk_size == adaptive, best
+                )
+                if report is not None:
+                    report(result)
+                results.append(result)
+    return results
+
+
+def _time(markup: bytes, builder: Any) -> float:
+    start = time.perf_counter()
+    BeautifulSoup(markup, builder=builder)
+    return time.perf_counter() - start
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m bs4.benchmarks.chunks",
+        description="Find out how the size of the pieces fed to lxml affects parsing.",
+    )
+    parser.add_argument(
+        "--parsers",
+        type=lambda value: [x.strip() for x in value.split(",") if x.strip()],
+        default=["lxml", "lxml-xml"],
+        help="Comma-separated parsers to use (default: lxml,lxml-xml).",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [parse_size(x) for x in value.split(",") if x.strip()],
+        default=[1024 * 1024],
+        help="Comma-separated document sizes, e.g. 1MB,10MB (default: 1MB).",
+    )
+    parser.add_argument(
+        "--chunk-sizes",
+        type=lambda value: [parse_size(x) for x in value.split(",") if x.strip()],
+        default=DEFAULT_CHUNK_SIZES,
+        help="Comma-separated chunk sizes to try (default: %s)."
+        % ",".join(format_size(x) for x in DEFAULT_CHUNK_SIZES),
+    )
+    parser.add_argument(
+        "--repetitions", type=int, default=3, help="Timed runs of each chunk size."
+    )
+    args = parser.parse_args(argv)
+    if args.repetitions < 1:
+        parser.error("--repetitions must be at least 1.")
+    if any(size < 1 for size in args.chunk_sizes):
+        parser.error("Chunk sizes must be at least 1 byte.")
+    run(args.parsers, args.sizes, args.chunk_sizes, args.repetitions, report=print)
+    print("\n* The chunk size the tree builder picks for a document of this size.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Synthetic documents for the benchmark suite.
+
+The documents are generated from a seed, so the same seed and size
+always give the same document, on any machine and any version of
+Python.
+"""
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+import random
+import re
+from typing import (
+    Callable,
+    Dict,
+    List,
+)
+
+#: Suffixes understood by `parse_size`.
+_SIZE_UNITS: Dict[str, int] = {
+    "": 1,
+    "B": 1,
+    "KB": 1024,
+    "MB": 1024 * 1024,
+    "GB": 1024 * 1024 * 1024,
+}
+
+_vowels = "aeiou"
+_consonants = "bcdfghjklmnpqrstvwxyz"
+
+
+def parse_size(size: str) -> int:
+    """Convert a size like "10KB" or "1MB" into a number of bytes.
+
+    :raise ValueError: If the size can't be understood.
+    """
+    match = re.match(r"^\s*(\d+)\s*([KMG]?B?)\s*$", size.upper())
+    if match is None:
+        raise ValueError("Can't understand the size %r." % size)
+    number, unit = match.groups()
+    if unit in ("K", "M", "G"):
+        unit += "B"
+    return int(number) * _SIZE_UNITS[unit]
+
+
+def format_size(size: int) -> str:
+    """The reverse of `parse_size`, for sizes that are a round number
+    of kilobytes or megabytes.
+    """
+    for unit in ("GB", "MB", "KB"):
+        multiplier = _SIZE_UNITS[unit]
+        if size >= multiplier and size % multiplier == 0:
+            return "%d%s" % (size // multiplier, unit)
+    return "%dB" % size
+
+
+class _Writer(object):
+    """Generates pieces of a document from a random number generator."""
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+
+    def word(self) -> str:
+        choice = self.random.choice
+        return "".join(
+            choice(_consonants if i % 2 == 0 else _vowels)
+            for i in range(self.random.randint(2, 9))
+        )
+
+    def sentence(self, words: int) -> str:
+        return " ".join(self.word() for i in range(words))
+
+    def html_section(self, index: int) -> str:
+        r = self.random
+        pieces = [
+            '<div class="section s%d" id="d%d">' % (index % 7, index),
+            "<h2>%s</h2>" % self.sentence(r.randint(1, 4)),
+        ]
+        for i in range(r.randint(1, 4)):
+            pieces.append(
+                '<p class="text">%s <a href="/page/%d?q=%s&amp;n=%d">%s</a> '
+                "<b>%s</b> %s</p>"
+                % (
+                    self.sentence(r.randint(3, 12)),
+                    index,
+                    self.word(),
+                    i,
+                    self.word(),
+                    self.word(),
+                    self.sentence(r.randint(2, 8)),
+                )
+            )
+        choice = r.randint(0, 3)
+        if choice == 0:
+            pieces.append("<ul>")
+            for i in range(r.randint(1, 5)):
+                pieces.append("<li>%s</li>" % self.sentence(r.randint(1, 5)))
+            pieces.append("</ul>")
+        elif choice == 1:
+            pieces.append('<table class="data">')
+            for i in range(r.randint(1, 3)):
+                pieces.append(
+                    "<tr><td>%s</td><td>%d</td></tr>" % (self.word(), r.randint(0, 999))
+                )
+            pieces.append("</table>")
+        elif choice == 2:
+            pieces.append("<!-- %s -->" % self.sentence(3))
+            pieces.append(
+                "<script>var x%d = %d;</script>" % (index, r.randint(0, 99))
+            )
+        else:
+            pieces.append(
+                '<div class="nested"><span>%s</span><br><img src="/i/%d.png" alt="%s"></div>'
+                % (self.sentence(2), index, self.word())
+            )
+        pieces.append("</div>\n")
+        return "".join(pieces)
+
+    def xml_item(self, index: int) -> str:
+        r = self.random
+        pieces = [
+            '<item id="i%d" kind="%s">' % (index, self.word()),
+            "<name>%s</name>" % self.sentence(r.randint(1, 3)),
+            "<description>%s &amp; %s</description>"
+            % (self.sentence(r.randint(3, 12)), self.word()),
+            "<tags>",
+        ]
+        for i in range(r.randint(1, 4)):
+            pieces.append("<tag>%s</tag>" % self.word())
+        pieces.append("</tags>")
+        if r.randint(0, 3) == 0:
+            pieces.append("<!-- %s -->" % self.sentence(3))
+        pieces.append("<price>%d.%02d</price>" % (r.randint(0, 999), r.randint(0, 99)))
+        pieces.append("</item>\n")
+        return "".join(pieces)
+
+
+def generate(size: int, seed: int = 0, xml: bool = False) -> str:
+    """Generate a document.
+
+    :param size: The approximate size of the document, in bytes. The
+        document is ASCII, so this is also its length. It will be a
+        little longer than this, rather than shorter.
+    :param seed: The seed for the random number generator.
+    :param xml: If this is True, the document is XML. Otherwise it's HTML.
+    """
+    writer = _Writer(seed)
+    if xml:
+        header = '<?xml version="1.0" encoding="utf-8"?>\n<catalog>\n'
+        footer = "</catalog>\n"
+        piece: Callable[[int], str] = writer.xml_item
+    else:
+        header = (
+            "<!DOCTYPE html>\n<html><head><title>%s</title>"
+            "<style>p { margin: 0 }</style></head><body>\n"
+        ) % writer.sentence(3)
+        footer = "</body></html>\n"
+        piece = writer.html_section
+
+    pieces: List[str] = [header]
+    length = len(header) + len(footer)
+    index = 0
+    while length < size:
+        section = piece(index)
+        pieces.append(section)
+        length += len(section)
+        index += 1
+    pieces.append(footer)
+    return "".join(pieces)
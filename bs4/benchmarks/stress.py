@@ -0,0 +1,324 @@
+"""A stress suite for pathological markup.
+
+Each `Pathology` makes a document (or a tree) that's bad in some
+particular way, at a given size: thousands of unclosed tags, deeply
+nested formatting tags, huge numbers of attributes, enormous strings,
+very long lists of siblings. The suite times each pathology at a
+series of growing sizes and fits a scaling exponent to the timings:
+1.0 means the time grows linearly with the size, 2.0 means it's
+quadratic. Run it with::
+
+ python -m bs4.benchmarks.stress
+
+Anything that scales worse than linearly is reported, and the exit
+status is 1.
+"""
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "PATHOLOGIES",
+    "Pathology",
+    "StressResult",
+    "fit_exponent",
+    "main",
+    "run",
+]
+
+import argparse
+import math
+import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from bs4 import (
+    BeautifulSoup,
+    Tag,
+)
+from bs4.builder import builder_registry
+from bs4.benchmarks import DEFAULT_PARSERS
+
+#: How much worse than linear a pathology can scale before it's
+#: reported.
+DEFAULT_THRESHOLD: float = 1.3
+
+
+class Pathology(object):
+    """One kind of bad input, at any size.
+
+    :param name: The name of the pathology.
+    :param setup: A function that's called (but not timed) with a
+        size and the name of a parser, and returns whatever
+        ``operation`` needs.
+    :param operation: The function to time. It's called with whatever
+        ``setup`` returned.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[int, str], Any],
+        operation: Callable[[Any], Any],
+    ):
+        self.name = name
+        self.setup = setup
+        self.operation = operation
+
+
+def _parsing(name: str, markup: Callable[[int], str]) -> Pathology:
+    """A pathology that's exercised by parsing a document."""
+    return Pathology(
+        name,
+        lambda size, parser: (markup(size), parser),
+        lambda argument: BeautifulSoup(*argument),
+    )
+
+
+def _tree(
+    name: str, markup: Callable[[int], str], operation: Callable[[Tag], Any]
+) -> Pathology:
+    """A pathology that's exercised by doing something to a parsed
+    document. The operation is called with the document's <body> tag,
+    or with the document itself if there is no <body> tag.
+    """
+
+    def setup(size: int, parser: str) -> Tag:
+        soup = BeautifulSoup(markup(size), parser)
+        return soup.body or soup
+
+    return Pathology(name, setup, operation)
+
+
+def _siblings(size: int) -> str:
+    return "<body>" + "<b>x</b>" * size + "</body>"
+
+
+def _deep(size: int) -> str:
+    return "<body>" + "<div>" * size + "x" + "</div>" * size + "</body>"
+
+
+def _extract_all(tag: Tag, reverse: bool = False) -> None:
+    children = list(tag.contents)
+    if reverse:
+        children.reverse()
+    for child in children:
+        child.extract()
+
+
+def _insert_at_front(tag: Tag) -> None:
+    for child in list(tag.contents):
+        tag.insert(0, child)
+
+
+#: The pathologies that make up the suite.
+PATHOLOGIES: List[Pathology] = [
+    _parsing("unclosed_tags", lambda size: "<div>" * size + "x"),
+    _parsing(
+        "stray_end_tags", lambda size: "<div><p>" + "</span>" * size + "x"
+    ),
+    _parsing(
+        "nested_formatting", lambda size: "<b><i><u>" * size + "<p>x</p>"
+    ),
+    _parsing(
+        "misnested_formatting",
+        lambda size: "<p>" + "<b><i>x</b>y</i>" * size,
+    ),
+    _parsing(
+        "many_attributes",
+        lambda size: "<p %s>x</p>" % " ".join('a%d="v"' % i for i in range(size)),
+    ),
+    _parsing("duplicate_attributes", lambda size: "<p" + ' a="v"' * size + ">x</p>"),
+    # A size is a hundred characters of text.
+    _parsing("long_text", lambda size: "<p>" + "xy " * (size * 33) + "</p>"),
+    _parsing("long_whitespace", lambda size: "<p>" + "   " * (size * 33) + "</p>"),
+    _parsing("split_text", lambda size: "<p>" + "x</a>" * size),
+    _parsing("many_siblings", _siblings),
+    _tree("extract_siblings", _siblings, _extract_all),
+    _tree(
+        "extract_siblings_reversed",
+        _siblings,
+        lambda tag: _extract_all(tag, reverse=True),
+    ),
+    _tree("insert_siblings_at_front", _siblings, _insert_at_front),
+    _tree("decode_siblings", _siblings, lambda tag: tag.decode()),
+    _tree("decode_deep", _deep, lambda tag: tag.decode()),
+    _tree("get_text_deep", _deep, lambda tag: tag.get_text()),
+    _tree("decompose_deep", _deep, lambda tag: tag.decompose()),
+]
+
+
+class StressResult(NamedTuple):
+    """The timings of one pathology with one parser."""
+
+    pathology: str
+    parser: str
+
+    #: The sizes the pathology was timed at.
+    sizes: List[int]
+
+    #: The fastest time at each size, in seconds.
+    times: List[float]
+
+    @property
+    def exponent(self) -> float:
+        """The scaling exponent fitted to the timings."""
+        return fit_exponent(self.sizes, self.times)
+
+    def __str__(self) -> str:
+        return "%-26s %-12s exponent %.2f  (%s)" % (
+            self.pathology,
+            self.parser,
+            self.exponent,
+            ", ".join(
+                "%d: %.4fs" % (size, t) for size, t in zip(self.sizes, self.times)
+            ),
+        )
+
+
+def fit_exponent(sizes: Sequence[float], times: Sequence[float]) -> float:
+    """Fit ``time = c * size ** exponent`` to some timings, by least
+    squares on a log-log scale.
+
+    :return: The exponent.
+    """
+    if len(sizes) != len(times) or len(sizes) < 2:
+        raise ValueError("Need at least two sizes, with one time for each.")
+    xs = [math.log(size) for size in sizes]
+    # A timer can report zero for something very fast.
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if spread == 0:
+        raise ValueError("Need at least two different sizes.")
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def _time(pathology: Pathology, size: int, parser: str) -> float:
+    argument = pathology.setup(size, parser)
+    start = time.perf_counter()
+    pathology.operation(argument)
+    return time.perf_counter() - start
+
+
+def run(
+    pathologies: Optional[Iterable[str]] = None,
+    parsers: Iterable[str] = DEFAULT_PARSERS,
+    sizes: Sequence[int] = (1000, 2000, 4000, 8000),
+    repetitions: int = 3,
+    report: Optional[Callable[[StressResult], Any]] = None,
+) -> List[StressResult]:
+    """Run the stress suite.
+
+    :param pathologies: The names of the pathologies to run. By
+        default, all of `PATHOLOGIES` are run.
+    :param parsers: The parsers to use. Parsers that aren't
+        installed are skipped.
+    :param sizes: The sizes to run each pathology at. What a size
+        means depends on the pathology: it might be a number of tags,
+        attributes or characters.
+    :param repetitions: How many times to time each pathology at each
+        size. The fastest time is kept, since noise only ever makes
+        things slower.
+    :param report: A function to be called with each `StressResult`
+        as soon as it's ready.
+    :return: A list of `StressResult` objects.
+    """
+    selected = PATHOLOGIES
+    if pathologies is not None:
+        wanted = list(pathologies)
+        unknown = set(wanted) - set(p.name for p in PATHOLOGIES)
+        if unknown:
+            raise ValueError("Unknown pathologies: %s" % ", ".join(sorted(unknown)))
+        selected = [p for p in PATHOLOGIES if p.name in wanted]
+
+    results = []
+    for parser in parsers:
+        if builder_registry.lookup(parser) is None:
+            continue
+        for pathology in selected:
+            times = [
+                min(_time(pathology, size, parser) for i in range(repetitions))
+                for size in sizes
+            ]
+            result = StressResult(pathology.name, parser, list(sizes), times)
+            if report is not None:
+                report(result)
+            results.append(result)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the stress suite from the command line.
+
+    :return: 1 if anything scaled worse than the threshold, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m bs4.benchmarks.stress",
+        description="Find out how Beautiful Soup scales on pathological markup.",
+    )
+    parser.add_argument(
+        "--pathologies",
+        type=lambda value: [x.strip() for x in value.split(",") if x.strip()],
+        help="Comma-separated pathologies to run (default: all of %s)."
+        % ",".join(p.name for p in PATHOLOGIES),
+    )
+    parser.add_argument(
+        "--parsers",
+        type=lambda value: [x.strip() for x in value.split(",") if x.strip()],
+        default=DEFAULT_PARSERS,
+        help="Comma-separated parsers to use (default: %s)."
+        % ",".join(DEFAULT_PARSERS),
+    )
+    parser.add_argument(
+        "--start", type=int, default=1000, help="The smallest size (default: 1000)."
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=4,
+        help="How many sizes to use; each is twice the last (default: 4).",
+    )
+    parser.add_argument(
+        "--repetitions", type=int, default=3, help="Timed runs at each size."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Report exponents above this (default: %s)." % DEFAULT_THRESHOLD,
+    )
+    args = parser.parse_args(argv)
+    if args.steps < 2:
+        parser.error("--steps must be at least 2.")
+    if args.start < 1 or args.repetitions < 1:
+        parser.error("--start and --repetitions must be at least 1.")
+    sizes = [args.start * 2**i for i in range(args.steps)]
+
+    try:
+        results = run(
+            args.pathologies, args.parsers, sizes, args.repetitions, report=print
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    superlinear = [r for r in results if r.exponent > args.threshold]
+    if superlinear:
+        print("\n%d pathologies scale worse than linearly:" % len(superlinear))
+        for result in superlinear:
+            print("  " + str(result))
+        return 1
+    print("\nEverything scales linearly.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
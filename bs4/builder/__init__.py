@@ -4,6 +4,7 @@ from __future__ import annotations
 __license__ = "MIT"
 
 from collections import defaultdict
+import importlib
 import re
 from types import ModuleType
 from typing import (
@@ -105,6 +106,26 @@ class TreeBuilderRegistry(object):
             self.builders_for_feature[feature].insert(0, treebuilder_class)
         self.builders.insert(0, treebuilder_class)
 
+    def register_lazily(
+        self, module_name: str, class_name: str, features: Iterable[str]
+    ) -> None:
+        """Register a treebuilder without importing it.
+
+        The module that defines the treebuilder is imported the first
+        time `TreeBuilderRegistry.lookup` picks it. If the module
+        can't be imported (usually because the parser it needs isn't
+        installed), the treebuilder is quietly unregistered, as though
+        it had never been registered at all.
+
+        :param module_name: The full name of the module that defines
+            the treebuilder.
+        :param class_name: The name of the `TreeBuilder` subclass.
+        :param features: The features the treebuilder will have. This
+            has to match its `TreeBuilder.features` attribute.
+        """
+        placeholder = _LazyTreeBuilder(module_name, class_name, features)
+        self.register(cast(Type[TreeBuilder], placeholder))
+
     def lookup(self, *features: str) -> Optional[Type[TreeBuilder]]:
         """Look up a TreeBuilder subclass with the desired features.
 
@@ -114,6 +135,35 @@ class TreeBuilderRegistry(object):
         :return: A TreeBuilder subclass, or None if there's no
             registered subclass with all the requested features.
         """
+        while True:
+            builder = self._lookup(*features)
+            if not isinstance(builder, _LazyTreeBuilder):
+                return builder
+            # Import the module, then look again: if the import
+            # failed, some other builder may be picked.
+            self._load(builder.module_name)
+
+    def _load(self, module_name: str) -> None:
+        """Replace every lazily registered treebuilder from a module
+        with the real `TreeBuilder` subclass.
+        """
+        try:
+            module: Optional[ModuleType] = importlib.import_module(module_name)
+        except ImportError:
+            module = None
+        for builders in [self.builders] + list(self.builders_for_feature.values()):
+            for i in range(len(builders) - 1, -1, -1):
+                builder = builders[i]
+                if (
+                    isinstance(builder, _LazyTreeBuilder)
+                    and builder.module_name == module_name
+                ):
+                    if module is None:
+                        del builders[i]
+                    else:
+                        builders[i] = getattr(module, builder.class_name)
+
+    def _lookup(self, *features: str) -> Optional[Type[TreeBuilder]]:
         if len(self.builders) == 0:
             # There are no builders at all.
             return None
@@ -151,6 +201,22 @@ class TreeBuilderRegistry(object):
         return None
 
 
+class _LazyTreeBuilder(object):
+    """Stands in for a `TreeBuilder` subclass that hasn't been
+    imported yet.
+
+    :meta private:
+    """
+
+    def __init__(self, module_name: str, class_name: str, features: Iterable[str]):
+        self.module_name = module_name
+        self.class_name = class_name
+        self.features = list(features)
+
+    def __repr__(self) -> str:
+        return "<lazily registered %s.%s>" % (self.module_name, self.class_name)
+
+
 #: The `BeautifulSoup` constructor will take a list of features
 #: and use it to look up `TreeBuilder` classes in this registry.
 builder_registry: TreeBuilderRegistry = TreeBuilderRegistry()
@@ -192,6 +258,13 @@ class TreeBuilder(object):
      doesn't keep track of this information, then store_line_numbers
      is irrelevant.
 
+    :param store_source_markup: If this is True, and the parser keeps
+     track of where each tag begins and ends in the original markup,
+     the markup will be kept around after parsing, so that
+     :py:meth:`bs4.element.Tag.source_markup` can return the exact
+     markup that created a tag. The default is False, since keeping
+     the markup uses extra memory.
+
     :param attribute_dict_class: A Tag's attribute values (available
       as tag.attrs) willl be stored in an instance of this class.
       The default is Beautiful Soup's built-in `AttributeDict` class and
@@ -216,6 +289,7 @@ class TreeBuilder(object):
         empty_element_tags: Set[str] = USE_DEFAULT,
         attribute_dict_class: Type[AttributeDict] = AttributeDict,
         attribute_value_list_class: Type[AttributeValueList] = AttributeValueList,
+        store_source_markup: bool = False,
     ):
         self.soup = None
         if multi_valued_attributes is self.USE_DEFAULT:
@@ -234,6 +308,7 @@ class TreeBuilder(object):
         if store_line_numbers == self.USE_DEFAULT:
             store_line_numbers = self.TRACKS_LINE_NUMBERS
         self.store_line_numbers = store_line_numbers
+        self.store_source_markup = store_source_markup
         if string_containers == self.USE_DEFAULT:
             string_containers = self.DEFAULT_STRING_CONTAINERS
         self.string_containers = string_containers
@@ -256,6 +331,7 @@ class TreeBuilder(object):
     preserve_whitespace_tags: Set[str]  #: :meta private:
     string_containers: Dict[str, Type[NavigableString]]  #: :meta private:
     tracks_line_numbers: bool  #: :meta private:
+    store_source_markup: bool  #: :meta private:
 
     #: A value for these tag/attribute combinations is a space- or
     #: comma-separated list of CDATA, rather than a single CDATA.
@@ -277,6 +353,16 @@ class TreeBuilder(object):
     #: Most parsers don't keep track of line numbers.
     TRACKS_LINE_NUMBERS: bool = False
 
+    #: Most parsers report what they find by calling methods like
+    #: handle_starttag() on the `BeautifulSoup` object, which means
+    #: they can also report to a `bs4._sink.ParseEventSink`.
+    SENDS_PARSE_EVENTS: bool = True
+
+    #: Most parsers need markup to be a string or a bytestring. A
+    #: memoryview, an `mmap.mmap` or a file is copied into a
+    #: bytestring before it's given to them.
+    ACCEPTS_BUFFERS: bool = False
+
     def initialize_soup(self, soup: BeautifulSoup) -> None:
         """The BeautifulSoup object has been initialized and is now
         being associated with the TreeBuilder.
@@ -320,6 +406,31 @@ class TreeBuilder(object):
         """Run incoming markup through some parsing process."""
         raise NotImplementedError()
 
+    def open_feed(self) -> None:
+        """Prepare to receive a document a piece at a time, through
+        `TreeBuilder.feed_chunk`.
+
+        By default, the pieces are collected and the whole document is
+        sent to `TreeBuilder.feed` in `TreeBuilder.close_feed`. Tree
+        builders whose parsers can accept a document in pieces
+        override these methods.
+        """
+        self._chunks: List[str] = []
+
+    def feed_chunk(self, chunk: str) -> None:
+        """Run the next piece of a document through the parsing process.
+
+        :param chunk: The next piece of the document, which must
+            already have been converted to Unicode.
+        """
+        self._chunks.append(chunk)
+
+    def close_feed(self) -> None:
+        """The whole document has been sent to `TreeBuilder.feed_chunk`."""
+        markup = "".join(self._chunks)
+        del self._chunks
+        self.feed(markup)
+
     def prepare_markup(
         self,
         markup: _RawMarkup,
@@ -743,8 +854,9 @@ class DetectsXMLParsedAsHTML(object):
         if markup is None:
             return False
         markup = markup[:500]
-        if isinstance(markup, bytes):
-            markup_b: bytes = markup
+        if not isinstance(markup, str):
+            # This may be a memoryview.
+            markup_b: bytes = bytes(markup)
             looks_like_xml = markup_b.startswith(
                 cls.XML_PREFIX_B
             ) and not cls.LOOKS_LIKE_HTML_B.search(markup)
@@ -794,11 +906,15 @@ class DetectsXMLParsedAsHTML(object):
         # We won't know until we encounter the first tag whether or
         # not this is actually a problem.
 
-    def _root_tag_encountered(self, name: str) -> None:
+    def _root_tag_encountered(self, name: str, stacklevel: int = 11) -> None:
         """Call this when you encounter the document's root tag.
 
         This is where we actually check whether an XML document is
         being incorrectly parsed as HTML, and issue the warning.
+
+        :param stacklevel: The stacklevel to use for the warning, if
+            this method is called from further inside the parser than
+            usual.
         """
         if self._root_tag_name is not None:
             # This method was incorrectly called multiple times. Do
@@ -815,7 +931,7 @@ class DetectsXMLParsedAsHTML(object):
             # We encountered an XML declaration and then a tag other
             # than 'html'. This is a reliable indicator that a
             # non-XHTML document is being parsed as XML.
-            self._warn(stacklevel=10)
+            self._warn(stacklevel=stacklevel)
 
 
 def register_treebuilders_from(module: ModuleType) -> None:
@@ -831,6 +947,46 @@ def register_treebuilders_from(module: ModuleType) -> None:
             this_module.builder_registry.register(obj)
 
 
+#: The treebuilders that depend on third-party parsers, and the
+#: modules that define them. These are registered lazily, so that
+#: importing Beautiful Soup doesn't also import html5lib and lxml.
+#: Each one's features have to match the `TreeBuilder.features` of
+#: the real class.
+_LAZY_BUILDERS: List[Tuple[str, str, List[str]]] = [
+    (
+        "bs4.builder._html5lib",
+        "HTML5TreeBuilder",
+        ["html5lib", PERMISSIVE, HTML_5, HTML],
+    ),
+    (
+        "bs4.builder._lxml",
+        "LXMLTreeBuilderForXML",
+        ["lxml-xml", "lxml", XML, FAST, PERMISSIVE],
+    ),
+    (
+        "bs4.builder._lxml",
+        "LXMLTreeBuilder",
+        ["lxml-html", "lxml", HTML, FAST, PERMISSIVE],
+    ),
+]
+
+
+def __getattr__(name: str) -> Any:
+    # The lazily registered treebuilders become attributes of this
+    # module the first time someone asks for them.
+    for module_name, class_name, _ in _LAZY_BUILDERS:
+        if class_name == name:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                break
+            obj = getattr(module, name)
+            setattr(sys.modules[__name__], name, obj)
+            __all__.append(name)
+            return obj
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 # Builders are registered in reverse order of priority, so that custom
 # builder registrations will take precedence. In general, we want lxml
 # to take precedence over html5lib, because it's faster. And we only
@@ -838,17 +994,5 @@ def register_treebuilders_from(module: ModuleType) -> None:
 from . import _htmlparser # noqa: E402
 
 register_treebuilders_from(_htmlparser)
-try:
-    from . import _html5lib
-
-    register_treebuilders_from(_html5lib)
-except ImportError:
-    # They don't have html5lib installed.
-    pass
-try:
-    from . import _lxml
-
-    register_treebuilders_from(_lxml)
-except ImportError:
-    # They don't have lxml installed.
-    pass
+for _lazy_builder in _LAZY_BUILDERS:
+    builder_registry.register_lazily(*_lazy_builder)
@@ -10,10 +10,12 @@ from typing import (
     cast,
     Dict,
     Iterable,
+    List,
     Optional,
     Sequence,
     TYPE_CHECKING,
     Tuple,
+    Type,
     Union,
 )
 from typing_extensions import TypeAlias
@@ -42,11 +44,13 @@ from bs4.element import (
 import html5lib
 from html5lib.constants import (
     namespaces,
+    tableInsertModeElements,
 )
 from bs4.element import (
     Comment,
     Doctype,
     NavigableString,
+    PreformattedString,
     Tag,
 )
 
@@ -65,12 +69,8 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
     be implemented, but at the very least it's quite difficult,
     because html5lib moves the parse tree around as it's being built.
 
-    Specifically:
-
-    * This `TreeBuilder` doesn't use different subclasses of
-      `NavigableString` (e.g. `Script`) based on the name of the tag
-      in which the string was found.
-    * You can't use a `SoupStrainer` to parse only part of a document.
+    Specifically, you can't use a `SoupStrainer` to parse only part
+    of a document.
     """
 
     NAME: str = "html5lib"
@@ -81,6 +81,10 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
     #: original file is the source of an element.
     TRACKS_LINE_NUMBERS: bool = True
 
+    #: html5lib builds its own tree rather than calling
+    #: handle_starttag() and friends.
+    SENDS_PARSE_EVENTS: bool = False
+
     underlying_builder: "TreeBuilderForHtml5lib"  #: :meta private:
     user_specified_encoding: Optional[_Encoding]
 
@@ -104,12 +108,12 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
             if variable:
                 warnings.warn(
                     f"You provided a value for {name}, but the html5lib tree builder doesn't support {name}.",
-                    stacklevel=3,
+                    stacklevel=4,
                 )
 
         # html5lib only parses HTML, so if it's given XML that's worth
         # noting.
-        DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=3)
+        DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=4)
 
         yield (markup, None, None, False)
 
@@ -121,7 +125,7 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
         if self.soup is not None and self.soup.parse_only is not None:
             warnings.warn(
                 "You provided a value for parse_only, but the html5lib tree builder doesn't support parse_only. The entire document will be parsed.",
-                stacklevel=4,
+                stacklevel=5,
             )
 
         # self.underlying_builder is probably None now, but it'll be set
@@ -136,7 +140,18 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
             # HTMLBinaryInputStream.__init__.
             extra_kwargs["override_encoding"] = self.user_specified_encoding
 
-        doc = parser.parse(markup, **extra_kwargs)
+        # Tags are created with BeautifulSoup.handle_starttag, which
+        # would apply parse_only. As the warning says, it's ignored.
+        parse_only = None
+        if self.soup is not None:
+            parse_only = self.soup.parse_only
+            self.soup.parse_only = None
+        try:
+            doc = parser.parse(markup, **extra_kwargs)
+        finally:
+            if self.soup is not None:
+                self.soup.parse_only = parse_only
+        self.underlying_builder.end_data()
 
         # Set the character encoding detected by the tokenizer.
         if isinstance(markup, str):
@@ -172,9 +187,35 @@ class HTML5TreeBuilder(HTMLTreeBuilder):
 
 
 class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
+    """The kind of object html5lib calls a 'TreeBuilder'.
+
+    Most of the time, html5lib adds each new tag, string or comment
+    to the end of the document, inside the tag that's on top of its
+    stack of open elements. Those go through the same
+    `BeautifulSoup` methods every other tree builder uses:
+    `BeautifulSoup.handle_starttag` and `BeautifulSoup.handle_data`,
+    and the `BeautifulSoup` object's own stack of open tags is kept
+    in step with html5lib's.
+
+    The rest of the time, html5lib rearranges the tree: it moves
+    nodes around when it sees misnested formatting tags (the
+    "adoption agency algorithm"), and it moves content out of tables
+    ("foster parenting"). Those go through the methods of `Element`,
+    which modify the tree directly. After that, the `BeautifulSoup`
+    object's stack is rebuilt the next time something is added to
+    the end of the document.
+    """
+
     soup: "BeautifulSoup"  #: :meta private:
     parser: Optional[html5lib.HTMLParser]  #: :meta private:
 
+    #: Whether the `BeautifulSoup` object's stack of open tags is an
+    #: unbroken line of ancestors of its most recently parsed element,
+    #: which is the last element in the document.
+    #:
+    #: :meta private:
+    in_order: bool
+
     def __init__(
         self,
         namespaceHTMLElements: bool,
@@ -210,33 +251,228 @@ class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
 
     def documentClass(self) -> "Element":
         self.soup.reset()
-        return Element(self.soup, self.soup, None)
+        # The document is empty, so anything can be added to it.
+        self.in_order = True
+        return Element(self.soup, self.soup, None, tree=self)
 
     def insertDoctype(self, token: Dict[str, Any]) -> None:
-        name: str = cast(str, token["name"])
-        publicId: Optional[str] = cast(Optional[str], token["publicId"])
-        systemId: Optional[str] = cast(Optional[str], token["systemId"])
+        doctype = Doctype.for_name_and_ids(
+            token["name"], token["publicId"], token["systemId"]
+        )
+        if self.prepare_to_append(self.document):
+            self.end_data()
+            if self.soup._limit_checker is not None:
+                self.soup._limit_checker.string_created()
+            self.soup.object_was_parsed(doctype)
+        else:
+            self.document.appendChild(TextNode(doctype, self.soup))
 
-        doctype = Doctype.for_name_and_ids(name, publicId, systemId)
-        self.soup.object_was_parsed(doctype)
+    def insertComment(
+        self, token: Dict[str, Any], parent: Optional["Element"] = None
+    ) -> None:
+        if parent is None:
+            parent = self.openElements[-1]
+        if not self.prepare_to_append(parent):
+            parent.appendChild(self.commentClass(token["data"]))
+            return
+        self.end_data()
+        if self.soup._limit_checker is not None:
+            self.soup._limit_checker.string_created()
+        container = self.soup.string_container(Comment)
+        self.soup.object_was_parsed(container(token["data"]))
+
+    def insertText(self, data: str, parent: Optional["Element"] = None) -> None:
+        if parent is None:
+            parent = self.openElements[-1]
+        if (
+            self.insertFromTable
+            and self.openElements[-1].name in tableInsertModeElements
+        ):
+            # Text inside a table goes in front of the table.
+            parent, insertBefore = self.getTableMisnestedNodePosition()
+            parent.insertText(data, insertBefore)
+        elif self.prepare_to_append(parent):
+            if not self.soup.current_data:
+                self._reopen_string(parent.element)
+            self.soup.handle_data(data)
+        else:
+            parent.insertText(data)
 
-    def elementClass(self, name: str, namespace: str) -> "Element":
-        sourceline: Optional[int] = None
-        sourcepos: Optional[int] = None
-        if self.parser is not None and self.store_line_numbers:
-            # This represents the point immediately after the end of the
-            # tag. We don't know when the tag started, but we do know
-            # where it ended -- the character just before this one.
-            sourceline, sourcepos = self.parser.tokenizer.stream.position()
-            assert sourcepos is not None
-            sourcepos = sourcepos - 1
-        tag = self.soup.new_tag(
-            name, namespace, sourceline=sourceline, sourcepos=sourcepos
+    def _reopen_string(self, tag: Tag) -> None:
+        """If the last thing in ``tag`` is a string, take it back out of
+        the tree, so that more text can be added to it.
+
+        This happens when html5lib rearranges the tree in the middle
+        of some text. Without it, the text would be split between two
+        strings.
+        """
+        soup = self.soup
+        if not tag.contents:
+            return
+        string = tag.contents[-1]
+        if string is not soup._most_recent_element or type(
+            string
+        ) is not soup.string_container():
+            return
+        soup._most_recent_element = string.previous_element
+        string.extract()
+        if soup._limit_checker is not None:
+            # The string will be counted again when it goes back in.
+            soup._limit_checker.nodes -= 1
+        soup.handle_data(string)
+
+    def end_data(self) -> None:
+        """Put any text that's been collected into the tree.
+
+        This does what `BeautifulSoup.endData` does, except that a
+        string that's nothing but whitespace is left alone: html5lib
+        has always been the tree builder that changes the document
+        least.
+
+        :meta private:
+        """
+        soup = self.soup
+        if not soup.current_data:
+            return
+        data = "".join(soup.current_data)
+        soup.current_data = []
+        if soup._limit_checker is not None:
+            soup._limit_checker.string_created()
+        container = soup.string_container()
+        soup.object_was_parsed(container(data))
+
+    def insertRoot(self, token: Dict[str, Any]) -> None:
+        self.openElements.append(self._append_element(token, self.document))
+
+    def insertElementNormal(self, token: Dict[str, Any]) -> "Element":
+        element = self._append_element(token, self.openElements[-1])
+        self.openElements.append(element)
+        return element
+
+    def insertElementTable(self, token: Dict[str, Any]) -> "Element":
+        if self.openElements[-1].name not in tableInsertModeElements:
+            return self.insertElementNormal(token)
+        # The element goes in front of the table.
+        element = self.createElement(token)
+        parent, insertBefore = self.getTableMisnestedNodePosition()
+        if insertBefore is None:
+            parent.appendChild(element)
+        else:
+            parent.insertBefore(element, insertBefore)
+        self.openElements.append(element)
+        return element
+
+    def _append_element(self, token: Dict[str, Any], parent: "Element") -> "Element":
+        """Create a tag and add it to the end of ``parent``."""
+        if not self.prepare_to_append(parent):
+            element = self.createElement(token)
+            parent.appendChild(element)
+            return element
+
+        name = token["name"]
+        namespace = token.get("namespace", self.defaultNamespace)
+        attrs = self.soup.builder.attribute_dict_class()
+        for key, value in token["data"].items():
+            if isinstance(key, tuple):
+                key = NamespacedAttribute(*key)
+            elif isinstance(value, list):
+                # This is a copy of another tag's attribute value.
+                value = value.__class__(value)
+            attrs[key] = value
+        sourceline, sourcepos = self._source_position()
+        self.end_data()
+        tag = self.soup.handle_starttag(
+            name, namespace, None, attrs, sourceline, sourcepos
         )
+        assert tag is not None
+        element = Element(tag, self.soup, namespace, tree=self, name=name)
+        element.parent = parent
+        return element
+
+    def prepare_to_append(self, parent: "Element") -> bool:
+        """Get the `BeautifulSoup` object ready for something to be
+        added to the end of ``parent`` with its usual tree-building
+        methods.
 
-        return Element(tag, self.soup, namespace)
+        :return: True if that's possible; False if ``parent`` isn't
+            at the end of the document, in which case the new node has
+            to be inserted with the methods of `Element`.
+
+        :meta private:
+        """
+        soup = self.soup
+        tag = parent.element
+        if self.in_order and soup.currentTag is tag:
+            return True
+        self.end_data()
+        if self.in_order:
+            # html5lib closes an element by taking it off its stack of
+            # open elements, without telling the tree builder. Close
+            # the same tags in the BeautifulSoup object.
+            stack = soup.tagStack
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i] is tag:
+                    for _ in range(len(stack) - 1 - i):
+                        soup.popTag()
+                    return True
+
+        # Either the tree has been rearranged, or ``parent`` was never
+        # on the BeautifulSoup object's stack. If ``parent`` is at the
+        # end of the document, the stack can be rebuilt.
+        # The rearranging methods don't always leave next_element
+        # right, so go by the structure of the tree: ``parent`` and
+        # each of its ancestors must be the last child of its parent.
+        ancestors = []
+        ancestor: Optional[Tag] = tag
+        while ancestor is not soup:
+            if ancestor is None or ancestor.next_sibling is not None:
+                # ``parent`` isn't at the end of the document, or isn't
+                # in the document at all.
+                return False
+            ancestors.append(ancestor)
+            ancestor = ancestor.parent
+        last_descendant = tag._last_descendant(is_initialized=False)
+        assert last_descendant is not None
+        last_descendant.next_element = None
+        while len(soup.tagStack) > 1:
+            soup.popTag()
+        for ancestor in reversed(ancestors):
+            # pushTag would add the tag to the contents of the current
+            # tag, which it's already part of.
+            soup.currentTag = None
+            soup.pushTag(ancestor)
+        soup._most_recent_element = last_descendant
+        self.in_order = True
+        return True
+
+    def _source_position(self) -> Tuple[Optional[int], Optional[int]]:
+        """Find where the tag that's just been tokenized was found."""
+        if self.parser is None or not self.store_line_numbers:
+            return None, None
+        # This represents the point immediately after the end of the
+        # tag. We don't know when the tag started, but we do know
+        # where it ended -- the character just before this one.
+        sourceline, sourcepos = self.parser.tokenizer.stream.position()
+        assert sourcepos is not None
+        return sourceline, sourcepos - 1
+
+    def elementClass(self, name: str, namespace: str) -> "Element":
+        # This is only used for elements that html5lib will insert
+        # with the methods of `Element`.
+        if self.soup._limit_checker is not None:
+            # The new element is about to go on top of the stack of
+            # open elements.
+            self.soup._limit_checker.tag_created(len(self.openElements) + 1)
+        sourceline, sourcepos = self._source_position()
+        tag = self.soup.new_tag(name, namespace)
+        if sourceline is not None:
+            self.soup._record_source_position(tag, sourceline, sourcepos)
+
+        return Element(tag, self.soup, namespace, tree=self)
 
     def commentClass(self, data: str) -> "TextNode":
+        if self.soup._limit_checker is not None:
+            self.soup._limit_checker.string_created()
         return TextNode(Comment(data), self.soup)
 
     def fragmentClass(self) -> "Element":
@@ -261,6 +497,8 @@ class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
         # (or a method with the same name) all over html5lib, so I'm
         # leaving the implementation in place rather than replacing it
         # with NotImplementedError()
+        self.end_data()
+        self.in_order = False
         self.soup.append(node.element)
 
     def getDocument(self) -> "BeautifulSoup":
@@ -278,11 +516,13 @@ class AttrList(object):
     """Represents a Tag's attributes in a way compatible with html5lib."""
 
     element: Tag
-    attrs: _AttributeValues
 
     def __init__(self, element: Tag):
         self.element = element
-        self.attrs = dict(self.element.attrs)
+
+    @property
+    def attrs(self) -> _AttributeValues:
+        return self.element.attrs
 
     def __iter__(self) -> Iterable[Tuple[str, _AttributeValue]]:
         return list(self.attrs.items()).__iter__()
@@ -317,7 +557,27 @@ class AttrList(object):
         return self.attrs[name]
 
     def __contains__(self, name: str) -> bool:
-        return name in list(self.attrs.keys())
+        return name in self.attrs
+
+    def __eq__(self, other: Any) -> bool:
+        # html5lib compares the attributes of two elements to decide
+        # whether they're the same formatting element (the "Noah's Ark"
+        # clause of the HTML spec). If this compared by identity, the
+        # list of active formatting elements would grow without limit
+        # on markup like "<b><b><b>...", and every new formatting
+        # element would be compared against all of them.
+        if isinstance(other, AttrList):
+            other = other.attrs
+        return self.attrs == other
+
+
+def _is_text(element: PageElement) -> bool:
+    """Is this an ordinary string, which can be merged with the
+    ordinary string next to it?
+    """
+    return isinstance(element, NavigableString) and not isinstance(
+        element, PreformattedString
+    )
 
 
 class BeautifulSoupNode(treebuilder_base.Node):
@@ -325,6 +585,21 @@ class BeautifulSoupNode(treebuilder_base.Node):
     soup: "BeautifulSoup"
     namespace: Optional[_NamespaceURL]
 
+    #: The tree builder that created this node, which needs to know
+    #: when the tree is modified other than by adding something to
+    #: the end of the document.
+    tree: Optional[TreeBuilderForHtml5lib] = None
+
+    def _rearranging_tree(self) -> None:
+        """Called before this node changes the tree."""
+        # Any text that's been collected has to go into the tree
+        # before anything else happens.
+        if self.tree is None:
+            self.soup.endData()
+        else:
+            self.tree.end_data()
+            self.tree.in_order = False
+
     @property
     def nodeType(self) -> int:
         """Return the html5lib constant corresponding to the type of
@@ -345,19 +620,50 @@ class Element(BeautifulSoupNode):
     element: Tag
     namespace: Optional[_NamespaceURL]
 
+    # These are normally set by treebuilder_base.Node.__init__, which
+    # isn't called.
+    parent: Optional["Element"]
+    value: Optional[str]
+    childNodes: List["BeautifulSoupNode"]
+    _flags: List[str]
+
     def __init__(
-        self, element: Tag, soup: "BeautifulSoup", namespace: Optional[_NamespaceURL]
+        self,
+        element: Tag,
+        soup: "BeautifulSoup",
+        namespace: Optional[_NamespaceURL],
+        tree: Optional[TreeBuilderForHtml5lib] = None,
+        name: Optional[str] = None,
     ):
-        treebuilder_base.Node.__init__(self, element.name)
+        # This does the work of treebuilder_base.Node.__init__, except
+        # for setting self.attributes, which would go through
+        # setAttributes.
+        #
+        # The name is the name html5lib knows the element by, which
+        # won't be the name of the tag if a SoupReplacer changed it.
+        self.name = element.name if name is None else name
+        self.parent = None
+        self.value = None
+        self.childNodes = []
+        self._flags = []
         self.element = element
         self.soup = soup
         self.namespace = namespace
+        self.tree = tree
+        # html5lib looks at this every time it checks whether an
+        # element is in scope, which means walking the stack of open
+        # elements, so it's calculated once rather than on demand.
+        self.nameTuple = (
+            namespaces["html"] if namespace is None else namespace,
+            self.name,
+        )
 
     def appendChild(self, node: "BeautifulSoupNode") -> None:
+        self._rearranging_tree()
         string_child: Optional[NavigableString] = None
         child: PageElement
-        if type(node.element) is NavigableString:
-            string_child = child = node.element
+        if _is_text(node.element):
+            string_child = child = cast(NavigableString, node.element)
         else:
             child = node.element
         node.parent = self
@@ -372,16 +678,21 @@ class Element(BeautifulSoupNode):
         if (
             string_child is not None
             and self.element.contents
-            and type(self.element.contents[-1]) is NavigableString
+            and _is_text(self.element.contents[-1])
         ):
             # We are appending a string onto another string.
             # TODO This has O(n^2) performance, for input like
             # "a</a>a</a>a</a>..."
-            old_element = self.element.contents[-1]
-            new_element = self.soup.new_string(old_element + string_child)
+            old_element = cast(NavigableString, self.element.contents[-1])
+            new_element = type(old_element)(old_element + string_child)
             old_element.replace_with(new_element)
             self.soup._most_recent_element = new_element
         else:
+            if string_child is not None and self.soup._limit_checker is not None:
+                # Tags and comments were counted when they were created,
+                # but a string only counts if it isn't merged into
+                # the string before it.
+                self.soup._limit_checker.string_created()
             if isinstance(node, str):
                 # Create a brand new NavigableString from this string.
                 child = self.soup.new_string(node)
@@ -453,31 +764,57 @@ class Element(BeautifulSoupNode):
     def insertText(
         self, data: str, insertBefore: Optional["BeautifulSoupNode"] = None
     ) -> None:
-        text = TextNode(self.soup.new_string(data), self.soup)
+        text = TextNode(self._string_container()(data), self.soup)
         if insertBefore:
             self.insertBefore(text, insertBefore)
         else:
             self.appendChild(text)
 
+    def _string_container(self) -> Type[NavigableString]:
+        """Find the class that should hold text added to this element.
+
+        This is what `BeautifulSoup.string_container` would say if
+        this element were on top of the stack, which it may not be.
+        """
+        container = cast(
+            Type[NavigableString],
+            self.soup.element_classes.get(NavigableString, NavigableString),
+        )
+        if container is not NavigableString:
+            return container
+        containers = self.soup.builder.string_containers
+        tag: Optional[Tag] = self.element
+        while tag is not None:
+            if tag.name in containers:
+                return containers[tag.name]
+            tag = tag.parent
+        return container
+
     def insertBefore(
         self, node: "BeautifulSoupNode", refNode: "BeautifulSoupNode"
     ) -> None:
+        self._rearranging_tree()
         index = self.element.index(refNode.element)
         if (
-            type(node.element) is NavigableString
+            _is_text(node.element)
             and self.element.contents
-            and type(self.element.contents[index - 1]) is NavigableString
+            and _is_text(self.element.contents[index - 1])
         ):
             # (See comments in appendChild)
-            old_node = self.element.contents[index - 1]
-            assert type(old_node) is NavigableString
-            new_str = self.soup.new_string(old_node + node.element)
+            old_node = cast(NavigableString, self.element.contents[index - 1])
+            new_str = type(old_node)(old_node + cast(str, node.element))
             old_node.replace_with(new_str)
         else:
+            if (
+                _is_text(node.element)
+                and self.soup._limit_checker is not None
+            ):
+                self.soup._limit_checker.string_created()
             self.element.insert(index, node.element)
             node.parent = self
 
     def removeChild(self, node: "Element") -> None:
+        self._rearranging_tree()
         node.element.extract()
 
     def reparentChildren(self, new_parent: "Element") -> None:
@@ -485,6 +822,7 @@ class Element(BeautifulSoupNode):
         # print("MOVE", self.element.contents)
         # print("FROM", self.element)
         # print("TO", new_parent.element)
+        self._rearranging_tree()
 
         element = self.element
         new_parent_element = new_parent.element
@@ -565,24 +903,22 @@ class Element(BeautifulSoupNode):
     # TODO-TYPING: typeshed stubs are incorrect about this;
     # hasContent returns a boolean, not None.
     def hasContent(self) -> bool:
-        return len(self.element.contents) > 0
+        if len(self.element.contents) > 0:
+            return True
+        # The tag may have text that hasn't gone into the tree yet.
+        return self.element is self.soup.currentTag and len(self.soup.current_data) > 0
 
     # TODO-TYPING: typeshed stubs are incorrect about this;
     # cloneNode returns a new Node, not None.
     def cloneNode(self) -> treebuilder_base.Node:
         tag = self.soup.new_tag(self.element.name, self.namespace)
-        node = Element(tag, self.soup, self.namespace)
+        node = Element(tag, self.soup, self.namespace, tree=self.tree, name=self.name)
         for key, value in self.attributes:
             node.attributes[key] = value
         return node
 
     def getNameTuple(self) -> Tuple[Optional[_NamespaceURL], str]:
-        if self.namespace is None:
-            return namespaces["html"], self.name
-        else:
-            return self.namespace, self.name
-
-    nameTuple = property(getNameTuple)
+        return self.nameTuple
 
 
 class TextNode(BeautifulSoupNode):
@@ -10,6 +10,7 @@ __all__ = [
 ]
 
 from html.parser import HTMLParser
+import re
 
 from typing import (
     Any,
@@ -19,6 +20,7 @@ from typing import (
     Iterable,
     List,
     Optional,
+    Set,
     TYPE_CHECKING,
     Tuple,
     Type,
@@ -32,6 +34,7 @@ from bs4.element import (
     Declaration,
     Doctype,
     ProcessingInstruction,
+    Tag,
 )
 from bs4.dammit import EntitySubstitution, UnicodeDammit
 
@@ -102,6 +105,17 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         # will ignore, assuming they ever show up.
         self.already_closed_empty_element = []
 
+        # The offset into the markup of the current parse event, and
+        # the start and end of the most recent start tag.
+        self._source_offset = 0
+        self._starttag_offset = -1
+        self._starttag_end = -1
+
+        # The names of tags whose contents shouldn't be parsed yet,
+        # and the most recent such tag to be opened.
+        self.lazy_tags: Set[str] = set()
+        self._lazy_tag: Optional[Tag] = None
+
         self._initialize_xml_detector()
 
     on_duplicate_attribute: Union[str, _DuplicateAttributeHandler]
@@ -119,6 +133,26 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         return name
     # -------------------------------------------------------
 
+    def updatepos(self, i: int, j: int) -> int:
+        """Keep track of the absolute offset into the markup, in
+        addition to the line number and column that HTMLParser tracks.
+        """
+        if i < j:
+            self._source_offset += j - i
+        return super(BeautifulSoupHTMLParser, self).updatepos(i, j)
+
+    def skip(self, data: str) -> None:
+        """Move past some markup without parsing it, keeping the line
+        number, column and offset up to date.
+        """
+        newlines = data.count("\n")
+        if newlines:
+            self.lineno += newlines
+            self.offset = len(data) - data.rindex("\n") - 1
+        else:
+            self.offset += len(data)
+        self._source_offset += len(data)
+
     def error(self, message: str) -> None:
         # NOTE: This method is required so long as Python 3.9 is
         # supported. The corresponding code is removed from HTMLParser
@@ -192,12 +226,21 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         # print("START", name)
         sourceline: Optional[int]
         sourcepos: Optional[int]
+        sourceoffset: Optional[int]
         if self.soup.builder.store_line_numbers:
             sourceline, sourcepos = self.getpos()
+            sourceoffset = self._starttag_offset = self._source_offset
+            self._starttag_end = sourceoffset + len(self.get_starttag_text() or "")
         else:
-            sourceline = sourcepos = None
+            sourceline = sourcepos = sourceoffset = None
         tag = self.soup.handle_starttag(
-            name, None, None, attr_dict, sourceline=sourceline, sourcepos=sourcepos
+            name,
+            None,
+            None,
+            attr_dict,
+            sourceline=sourceline,
+            sourcepos=sourcepos,
+            sourceoffset=sourceoffset,
         )
         if tag and tag.is_empty_element and handle_empty_element:
             # Unlike other parsers, html.parser doesn't send separate end tag
@@ -214,9 +257,21 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
             # But we might encounter an explicit closing tag for this tag
             # later on. If so, we want to ignore it.
             self.already_closed_empty_element.append(name)
+        elif (
+            tag is not None
+            and handle_empty_element
+            and name in self.lazy_tags
+            and not tag.can_be_empty_element
+        ):
+            self._lazy_tag = tag
 
         if self._root_tag_name is None:
-            self._root_tag_encountered(name)
+            # An empty-element tag comes in through
+            # handle_startendtag, one stack frame further from the
+            # code that started the parse.
+            self._root_tag_encountered(
+                name, stacklevel=11 if handle_empty_element else 12
+            )
 
     def handle_endtag(self, name: str, check_already_closed: bool = True) -> None:
         """Handle a closing tag, e.g. '</tag>'
@@ -237,7 +292,21 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
             # print("ALREADY CLOSED", name)
             self.already_closed_empty_element.remove(name)
         else:
-            self.soup.handle_endtag(name)
+            sourceoffset: Optional[int] = None
+            sourceend: Optional[int] = None
+            if self.soup.builder.store_line_numbers:
+                if self._source_offset == self._starttag_offset:
+                    # This end tag is implied by the start tag that
+                    # was just processed, e.g. <br> or <br/>.
+                    sourceoffset = sourceend = self._starttag_end
+                else:
+                    sourceoffset = self._source_offset
+                    markup = self.soup.markup
+                    if isinstance(markup, str):
+                        sourceend = markup.find(">", sourceoffset) + 1 or len(markup)
+            self.soup.handle_endtag(
+                name, sourceoffset=sourceoffset, sourceend=sourceend
+            )
 
     def handle_data(self, data: str) -> None:
         """Handle some textual data that shows up between tags."""
@@ -364,10 +433,20 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
     #: original file is the source of an element.
     TRACKS_LINE_NUMBERS: bool = True
 
+    #: The contents of tags with these names will be left unparsed
+    #: until they're needed.
+    lazy_tags: Set[str]
+
+    # Lazy tags that start before this offset into the markup are
+    # parsed as usual. This is how the contents of a lazy tag are
+    # parsed without the tag itself being treated as lazy again.
+    _lazy_tags_start: int = 0
+
     def __init__(
         self,
         parser_args: Optional[Iterable[Any]] = None,
         parser_kwargs: Optional[Dict[str, Any]] = None,
+        lazy_tags: Optional[Iterable[str]] = None,
         **kwargs: Any,
     ):
         """Constructor.
@@ -378,6 +457,14 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
         :param parser_kwargs: Keyword arguments to pass into
             the BeautifulSoupHTMLParser constructor, once it's
             invoked.
+        :param lazy_tags: The names of tags whose contents should not
+            be parsed along with the rest of the document. Each such
+            tag's contents are kept as a string, and only parsed the
+            first time something looks at them, e.g. through
+            `Tag.contents`, `Tag.descendants`, `Tag.find_all` or
+            `Tag.select`. This can save a lot of time and memory on
+            documents where most of the markup is in a few subtrees
+            (such as inline <svg> images) that you don't need.
         :param kwargs: Keyword arguments for the superclass constructor.
         """
         # Some keyword arguments will be pulled out of kwargs and placed
@@ -393,6 +480,7 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
         parser_kwargs.update(extra_parser_kwargs)
         parser_kwargs["convert_charrefs"] = False
         self.parser_args = (parser_args, parser_kwargs)
+        self.lazy_tags = set(x.lower() for x in (lazy_tags or ()))
 
     def prepare_markup(
         self,
@@ -484,7 +572,10 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
         parser = BeautifulSoupHTMLParser(self.soup, *args, **kwargs)
 
         try:
-            parser.feed(markup)
+            if self.lazy_tags:
+                self._feed_lazily(parser, markup)
+            else:
+                parser.feed(markup)
             parser.close()
         except AssertionError as e:
             # html.parser raises AssertionError in rare cases to
@@ -492,3 +583,118 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
             # when there's an error in the doctype declaration.
             raise ParserRejectedMarkup(e)
         parser.already_closed_empty_element = []
+
+    def open_feed(self) -> None:
+        # Tags can't be parsed lazily, since the document isn't
+        # available all at once.
+        assert self.soup is not None
+        args, kwargs = self.parser_args
+        self._parser = BeautifulSoupHTMLParser(self.soup, *args, **kwargs)
+
+    def feed_chunk(self, chunk: str) -> None:
+        try:
+            self._parser.feed(chunk)
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+
+    def close_feed(self) -> None:
+        parser = self._parser
+        del self._parser
+        try:
+            parser.close()
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+        parser.already_closed_empty_element = []
+
+    def _feed_lazily(self, parser: BeautifulSoupHTMLParser, markup: str) -> None:
+        """Feed markup to the parser, but skip over the contents of any
+        tag named in `HTMLParserTreeBuilder.lazy_tags`, leaving them to
+        be parsed later.
+        """
+        from bs4._lazy import _LazyContent
+
+        assert self.soup is not None
+        parser.lazy_tags = self.lazy_tags
+        soup_kwargs = dict(
+            element_classes=self.soup.element_classes,
+            replacer=self.soup.replacer,
+        )
+        candidates = re.compile(
+            r"<(%s)(?=[\s/>])" % "|".join(re.escape(x) for x in self.lazy_tags),
+            re.I,
+        )
+        fed = 0
+        match = candidates.search(markup, self._lazy_tags_start)
+        while match is not None:
+            start = match.start()
+            parser.feed(markup[fed:start])
+            fed = start
+            if parser.rawdata or parser.cdata_elem is not None:
+                # This isn't a start tag; it's inside a comment, a
+                # <script> tag, or something like that.
+                match = candidates.search(markup, match.end())
+                continue
+
+            # Feed the start tag. A '>' might show up inside an
+            # attribute value, so keep going until HTMLParser has
+            # actually processed the tag.
+            parser._lazy_tag = None
+            while True:
+                end = markup.find(">", fed)
+                if end == -1:
+                    break
+                parser.feed(markup[fed : end + 1])
+                fed = end + 1
+                if not parser.rawdata:
+                    break
+            tag = parser._lazy_tag
+            parser._lazy_tag = None
+            if tag is not None:
+                name = match.group(1).lower()
+                content_end = self._find_end_tag(markup, name, fed)
+                tag._lazy_content = _LazyContent(
+                    markup[start:content_end], fed - start, name, self, soup_kwargs
+                )
+                del tag.contents
+                Tag._lazy_content_in_use = True
+                parser.skip(markup[fed:content_end])
+                fed = content_end
+            match = candidates.search(markup, fed)
+        parser.feed(markup[fed:])
+
+    @classmethod
+    def _find_end_tag(cls, markup: str, name: str, pos: int) -> int:
+        """Find the end tag that closes a tag whose contents start at
+        ``pos``.
+
+        :return: The offset of the end tag, or the length of the
+            markup if there isn't one.
+        """
+        if name in HTMLParser.CDATA_CONTENT_ELEMENTS:
+            # The contents of a tag like <script> end at the first end tag.
+            match = re.compile(r"</%s(?=[\s/>])" % re.escape(name), re.I).search(
+                markup, pos
+            )
+            if match is None:
+                return len(markup)
+            return match.start()
+
+        tags = re.compile(
+            r"<!--.*?-->|<(script|style)(?=[\s/>]).*?</\1\s*>|<(/?)%s(?=[\s/>])"
+            % re.escape(name),
+            re.I | re.S,
+        )
+        depth = 1
+        for match in tags.finditer(markup, pos):
+            if match.group(1) is not None or match.group(2) is None:
+                # A comment or a tag whose contents aren't markup.
+                continue
+            if match.group(2):
+                depth -= 1
+                if depth == 0:
+                    return match.start()
+            else:
+                end = markup.find(">", match.end())
+                if end != -1 and markup[end - 1] != "/":
+                    depth += 1
+        return len(markup)
@@ -24,8 +24,6 @@ from typing import (
 )
 from typing_extensions import TypeAlias
 
-from io import BytesIO
-from io import StringIO
 from lxml import etree
 from bs4.element import (
     AttributeDict,
@@ -87,8 +85,21 @@ class LXMLTreeBuilderForXML(TreeBuilder):
     # Well, it's permissive by XML parser standards.
     features: Iterable[str] = [NAME, LXML, XML, FAST, PERMISSIVE]
 
+    #: The smallest piece of markup fed to the lxml parser at once.
     CHUNK_SIZE: int = 512
 
+    #: The largest piece of markup fed to the lxml parser at once.
+    #: Past about 64 KB, bigger pieces don't make lxml any faster;
+    #: they just take more memory, and mean the `ParseLimits` clock
+    #: is checked less often. libxml2 refuses to parse more than about
+    #: 10 MB of XML in one piece.
+    MAX_CHUNK_SIZE: int = 1024 * 1024
+
+    #: The markup can be any object that supports the buffer protocol,
+    #: such as a `memoryview` or an `mmap.mmap`. Only the piece being
+    #: fed to lxml is ever copied into a bytestring.
+    ACCEPTS_BUFFERS: bool = True
+
     # This namespace mapping is specified in the XML Namespace
     # standard.
     DEFAULT_NSMAPS: _NamespaceMapping = dict(xml="http://www.w3.org/XML/1998/namespace")
@@ -231,7 +242,7 @@ class LXMLTreeBuilderForXML(TreeBuilder):
             self.processing_instruction_class = ProcessingInstruction
             # We're in HTML mode, so if we're given XML, that's worth
             # noting.
-            DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=3)
+            DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(markup, stacklevel=4)
         else:
             self.processing_instruction_class = XMLProcessingInstruction
 
@@ -280,28 +291,72 @@ class LXMLTreeBuilderForXML(TreeBuilder):
         for encoding in detector.encodings:
             yield (detector.markup, encoding, document_declared_encoding, False)
 
-    def feed(self, markup: _RawMarkup) -> None:
-        io: Union[BytesIO, StringIO]
-        if isinstance(markup, bytes):
-            io = BytesIO(markup)
-        elif isinstance(markup, str):
-            io = StringIO(markup)
+    def chunk_size(self, length: int) -> int:
+        """Decide how much markup to feed to the lxml parser at once.
+
+        Every call into lxml has a fixed cost, which adds up when a
+        big document is fed in small pieces, so the pieces get bigger
+        as the document does: a document is fed in about sixteen
+        pieces, each between `CHUNK_SIZE` and `MAX_CHUNK_SIZE`.
+
+        :param length: The length of the document.
+        """
+        return max(self.CHUNK_SIZE, min(length // 16, self.MAX_CHUNK_SIZE))
 
+    def feed(self, markup: _RawMarkup) -> None:
         # initialize_soup is called before feed, so we know this
         # is not None.
         assert self.soup is not None
 
-        # Call feed() at least once, even if the markup is empty,
-        # or the parser won't be initialized.
-        data = io.read(self.CHUNK_SIZE)
+        # Slicing a string or bytestring copies only the slice, so
+        # the markup can be fed straight from wherever it is, whether
+        # that's a string, a bytestring, a memoryview or a
+        # memory-mapped file.
+        length = len(markup)
+        chunk_size = self.chunk_size(length)
         try:
             self.parser = self.parser_for(self.soup.original_encoding)
-            self.parser.feed(data)
-            while len(data) != 0:
-                # Now call feed() on the rest of the data, chunk by chunk.
-                data = io.read(self.CHUNK_SIZE)
-                if len(data) != 0:
-                    self.parser.feed(data)
+            # Call feed() at least once, even if the markup is empty,
+            # or the parser won't be initialized.
+            self.parser.feed(self._chunk(markup, 0, chunk_size))
+            for start in range(chunk_size, length, chunk_size):
+                self.parser.feed(self._chunk(markup, start, start + chunk_size))
+                if self.soup._limit_checker is not None:
+                    # A single chunk might not create any nodes,
+                    # so check the clock here as well.
+                    self.soup._limit_checker.check()
+            self.parser.close()
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+
+    @classmethod
+    def _chunk(cls, markup: _RawMarkup, start: int, end: int) -> Union[str, bytes]:
+        """Get one piece of the markup, as something lxml will accept."""
+        chunk = markup[start:end]
+        if not isinstance(chunk, (str, bytes)):
+            # Slicing a memoryview doesn't copy anything, but lxml
+            # only accepts strings and bytestrings.
+            chunk = bytes(chunk)
+        return chunk
+
+    def open_feed(self) -> None:
+        # The pieces of the document will already have been decoded.
+        self.parser = self.parser_for(None)
+        self._fed = False
+
+    def feed_chunk(self, chunk: str) -> None:
+        try:
+            self.parser.feed(chunk)
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+        self._fed = True
+
+    def close_feed(self) -> None:
+        try:
+            if not self._fed:
+                # Call feed() at least once, or the parser won't be
+                # initialized.
+                self.parser.feed("")
             self.parser.close()
         except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
             raise ParserRejectedMarkup(e)
@@ -474,17 +529,6 @@ class LXMLTreeBuilder(HTMLTreeBuilder, LXMLTreeBuilderForXML):
     def default_parser(self, encoding: Optional[_Encoding]) -> _ParserOrParserClass:
         return etree.HTMLParser
 
-    def feed(self, markup: _RawMarkup) -> None:
-        # We know self.soup is set by the time feed() is called.
-        assert self.soup is not None
-        encoding = self.soup.original_encoding
-        try:
-            self.parser = self.parser_for(encoding)
-            self.parser.feed(markup)
-            self.parser.close()
-        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
-            raise ParserRejectedMarkup(e)
-
     def test_fragment_to_document(self, fragment: str) -> str:
         """See `TreeBuilder`."""
         return "<html><body>%s</body></html>" % fragment
@@ -0,0 +1,259 @@
+"""Call functions on the parts of a document that match CSS selectors,
+as the document is being parsed.
+
+This is useful when you only care about a few elements of a large
+document, such as its links and its OpenGraph metadata. Rather than
+building a tree for the whole document and then searching it, you
+register a handler for each CSS selector you're interested in::
+
+    callbacks = SelectorCallbacks()
+    callbacks.on("a[href]", lambda tag: links.append(tag["href"]))
+    callbacks.on("meta[property^='og:']", lambda tag: ...)
+    callbacks.parse(markup, "lxml")
+
+Each handler is called as soon as a matching tag is closed, and is
+given the complete subtree for that tag. Everything outside a
+matching tag is thrown away as soon as the parser is done with it.
+
+This module requires `Soup Sieve <https://facelessuser.github.io/soupsieve/>`_.
+"""
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "SelectorCallbacks",
+]
+
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
+
+from bs4 import BeautifulSoup
+from bs4.builder import TreeBuilder
+from bs4.css import soupsieve
+from bs4.element import (
+    NavigableString,
+    PageElement,
+    Tag,
+)
+from bs4._sink import _builder_for
+from bs4._typing import (
+    _IncomingMarkup,
+    _NamespaceMapping,
+    _RawAttributeValues,
+)
+
+if TYPE_CHECKING:
+    from soupsieve import SoupSieve
+
+#: A function to be called with a `Tag` that matched a selector.
+_TagHandler = Callable[[Tag], Any]
+
+
+class SelectorCallbacks(object):
+    """A set of CSS selectors, each with a function to be called
+    when a tag that matches the selector is found during parsing.
+
+    A selector is checked against each tag when the tag is opened, so
+    it can test the tag's name and attributes, and the names and
+    attributes of all of its ancestors. Since it runs before the rest
+    of the document has been parsed, a selector can't test anything
+    that comes later: the tag's contents (``:has()``, ``:empty``,
+    ``:-soup-contains()``), its later siblings (``:last-child``),
+    and so on. Since everything outside a matched region is thrown
+    away, a selector can't reliably test earlier siblings either
+    (``+``, ``~``, ``:nth-child()``).
+
+    Handlers are called in the order in which matching tags are
+    closed. If a tag matches more than one selector, its handlers are
+    called in the order in which they were registered. If one matched
+    tag is inside another, the inner tag's handlers are called first,
+    and the outer tag is still given its complete subtree.
+
+    When a handler is called, the `Tag` is still connected to its
+    ancestors, but everything else in the document has been thrown
+    away. As soon as the handler returns, the `Tag` is extracted from
+    the tree, so it's safe to hang on to it.
+
+    :param namespaces: A dictionary mapping namespace prefixes
+        used in the CSS selectors to namespace URIs.
+    :param api: An optional drop-in replacement for the ``soupsieve``
+        module, intended for use in unit tests.
+    """
+
+    handlers: List[Tuple["SoupSieve", _TagHandler]]
+
+    def __init__(
+        self,
+        namespaces: Optional[_NamespaceMapping] = None,
+        api: Optional[ModuleType] = None,
+    ):
+        if api is None:
+            api = soupsieve
+        if api is None:
+            raise NotImplementedError(
+                "Cannot use CSS selectors because the soupsieve package is not installed."
+            )
+        self.api = api
+        self.namespaces = namespaces
+        self.handlers = []
+
+    def on(
+        self, select: Union[str, "SoupSieve"], handler: _TagHandler, flags: int = 0
+    ) -> None:
+        """Register a function to be called with every tag that matches
+        a CSS selector.
+
+        :param select: A CSS selector, or a selector that was
+            precompiled with `CSS.compile`.
+        :param handler: A function that takes a `Tag`. Its return
+            value is ignored.
+        :param flags: Flags to be passed into Soup Sieve's
+            `soupsieve.compile() <https://facelessuser.github.io/soupsieve/api/#soupsievecompile>`_ method.
+        """
+        compiled: "SoupSieve"
+        if isinstance(select, str):
+            compiled = self.api.compile(select, self.namespaces, flags)
+        else:
+            compiled = select
+        self.handlers.append((compiled, handler))
+
+    def handlers_for(self, tag: Tag) -> List[_TagHandler]:
+        """Find the handlers whose selectors match the given tag.
+
+        :meta private:
+        """
+        return [handler for select, handler in self.handlers if select.match(tag)]
+
+    def parse(
+        self,
+        markup: _IncomingMarkup,
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Parse a document, calling handlers as matching tags are found.
+
+        :param markup: A string, bytestring, or open filehandle.
+        :param features: Desirable features of the parser to be used,
+            as with the `BeautifulSoup` constructor.
+        :param builder: A `TreeBuilder` subclass to instantiate (or
+            instance to use) instead of looking one up based on
+            `features`.
+        :param kwargs: Other keyword arguments are passed into the
+            `BeautifulSoup` constructor.
+        """
+        constructor_kwargs = {}
+        for arg in ("from_encoding", "exclude_encodings", "element_classes"):
+            if arg in kwargs:
+                constructor_kwargs[arg] = kwargs.pop(arg)
+        tree_builder = _builder_for(features, builder, **kwargs)
+        if tree_builder.SENDS_PARSE_EVENTS:
+            _CallbackSoup(markup, builder=tree_builder, callbacks=self, **constructor_kwargs)
+            return
+
+        # This tree builder (html5lib) moves things around in the
+        # tree as it's being built, so the best we can do is build
+        # the whole tree and then visit tags in the order in which
+        # they were closed.
+        soup = BeautifulSoup(markup, builder=tree_builder, **constructor_kwargs)
+        matched: List[Tuple[Tag, List[_TagHandler]]] = []
+        for event, element in list(soup._event_stream(soup.descendants)):
+            if event is Tag.STRING_ELEMENT_EVENT:
+                continue
+            assert isinstance(element, Tag)
+            if event is not Tag.END_ELEMENT_EVENT:
+                handlers = self.handlers_for(element)
+                if handlers:
+                    matched.append((element, handlers))
+            if event is not Tag.START_ELEMENT_EVENT:
+                if matched and matched[-1][0] is element:
+                    for handler in matched.pop()[1]:
+                        handler(element)
+                    if not matched:
+                        element.extract()
+
+
+class _CallbackSoup(BeautifulSoup):
+    """A `BeautifulSoup` object that calls the handlers in a
+    `SelectorCallbacks` as it parses, and throws away everything
+    outside of the tags that matched.
+    """
+
+    #: Each tag that matched at least one selector and hasn't been
+    #: closed yet, along with the handlers to call when it's closed.
+    _matched: List[Tuple[Tag, List[_TagHandler]]]
+
+    def __init__(self, *args: Any, callbacks: SelectorCallbacks, **kwargs: Any):
+        self._callbacks = callbacks
+        super(_CallbackSoup, self).__init__(*args, **kwargs)
+
+    def reset(self) -> None:
+        super(_CallbackSoup, self).reset()
+        self._matched = []
+
+    def handle_starttag(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: _RawAttributeValues,
+        sourceline: Optional[int] = None,
+        sourcepos: Optional[int] = None,
+        namespaces: Optional[dict] = None,
+        sourceoffset: Optional[int] = None,
+    ) -> Optional[Tag]:
+        tag = super(_CallbackSoup, self).handle_starttag(
+            name,
+            namespace,
+            nsprefix,
+            attrs,
+            sourceline=sourceline,
+            sourcepos=sourcepos,
+            namespaces=namespaces,
+            sourceoffset=sourceoffset,
+        )
+        if tag is not None:
+            handlers = self._callbacks.handlers_for(tag)
+            if handlers:
+                self._matched.append((tag, handlers))
+        return tag
+
+    def object_was_parsed(
+        self,
+        o: PageElement,
+        parent: Optional[Tag] = None,
+        most_recent_element: Optional[PageElement] = None,
+    ) -> None:
+        if not self._matched and isinstance(o, NavigableString):
+            # This string isn't inside any tag we care about.
+            return
+        super(_CallbackSoup, self).object_was_parsed(o, parent, most_recent_element)
+
+    def popTag(self) -> Optional[Tag]:
+        if len(self.tagStack) <= 1:
+            return super(_CallbackSoup, self).popTag()
+        tag = self.tagStack[-1]
+        current = super(_CallbackSoup, self).popTag()
+        if self._matched and self._matched[-1][0] is tag:
+            for handler in self._matched.pop()[1]:
+                handler(tag)
+        if not self._matched:
+            # Nothing that's still open needs this tag, so get rid of
+            # it. Its parent is still open, and everything else inside
+            # the parent has already been thrown away, so the parent
+            # becomes the most recently parsed element.
+            parent = tag.parent
+            tag.extract()
+            self._most_recent_element = parent
+        return current
@@ -20,6 +20,7 @@ import re
 from logging import Logger, getLogger
 from types import ModuleType
 from typing import (
+    Any,
     Dict,
     Iterator,
     List,
@@ -32,6 +33,7 @@ from typing import (
     cast,
 )
 from typing_extensions import Literal
+from bs4 import instrumentation
 from bs4._typing import (
     _Encoding,
     _Encodings,
@@ -73,6 +75,9 @@ def _chardet_dammit(s: bytes) -> Optional[str]:
     if chardet_module is None or isinstance(s, str):
         return None
     module = chardet_module
+    if not isinstance(s, bytes):
+        # This may be a memoryview, which the detectors don't accept.
+        s = bytes(s)
     return module.detect(s)["encoding"]
 
 
@@ -95,26 +100,61 @@ encoding_res[str] = {
 }
 
 
+class _LazyClassVariable(object):
+    """A class variable that isn't calculated until it's first used.
+
+    The first time the variable is looked up, a classmethod of the
+    class that defines it is called. The classmethod is expected to
+    set the variable (and maybe some others), replacing this object.
+
+    :param populate: The name of the classmethod.
+
+    :meta private:
+    """
+
+    def __init__(self, populate: str):
+        self.populate = populate
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        getattr(self.owner, self.populate)()
+        return getattr(self.owner, self.name)
+
+
 class EntitySubstitution(object):
-    """The ability to substitute XML or HTML entities for certain characters."""
+    """The ability to substitute XML or HTML entities for certain characters.
+
+    The tables of HTML entities, and the regular expressions built from
+    them, aren't created until they're first used, so a program that
+    never turns characters into HTML entities doesn't pay for them.
+    """
 
     #: A map of named HTML entities to the corresponding Unicode string.
     #:
     #: :meta hide-value:
-    HTML_ENTITY_TO_CHARACTER: Dict[str, str]
+    HTML_ENTITY_TO_CHARACTER: Dict[str, str] = _LazyClassVariable(  # type: ignore[assignment]
+        "_populate_entity_names"
+    )
 
     #: A map of Unicode strings to the corresponding named HTML entities;
     #: the inverse of HTML_ENTITY_TO_CHARACTER.
     #:
     #: :meta hide-value:
-    CHARACTER_TO_HTML_ENTITY: Dict[str, str]
+    CHARACTER_TO_HTML_ENTITY: Dict[str, str] = _LazyClassVariable(  # type: ignore[assignment]
+        "_populate_class_variables"
+    )
 
     #: A regular expression that matches any character (or, in rare
     #: cases, pair of characters) that can be replaced with a named
     #: HTML entity.
     #:
     #: :meta hide-value:
-    CHARACTER_TO_HTML_ENTITY_RE: Pattern[str]
+    CHARACTER_TO_HTML_ENTITY_RE: Pattern[str] = _LazyClassVariable(  # type: ignore[assignment]
+        "_populate_class_variables"
+    )
 
     #: A very similar regular expression to
     #: CHARACTER_TO_HTML_ENTITY_RE, but which also matches unescaped
@@ -123,7 +163,38 @@ class EntitySubstitution(object):
     #: ampersands to go unescaped.
     #:
     #: :meta hide-value:
-    CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE: Pattern[str]
+    CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE: Pattern[str] = _LazyClassVariable(  # type: ignore[assignment]
+        "_populate_class_variables"
+    )
+
+    @classmethod
+    def _populate_entity_names(cls) -> None:
+        """Initialize HTML_ENTITY_TO_CHARACTER, the only one of the
+        HTML entity tables that's needed when parsing, without
+        building the others.
+        """
+        name_to_unicode = {}
+        for name_with_semicolon, character in sorted(html5.items()):
+            # "It is intentional, for legacy compatibility, that many
+            # code points have multiple character reference names. For
+            # example, some appear both with and without the trailing
+            # semicolon, or with different capitalizations."
+            # - https://html.spec.whatwg.org/multipage/named-characters.html#named-character-references
+            #
+            # The parsers are in charge of handling (or not) character
+            # references with no trailing semicolon, so we remove the
+            # semicolon whenever it appears.
+            if name_with_semicolon.endswith(";"):
+                name = name_with_semicolon[:-1]
+            else:
+                name = name_with_semicolon
+
+            # When parsing HTML, we want to recognize any known named
+            # entity and convert it to a sequence of Unicode
+            # characters.
+            if name not in name_to_unicode:
+                name_to_unicode[name] = character
+        cls.HTML_ENTITY_TO_CHARACTER = name_to_unicode
 
     @classmethod
     def _populate_class_variables(cls) -> None:
@@ -149,33 +220,20 @@ class EntitySubstitution(object):
         formatted to provide backwards-compatibility, even though the HTML5
         spec allows most ampersands to go unescaped.
         """
+        cls._populate_entity_names()
         unicode_to_name = {}
-        name_to_unicode = {}
 
         short_entities = set()
         long_entities_by_first_character = defaultdict(set)
 
         for name_with_semicolon, character in sorted(html5.items()):
-            # "It is intentional, for legacy compatibility, that many
-            # code points have multiple character reference names. For
-            # example, some appear both with and without the trailing
-            # semicolon, or with different capitalizations."
-            # - https://html.spec.whatwg.org/multipage/named-characters.html#named-character-references
-            #
-            # The parsers are in charge of handling (or not) character
-            # references with no trailing semicolon, so we remove the
-            # semicolon whenever it appears.
+            # As in _populate_entity_names, the trailing semicolon is
+            # removed.
             if name_with_semicolon.endswith(";"):
                 name = name_with_semicolon[:-1]
             else:
                 name = name_with_semicolon
 
-            # When parsing HTML, we want to recognize any known named
-            # entity and convert it to a sequence of Unicode
-            # characters.
-            if name not in name_to_unicode:
-                name_to_unicode[name] = character
-
             # When _generating_ HTML, we want to recognize special
             # character sequences that _could_ be converted to named
             # entities.
@@ -251,7 +309,6 @@ class EntitySubstitution(object):
             unicode_to_name[character] = name
 
         cls.CHARACTER_TO_HTML_ENTITY = unicode_to_name
-        cls.HTML_ENTITY_TO_CHARACTER = name_to_unicode
         cls.CHARACTER_TO_HTML_ENTITY_RE = re.compile(re_definition)
         cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE = re.compile(
             re_definition_with_ampersand
@@ -479,8 +536,6 @@ class EntitySubstitution(object):
         return s
 
 
-EntitySubstitution._populate_class_variables()
-
 
 class EncodingDetector:
     """This class is capable of guessing a number of possible encodings
@@ -711,10 +766,10 @@ class EncodingDetector:
             xml_endpos = 1024
             html_endpos = max(2048, int(len(markup) * 0.05))
 
-        if isinstance(markup, bytes):
-            res = encoding_res[bytes]
-        else:
+        if isinstance(markup, str):
             res = encoding_res[str]
+        else:
+            res = encoding_res[bytes]
 
         xml_re = res["xml"]
         html_re = res["html"]
@@ -807,9 +862,21 @@ class UnicodeDammit:
         # Use the stripped markup from this point on.
         self.markup = self.detector.markup
 
+        if instrumentation.enabled:
+            with instrumentation._Operation(
+                "detect_encoding", len(markup)
+            ) as operation:
+                self._convert_markup()
+                operation.details["encoding"] = self.original_encoding
+        else:
+            self._convert_markup()
+
+    def _convert_markup(self) -> None:
+        """Try each of the detector's encodings in turn until one of
+        them converts the markup to Unicode.
+        """
         u = None
         for encoding in self.detector.encodings:
-            markup = self.detector.markup
             u = self._convert_from(encoding)
             if u is not None:
                 break
@@ -3,17 +3,27 @@
 # Use of this source code is governed by the MIT license.
 __license__ = "MIT"
 
+import argparse
+from collections import defaultdict
 import cProfile
 from io import BytesIO
 from html.parser import HTMLParser
 import bs4
-from bs4 import BeautifulSoup, __version__
+from bs4 import BeautifulSoup, SoupFactory, __version__
 from bs4.builder import builder_registry
+from bs4.element import (
+    PageElement,
+    Tag,
+)
 from typing import (
     Any,
+    Dict,
     IO,
+    Iterable,
     List,
+    NamedTuple,
     Optional,
+    Set,
     Tuple,
     TYPE_CHECKING,
 )
@@ -26,6 +36,7 @@ import random
 import tempfile
 import time
 import traceback
+import tracemalloc
 import sys
 
 
@@ -39,11 +50,8 @@ def diagnose(data: "_IncomingMarkup") -> None:
     print(("Python version %s" % sys.version))
 
     basic_parsers = ["html.parser", "html5lib", "lxml"]
-    for name in basic_parsers:
-        for builder in builder_registry.builders:
-            if name in builder.features:
-                break
-        else:
+    for name in list(basic_parsers):
+        if builder_registry.lookup(name) is None:
             basic_parsers.remove(name)
             print(
                 ("I noticed that %s is not installed. Installing it may help." % name)
@@ -214,7 +222,10 @@ def rdoc(num_elements: int = 1000) -> str:
 
 
 def benchmark_parsers(num_elements: int = 100000) -> None:
-    """Very basic head-to-head performance benchmark."""
+    """Very basic head-to-head performance benchmark.
+
+    For a more thorough benchmark, see `bs4.benchmarks`.
+    """
     print(("Comparative parser benchmark on Beautiful Soup %s" % __version__))
     data = rdoc(num_elements)
     print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
@@ -248,6 +259,295 @@ def benchmark_parsers(num_elements: int = 100000) -> None:
     print(("Raw html5lib parsed the markup in %.2fs." % (b - a)))
 
 
+def benchmark_fragments(num_fragments: int = 10000, size: int = 1024) -> None:
+    """Compare the time it takes to parse a lot of small fragments with
+    the `BeautifulSoup` constructor and with a `SoupFactory`.
+    """
+    print(("Fragment benchmark on Beautiful Soup %s" % __version__))
+    fragments: List[str] = []
+    while len(fragments) < num_fragments:
+        data = rdoc(size // 4)
+        while len(data) > size:
+            fragments.append(data[:size])
+            data = data[size:]
+    fragments = fragments[:num_fragments]
+    print(("Generated %d fragments of %d bytes." % (len(fragments), size)))
+
+    for parser_name in ["html.parser", "lxml", "html5lib"]:
+        if builder_registry.lookup(parser_name) is None:
+            continue
+        a = time.time()
+        for fragment in fragments:
+            BeautifulSoup(fragment, parser_name)
+        b = time.time()
+        factory = SoupFactory(parser_name)
+        for fragment in fragments:
+            factory.parse(fragment)
+        c = time.time()
+        print(
+            (
+                "BS4+%s: %.2fs with the constructor, %.2fs with a SoupFactory."
+                % (parser_name, b - a, c - b)
+            )
+        )
+
+
+class MemoryUsage(NamedTuple):
+    """How many objects of some kind there are, and how much memory
+    they use.
+    """
+
+    objects: int
+    bytes: int
+
+
+class MemoryProfile(object):
+    """Where the memory used by a parsed tree goes.
+
+    Each object is counted once, in the first category it's found
+    in, and its size is the size reported by :py:func:`sys.getsizeof`.
+    Objects that are shared with the `TreeBuilder` rather than
+    belonging to the tree (such as the set of tags that preserve
+    whitespace) aren't counted.
+
+    Don't instantiate this class yourself; call `memory_profile`.
+    """
+
+    #: The `PageElement` objects themselves, keyed by class name. For
+    #: strings, this includes the text.
+    nodes: Dict[str, MemoryUsage]
+
+    #: The ``__dict__`` of each `PageElement`.
+    instance_dicts: MemoryUsage
+
+    #: The `Tag.attrs` dictionaries.
+    attribute_dicts: MemoryUsage
+
+    #: The values of multi-valued attributes, like ``class``.
+    attribute_value_lists: MemoryUsage
+
+    #: The `Tag.contents` lists.
+    contents_lists: MemoryUsage
+
+    #: Strings that aren't part of the document's text: tag names,
+    #: prefixes, namespaces, and attribute names and values.
+    strings: MemoryUsage
+
+    #: How many of the objects in `MemoryProfile.strings` have the
+    #: same value as another one, and could be replaced by it.
+    duplicate_strings: int
+
+    #: How much memory would be saved by replacing those duplicates.
+    duplicate_string_bytes: int
+
+    def __init__(self) -> None:
+        self.nodes = {}
+        self.instance_dicts = self.attribute_dicts = MemoryUsage(0, 0)
+        self.attribute_value_lists = self.contents_lists = MemoryUsage(0, 0)
+        self.strings = MemoryUsage(0, 0)
+        self.duplicate_strings = self.duplicate_string_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """The total memory used by the tree."""
+        return sum(usage.bytes for usage in self.nodes.values()) + sum(
+            usage.bytes for name, usage in self._categories()
+        )
+
+    def _categories(self) -> List[Tuple[str, MemoryUsage]]:
+        return [
+            ("instance __dict__s", self.instance_dicts),
+            ("attribute dicts", self.attribute_dicts),
+            ("attribute value lists", self.attribute_value_lists),
+            ("contents lists", self.contents_lists),
+            ("other strings", self.strings),
+        ]
+
+    def __str__(self) -> str:
+        lines = ["%-24s %10s %14s" % ("", "objects", "bytes")]
+        for name in sorted(self.nodes, key=lambda x: -self.nodes[x].bytes):
+            usage = self.nodes[name]
+            lines.append("%-24s %10d %14d" % (name, usage.objects, usage.bytes))
+        for name, usage in self._categories():
+            lines.append("%-24s %10d %14d" % (name, usage.objects, usage.bytes))
+        lines.append("%-24s %10s %14d" % ("total", "", self.total_bytes))
+        lines.append(
+            "%d duplicate strings; interning them would save %d bytes."
+            % (self.duplicate_strings, self.duplicate_string_bytes)
+        )
+        return "\n".join(lines)
+
+
+def memory_profile(tree: PageElement) -> MemoryProfile:
+    """Measure the memory used by a parsed tree.
+
+    Tags whose contents haven't been parsed yet (see the ``lazy_tags``
+    argument to `HTMLParserTreeBuilder`) are not parsed by this
+    function, so their contents aren't counted.
+
+    :param tree: A `BeautifulSoup` object, or any part of one.
+    :return: A `MemoryProfile`.
+    """
+    seen: Set[int] = set()
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    node_totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    strings: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+    def count(category: str, obj: Any) -> None:
+        if obj is None or id(obj) in seen:
+            return
+        seen.add(id(obj))
+        total = totals[category]
+        total[0] += 1
+        total[1] += sys.getsizeof(obj)
+
+    def count_string(value: Any) -> None:
+        if isinstance(value, str):
+            if id(value) not in seen:
+                strings[value][id(value)] = sys.getsizeof(value)
+            count("strings", value)
+
+    stack: List[PageElement] = [tree]
+    while stack:
+        element = stack.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        node_total = node_totals[element.__class__.__name__]
+        node_total[0] += 1
+        node_total[1] += sys.getsizeof(element)
+        if hasattr(element, "__dict__"):
+            count("instance_dicts", element.__dict__)
+        if not isinstance(element, Tag):
+            continue
+        for name in (element.name, element.prefix, element.namespace):
+            count_string(name)
+        count("attribute_dicts", element.attrs)
+        for key, value in element.attrs.items():
+            count_string(key)
+            if isinstance(value, list):
+                count("attribute_value_lists", value)
+                for item in value:
+                    count_string(item)
+            else:
+                count_string(value)
+        if element._lazy_content is not None:
+            # Even looking at the Tag.contents of this tag would
+            # parse it.
+            continue
+        count("contents_lists", element.contents)
+        # Look at Tag.contents directly rather than using
+        # Tag.descendants, so that unparsed tags below this one
+        # aren't parsed.
+        stack.extend(reversed(element.contents))
+
+    profile = MemoryProfile()
+    profile.nodes = {
+        name: MemoryUsage(*total) for name, total in node_totals.items()
+    }
+    for category in (
+        "instance_dicts",
+        "attribute_dicts",
+        "attribute_value_lists",
+        "contents_lists",
+        "strings",
+    ):
+        setattr(profile, category, MemoryUsage(*totals[category]))
+    for copies in strings.values():
+        if len(copies) > 1:
+            sizes = sorted(copies.values())
+            profile.duplicate_strings += len(sizes) - 1
+            profile.duplicate_string_bytes += sum(sizes[:-1])
+    return profile
+
+
+class ParseMemory(NamedTuple):
+    """Memory allocated while parsing a document, as measured by
+    :py:mod:`tracemalloc`.
+    """
+
+    #: The most memory that was in use at any one time during parsing.
+    peak: int
+
+    #: The memory still in use after parsing: the size of the tree.
+    retained: int
+
+
+def parse_memory(
+    data: "_IncomingMarkup", parsers: Optional[Iterable[str]] = None
+) -> Dict[str, ParseMemory]:
+    """Measure the memory allocated while parsing a document with
+    each of several parsers.
+
+    Tracing memory allocations slows Python down considerably, so
+    don't time anything while this is running.
+
+    :param data: The markup to parse.
+    :param parsers: The parsers to use. By default, every installed
+        parser is used.
+    :return: A dictionary mapping the name of each parser to a
+        `ParseMemory`.
+    """
+    if hasattr(data, "read"):
+        data = data.read()
+    if parsers is None:
+        parsers = ["html.parser", "lxml", "lxml-xml", "html5lib"]
+    results = {}
+    already_tracing = tracemalloc.is_tracing()
+    for parser in parsers:
+        if builder_registry.lookup(parser) is None:
+            continue
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        soup = BeautifulSoup(data, parser)
+        current, peak = tracemalloc.get_traced_memory()
+        results[parser] = ParseMemory(peak - before, current - before)
+        del soup
+        if not already_tracing:
+            tracemalloc.stop()
+    return results
+
+
+def _memory_main(argv: List[str]) -> int:
+    """Run `memory_profile` or `parse_memory` from the command line.
+
+    :meta private:
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m bs4.diagnose memory",
+        description="Report where the memory used by a parsed document goes.",
+    )
+    parser.add_argument("filename", help="The document to parse.")
+    parser.add_argument(
+        "--parser",
+        action="append",
+        dest="parsers",
+        help="A parser to use; may be given more than once (default: html.parser).",
+    )
+    parser.add_argument(
+        "--peak",
+        action="store_true",
+        help="Measure the memory allocated during parsing, with tracemalloc.",
+    )
+    args = parser.parse_args(argv)
+    with open(args.filename, "rb") as f:
+        data = f.read()
+    if args.peak:
+        for name, usage in parse_memory(data, args.parsers).items():
+            print(
+                "%-12s peak %14d bytes, retained %14d bytes"
+                % (name, usage.peak, usage.retained)
+            )
+        return 0
+    for name in args.parsers or ["html.parser"]:
+        print("Memory used by the tree built by %s:" % name)
+        print(memory_profile(BeautifulSoup(data, name)))
+        print()
+    return 0
+
+
 def profile(num_elements: int = 100000, parser: str = "lxml") -> None:
     """Use Python's profiler on a randomly generated document."""
     filehandle = tempfile.NamedTemporaryFile()
@@ -263,6 +563,9 @@ def profile(num_elements: int = 100000, parser: str = "lxml") -> None:
     stats.print_stats("_html5lib|bs4", 50)
 
 
-# If this file is run as a script, standard input is diagnosed.
+# If this file is run as a script, standard input is diagnosed. Run
+# it as "python -m bs4.diagnose memory" to profile memory use instead.
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["memory"]:
+        sys.exit(_memory_main(sys.argv[2:]))
     diagnose(sys.stdin.read())
@@ -6,6 +6,7 @@ __license__ = "MIT"
 import re
 import warnings
 
+from bs4 import instrumentation
 from bs4.css import CSS
 from bs4._deprecation import (
     _deprecated,
@@ -18,6 +19,7 @@ from bs4.formatter import (
     XMLFormatter,
 )
 from bs4._warnings import AttributeResemblesVariableWarning
+from bs4.exceptions import FrozenTreeError
 
 from typing import (
     Any,
@@ -47,6 +49,14 @@ if TYPE_CHECKING:
     from bs4 import BeautifulSoup
     from bs4.builder import TreeBuilder
     from bs4.filter import ElementFilter
+    from bs4._positions import SourcePositions
+    from bs4._frozen import FrozenIndex
+    from bs4._order import DocumentOrder
+    from bs4._query_cache import (
+        QueryCache,
+        QueryCacheInfo,
+    )
+    from bs4._lazy import _LazyContent
     from bs4.formatter import (
         _EntitySubstitutionFunction,
         _FormatterOrName,
@@ -57,6 +67,7 @@ if TYPE_CHECKING:
         _AttributeValues,
         _Encoding,
         _InsertableElement,
+        _MutationListener,
         _OneElement,
         _QueryResults,
         _RawOrProcessedAttributeValues,
@@ -373,6 +384,47 @@ class PageElement(object):
     #: Only the `BeautifulSoup` object itself is hidden.
     hidden: bool = False
 
+    # If a tree builder was asked to parse this element's contents
+    # lazily, the unparsed contents. See `Tag.is_lazy`.
+    _lazy_content: Optional[_LazyContent] = None  #: :meta private:
+
+    # If this is the root of a tree that has been frozen, the indexes
+    # calculated when it was frozen. See `BeautifulSoup.freeze`.
+    _frozen: Optional[FrozenIndex] = None  #: :meta private:
+
+    # If this is the root of a tree and anyone has asked for the
+    # document order of its elements, the numbering. See
+    # `PageElement._document_order`.
+    _order: Optional[DocumentOrder] = None  #: :meta private:
+
+    # Set to True the first time a tree is numbered in document
+    # order, so that tree modifications don't have to look for
+    # numbers to throw away when there are none.
+    _document_order_in_use: bool = False  #: :meta private:
+
+    #: The kinds of change reported to a mutation listener (see
+    #: `Tag.add_mutation_listener`): an element was inserted into the
+    #: tree, an element was extracted from the tree, a tag's
+    #: attributes were changed, or a tag was renamed.
+    INSERTED: str = "inserted"
+    EXTRACTED: str = "extracted"
+    ATTRIBUTES_CHANGED: str = "attributes"
+    RENAMED: str = "renamed"
+
+    # If this is the root of a tree, the number of times the tree has
+    # been modified since anyone started keeping track. See
+    # `PageElement.generation`.
+    _generation: int = 0  #: :meta private:
+
+    # Functions to be called when the tree beneath this element is
+    # modified. See `Tag.add_mutation_listener`.
+    _mutation_listeners: Optional[List[_MutationListener]] = None  #: :meta private:
+
+    # Set to True the first time anyone asks for a tree's generation
+    # or adds a mutation listener, so that tree modifications don't
+    # have to keep count when nobody is looking.
+    _mutation_tracking_in_use: bool = False  #: :meta private:
+
     def setup(
         self,
         parent: Optional[Tag] = None,
@@ -593,10 +645,13 @@ class PageElement(object):
 
         :return: this `PageElement`, no longer part of the tree.
         """
+        self._check_not_frozen()
+        old_parent = self.parent
         if self.parent is not None:
             if _self_index is None:
                 _self_index = self.parent.index(self)
             del self.parent.contents[_self_index]
+            self.parent._tree_changed()
 
         # Find the two elements that would be next to each other if
         # this element (and any children) hadn't been parsed. Connect
@@ -630,6 +685,8 @@ class PageElement(object):
         ):
             self.next_sibling.previous_sibling = self.previous_sibling
         self.previous_sibling = self.next_sibling = None
+        if PageElement._mutation_tracking_in_use and old_parent is not None:
+            self._mutated(self.EXTRACTED, old_parent)
         return self
 
     def decompose(self) -> None:
@@ -676,7 +733,13 @@ class PageElement(object):
             last_child = self.next_sibling.previous_element
         else:
             last_child = self
-            while isinstance(last_child, Tag) and last_child.contents:
+            # A tag whose contents haven't been parsed yet has no
+            # descendants as far as the next_element chain is concerned.
+            while (
+                isinstance(last_child, Tag)
+                and last_child._lazy_content is None
+                and last_child.contents
+            ):
                 last_child = last_child.contents[-1]
         if not accept_self and last_child is self:
             last_child = None
@@ -686,6 +749,140 @@ class PageElement(object):
         "_lastRecursiveChild", "_last_descendant", "4.0.0"
     )
 
+    def _frozen_index(self) -> Optional[FrozenIndex]:
+        """Find the indexes for the frozen tree this element is part of.
+
+        :return: None if this element isn't part of a frozen tree.
+        """
+        if not Tag._freezing_in_use:
+            return None
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return root._frozen
+
+    def _check_not_frozen(self) -> None:
+        """Raise an exception if this element is part of a frozen tree.
+
+        Every method that modifies the tree calls this before
+        changing anything.
+        """
+        if Tag._freezing_in_use and self._frozen_index() is not None:
+            raise FrozenTreeError(
+                "This tree has been frozen, and can't be modified."
+            )
+
+    def _document_order(self) -> DocumentOrder:
+        """Number every element in this element's tree in document order.
+
+        The numbers are reused until the tree is modified. A frozen
+        tree is numbered when it's frozen.
+        """
+        order = self._existing_document_order()
+        if order is not None:
+            return order
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        from bs4._order import DocumentOrder
+
+        PageElement._document_order_in_use = True
+        return DocumentOrder(cast(Tag, root))
+
+    def _existing_document_order(self) -> Optional[DocumentOrder]:
+        """Find the numbering of this element's tree, if it has already
+        been calculated and is still good.
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        if root._frozen is not None:
+            return root._frozen
+        order = root._order
+        if order is not None and order.valid:
+            return order
+        return None
+
+    @property
+    def generation(self) -> int:
+        """A number that changes every time this element's tree is
+        modified.
+
+        Any code that keeps information about a tree can store the
+        generation along with the information, and know that it's
+        still good as long as the generation hasn't changed. Every
+        method that modifies the tree changes the generation, except
+        modifying a `Tag.attrs` dictionary directly.
+
+        The count starts the first time anyone asks for any tree's
+        generation; it's the same for every element in the tree.
+        """
+        PageElement._start_tracking_mutations()
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return root._generation
+
+    @classmethod
+    def _start_tracking_mutations(cls) -> None:
+        """Called the first time anyone is interested in changes to
+        any tree.
+
+        :meta private:
+        """
+        PageElement._mutation_tracking_in_use = True
+
+    def _mutated(self, kind: str, start: Optional[PageElement] = None) -> None:
+        """Called after this element has been changed, to update the
+        generation of its tree and tell its tree's mutation listeners.
+
+        :param kind: What happened, e.g. `PageElement.INSERTED`.
+        :param start: The first element whose listeners should be
+            told, if not this one. When an element has been extracted,
+            this is its former parent.
+
+        :meta private:
+        """
+        element = self if start is None else start
+        while True:
+            if element._mutation_listeners:
+                for listener in list(element._mutation_listeners):
+                    listener(self, kind)
+            parent = element.parent
+            if parent is None:
+                break
+            element = parent
+        element._generation += 1
+
+    def _tree_changed(self) -> None:
+        """Called whenever the part of the tree at or beneath this element
+        has been modified, so that any information cached about it
+        can be thrown away.
+
+        This throws away the document order of the whole tree (see
+        `PageElement._document_order`). Since the text of a `Tag`
+        includes the text of everything beneath it, it also
+        invalidates the text cache (see `Tag.enable_text_cache`) of
+        this element and all of its parents.
+        """
+        if PageElement._document_order_in_use:
+            root = self
+            while root.parent is not None:
+                root = root.parent
+            if root._order is not None:
+                root._order.forget()
+                root._order = None
+        if not Tag._text_caching_in_use:
+            return
+        tag: Optional[Tag]
+        if isinstance(self, Tag):
+            tag = self
+        else:
+            tag = self.parent
+        while tag is not None:
+            tag.__dict__.pop("_text_cache", None)
+            tag = tag.parent
+
     def insert_before(self, *args: _InsertableElement) -> List[PageElement]:
         """Makes the given element(s) the immediate predecessor of this one.
 
@@ -700,6 +897,7 @@ class PageElement(object):
         parent = self.parent
         if parent is None:
             raise ValueError("Element has no parent, so 'before' has no meaning.")
+        parent._check_not_frozen()
         if any(x is self for x in args):
             raise ValueError("Can't insert an element before itself.")
         results: List[PageElement] = []
@@ -728,6 +926,7 @@ class PageElement(object):
         parent = self.parent
         if parent is None:
             raise ValueError("Element has no parent, so 'after' has no meaning.")
+        parent._check_not_frozen()
         if any(x is self for x in args):
             raise ValueError("Can't insert an element after itself.")
 
@@ -1148,7 +1347,10 @@ class PageElement(object):
     def next_elements(self) -> Iterator[PageElement]:
         """All PageElements that were parsed after this one."""
         i = self.next_element
+        lazy = Tag._lazy_content_in_use
         while i is not None:
+            if lazy and i._lazy_content is not None:
+                cast(Tag, i)._materialize()
             successor = i.next_element
             yield i
             i = successor
@@ -1181,7 +1383,15 @@ class PageElement(object):
         :yield: A sequence of PageElements.
         """
         i = self.previous_element
+        lazy = Tag._lazy_content_in_use
         while i is not None:
+            if lazy and i._lazy_content is not None:
+                # Parse this tag's contents, then go back to its last
+                # descendant, which was parsed just before the
+                # element we came from.
+                cast(Tag, i)._materialize()
+                i = cast(PageElement, i._last_descendant(accept_self=True))
+                continue
             successor = i.previous_element
             yield i
             i = successor
@@ -1566,6 +1776,39 @@ class RubyParenthesisString(NavigableString):
     """
 
 
+class _WatchedAttribute(object):
+    """Notices when `Tag.name` or `Tag.attrs` is replaced, so that a
+    frozen tree can't be renamed and a renamed tag counts as a change
+    to its tree.
+
+    This only defines ``__set__``, so reading the attribute gets it
+    straight from the instance ``__dict__``, as though this weren't
+    here. Setting the attribute in `Tag.__init__` only costs a
+    method call; looking for a frozen tree or telling mutation
+    listeners only happens when the attribute already had a value.
+
+    :param name: The name of the attribute.
+    :param kind: What sort of change to report to mutation
+        listeners, e.g. `PageElement.RENAMED`.
+    """
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+
+    def __set__(self, tag: Tag, value: Any) -> None:
+        values = tag.__dict__
+        if self.name in values and (
+            Tag._freezing_in_use or PageElement._mutation_tracking_in_use
+        ):
+            tag._check_not_frozen()
+            values[self.name] = value
+            if PageElement._mutation_tracking_in_use:
+                tag._mutated(self.kind)
+        else:
+            values[self.name] = value
+
+
 class Tag(PageElement):
     """An HTML or XML tag that is part of a parse tree, along with its
     attributes, contents, and relationships to other parts of the tree.
@@ -1649,14 +1892,10 @@ class Tag(PageElement):
         self.namespace = namespace
         self._namespaces = namespaces or {}
         self.prefix = prefix
-        if (not builder or builder.store_line_numbers) and (
-            sourceline is not None or sourcepos is not None
-        ):
-            self.sourceline = sourceline
-            self.sourcepos = sourcepos
-        else:
-            self.sourceline = sourceline
-            self.sourcepos = sourcepos
+        if sourceline is not None:
+            self._sourceline = sourceline
+        if sourcepos is not None:
+            self._sourcepos = sourcepos
 
         attr_dict_class: type[AttributeDict]
         attribute_value_list_class: type[AttributeValueList]
@@ -1741,8 +1980,6 @@ class Tag(PageElement):
     namespace: Optional[str]
     prefix: Optional[str]
     attrs: _AttributeValues
-    sourceline: Optional[int]
-    sourcepos: Optional[int]
     known_xml: Optional[bool]
     contents: List[PageElement]
     hidden: bool
@@ -1752,9 +1989,105 @@ class Tag(PageElement):
     cdata_list_attributes: Optional[Dict[str, Set[str]]]
     preserve_whitespace_tags: Optional[Set[str]]
 
+    if not TYPE_CHECKING:
+        # Type checkers should see these as the plain attributes
+        # declared above.
+        name = _WatchedAttribute("name", PageElement.RENAMED)
+        attrs = _WatchedAttribute("attrs", PageElement.ATTRIBUTES_CHANGED)
+
     #: :meta private:
     parserClass = _deprecated_alias("parserClass", "parser_class", "4.0.0")
 
+    # If this is the root of a parsed document, where the tree
+    # builder found each of its tags. See `Tag.sourceline`.
+    _document_positions: Optional[SourcePositions] = None  #: :meta private:
+
+    # The position of a tag that isn't recorded in its document's
+    # SourcePositions, if it's known at all.
+    _sourceline: Optional[int] = None  #: :meta private:
+    _sourcepos: Optional[int] = None  #: :meta private:
+
+    def _source_record(self) -> Tuple[Optional[SourcePositions], int]:
+        """Find this tag's record in the `SourcePositions` for the
+        document it's part of.
+
+        :return: The `SourcePositions` and the index of the record,
+            or (None, -1) if there's no record.
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        positions = root._document_positions
+        if positions is not None:
+            index = positions.index(self)
+            if index is not None:
+                return positions, index
+        return None, -1
+
+    @property
+    def sourceline(self) -> Optional[int]:
+        """The line number where this tag was found in its source
+        document, if known.
+
+        Positions recorded by the tree builder are kept with the
+        document rather than with each tag, so a tag that's been
+        removed from its document no longer knows where it was found.
+        """
+        positions, index = self._source_record()
+        if positions is not None:
+            return positions.line(index)
+        return self._sourceline
+
+    @sourceline.setter
+    def sourceline(self, value: Optional[int]) -> None:
+        positions, index = self._source_record()
+        if positions is not None:
+            positions.lines[index] = -1 if value is None else value
+        else:
+            self._sourceline = value
+
+    @property
+    def sourcepos(self) -> Optional[int]:
+        """The character position within `Tag.sourceline` where this
+        tag was found, if known.
+        """
+        positions, index = self._source_record()
+        if positions is not None:
+            return positions.column(index)
+        return self._sourcepos
+
+    @sourcepos.setter
+    def sourcepos(self, value: Optional[int]) -> None:
+        positions, index = self._source_record()
+        if positions is not None:
+            positions.columns[index] = -1 if value is None else value
+        else:
+            self._sourcepos = value
+
+    def source_markup(self) -> Optional[Union[str, memoryview]]:
+        """Find the exact markup in the source document that created
+        this tag, from the start of its start tag to the end of its
+        end tag.
+
+        This is only possible if the tree builder keeps track of where
+        tags begin and end (currently only html.parser does), and the
+        `TreeBuilder` was created with ``store_source_markup=True``::
+
+         soup = BeautifulSoup(markup, "html.parser", store_source_markup=True)
+
+        If a tag was closed implicitly, its markup ends where the
+        markup that closed it begins.
+
+        :return: If the document was provided as a bytestring, a
+            `memoryview` onto the original bytes, which avoids making a
+            copy. Otherwise, a string. If the information isn't
+            available, None.
+        """
+        positions, index = self._source_record()
+        if positions is None:
+            return None
+        return positions.source_markup(index)
+
     def __deepcopy__(self, memo: Dict[Any, Any], recursive: bool = True) -> Self:
         """A deepcopy of a Tag is a new Tag, unconnected to the parse tree.
         Its contents are a copy of the old Tag's contents.
@@ -1870,6 +2203,297 @@ class Tag(PageElement):
     #: :meta private:
     MAIN_CONTENT_STRING_TYPES = {NavigableString, CData}
 
+    # Set to True the first time a tree builder leaves a tag's
+    # contents unparsed, so that the tree traversal generators only
+    # look for unparsed tags once there might be some.
+    _lazy_content_in_use: bool = False  #: :meta private:
+
+    # Set to True the first time a tree is frozen, so that methods that
+    # modify the tree only look for a frozen tree once there might be
+    # one.
+    _freezing_in_use: bool = False  #: :meta private:
+
+    # Where Tag.index() found a child last time.
+    _index_hint: int = 0  #: :meta private:
+
+    @classmethod
+    def _start_checking_for_frozen_trees(cls) -> None:
+        """Called the first time a tree is frozen.
+
+        :meta private:
+        """
+        Tag._freezing_in_use = True
+
+    @property
+    def is_lazy(self) -> bool:
+        """Is this `Tag` holding on to contents that haven't been parsed
+        yet?
+
+        The ``html.parser`` tree builder can be told to leave the
+        contents of certain tags unparsed (see
+        `HTMLParserTreeBuilder`). Those contents are parsed the first
+        time something looks at them, e.g. through `Tag.contents`,
+        `Tag.descendants`, `Tag.find_all` or `Tag.select`.
+        """
+        return self._lazy_content is not None
+
+    def _materialize(self) -> None:
+        """Parse this tag's unparsed contents and make them its children.
+
+        :meta private:
+        """
+        lazy = self._lazy_content
+        if lazy is None:
+            return
+        del self._lazy_content
+        self.contents = []
+        lazy.materialize(self)
+
+    #: The default value for the ``min_size`` argument to
+    #: `Tag.enable_text_cache`.
+    DEFAULT_TEXT_CACHE_MIN_SIZE: int = 64
+
+    # Text caching is opt-in. These class-level defaults mean that a
+    # Tag which has never been involved in text caching doesn't pay
+    # for an entry in its __dict__, and that looking them up never
+    # falls through to Tag.__getattr__.
+    _text_cache_min_size: Optional[int] = None  #: :meta private:
+    _text_cache: Optional[Dict[Tuple[Any, ...], Any]] = None  #: :meta private:
+
+    # A _text_cache_min_size set by disable_text_cache. It overrides
+    # whatever min_size is in effect for this Tag's parents.
+    _TEXT_CACHE_DISABLED: int = -1  #: :meta private:
+
+    # Set to True the first time anyone turns on text caching, so that
+    # tree modifications don't have to look for caches to invalidate
+    # in the (overwhelmingly common) case where there are none.
+    _text_caching_in_use: bool = False  #: :meta private:
+
+    def enable_text_cache(self, min_size: int = DEFAULT_TEXT_CACHE_MIN_SIZE) -> None:
+        """Cache the results of `Tag.get_text`, `Tag.strings` and
+        `Tag.stripped_strings` for this `Tag` and everything beneath it.
+
+        Once a `Tag` has calculated its text, it will hang on to the
+        result (keyed by the separator, ``strip`` and ``types``
+        arguments) until the tree changes. Modifying the tree with
+        methods like `Tag.insert` or `PageElement.extract` will
+        invalidate the cache of every `Tag` whose text might have
+        changed.
+
+        :param min_size: Only a `Tag` with at least this many
+           `PageElement` objects beneath it will cache its text. A small
+           `Tag` is cheap to recalculate, so this keeps the memory
+           used by the cache proportional to the number of large
+           subtrees rather than the size of the document.
+        """
+        if min_size < 0:
+            raise ValueError("min_size must be zero or greater.")
+        Tag._text_caching_in_use = True
+        self._text_cache_min_size = min_size
+
+    def disable_text_cache(self) -> None:
+        """Stop caching text for this `Tag` and everything beneath it,
+        and throw away anything that has already been cached.
+
+        This overrides a call to `Tag.enable_text_cache` on one of
+        this `Tag`'s parents, and lasts until `Tag.enable_text_cache`
+        is called on this `Tag` or one of the tags beneath it.
+        """
+        if Tag._text_caching_in_use:
+            self._text_cache_min_size = self._TEXT_CACHE_DISABLED
+        for tag in self._self_and_descendant_tags():
+            tag.__dict__.pop("_text_cache", None)
+
+    #: The default value for the ``max_size`` argument to
+    #: `Tag.enable_query_cache`.
+    DEFAULT_QUERY_CACHE_SIZE: int = 128
+
+    # Query caching is opt-in, like text caching.
+    _query_cache: Optional[QueryCache] = None  #: :meta private:
+    _query_caching_in_use: bool = False  #: :meta private:
+
+    def enable_query_cache(self, max_size: int = DEFAULT_QUERY_CACHE_SIZE) -> None:
+        """Remember the results of `Tag.find_all`, `Tag.find`,
+        `Tag.select` and `Tag.select_one` when they're called on this
+        `Tag` or anything beneath it.
+
+        Running the same search again returns a new `ResultSet`
+        containing the same objects, without looking at the tree.
+        Everything that has been remembered is thrown away as soon as
+        the tree changes (see `PageElement.generation`).
+
+        Changes made to attribute values in place are *not* noticed.
+        If you modify a `Tag.attrs` dictionary directly, or the list
+        holding a multi-valued attribute (as in
+        ``tag["class"].append("new")``), a search may keep returning
+        the results it found before the change. Set the attribute
+        with ``tag["class"] = ...`` instead, or call this method
+        again afterwards.
+
+        Calling this again replaces the cache with an empty one.
+
+        :param max_size: Remember the results of at most this many
+           searches. When this is exceeded, the results that were used
+           least recently are forgotten.
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be zero or greater.")
+        from bs4._query_cache import QueryCache
+
+        PageElement._start_tracking_mutations()
+        Tag._query_caching_in_use = True
+        self._query_cache = QueryCache(self, max_size)
+
+    def disable_query_cache(self) -> None:
+        """Stop remembering search results for this `Tag` and everything
+        beneath it, and throw away anything that has been remembered.
+        """
+        self.__dict__.pop("_query_cache", None)
+
+    def query_cache_info(self) -> Optional[QueryCacheInfo]:
+        """Get statistics about the cache created by calling
+        `Tag.enable_query_cache` on this `Tag`.
+
+        :return: A named tuple with the fields ``hits``, ``misses``,
+           ``max_size`` and ``size``, or None if the cache isn't
+           enabled on this `Tag`.
+        """
+        cache = self._query_cache
+        if cache is None:
+            return None
+        return cache.info()
+
+    def _effective_query_cache(self) -> Optional[QueryCache]:
+        """Find the cache created by a call to `Tag.enable_query_cache`
+        on this `Tag` or one of its parents.
+        """
+        if not Tag._query_caching_in_use:
+            return None
+        tag: Optional[Tag] = self
+        while tag is not None:
+            if tag._query_cache is not None:
+                return tag._query_cache
+            tag = tag.parent
+        return None
+
+    def add_mutation_listener(self, listener: _MutationListener) -> None:
+        """Arrange for a function to be called whenever this `Tag`,
+        or anything beneath it, is modified.
+
+        The function is called after the modification, with the
+        `PageElement` that changed and the kind of change:
+        `PageElement.INSERTED` (the element was inserted into the
+        tree), `PageElement.EXTRACTED` (the element was removed from
+        the tree), `PageElement.ATTRIBUTES_CHANGED` or
+        `PageElement.RENAMED`. Methods like `PageElement.replace_with`
+        and `Tag.clear` are reported as a series of these simpler
+        changes.
+
+        :param listener: A function that takes a `PageElement` and a
+            string.
+        """
+        PageElement._start_tracking_mutations()
+        if self._mutation_listeners is None:
+            self._mutation_listeners = []
+        self._mutation_listeners.append(listener)
+
+    def remove_mutation_listener(self, listener: _MutationListener) -> None:
+        """Stop calling a function passed into `Tag.add_mutation_listener`.
+
+        :raise ValueError: If the function isn't listening to this `Tag`.
+        """
+        listeners = self._mutation_listeners
+        if listeners is None or listener not in listeners:
+            raise ValueError("That function isn't listening to this Tag.")
+        listeners.remove(listener)
+        if not listeners:
+            del self._mutation_listeners
+
+    def _self_and_descendant_tags(self) -> Iterator[Tag]:
+        """Yield this `Tag` and every `Tag` beneath it."""
+        yield self
+        for descendant in self.descendants:
+            if isinstance(descendant, Tag):
+                yield descendant
+
+    def _effective_text_cache_min_size(self) -> Optional[int]:
+        """Find the ``min_size`` in effect for this `Tag`, as set by a call
+        to `Tag.enable_text_cache` on this `Tag` or one of its parents.
+
+        :return: None if text caching is not enabled here.
+        """
+        if not Tag._text_caching_in_use:
+            return None
+        tag: Optional[Tag] = self
+        while tag is not None:
+            min_size = tag._text_cache_min_size
+            if min_size is not None:
+                if min_size == self._TEXT_CACHE_DISABLED:
+                    return None
+                return min_size
+            tag = tag.parent
+        return None
+
+    @classmethod
+    def _text_cache_key_for_types(cls, types: _OneOrMoreStringTypes) -> Any:
+        """Turn the ``types`` argument to `Tag._all_strings` into something
+        that can be used as part of a dictionary key.
+        """
+        if types is None or isinstance(types, type):
+            return types
+        return frozenset(types)
+
+    def _cached_strings(
+        self, strip: bool, types: _OneOrMoreStringTypes, min_size: int
+    ) -> Tuple[str, ...]:
+        """Return the strings that `Tag._all_strings` would yield, from
+        the cache if possible.
+        """
+        key = (strip, self._text_cache_key_for_types(types))
+        cache = self._text_cache
+        if cache is not None and key in cache:
+            return cast(Tuple[str, ...], cache[key])
+
+        # Walk the subtree once, counting elements as we go so we
+        # know whether this Tag is big enough to be worth caching.
+        size = 0
+        strings: List[str] = []
+        for descendant in self.descendants:
+            size += 1
+            if not isinstance(descendant, NavigableString):
+                continue
+            value = self._string_if_interesting(descendant, strip, types)
+            if value is not None:
+                strings.append(value)
+        result = tuple(strings)
+        if size >= min_size:
+            if cache is None:
+                cache = self._text_cache = {}
+            cache[key] = result
+        return result
+
+    @classmethod
+    def _string_if_interesting(
+        cls, string: NavigableString, strip: bool, types: _OneOrMoreStringTypes
+    ) -> Optional[str]:
+        """Decide whether `Tag._all_strings` should yield the given string,
+        and if so, what it should yield.
+        """
+        descendant_type = type(string)
+        if isinstance(types, type):
+            if descendant_type is not types:
+                # We're not interested in strings of this type.
+                return None
+        elif types is not None and descendant_type not in types:
+            # We're not interested in strings of this type.
+            return None
+        if strip:
+            stripped = string.strip()
+            if len(stripped) == 0:
+                return None
+            return stripped
+        return string
+
     def _all_strings(
         self, strip: bool = False, types: _OneOrMoreStringTypes = PageElement.default
     ) -> Iterator[str]:
@@ -1892,27 +2516,74 @@ class Tag(PageElement):
             else:
                 types = self.interesting_string_types
 
+        min_size = self._effective_text_cache_min_size()
+        if min_size is not None:
+            return iter(self._cached_strings(strip, types, min_size))
+        return self._generate_strings(strip, types)
+
+    def _generate_strings(
+        self, strip: bool, types: _OneOrMoreStringTypes
+    ) -> Iterator[str]:
+        """The uncached implementation of `Tag._all_strings`."""
         for descendant in self.descendants:
             if not isinstance(descendant, NavigableString):
                 continue
-            descendant_type = type(descendant)
-            if isinstance(types, type):
-                if descendant_type is not types:
-                    # We're not interested in strings of this type.
-                    continue
-            elif types is not None and descendant_type not in types:
-                # We're not interested in strings of this type.
-                continue
-            if strip:
-                stripped = descendant.strip()
-                if len(stripped) == 0:
-                    continue
-                yield stripped
-            else:
-                yield descendant
+            value = self._string_if_interesting(descendant, strip, types)
+            if value is not None:
+                yield value
 
     strings = property(_all_strings)
 
+    def get_text(
+        self,
+        separator: str = "",
+        strip: bool = False,
+        types: Iterable[Type[NavigableString]] = PageElement.default,
+    ) -> str:
+        """Get all child strings of this `Tag`, concatenated using the
+        given separator.
+
+        If `Tag.enable_text_cache` has been called on this `Tag` or
+        one of its parents, the result may come from a cache.
+
+        :param separator: Strings will be concatenated using this separator.
+
+        :param strip: If True, strings will be stripped before being
+            concatenated.
+
+        :param types: A tuple of NavigableString subclasses. Any
+            strings of a subclass not found in this list will be
+            ignored. Although there are exceptions, the default
+            behavior in most cases is to consider only NavigableString
+            and CData objects. That means no comments, processing
+            instructions, etc.
+
+        :return: A string.
+        """
+        min_size = self._effective_text_cache_min_size()
+        if min_size is None:
+            return separator.join([s for s in self._all_strings(strip, types=types)])
+
+        if types is self.default:
+            if self.interesting_string_types is None:
+                types = self.MAIN_CONTENT_STRING_TYPES
+            else:
+                types = self.interesting_string_types
+        key = (separator, strip, self._text_cache_key_for_types(types))
+        cache = self._text_cache
+        if cache is not None and key in cache:
+            return cast(str, cache[key])
+        text = separator.join(self._cached_strings(strip, types, min_size))
+        # _cached_strings will have created the cache if this Tag is
+        # big enough to be worth caching.
+        cache = self._text_cache
+        if cache is not None:
+            cache[key] = text
+        return text
+
+    getText = get_text
+    text = property(get_text)
+
     def insert(self, position: int, *new_children: _InsertableElement) -> List[PageElement]:
         """Insert one or more new PageElements as a child of this `Tag`.
 
@@ -1933,6 +2604,7 @@ class Tag(PageElement):
         return inserted
 
     def _insert(self, position: int, new_child: _InsertableElement) -> List[PageElement]:
+        self._check_not_frozen()
         if new_child is None:
             raise ValueError("Cannot insert None into a tag.")
         if new_child is self:
@@ -1962,7 +2634,13 @@ class Tag(PageElement):
                     # We're 'inserting' an element into its current location.
                     # This is a no-op.
                     return [new_child]
-            new_child.extract()
+                new_child.extract(_self_index=current_index)
+            else:
+                new_child.extract()
+        elif PageElement._document_order_in_use and new_child._order is not None:
+            # The root of one tree is becoming part of another.
+            new_child._order.forget()
+            new_child._order = None
 
         new_child.parent = self
         previous_child = None
@@ -2016,6 +2694,9 @@ class Tag(PageElement):
                 new_childs_last_element
             )
         self.contents.insert(position, new_child)
+        self._tree_changed()
+        if PageElement._mutation_tracking_in_use:
+            new_child._mutated(self.INSERTED)
 
         return [new_child]
 
@@ -2112,6 +2793,7 @@ class Tag(PageElement):
         calling this method afterwards can make pretty-printed output
         look more natural.
         """
+        self._check_not_frozen()
         # Mark the first position of every pair of children that need
         # to be consolidated.  Do this rather than making a copy of
         # self.contents, since in most cases very few strings will be
@@ -2152,11 +2834,38 @@ class Tag(PageElement):
 
         :param element: Look for this `PageElement` in this object's contents.
         """
-        for i, child in enumerate(self.contents):
+        contents = self.contents
+        # Code that works through a tag's children one at a time,
+        # extracting or moving them, looks for an element next to the
+        # one it found last time. Checking there first keeps that code
+        # from scanning the whole list on every call.
+        hint = self._index_hint
+        for i in (hint, hint - 1, hint + 1):
+            if 0 <= i < len(contents) and contents[i] is element:
+                self._index_hint = i
+                return i
+        for i, child in enumerate(contents):
             if child is element:
+                self._index_hint = i
                 return i
         raise ValueError("Tag.index: element not in tag")
 
+    def contains(self, element: PageElement) -> bool:
+        """Is the given `PageElement` this `Tag`, or somewhere beneath it?
+
+        The first time this is called, every element in the tree is
+        numbered in document order, so that later calls can answer
+        the question without walking the tree. The numbers are thrown
+        away when the tree is modified.
+
+        :param element: Look for this `PageElement` beneath this `Tag`.
+        """
+        if element is self:
+            return True
+        if element.parent is self:
+            return True
+        return self._document_order().contains(self, element)
+
     def get(
         self, key: str, default: Optional[_AttributeValue] = None
     ) -> Optional[_AttributeValue]:
@@ -2223,11 +2932,17 @@ class Tag(PageElement):
     def __setitem__(self, key: str, value: _AttributeValue) -> None:
         """Setting tag[key] sets the value of the 'key' attribute for the
         tag."""
+        self._check_not_frozen()
         self.attrs[key] = value
+        if PageElement._mutation_tracking_in_use:
+            self._mutated(self.ATTRIBUTES_CHANGED)
 
     def __delitem__(self, key: str) -> None:
         "Deleting tag[key] deletes all 'key' attributes for the tag."
+        self._check_not_frozen()
         self.attrs.pop(key, None)
+        if PageElement._mutation_tracking_in_use:
+            self._mutated(self.ATTRIBUTES_CHANGED)
 
     def __call__(
         self,
@@ -2260,6 +2975,12 @@ class Tag(PageElement):
                 stacklevel=2,
             )
             result = self.find(tag_name)
+        elif subtag == "contents" and self._lazy_content is not None:
+            # This tag's contents haven't been parsed yet. Type
+            # checkers see Tag.contents as the attribute it's declared
+            # as, not as something returned by this method.
+            self._materialize()
+            return cast(Any, self.contents)
         # We special case contents to avoid recursion.
         elif not subtag.startswith("__") and not subtag == "contents":
             result = self.find(subtag)
@@ -2326,6 +3047,14 @@ class Tag(PageElement):
             handling constants defined by Python's codecs module
             <https://docs.python.org/3/library/codecs.html#error-handlers>`_.
         """
+        if instrumentation.enabled and not instrumentation._is_active("encode"):
+            with instrumentation._Operation(
+                "encode", includes=("decode",), tag=self.name
+            ) as operation:
+                data = self.encode(encoding, indent_level, formatter, errors)
+                operation.size = len(data)
+            return data
+
         # Turn the data structure into Unicode, then encode the
         # Unicode.
         u = self.decode(indent_level, encoding, formatter)
@@ -2357,6 +3086,14 @@ class Tag(PageElement):
             parse tree. This is only used by `Tag.decode_contents` and
             you probably won't need to use it.
         """
+        if instrumentation.enabled and not instrumentation._is_active("decode"):
+            with instrumentation._Operation("decode", tag=self.name) as operation:
+                text = Tag.decode(
+                    self, indent_level, eventual_encoding, formatter, iterator
+                )
+                operation.size = len(text)
+            return text
+
         pieces = []
         # First off, turn a non-Formatter `formatter` into a Formatter
         # object. This will stop the lookup from happening over and
@@ -2737,12 +3474,56 @@ class Tag(PageElement):
         :param _stacklevel: Used internally to improve warning messages.
         :kwargs: Additional filters on attribute values.
         """
-        generator = self.descendants
+        cache = self._effective_query_cache()
+        key = None
+        if cache is not None:
+            if "text" not in kwargs and "_class" not in kwargs:
+                # Searches that issue warnings aren't cached, so the
+                # warnings aren't lost.
+                key = cache.key(
+                    "find_all", self, name, attrs, recursive, string, limit, kwargs
+                )
+            cached = cache.get(self, key)
+            if cached is not None:
+                return cached
+
+        generator: Iterator[PageElement] = self.descendants
         if not recursive:
             generator = self.children
-        return self._find_all(
-            name, attrs, string, limit, generator, _stacklevel=_stacklevel + 1, **kwargs
-        )
+        elif Tag._freezing_in_use:
+            index = self._frozen_index()
+            if index is not None:
+                # Use the indexes to narrow down the search, if
+                # possible. The candidates are still run through the
+                # usual filter.
+                candidates = index.candidates(self, name, attrs, kwargs)
+                if candidates is not None:
+                    generator = iter(candidates)
+        if instrumentation.enabled:
+            with instrumentation._Operation("find_all", tag=self.name) as operation:
+                results = self._find_all(
+                    name,
+                    attrs,
+                    string,
+                    limit,
+                    generator,
+                    _stacklevel=_stacklevel + 1,
+                    **kwargs,
+                )
+                operation.size = len(results)
+        else:
+            results = self._find_all(
+                name,
+                attrs,
+                string,
+                limit,
+                generator,
+                _stacklevel=_stacklevel + 1,
+                **kwargs,
+            )
+        if cache is not None:
+            cache.put(self, key, results)
+        return results
 
     findAll = _deprecated_function_alias("findAll", "find_all", "4.0.0")
     findChildren = _deprecated_function_alias("findChildren", "find_all", "3.0.0")
@@ -2767,13 +3548,30 @@ class Tag(PageElement):
         """
         if not len(self.contents):
             return
-        # _last_descendant() can't return None here because
-        # accept_self is True. Worst case, last_descendant will end up
-        # as self.
-        last_descendant = cast(PageElement, self._last_descendant(accept_self=True))
-        stopNode = last_descendant.next_element
+        order = None
+        position = None
+        if PageElement._document_order_in_use or Tag._freezing_in_use:
+            order = self._existing_document_order()
+            if order is not None:
+                position = order.position(self)
+        if order is not None and position is not None:
+            # The tree has been numbered, so we know where this tag's
+            # descendants end without looking for the last one.
+            end = order.ends[position] + 1
+            stopNode = order.elements[end] if end < len(order.elements) else None
+        else:
+            # _last_descendant() can't return None here because
+            # accept_self is True. Worst case, last_descendant will
+            # end up as self.
+            last_descendant = cast(
+                PageElement, self._last_descendant(accept_self=True)
+            )
+            stopNode = last_descendant.next_element
         current: _AtMostOneElement = self.contents[0]
+        lazy = Tag._lazy_content_in_use
         while current is not stopNode and current is not None:
+            if lazy and current._lazy_content is not None:
+                cast(Tag, current)._materialize()
             successor = current.next_element
             yield current
             current = successor
@@ -2794,7 +3592,22 @@ class Tag(PageElement):
         :param kwargs: Keyword arguments to be passed into Soup Sieve's
            soupsieve.select() method.
         """
-        return self.css.select_one(selector, namespaces, **kwargs)
+        cache = self._effective_query_cache()
+        key = None
+        if cache is not None:
+            key = cache.key("select_one", self, selector, namespaces, kwargs)
+            cached = cache.get(self, key)
+            if cached is not None:
+                return cached[0] if cached else None
+        if instrumentation.enabled:
+            with instrumentation._Operation("select", selector=selector) as operation:
+                found = self.css.select_one(selector, namespaces, **kwargs)
+                operation.size = 0 if found is None else 1
+        else:
+            found = self.css.select_one(selector, namespaces, **kwargs)
+        if cache is not None:
+            cache.put(self, key, ResultSet(None, [] if found is None else [found]))
+        return found
 
     def select(
         self,
@@ -2819,7 +3632,22 @@ class Tag(PageElement):
         :param kwargs: Keyword arguments to be passed into SoupSieve's
            soupsieve.select() method.
         """
-        return self.css.select(selector, namespaces, limit, **kwargs)
+        cache = self._effective_query_cache()
+        key = None
+        if cache is not None:
+            key = cache.key("select", self, selector, namespaces, limit, kwargs)
+            cached = cache.get(self, key)
+            if cached is not None:
+                return cached
+        if instrumentation.enabled:
+            with instrumentation._Operation("select", selector=selector) as operation:
+                results = self.css.select(selector, namespaces, limit, **kwargs)
+                operation.size = len(results)
+        else:
+            results = self.css.select(selector, namespaces, limit, **kwargs)
+        if cache is not None:
+            cache.put(self, key, results)
+        return results
 
     @property
     def css(self) -> CSS:
@@ -2879,6 +3707,29 @@ class ResultSet(List[_PageElementT], Generic[_PageElementT]):
         )
 
 
+def sort_document_order(elements: Iterable[_PageElementT]) -> List[_PageElementT]:
+    """Sort some `PageElement` objects into the order they occur in
+    their documents.
+
+    Each tree involved is numbered once (see `Tag.contains`), rather
+    than walking the tree for every comparison. Elements from
+    different trees are grouped by tree, in the order each tree was
+    first seen.
+
+    :param elements: The `PageElement` objects to sort.
+    :return: A new list.
+    """
+    trees: Dict[int, int] = {}
+    keyed: List[Tuple[int, int, int]] = []
+    elements = list(elements)
+    for i, element in enumerate(elements):
+        order = element._document_order()
+        tree = trees.setdefault(id(order), len(trees))
+        keyed.append((tree, cast(int, order.position(element)), i))
+    keyed.sort()
+    return [elements[i] for _, _, i in keyed]
+
+
 # Now that all the classes used by SoupStrainer have been defined,
 # import SoupStrainer itself into this module to preserve the
 # backwards compatibility of anyone who imports
@@ -26,3 +26,32 @@ class ParserRejectedMarkup(Exception):
             e = message_or_exception
             message_or_exception = "%s: %s" % (e.__class__.__name__, str(e))
         super(ParserRejectedMarkup, self).__init__(message_or_exception)
+
+
+class FrozenTreeError(ValueError):
+    """Exception raised when someone tries to modify a tree that has
+    been frozen with `BeautifulSoup.freeze`.
+    """
+
+
+class ParseLimitExceeded(Exception):
+    """Exception raised when a document goes over one of the limits
+    set by a `bs4.limits.ParseLimits`.
+    """
+
+    #: The name of the limit that was reached, e.g. "max_nodes".
+    limit: str
+
+    #: The value of that limit.
+    value: Union[int, float]
+
+    def __init__(self, limit: str, value: Union[int, float]):
+        self.limit = limit
+        self.value = value
+        super(ParseLimitExceeded, self).__init__(limit, value)
+
+    def __str__(self) -> str:
+        return "The document went over a parsing limit: %s=%s" % (
+            self.limit,
+            self.value,
+        )
@@ -0,0 +1,720 @@
+"""A compact, read-only representation of a parsed document.
+
+A `BeautifulSoup` tree is made of Python objects: each `Tag` has its
+own attribute dictionary, its own list of children, and about a dozen
+references to other objects, and each string is a separate
+`NavigableString`. That's convenient, but it takes several hundred
+bytes per element, so it's not practical to keep a large number of
+parsed documents in memory at once.
+
+A `FlatSoup` stores the same document in a handful of parallel arrays
+of integers, with all of its text in a single string. The tags and
+strings you get from it are lightweight proxies (`FlatTag` and
+`FlatString`) that look things up in those arrays, and support the
+most common parts of the `Tag` and `NavigableString` API for reading
+a tree: `FlatTag.name`, `FlatTag.attrs`, `FlatTag.children`,
+`FlatTag.descendants`, `FlatTag.find_all`, `FlatTag.get_text`, and
+so on. A `FlatSoup` can't be modified; if you need a real `Tag` to
+work with, call `FlatTag.to_tag`.
+"""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "FlatSoup",
+    "FlatString",
+    "FlatTag",
+]
+
+from array import array
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
+
+from bs4.builder import TreeBuilder
+from bs4.element import (
+    NavigableString,
+    ResultSet,
+    Tag,
+    _OneOrMoreStringTypes,
+)
+from bs4.filter import SoupStrainer
+from bs4._sink import (
+    ParseEventSink,
+    _builder_for,
+)
+from bs4._typing import (
+    _AttributeValues,
+    _Encoding,
+    _Encodings,
+    _IncomingMarkup,
+    _RawAttributeValues,
+    _StrainableAttribute,
+    _StrainableAttributes,
+    _StrainableElement,
+    _StrainableString,
+)
+
+#: The value of `FlatSoup.kinds` for a tag. Any other value is the
+#: index of a `NavigableString` subclass in `FlatSoup.string_classes`,
+#: plus one.
+TAG_KIND: int = 0
+
+#: Used in the node arrays to mean "no such node".
+NO_NODE: int = -1
+
+
+class FlatSoup(ParseEventSink):
+    """A parsed document, stored as arrays.
+
+    Every node in the document (tag or string) has a number. The
+    document itself is node 0, and the rest of the nodes are numbered
+    in document order, so the descendants of a node always have
+    consecutive numbers, starting right after the node itself.
+
+    For each node, these arrays hold:
+
+    * `FlatSoup.parents`, `FlatSoup.first_children` and
+      `FlatSoup.next_siblings`: the numbers of other nodes, or
+      `NO_NODE`.
+    * `FlatSoup.kinds`: `TAG_KIND` for a tag; otherwise, which kind of
+      string this is.
+    * `FlatSoup.name_ids`: for a tag, the position of its name in
+      `FlatSoup.names`. Tag names are only stored once.
+    * `FlatSoup.prefix_ids`: for a tag with a namespace prefix, the
+      position of the prefix in `FlatSoup.names`.
+    * `FlatSoup.namespace_ids`: for a tag in a namespace, the
+      position of the namespace URL in `FlatSoup.names`.
+    * `FlatSoup.attribute_offsets`: the position of the tag's first
+      attribute in the attribute table. Since the attributes are stored
+      in document order, a tag's attributes end where the next node's
+      attributes begin.
+    * `FlatSoup.string_ids`: for a string, its position in the string
+      pool.
+
+    The attribute table is two arrays: `FlatSoup.attribute_names`
+    (positions in `FlatSoup.names`) and `FlatSoup.attribute_values`
+    (positions in the string pool). The string pool is a single
+    string, `FlatSoup.string_pool`, along with an array giving the
+    offset where each piece of text starts.
+
+    Creating a `FlatSoup` parses the markup the same way the
+    `BeautifulSoup` constructor does.
+
+    :param markup: A string, bytestring, or open filehandle.
+    :param features: Desirable features of the parser to be used,
+        as with the `BeautifulSoup` constructor.
+    :param builder: A `TreeBuilder` subclass to instantiate (or
+        instance to use) instead of looking one up based on `features`.
+    :param from_encoding: A string indicating the encoding of the
+        document to be parsed.
+    :param exclude_encodings: A list of strings indicating encodings
+        known to be wrong.
+    :param kwargs: Keyword arguments for the `TreeBuilder` constructor.
+    """
+
+    parents: array
+    first_children: array
+    next_siblings: array
+    kinds: array
+    name_ids: array
+    prefix_ids: array
+    namespace_ids: array
+    attribute_offsets: array
+    string_ids: array
+
+    attribute_names: array
+    attribute_values: array
+
+    #: Every distinct tag name, attribute name, namespace prefix and
+    #: namespace URL.
+    names: List[str]
+
+    #: The types of string found in the document.
+    string_classes: List[Type[NavigableString]]
+
+    #: All of the text in the document, including attribute values,
+    #: concatenated into one string.
+    string_pool: str
+
+    #: The offset into `FlatSoup.string_pool` where each piece of
+    #: text begins.
+    string_offsets: array
+
+    def __init__(
+        self,
+        markup: _IncomingMarkup = "",
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        **kwargs: Any,
+    ):
+        super(FlatSoup, self).__init__(_builder_for(features, builder, **kwargs))
+        self.parse(markup, from_encoding, exclude_encodings)
+        self._finish()
+
+    def reset(self) -> None:
+        super(FlatSoup, self).reset()
+        self.parents = array("i")
+        self.first_children = array("i")
+        self.next_siblings = array("i")
+        self.kinds = array("b")
+        self.name_ids = array("i")
+        self.prefix_ids = array("i")
+        self.namespace_ids = array("i")
+        self.attribute_offsets = array("i")
+        self.string_ids = array("i")
+        self.attribute_names = array("i")
+        self.attribute_values = array("i")
+        self.names = []
+        self._name_ids: Dict[str, int] = {}
+        self.string_classes = []
+        self._pieces: List[str] = []
+        self._length = 0
+        self.string_offsets = array("q")
+        self.string_pool = ""
+
+        # These are only needed while the document is being parsed.
+        self._last_children = array("i")
+        self._open = [0]
+        self._add_node(NO_NODE, TAG_KIND, self._name_id(self.ROOT_TAG_NAME))
+
+    def _name_id(self, name: str) -> int:
+        """Find (or assign) the number for a name."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def _string_id(self, string: str) -> int:
+        """Add a piece of text to the string pool."""
+        self.string_offsets.append(self._length)
+        self._pieces.append(string)
+        self._length += len(string)
+        return len(self.string_offsets) - 1
+
+    def _add_node(self, parent: int, kind: int, name_id: int = NO_NODE) -> int:
+        """Add a node to the end of the document, as the last child of
+        ``parent``.
+        """
+        index = len(self.kinds)
+        self.parents.append(parent)
+        self.first_children.append(NO_NODE)
+        self.next_siblings.append(NO_NODE)
+        self._last_children.append(NO_NODE)
+        self.kinds.append(kind)
+        self.name_ids.append(name_id)
+        self.prefix_ids.append(NO_NODE)
+        self.namespace_ids.append(NO_NODE)
+        self.attribute_offsets.append(len(self.attribute_names))
+        self.string_ids.append(NO_NODE)
+        if parent != NO_NODE:
+            last = self._last_children[parent]
+            if last == NO_NODE:
+                self.first_children[parent] = index
+            else:
+                self.next_siblings[last] = index
+            self._last_children[parent] = index
+        return index
+
+    def _finish(self) -> None:
+        """Compact the string pool once the document is parsed."""
+        self.string_offsets.append(self._length)
+        self.string_pool = "".join(self._pieces)
+        del self._pieces
+        del self._last_children
+        del self._open
+
+    # ParseEventSink methods, called as the document is parsed.
+
+    def tag_started(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: _RawAttributeValues,
+    ) -> None:
+        index = self._add_node(self._open[-1], TAG_KIND, self._name_id(name))
+        if nsprefix:
+            self.prefix_ids[index] = self._name_id(nsprefix)
+        if namespace:
+            self.namespace_ids[index] = self._name_id(namespace)
+        for key, value in attrs.items():
+            if isinstance(value, list):
+                # html5lib has already split up multi-valued attributes.
+                value = " ".join(value)
+            self.attribute_names.append(self._name_id(str(key)))
+            self.attribute_values.append(self._string_id(value))
+        self._open.append(index)
+
+    def tag_ended(self, name: str, nsprefix: Optional[str]) -> None:
+        self._open.pop()
+
+    def string_found(self, string: str, container: Type[NavigableString]) -> None:
+        try:
+            kind = self.string_classes.index(container) + 1
+        except ValueError:
+            self.string_classes.append(container)
+            kind = len(self.string_classes)
+        index = self._add_node(self._open[-1], kind)
+        self.string_ids[index] = self._string_id(string)
+
+    # Access to the document.
+
+    def __len__(self) -> int:
+        """The number of nodes in the document, including the document itself."""
+        return len(self.kinds)
+
+    def node(self, index: int) -> Union[FlatTag, FlatString]:
+        """Get a proxy for the node with the given number."""
+        if self.kinds[index] == TAG_KIND:
+            return FlatTag(self, index)
+        return FlatString(self, index)
+
+    @property
+    def root(self) -> FlatTag:
+        """A proxy for the document itself."""
+        return FlatTag(self, 0)
+
+    def _string(self, string_id: int) -> str:
+        """Get a piece of text out of the string pool."""
+        offsets = self.string_offsets
+        return self.string_pool[offsets[string_id] : offsets[string_id + 1]]
+
+    def _subtree_end(self, index: int) -> int:
+        """The number of the first node after the subtree rooted at
+        ``index``.
+        """
+        parents = self.parents
+        next_siblings = self.next_siblings
+        while index != NO_NODE:
+            following = next_siblings[index]
+            if following != NO_NODE:
+                return following
+            index = parents[index]
+        return len(self.kinds)
+
+    # These are conveniences that pass through to the root node.
+
+    def find_all(self, *args: Any, **kwargs: Any) -> ResultSet[Any]:
+        """Run `FlatTag.find_all` on the whole document."""
+        return self.root.find_all(*args, **kwargs)
+
+    def find(self, *args: Any, **kwargs: Any) -> Optional[Union[FlatTag, FlatString]]:
+        """Run `FlatTag.find` on the whole document."""
+        return self.root.find(*args, **kwargs)
+
+    def get_text(self, *args: Any, **kwargs: Any) -> str:
+        """Run `FlatTag.get_text` on the whole document."""
+        return self.root.get_text(*args, **kwargs)
+
+    @property
+    def text(self) -> str:
+        """The text of the whole document, as with `Tag.text`."""
+        return self.root.text
+
+    @property
+    def children(self) -> Iterator[Union[FlatTag, FlatString]]:
+        """The top-level nodes of the document."""
+        return self.root.children
+
+    @property
+    def contents(self) -> List[Union[FlatTag, FlatString]]:
+        """A list of the top-level nodes of the document."""
+        return self.root.contents
+
+    @property
+    def descendants(self) -> Iterator[Union[FlatTag, FlatString]]:
+        """Every node in the document, in document order."""
+        return self.root.descendants
+
+    def __getattr__(self, name: str) -> Any:
+        # soup.title means soup.find("title"), as with BeautifulSoup.
+        if name.startswith("_") or len(name) > 3 and name.endswith("Tag"):
+            raise AttributeError(name)
+        return self.root.find(name)
+
+
+class _FlatNode(object):
+    """Behavior common to `FlatTag` and `FlatString`."""
+
+    __slots__ = ()
+
+    _soup: FlatSoup
+    _index: int
+
+    @property
+    def parent(self) -> Optional[FlatTag]:
+        """The tag that contains this node."""
+        parent = self._soup.parents[self._index]
+        if parent == NO_NODE:
+            return None
+        return FlatTag(self._soup, parent)
+
+    @property
+    def next_sibling(self) -> Optional[Union[FlatTag, FlatString]]:
+        """The node right after this one, at the same level of the tree."""
+        following = self._soup.next_siblings[self._index]
+        if following == NO_NODE:
+            return None
+        return self._soup.node(following)
+
+    @property
+    def previous_sibling(self) -> Optional[Union[FlatTag, FlatString]]:
+        """The node right before this one, at the same level of the tree."""
+        soup = self._soup
+        parent = soup.parents[self._index]
+        if parent == NO_NODE:
+            return None
+        child = soup.first_children[parent]
+        previous = NO_NODE
+        while child != self._index:
+            previous = child
+            child = soup.next_siblings[child]
+        if previous == NO_NODE:
+            return None
+        return soup.node(previous)
+
+    @property
+    def node_index(self) -> int:
+        """This node's number in its `FlatSoup`."""
+        return self._index
+
+
+class FlatString(str, _FlatNode):
+    """A string in a `FlatSoup`.
+
+    This is a real string, so it can be used anywhere a string can;
+    it also knows where it is in the document.
+    """
+
+    def __new__(cls, soup: FlatSoup, index: int) -> FlatString:
+        obj = str.__new__(cls, soup._string(soup.string_ids[index]))
+        obj._soup = soup
+        obj._index = index
+        return obj
+
+    #: Since a string is not a tag, it has no name.
+    name = None
+
+    @property
+    def string_class(self) -> Type[NavigableString]:
+        """The `NavigableString` subclass `BeautifulSoup` would have
+        used for this string, e.g. `Comment`.
+        """
+        return self._soup.string_classes[self._soup.kinds[self._index] - 1]
+
+    def __repr__(self) -> str:
+        return str.__repr__(self)
+
+
+class FlatTag(_FlatNode):
+    """A tag in a `FlatSoup`.
+
+    These objects are created on demand, and two `FlatTag` objects
+    for the same tag compare equal.
+    """
+
+    __slots__ = ("_soup", "_index")
+
+    def __init__(self, soup: FlatSoup, index: int):
+        self._soup = soup
+        self._index = index
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, FlatTag)
+            and other._soup is self._soup
+            and other._index == self._index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self._soup), self._index))
+
+    @property
+    def name(self) -> str:
+        """The name of the tag."""
+        return self._soup.names[self._soup.name_ids[self._index]]
+
+    @property
+    def prefix(self) -> Optional[str]:
+        """The tag's namespace prefix, if any."""
+        prefix_id = self._soup.prefix_ids[self._index]
+        if prefix_id == NO_NODE:
+            return None
+        return self._soup.names[prefix_id]
+
+    @property
+    def namespace(self) -> Optional[str]:
+        """The URL of the tag's namespace, if any."""
+        namespace_id = self._soup.namespace_ids[self._index]
+        if namespace_id == NO_NODE:
+            return None
+        return self._soup.names[namespace_id]
+
+    @property
+    def attrs(self) -> _AttributeValues:
+        """A new dictionary of the tag's attributes.
+
+        Multi-valued attributes like ``class`` are split into lists,
+        just as they are in a `Tag`.
+        """
+        attrs = self._raw_attrs()
+        if attrs:
+            self._soup.builder._replace_cdata_list_attribute_values(self.name, attrs)
+        return attrs
+
+    def _raw_attrs(self) -> Dict[str, Any]:
+        """The tag's attributes, as they were found in the markup."""
+        soup = self._soup
+        start = soup.attribute_offsets[self._index]
+        if self._index + 1 < len(soup.attribute_offsets):
+            end = soup.attribute_offsets[self._index + 1]
+        else:
+            end = len(soup.attribute_names)
+        names = soup.names
+        return {
+            names[soup.attribute_names[i]]: soup._string(soup.attribute_values[i])
+            for i in range(start, end)
+        }
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the value of an attribute, or ``default`` if the tag
+        doesn't have it.
+        """
+        return self.attrs.get(key, default)
+
+    def has_attr(self, key: str) -> bool:
+        """Does this tag have an attribute with the given name?"""
+        return key in self.attrs
+
+    def __getitem__(self, key: str) -> Any:
+        return self.attrs[key]
+
+    @property
+    def children(self) -> Iterator[Union[FlatTag, FlatString]]:
+        """Iterate over the nodes directly beneath this tag."""
+        soup = self._soup
+        child = soup.first_children[self._index]
+        while child != NO_NODE:
+            yield soup.node(child)
+            child = soup.next_siblings[child]
+
+    @property
+    def contents(self) -> List[Union[FlatTag, FlatString]]:
+        """A list of the nodes directly beneath this tag."""
+        return list(self.children)
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __iter__(self) -> Iterator[Union[FlatTag, FlatString]]:
+        return self.children
+
+    def __bool__(self) -> bool:
+        return True
+
+    @property
+    def descendants(self) -> Iterator[Union[FlatTag, FlatString]]:
+        """Iterate over every node beneath this tag, in document order."""
+        soup = self._soup
+        for index in range(self._index + 1, soup._subtree_end(self._index)):
+            yield soup.node(index)
+
+    @property
+    def string(self) -> Optional[str]:
+        """The single string within this tag, as with `Tag.string`."""
+        soup = self._soup
+        child = soup.first_children[self._index]
+        if child == NO_NODE or soup.next_siblings[child] != NO_NODE:
+            return None
+        node = soup.node(child)
+        if isinstance(node, FlatTag):
+            return node.string
+        return node
+
+    @property
+    def _interesting_string_types(self) -> Iterable[Type[NavigableString]]:
+        container = self._soup.builder.string_containers.get(self.name)
+        if container is not None and self._index != 0:
+            return {container}
+        return Tag.MAIN_CONTENT_STRING_TYPES
+
+    def _all_strings(
+        self,
+        strip: bool = False,
+        types: Optional[_OneOrMoreStringTypes] = None,
+    ) -> Iterator[str]:
+        """Yield the strings beneath this tag that are of the given
+        types, possibly stripping them.
+        """
+        wanted_types: Iterable[Type[NavigableString]]
+        if types is None:
+            wanted_types = self._interesting_string_types
+        elif isinstance(types, type):
+            wanted_types = (types,)
+        else:
+            wanted_types = types
+        soup = self._soup
+        kinds = soup.kinds
+        wanted = set(
+            i + 1 for i, cls in enumerate(soup.string_classes) if cls in wanted_types
+        )
+        string_ids = soup.string_ids
+        for index in range(self._index + 1, soup._subtree_end(self._index)):
+            if kinds[index] in wanted:
+                string = soup._string(string_ids[index])
+                if strip:
+                    string = string.strip()
+                    if not string:
+                        continue
+                yield string
+
+    @property
+    def strings(self) -> Iterator[str]:
+        """Yield all the interesting strings beneath this tag."""
+        return self._all_strings()
+
+    @property
+    def stripped_strings(self) -> Iterator[str]:
+        """Yield all the interesting strings beneath this tag, stripped."""
+        return self._all_strings(True)
+
+    def get_text(
+        self,
+        separator: str = "",
+        strip: bool = False,
+        types: Optional[_OneOrMoreStringTypes] = None,
+    ) -> str:
+        """Get all the strings beneath this tag, concatenated, as with
+        `Tag.get_text`.
+        """
+        return separator.join(self._all_strings(strip, types))
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    def find_all(
+        self,
+        name: Optional[Union[_StrainableElement, SoupStrainer]] = None,
+        attrs: _StrainableAttributes = {},
+        recursive: bool = True,
+        string: Optional[_StrainableString] = None,
+        limit: Optional[int] = None,
+        **kwargs: _StrainableAttribute,
+    ) -> ResultSet[Any]:
+        """Look in the tree beneath this tag for tags (or strings) that
+        match the given criteria, as with `Tag.find_all`.
+        """
+        if isinstance(name, SoupStrainer):
+            strainer = name
+        else:
+            strainer = SoupStrainer(name, attrs, string, **kwargs)
+        match_tags = bool(strainer.name_rules or strainer.attribute_rules)
+        # With no rules at all, every tag matches.
+        all_tags = not match_tags and not strainer.string_rules
+        results: List[Any] = []
+        for node in self._candidates(recursive):
+            if isinstance(node, FlatTag):
+                if not all_tags and not (
+                    match_tags and strainer.matches_tag(node)  # type: ignore[arg-type]
+                ):
+                    continue
+            elif all_tags or match_tags or not strainer.matches_any_string_rule(node):
+                continue
+            results.append(node)
+            if limit and len(results) >= limit:
+                break
+        return ResultSet(strainer, results)
+
+    def find(
+        self,
+        name: Optional[Union[_StrainableElement, SoupStrainer]] = None,
+        attrs: _StrainableAttributes = {},
+        recursive: bool = True,
+        string: Optional[_StrainableString] = None,
+        **kwargs: _StrainableAttribute,
+    ) -> Optional[Union[FlatTag, FlatString]]:
+        """Find the first node beneath this tag that matches the given
+        criteria, as with `Tag.find`.
+        """
+        results = self.find_all(name, attrs, recursive, string, 1, **kwargs)
+        if results:
+            return results[0]
+        return None
+
+    def _candidates(self, recursive: bool) -> Iterator[Union[FlatTag, FlatString]]:
+        if recursive:
+            return self.descendants
+        return self.children
+
+    def __getattr__(self, name: str) -> Any:
+        # tag.b means tag.find("b"), as with Tag.
+        if name.startswith("_") or len(name) > 3 and name.endswith("Tag"):
+            raise AttributeError(name)
+        return self.find(name)
+
+    def to_tag(self) -> Tag:
+        """Build a real `Tag` (in a new `BeautifulSoup` object) with
+        the same contents as this one.
+        """
+        from bs4 import BeautifulSoup
+
+        flat = self._soup
+        soup = BeautifulSoup("", builder=flat.builder)
+        # Some tree builders (html5lib) create tags even for an empty
+        # document; start over with an empty tree.
+        soup.reset()
+        if self._index == 0:
+            nodes = range(1, len(flat))
+        else:
+            nodes = range(self._index, flat._subtree_end(self._index))
+        open_tags: List[int] = []
+        for index in nodes:
+            parent = flat.parents[index]
+            while open_tags and open_tags[-1] != parent:
+                closed = FlatTag(flat, open_tags.pop())
+                soup.handle_endtag(closed.name, closed.prefix)
+            if flat.kinds[index] == TAG_KIND:
+                tag = FlatTag(flat, index)
+                soup.handle_starttag(
+                    tag.name, tag.namespace, tag.prefix, tag._raw_attrs()
+                )
+                open_tags.append(index)
+            else:
+                # The string was already cleaned up when the document
+                # was parsed, so it goes into the tree as it is.
+                string = FlatString(flat, index)
+                soup.object_was_parsed(string.string_class(str(string)))
+        while open_tags:
+            closed = FlatTag(flat, open_tags.pop())
+            soup.handle_endtag(closed.name, closed.prefix)
+        flat.builder.soup = None
+        if self._index == 0:
+            return soup
+        result = soup.contents[0]
+        assert isinstance(result, Tag)
+        return result
+
+    def decode(self, *args: Any, **kwargs: Any) -> str:
+        """Render this tag as markup, as with `Tag.decode`."""
+        return self.to_tag().decode(*args, **kwargs)
+
+    def __str__(self) -> str:
+        return self.decode()
+
+    def __repr__(self) -> str:
+        return "<%s %d: %s>" % (self.__class__.__name__, self._index, self.name)
@@ -0,0 +1,340 @@
+"""Reporting what Beautiful Soup is doing to a metrics or tracing system.
+
+A sink is a function that's called with an `Event` every time
+Beautiful Soup finishes one of these operations:
+
+* ``parse``: the `BeautifulSoup` constructor (or `SoupFactory.parse`)
+  parsing a document.
+* ``detect_encoding``: `UnicodeDammit` figuring out the encoding of a
+  bytestring and converting it to Unicode.
+* ``find_all``: a call to `Tag.find_all` (and so to `Tag.find`, and
+  to attribute access like ``soup.p``).
+* ``select``: a call to `Tag.select` or `Tag.select_one`.
+* ``decode`` and ``encode``: turning a `Tag` into a string or a
+  bytestring.
+
+Register a sink with `add_sink`. To wrap each operation in a span
+instead, register a function that creates context managers with
+`add_span_factory`.
+
+`AggregatingSink` is a sink that keeps running totals, and can render
+them in the Prometheus text format::
+
+ from bs4 import instrumentation
+ metrics = instrumentation.AggregatingSink()
+ instrumentation.add_sink(metrics)
+ ...
+ print(metrics.render())
+
+As long as nothing is registered, the only cost to Beautiful Soup
+is checking `enabled` before each operation.
+"""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "AggregatingSink",
+    "Event",
+    "add_sink",
+    "add_span_factory",
+    "remove_sink",
+    "remove_span_factory",
+]
+
+import threading
+from time import perf_counter
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+
+class Event(NamedTuple):
+    """A report on one operation."""
+
+    #: The name of the operation, e.g. "parse" or "find_all".
+    operation: str
+
+    #: How long the operation took, in seconds.
+    seconds: float
+
+    #: How big the operation was. For ``parse`` and
+    #: ``detect_encoding``, this is the length of the markup. For
+    #: ``find_all`` and ``select``, it's the number of results. For
+    #: ``decode`` and ``encode``, it's the length of the output. It's
+    #: None if the operation failed before the size was known.
+    size: Optional[int]
+
+    #: "ok" if the operation succeeded, "error" if it raised an
+    #: exception.
+    outcome: str
+
+    #: More information about the operation, such as the name of the
+    #: parser or the CSS selector. If the operation failed, the name
+    #: of the exception class is under "exception".
+    details: Dict[str, Any]
+
+
+#: A function that's told about each `Event`.
+_Sink = Callable[[Event], Any]
+
+#: A function that's called with the name and details of an
+#: operation, and returns a context manager to be entered for the
+#: duration of the operation.
+_SpanFactory = Callable[[str, Dict[str, Any]], ContextManager[Any]]
+
+_sinks: List[_Sink] = []
+_span_factories: List[_SpanFactory] = []
+
+#: True if any sinks or span factories are registered. Beautiful Soup
+#: checks this before each operation and does nothing else unless
+#: it's True.
+enabled: bool = False
+
+# The operations currently running in each thread, so that an
+# operation that calls itself is only reported once.
+_local = threading.local()
+
+
+def add_sink(sink: _Sink) -> None:
+    """Call a function with an `Event` whenever an operation finishes."""
+    _sinks.append(sink)
+    _update()
+
+
+def remove_sink(sink: _Sink) -> None:
+    """Stop calling a function passed into `add_sink`.
+
+    :raise ValueError: If the function isn't registered.
+    """
+    _sinks.remove(sink)
+    _update()
+
+
+def add_span_factory(factory: _SpanFactory) -> None:
+    """Run every operation inside a context manager.
+
+    :param factory: A function that takes the name of an operation
+        and a dictionary of details about it (the same dictionary that
+        will become `Event.details`), and returns a context manager.
+    """
+    _span_factories.append(factory)
+    _update()
+
+
+def remove_span_factory(factory: _SpanFactory) -> None:
+    """Stop using a function passed into `add_span_factory`.
+
+    :raise ValueError: If the function isn't registered.
+    """
+    _span_factories.remove(factory)
+    _update()
+
+
+def _update() -> None:
+    global enabled
+    enabled = bool(_sinks or _span_factories)
+
+
+def _active() -> Set[str]:
+    active = getattr(_local, "active", None)
+    if active is None:
+        active = _local.active = set()
+    return active
+
+
+def _is_active(operation: str) -> bool:
+    """Is this operation already running in this thread?
+
+    :meta private:
+    """
+    return operation in _active()
+
+
+class _Operation(object):
+    """A context manager that times an operation and reports it to
+    the registered sinks and span factories.
+
+    Only Beautiful Soup itself should need to create these.
+
+    :param operation: The name of the operation.
+    :param size: The size of the operation, if it's known in advance.
+        Otherwise, set `_Operation.size` before the operation finishes.
+    :param includes: The names of other operations this one calls,
+        which shouldn't be reported separately while it's running.
+    :param details: Extra information about the operation.
+
+    :meta private:
+    """
+
+    def __init__(
+        self,
+        operation: str,
+        size: Optional[int] = None,
+        includes: Sequence[str] = (),
+        **details: Any,
+    ):
+        self.operation = operation
+        self.size = size
+        self.includes = includes
+        self.details = details
+        self.spans: List[ContextManager[Any]] = []
+        self.added: List[str] = []
+        self.start = 0.0
+
+    def __enter__(self) -> _Operation:
+        for factory in list(_span_factories):
+            span = factory(self.operation, self.details)
+            span.__enter__()
+            self.spans.append(span)
+        active = _active()
+        for name in (self.operation,) + tuple(self.includes):
+            if name not in active:
+                active.add(name)
+                self.added.append(name)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        seconds = perf_counter() - self.start
+        active = _active()
+        for name in self.added:
+            active.discard(name)
+        if exc_type is None:
+            outcome = "ok"
+        else:
+            outcome = "error"
+            self.details["exception"] = exc_type.__name__
+        for span in reversed(self.spans):
+            span.__exit__(exc_type, exc_value, traceback)
+        if _sinks:
+            event = Event(self.operation, seconds, self.size, outcome, self.details)
+            for sink in list(_sinks):
+                sink(event)
+
+
+class AggregatingSink(object):
+    """A sink that keeps running totals of the events it's told about,
+    grouped by operation and outcome.
+
+    The durations go into a histogram, and the sizes into a sum, so
+    that `AggregatingSink.render` can produce the Prometheus text
+    exposition format.
+
+    :param buckets: The upper bounds, in seconds, of the histogram
+        buckets. A bucket for all durations is added automatically.
+    :param prefix: The start of each metric's name.
+    """
+
+    #: The default upper bounds of the histogram buckets, in seconds.
+    DEFAULT_BUCKETS: Tuple[float, ...] = (
+        0.0001,
+        0.001,
+        0.01,
+        0.1,
+        1.0,
+        10.0,
+    )
+
+    def __init__(
+        self, buckets: Iterable[float] = DEFAULT_BUCKETS, prefix: str = "bs4"
+    ):
+        self.buckets = sorted(buckets)
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counts: Dict[Tuple[str, str], List[int]] = {}
+        self.seconds: Dict[Tuple[str, str], float] = {}
+        self.sizes: Dict[Tuple[str, str], int] = {}
+
+    def __call__(self, event: Event) -> None:
+        key = (event.operation, event.outcome)
+        with self.lock:
+            counts = self.counts.get(key)
+            if counts is None:
+                counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+                self.seconds[key] = 0.0
+                self.sizes[key] = 0
+            for i, bound in enumerate(self.buckets):
+                if event.seconds <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self.seconds[key] += event.seconds
+            if event.size is not None:
+                self.sizes[key] += event.size
+
+    def count(self, operation: str, outcome: str = "ok") -> int:
+        """How many times has this operation been reported?"""
+        with self.lock:
+            counts = self.counts.get((operation, outcome))
+            return 0 if counts is None else counts[-1]
+
+    def render(self) -> str:
+        """Render the totals in the Prometheus text exposition format."""
+        seconds_name = "%s_operation_seconds" % self.prefix
+        size_name = "%s_operation_size" % self.prefix
+        seconds_lines = [
+            "# HELP %s Time spent in Beautiful Soup operations." % seconds_name,
+            "# TYPE %s histogram" % seconds_name,
+        ]
+        size_lines = [
+            "# HELP %s Size of the input or output of Beautiful Soup operations."
+            % size_name,
+            "# TYPE %s summary" % size_name,
+        ]
+        with self.lock:
+            for key in sorted(self.counts):
+                counts = self.counts[key]
+                labels = 'operation="%s",outcome="%s"' % (
+                    _escape(key[0]),
+                    _escape(key[1]),
+                )
+                for bound, count in zip(self.buckets, counts):
+                    seconds_lines.append(
+                        '%s_bucket{%s,le="%s"} %d'
+                        % (seconds_name, labels, _number(bound), count)
+                    )
+                seconds_lines.append(
+                    '%s_bucket{%s,le="+Inf"} %d' % (seconds_name, labels, counts[-1])
+                )
+                seconds_lines.append(
+                    "%s_sum{%s} %s"
+                    % (seconds_name, labels, _number(self.seconds[key]))
+                )
+                seconds_lines.append(
+                    "%s_count{%s} %d" % (seconds_name, labels, counts[-1])
+                )
+                size_lines.append(
+                    "%s_sum{%s} %d" % (size_name, labels, self.sizes[key])
+                )
+                size_lines.append(
+                    "%s_count{%s} %d" % (size_name, labels, counts[-1])
+                )
+        return "\n".join(seconds_lines + size_lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Format a number the way Prometheus expects."""
+    return repr(float(value))
@@ -0,0 +1,176 @@
+"""Limits on the resources used to parse a document.
+
+When parsing markup from an untrusted source, pass a `ParseLimits`
+into the `BeautifulSoup` constructor (or into a `SoupFactory`) to
+stop a hostile or broken document from using too much time or memory::
+
+ limits = ParseLimits(max_nodes=100000, max_depth=500, max_seconds=5)
+ soup = BeautifulSoup(markup, "lxml", limits=limits)
+
+By default, going over a limit raises `ParseLimitExceeded`. If the
+limits are created with ``on_breach=ParseLimits.TRUNCATE``, parsing
+stops instead, and the `BeautifulSoup` object holds the part of the
+document that was parsed before the limit was reached.
+"""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "ParseLimits",
+]
+
+import sys
+from time import perf_counter
+from typing import Optional
+
+from bs4.exceptions import ParseLimitExceeded
+
+
+class ParseLimits(object):
+    """Limits on the resources used to parse one document.
+
+    Any limit that is None is not enforced.
+
+    The limits are checked as the tree is built, by counting: the
+    only per-node work is incrementing a counter and comparing it
+    against a threshold, so it's cheap enough to leave on all the time.
+    The clock is only looked at once every ``check_interval`` nodes,
+    and between the chunks of markup fed to the parser, so
+    ``max_seconds`` may be overrun by however long that takes.
+
+    :param max_nodes: The most tags and strings (including comments
+        and other special strings) the tree can contain.
+    :param max_depth: The deepest a tag can be nested. A tag at the
+        top level of the document has depth 1.
+    :param max_input_bytes: The longest the markup can be: a number
+        of bytes for a bytestring or a file opened in binary mode, or
+        a number of characters for a Unicode string.
+    :param max_seconds: The most time parsing can take, including
+        the time spent detecting the document's encoding.
+    :param on_breach: What to do when a limit is reached:
+        `ParseLimits.RAISE` to raise `ParseLimitExceeded`, or
+        `ParseLimits.TRUNCATE` to stop parsing and keep what was
+        parsed so far. If the document is truncated, the
+        `ParseLimitExceeded` that would have been raised is stored as
+        `BeautifulSoup.parse_limit_exceeded`.
+    :param check_interval: How many nodes to create between looks at
+        the clock.
+    """
+
+    #: Raise `ParseLimitExceeded` when a limit is reached.
+    RAISE: str = "raise"
+
+    #: Stop parsing when a limit is reached, and keep the partial tree.
+    TRUNCATE: str = "truncate"
+
+    max_nodes: Optional[int]
+    max_depth: Optional[int]
+    max_input_bytes: Optional[int]
+    max_seconds: Optional[float]
+    on_breach: str
+    check_interval: int
+
+    def __init__(
+        self,
+        max_nodes: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_input_bytes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        on_breach: str = RAISE,
+        check_interval: int = 256,
+    ):
+        for name, value in (
+            ("max_nodes", max_nodes),
+            ("max_depth", max_depth),
+            ("max_input_bytes", max_input_bytes),
+            ("max_seconds", max_seconds),
+        ):
+            if value is not None and value < 0:
+                raise ValueError("%s can't be negative." % name)
+        if on_breach not in (self.RAISE, self.TRUNCATE):
+            raise ValueError(
+                "on_breach must be %r or %r, not %r."
+                % (self.RAISE, self.TRUNCATE, on_breach)
+            )
+        if check_interval < 1:
+            raise ValueError("check_interval must be at least 1.")
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.max_input_bytes = max_input_bytes
+        self.max_seconds = max_seconds
+        self.on_breach = on_breach
+        self.check_interval = check_interval
+
+    def __repr__(self) -> str:
+        return "ParseLimits(%s)" % ", ".join(
+            "%s=%r" % (name, getattr(self, name))
+            for name in (
+                "max_nodes",
+                "max_depth",
+                "max_input_bytes",
+                "max_seconds",
+                "on_breach",
+            )
+            if getattr(self, name) is not None
+        )
+
+
+class _LimitChecker(object):
+    """Enforces a `ParseLimits` while one document is parsed.
+
+    :param limits: The limits to enforce.
+    :param deadline: When parsing has to be finished, as a
+        `time.perf_counter` value, or None if there's no time limit.
+
+    :meta private:
+    """
+
+    def __init__(self, limits: ParseLimits, deadline: Optional[float]):
+        self.limits = limits
+        self.deadline = deadline
+        self.nodes = 0
+        self.max_depth = sys.maxsize if limits.max_depth is None else limits.max_depth
+        self.max_nodes = sys.maxsize if limits.max_nodes is None else limits.max_nodes
+        # Everything except the depth is checked when the node count
+        # reaches this number, so creating a node normally costs one
+        # comparison.
+        self.next_check = 0
+        self._schedule()
+
+    def _schedule(self) -> None:
+        next_check = self.max_nodes + 1
+        if self.deadline is not None:
+            next_check = min(next_check, self.nodes + self.limits.check_interval)
+        self.next_check = next_check
+
+    def tag_created(self, depth: int) -> None:
+        """Called when a tag is added to the tree.
+
+        :param depth: How deeply the tag is nested.
+        """
+        if depth > self.max_depth:
+            raise ParseLimitExceeded("max_depth", self.max_depth)
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.check()
+
+    def string_created(self) -> None:
+        """Called when a string is added to the tree."""
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.check()
+
+    def check(self) -> None:
+        """Check every limit that doesn't depend on a particular node.
+
+        Tree builders call this between chunks of markup.
+        """
+        if self.nodes > self.max_nodes:
+            raise ParseLimitExceeded("max_nodes", self.max_nodes)
+        if self.deadline is not None and perf_counter() > self.deadline:
+            # There's only a deadline if max_seconds was set.
+            assert self.limits.max_seconds is not None
+            raise ParseLimitExceeded("max_seconds", self.limits.max_seconds)
+        self._schedule()
@@ -0,0 +1,711 @@
+"""Parse many documents at once, using a pool of worker processes.
+
+Parsing is CPU-bound, so threads don't help, and sending a
+`BeautifulSoup` tree from one process to another means pickling and
+unpickling the whole thing, which can take longer than parsing it in
+the first place. `parse_many` avoids this by running your own
+extraction function in the worker process, right after the document is
+parsed, and sending back only what it returns::
+
+    def title(soup):
+        return soup.title.string if soup.title else None
+
+    for result in parse_many(documents, "lxml", extract=title):
+        print(result.index, result.value)
+
+The extraction function (and anything else passed to a worker) must be
+picklable, which in practice means it has to be defined at the top
+level of a module.
+
+`parse_records` goes the other way, and uses worker processes to
+parse a single huge document made of many sibling records.
+"""
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "ParseResult",
+    "parse_many",
+    "parse_records",
+]
+
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+import itertools
+import os
+import re
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
+
+from bs4 import (
+    BeautifulSoup,
+    SoupFactory,
+)
+from bs4.builder import TreeBuilder
+from bs4.dammit import UnicodeDammit
+from bs4.element import (
+    NavigableString,
+    PageElement,
+    Tag,
+)
+from bs4.exceptions import ParserRejectedMarkup
+from bs4._lazy import _FragmentSoup
+from bs4._sink import (
+    ParseEventSink,
+    _builder_for,
+)
+from bs4._typing import (
+    _Encoding,
+    _Encodings,
+    _RawAttributeValues,
+    _RawMarkup,
+)
+
+if TYPE_CHECKING:
+    from bs4.replacer import SoupReplacer
+
+#: A function that takes a freshly parsed document and returns
+#: whatever the caller is interested in.
+_Extractor = Callable[[BeautifulSoup], Any]
+
+#: What a worker process sends back for one document: its index, the
+#: value returned by the extraction function, and the error, if the
+#: markup was rejected.
+_WorkerResult = Tuple[int, Any, Optional[ParserRejectedMarkup]]
+
+
+class ParseResult(object):
+    """The outcome of parsing one of the documents given to `parse_many`.
+
+    :param index: The position of the document in the input.
+    :param value: The value returned by the extraction function, or
+        None if the document couldn't be parsed.
+    :param error: The `ParserRejectedMarkup` exception raised when
+        parsing the document, or None if it was parsed successfully.
+    """
+
+    __slots__ = ("index", "value", "error")
+
+    index: int
+    value: Any
+    error: Optional[ParserRejectedMarkup]
+
+    def __init__(
+        self, index: int, value: Any, error: Optional[ParserRejectedMarkup] = None
+    ):
+        self.index = index
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Was the document parsed successfully?"""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return "<ParseResult %d: %r>" % (self.index, self.error)
+        return "<ParseResult %d: %r>" % (self.index, self.value)
+
+
+# Each worker process sets these up once, in _initialize_worker, and
+# uses them for every document it's given.
+_factory: Optional[SoupFactory] = None
+_extract: Optional[_Extractor] = None
+_parse_kwargs: Dict[str, Any] = {}
+
+
+def _initialize_worker(
+    features: Optional[Union[str, Sequence[str]]],
+    builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]],
+    extract: _Extractor,
+    parse_kwargs: Dict[str, Any],
+    factory_kwargs: Dict[str, Any],
+) -> None:
+    """Set up a worker process to parse documents."""
+    global _factory, _extract, _parse_kwargs
+    _factory = SoupFactory(features, builder=builder, **factory_kwargs)
+    _extract = extract
+    _parse_kwargs = parse_kwargs
+
+
+def _parse_batch(batch: List[Tuple[int, _RawMarkup]]) -> List[_WorkerResult]:
+    """Parse some documents in a worker process."""
+    assert _factory is not None and _extract is not None
+    results: List[_WorkerResult] = []
+    for index, markup in batch:
+        try:
+            soup = _factory.parse(markup, **_parse_kwargs)
+        except ParserRejectedMarkup as e:
+            results.append((index, None, e))
+            continue
+        results.append((index, _extract(soup), None))
+    return results
+
+
+def parse_many(
+    markups: Iterable[_RawMarkup],
+    features: Optional[Union[str, Sequence[str]]] = None,
+    extract: Optional[_Extractor] = None,
+    processes: Optional[int] = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+    from_encoding: Optional[_Encoding] = None,
+    exclude_encodings: Optional[_Encodings] = None,
+    **kwargs: Any,
+) -> Iterator[ParseResult]:
+    """Parse a lot of documents in a pool of worker processes, and
+    extract something from each one.
+
+    Each worker process looks up and configures its tree builder once
+    (see `SoupFactory`), and then parses whichever documents it's
+    given. Only the value returned by ``extract`` is sent back to this
+    process, not the tree itself.
+
+    Documents are read from ``markups`` as they're needed, and only a
+    few batches per worker are outstanding at any time, so ``markups``
+    can be a generator over more documents than will fit in memory.
+
+    If a tree builder rejects a document, the `ParseResult` for that
+    document has the `ParserRejectedMarkup` exception as its ``error``,
+    and the rest of the documents are parsed as usual. Any other
+    exception, including one raised by ``extract``, is raised when
+    the result for its batch is reached.
+
+    :param markups: An iterable of strings or bytestrings. (Open
+        filehandles can't be sent to another process.)
+    :param features: Desirable features of the parser to be used,
+        as with the `BeautifulSoup` constructor.
+    :param extract: A function that takes a `BeautifulSoup` object and
+        returns a picklable value. This is required: send back the
+        parts of the tree you need, not the tree itself.
+    :param processes: The number of worker processes. The default is
+        the number of CPUs.
+    :param chunksize: The number of documents sent to a worker process
+        at a time. For lots of small documents, a larger number cuts
+        down on communication overhead.
+    :param ordered: If this is True, results are yielded in the same
+        order as the documents in ``markups``. If it's False, results
+        are yielded as soon as they're ready, and you can use
+        `ParseResult.index` to match them up with their documents.
+    :param builder: A `TreeBuilder` subclass to instantiate (or
+        instance to use) instead of looking one up based on `features`.
+    :param from_encoding: A string indicating the encoding of the
+        documents to be parsed.
+    :param exclude_encodings: A list of strings indicating encodings
+        known to be wrong.
+    :param kwargs: Other keyword arguments are passed into the
+        `SoupFactory` constructor in each worker process.
+    :return: An iterator over a `ParseResult` for each document.
+    """
+    if extract is None:
+        raise TypeError(
+            "parse_many() needs an extract function, so that it doesn't have to send entire trees between processes."
+        )
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1.")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    parse_kwargs = dict(from_encoding=from_encoding, exclude_encodings=exclude_encodings)
+    initargs = (features, builder, extract, parse_kwargs, kwargs)
+    return _results(_batches(markups, chunksize), processes, ordered, initargs)
+
+
+def _results(
+    batches: Iterator[List[Tuple[int, _RawMarkup]]],
+    processes: int,
+    ordered: bool,
+    initargs: Tuple[Any, ...],
+) -> Iterator[ParseResult]:
+    """Send batches of documents to a pool of worker processes and
+    yield the results as they come back.
+    """
+    max_pending = processes * 2
+    with ProcessPoolExecutor(
+        processes, initializer=_initialize_worker, initargs=initargs
+    ) as executor:
+        if ordered:
+            queue: Deque[Future] = deque()
+            for batch in itertools.islice(batches, max_pending):
+                queue.append(executor.submit(_parse_batch, batch))
+            while queue:
+                results = queue.popleft().result()
+                for batch in itertools.islice(batches, 1):
+                    queue.append(executor.submit(_parse_batch, batch))
+                for index, value, error in results:
+                    yield ParseResult(index, value, error)
+        else:
+            pending: Set[Future] = set()
+            for batch in itertools.islice(batches, max_pending):
+                pending.add(executor.submit(_parse_batch, batch))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for batch in itertools.islice(batches, len(done)):
+                    pending.add(executor.submit(_parse_batch, batch))
+                for future in done:
+                    for index, value, error in future.result():
+                        yield ParseResult(index, value, error)
+
+
+def _batches(
+    markups: Iterable[_RawMarkup], chunksize: int
+) -> Iterator[List[Tuple[int, _RawMarkup]]]:
+    """Group numbered documents into lists of ``chunksize``."""
+    numbered = enumerate(markups)
+    while True:
+        batch = list(itertools.islice(numbered, chunksize))
+        if not batch:
+            return
+        yield batch
+
+
+# Parsing one big document in pieces.
+
+#: An event recorded by `_RecordingSink`, to be replayed into a
+#: `BeautifulSoup` object: a start tag, an end tag, or a string.
+_Event = Tuple[Any, ...]
+
+#: Tags whose contents are never parsed as markup in HTML, so a
+#: record tag that shows up inside one of them isn't really a tag.
+_RAW_TEXT_TAGS: str = "script|style|textarea|title|xmp|iframe|noembed|noframes|plaintext"
+
+
+class _RecordingSink(ParseEventSink):
+    """Records the events for a run of sibling records, so they can be
+    replayed into a `BeautifulSoup` object in another process.
+
+    Recording starts when the first record tag is opened. From then
+    on, everything at or below the level of the records is recorded;
+    the events that follow the last record are thrown away in
+    `_RecordingSink.events`.
+    """
+
+    def __init__(self, builder: TreeBuilder, record_name: str):
+        self.record_name = record_name
+        super(_RecordingSink, self).__init__(builder)
+
+    def reset(self) -> None:
+        super(_RecordingSink, self).reset()
+        self._recorded: List[_Event] = []
+        self._depth: Optional[int] = None
+        self._last_record_end = 0
+        self._tag_namespaces: Optional[Dict[str, str]] = None
+
+    def handle_starttag(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: _RawAttributeValues,
+        sourceline: Optional[int] = None,
+        sourcepos: Optional[int] = None,
+        namespaces: Optional[Dict[str, str]] = None,
+        sourceoffset: Optional[int] = None,
+    ) -> None:
+        self._tag_namespaces = namespaces
+        return super(_RecordingSink, self).handle_starttag(
+            name, namespace, nsprefix, attrs, namespaces=namespaces
+        )
+
+    def tag_started(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: _RawAttributeValues,
+    ) -> None:
+        if self._depth is None:
+            if _prefixed(name, nsprefix) != self.record_name:
+                return
+            self._depth = len(self.tagStack)
+        elif len(self.tagStack) < self._depth:
+            return
+        self._recorded.append(
+            ("start", name, namespace, nsprefix, dict(attrs), self._tag_namespaces)
+        )
+
+    def tag_ended(self, name: str, nsprefix: Optional[str]) -> None:
+        # The tag has already been popped off the stack, unless it's
+        # an empty-element tag that was never pushed.
+        if self._depth is None or len(self.tagStack) < self._depth:
+            return
+        self._recorded.append(("end", name, nsprefix))
+        if (
+            len(self.tagStack) == self._depth
+            and _prefixed(name, nsprefix) == self.record_name
+        ):
+            self._last_record_end = len(self._recorded)
+
+    def string_found(self, string: str, container: Type[NavigableString]) -> None:
+        if self._depth is None or len(self.tagStack) < self._depth:
+            return
+        self._recorded.append(("string", string, container))
+
+    @property
+    def events(self) -> List[_Event]:
+        """The recorded events, up to the end of the last record."""
+        return self._recorded[: self._last_record_end]
+
+
+# Each worker process sets this up once, in _initialize_record_worker.
+_record_builder: Optional[TreeBuilder] = None
+
+
+def _initialize_record_worker(
+    features: Optional[Union[str, Sequence[str]]],
+    builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]],
+    builder_kwargs: Dict[str, Any],
+) -> None:
+    """Set up a worker process to parse records."""
+    global _record_builder
+    _record_builder = _builder_for(features, builder, **builder_kwargs)
+
+
+def _record_events(
+    prefix: str, records: str, suffix: str, record_name: str
+) -> Tuple[List[_Event], Dict[str, str]]:
+    """Parse some records in their context, in a worker process.
+
+    :return: A 2-tuple (events, namespaces).
+    """
+    assert _record_builder is not None
+    sink = _RecordingSink(_record_builder, record_name)
+    sink.parse(prefix + records + suffix)
+    return sink.events, sink._namespaces
+
+
+def _find_records(markup: str, record_tag: str, is_xml: bool) -> Optional[List[Tuple[int, int]]]:
+    """Find the start and end of every record in a document.
+
+    :return: A list of (start, end) offsets, one for each top-level
+        record tag, or None if the records aren't all siblings, or
+        aren't properly closed, or something else makes it unsafe to
+        split the document between them.
+    """
+    name = re.escape(record_tag)
+    alternatives = [
+        r"<!--.*?-->",
+        r"<!\[CDATA\[.*?\]\]>",
+        r"<\?.*?>",
+    ]
+    if not is_xml:
+        alternatives.append(
+            r"<(%s)(?=[\s/>])(?:[^>\"']|\"[^\"]*\"|'[^']*')*>.*?</\1\s*>" % _RAW_TEXT_TAGS
+        )
+    alternatives.append(
+        r"<(?P<close>/?)%s(?=[\s/>])(?P<attrs>(?:[^>\"']|\"[^\"]*\"|'[^']*')*)>" % name
+    )
+    flags = re.DOTALL
+    if not is_xml:
+        flags |= re.IGNORECASE
+    tokens = re.compile("|".join(alternatives), flags)
+
+    records: List[Tuple[int, int]] = []
+    depth = 0
+    start = 0
+    for match in tokens.finditer(markup):
+        if match.group("attrs") is None:
+            # A comment, a CDATA section, or some other construct that
+            # might contain something that looks like a record tag.
+            continue
+        if match.group("close"):
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0:
+                records.append((start, match.end()))
+        elif match.group("attrs").endswith("/"):
+            if depth == 0:
+                records.append((match.start(), match.end()))
+        else:
+            if depth == 0:
+                start = match.start()
+            depth += 1
+    if depth != 0 or not records:
+        return None
+
+    # The only thing allowed between one record and the next is
+    # whitespace; anything else means the records might not be
+    # siblings.
+    for (_, end), (next_start, _) in zip(records, records[1:]):
+        if "<" in markup[end:next_start]:
+            return None
+    return records
+
+
+def _plan_chunks(
+    markup: str, records: List[Tuple[int, int]], count: int
+) -> List[Tuple[int, int]]:
+    """Group records into about ``count`` chunks of similar size.
+
+    A chunk boundary can only go between two records separated by
+    nothing but whitespace, since the space between chunks is added
+    to the tree as a plain string.
+
+    :return: A list of (start, end) offsets, one for each chunk.
+    """
+    target = (records[-1][1] - records[0][0]) // count + 1
+    chunks: List[Tuple[int, int]] = []
+    chunk_start = records[0][0]
+    for (_, end), (next_start, _) in zip(records, records[1:]):
+        if end - chunk_start < target or markup[end:next_start].strip(
+            BeautifulSoup.ASCII_SPACES
+        ):
+            continue
+        chunks.append((chunk_start, end))
+        chunk_start = next_start
+    chunks.append((chunk_start, records[-1][1]))
+    return chunks
+
+
+def parse_records(
+    markup: _RawMarkup,
+    record_tag: str,
+    features: Optional[Union[str, Sequence[str]]] = None,
+    processes: Optional[int] = None,
+    builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+    from_encoding: Optional[_Encoding] = None,
+    exclude_encodings: Optional[_Encodings] = None,
+    element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+    replacer: "Optional[SoupReplacer]" = None,
+    **kwargs: Any,
+) -> BeautifulSoup:
+    """Parse one big document made mostly of sibling records--a product
+    catalog, a huge <table>--using a pool of worker processes.
+
+    The document is split into chunks between records, and the chunks
+    are parsed in worker processes. Each worker parses its records in
+    the context of the rest of the document (everything before the
+    first record and after the last one), and sends back the events
+    needed to build them. This process builds the records from those
+    events and puts them in the tree, in order, beneath the tag that
+    contains the records.
+
+    Tokenizing the markup happens in parallel, but building the tree
+    doesn't, so this helps most with html.parser, whose tokenizer is
+    written in Python. With lxml, most of the time is spent building
+    the tree.
+
+    If the document can't be split safely--the records aren't all
+    siblings, something other than whitespace separates them, the
+    record tags aren't explicitly closed, or the tree builder doesn't
+    send parse events (html5lib)--the whole document is parsed in
+    this process, as usual.
+
+    Source line numbers and positions aren't recorded. If you ask
+    for them, with ``store_line_numbers=True`` or
+    ``store_source_markup=True``, the document is parsed in this
+    process.
+
+    :param markup: A string or bytestring.
+    :param record_tag: The name of the tag that makes up each record,
+        as it appears in the markup, including any namespace prefix.
+    :param features: Desirable features of the parser to be used,
+        as with the `BeautifulSoup` constructor.
+    :param processes: The number of worker processes. The default is
+        the number of CPUs.
+    :param builder: A `TreeBuilder` subclass to instantiate (or
+        instance to use) instead of looking one up based on `features`.
+    :param from_encoding: A string indicating the encoding of the
+        document to be parsed.
+    :param exclude_encodings: A list of strings indicating encodings
+        known to be wrong.
+    :param element_classes: A dictionary mapping Beautiful Soup
+        classes like `Tag` and `NavigableString` to the classes to be
+        instantiated instead.
+    :param replacer: A `SoupReplacer` to apply to every tag.
+    :param kwargs: Keyword arguments for the `TreeBuilder` constructor.
+    :return: A `BeautifulSoup` object.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    soup_kwargs: Dict[str, Any] = dict(element_classes=element_classes, replacer=replacer)
+
+    def parse_serially() -> BeautifulSoup:
+        return BeautifulSoup(
+            markup,
+            features,
+            builder=builder,
+            from_encoding=from_encoding,
+            exclude_encodings=exclude_encodings,
+            **soup_kwargs,
+            **kwargs,
+        )
+
+    if (
+        kwargs.get("store_line_numbers") is True
+        or kwargs.get("store_source_markup")
+        or isinstance(builder, TreeBuilder)
+    ):
+        return parse_serially()
+    builder_kwargs = dict(kwargs, store_line_numbers=False)
+    tree_builder = _builder_for(features, builder, **builder_kwargs)
+    if not tree_builder.SENDS_PARSE_EVENTS:
+        return parse_serially()
+
+    dammit = None
+    if isinstance(markup, bytes):
+        dammit = UnicodeDammit(
+            markup,
+            [from_encoding] if from_encoding else [],
+            is_html=not tree_builder.is_xml,
+            exclude_encodings=exclude_encodings,
+        )
+        if dammit.unicode_markup is None:
+            return parse_serially()
+        text = dammit.unicode_markup
+    else:
+        text = markup
+
+    record_name = record_tag if tree_builder.is_xml else record_tag.lower()
+    records = _find_records(text, record_tag, tree_builder.is_xml)
+    if records is None:
+        return parse_serially()
+    chunks = _plan_chunks(text, records, processes * 4)
+    if len(chunks) < 2:
+        return parse_serially()
+
+    prefix = text[: records[0][0]]
+    suffix = text[records[-1][1] :]
+    with ProcessPoolExecutor(
+        processes,
+        initializer=_initialize_record_worker,
+        initargs=(features, builder, builder_kwargs),
+    ) as executor:
+        futures = [
+            executor.submit(_record_events, prefix, text[start:end], suffix, record_name)
+            for start, end in chunks[1:]
+        ]
+
+        # Meanwhile, parse the first chunk in this process. This
+        # builds everything that's not a record.
+        start, end = chunks[0]
+        soup = BeautifulSoup(prefix + text[start:end] + suffix, builder=tree_builder, **soup_kwargs)
+        if dammit is not None:
+            soup.original_encoding = dammit.original_encoding
+            soup.declared_html_encoding = dammit.declared_html_encoding
+            soup.contains_replacement_characters = dammit.contains_replacement_characters
+
+        first = soup.find(record_name)
+        if first is None or first.parent is None:
+            # The tree builder moved the record somewhere
+            # unexpected, so don't try to put the others next to it.
+            for future in futures:
+                future.cancel()
+            return parse_serially()
+        container = first.parent
+        anchor = first
+        for element in container.contents:
+            if isinstance(element, Tag) and _full_name(element) == record_name:
+                anchor = element
+
+        previous_end = end
+        for (start, end), future in zip(chunks[1:], futures):
+            events, namespaces = future.result()
+            for key, value in namespaces.items():
+                soup._namespaces.setdefault(key, value)
+            fragment = _FragmentSoup(
+                "", builder=tree_builder, context=container, **soup_kwargs
+            )
+            if start > previous_end:
+                fragment.handle_data(text[previous_end:start])
+                fragment.endData()
+            _replay(fragment, events)
+            anchor = _splice(container, anchor, fragment)
+            previous_end = end
+    tree_builder.soup = None
+    return soup
+
+
+def _prefixed(name: str, nsprefix: Optional[str]) -> str:
+    """The name of a tag as it appeared in the markup."""
+    if nsprefix:
+        return nsprefix + ":" + name
+    return name
+
+
+def _full_name(tag: Tag) -> str:
+    """The name of a tag as it appeared in the markup."""
+    return _prefixed(tag.name, tag.prefix)
+
+
+def _replay(soup: BeautifulSoup, events: List[_Event]) -> None:
+    """Build part of a tree from events recorded by `_RecordingSink`."""
+    handle_starttag = soup.handle_starttag
+    handle_endtag = soup.handle_endtag
+    handle_data = soup.handle_data
+    end_data = soup.endData
+    for event in events:
+        kind = event[0]
+        if kind == "start":
+            _, name, namespace, nsprefix, attrs, namespaces = event
+            handle_starttag(name, namespace, nsprefix, attrs, namespaces=namespaces)
+        elif kind == "end":
+            handle_endtag(event[1], event[2])
+        else:
+            handle_data(event[1])
+            end_data(event[2])
+    soup.endData()
+
+
+def _splice(container: Tag, anchor: PageElement, fragment: BeautifulSoup) -> PageElement:
+    """Move everything in ``fragment`` into ``container``, right after
+    ``anchor``.
+
+    This does the same thing as ``anchor.insert_after(*fragment.contents)``,
+    but it doesn't need to take ``fragment`` apart one element at a time,
+    since everything in it is already connected.
+
+    :return: The last element that was moved.
+    """
+    new = fragment.contents
+    # Find these before any of the links change, since
+    # _last_descendant() takes a shortcut through the next sibling.
+    anchor_last = anchor._last_descendant()
+    new_last = new[-1]._last_descendant()
+    assert anchor_last is not None and new_last is not None
+
+    fragment.contents = []
+    fragment.next_element = None
+    for element in new:
+        element.parent = container
+
+    position = container.index(anchor) + 1
+    container.contents[position:position] = new
+
+    following = anchor.next_sibling
+    anchor.next_sibling = new[0]
+    new[0].previous_sibling = anchor
+    new[-1].next_sibling = following
+    if following is not None:
+        following.previous_sibling = new[-1]
+
+    following_element = anchor_last.next_element
+    anchor_last.next_element = new[0]
+    new[0].previous_element = anchor_last
+    new_last.next_element = following_element
+    if following_element is not None:
+        following_element.previous_element = new_last
+    container._tree_changed()
+    return new[-1]
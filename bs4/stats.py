@@ -0,0 +1,262 @@
+"""Measuring where the time goes when a document is parsed.
+
+Pass ``collect_stats=True`` into the `BeautifulSoup` constructor (or
+into a `SoupFactory`), and the resulting object's ``parse_stats``
+attribute will be a `ParseStats` object describing the parse.
+"""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "ParseStats",
+]
+
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from bs4.element import (
+    NavigableString,
+    PageElement,
+    Tag,
+)
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from bs4._typing import _RawMarkup
+
+_T = TypeVar("_T")
+
+
+class ParseStats(object):
+    """Statistics about the parsing of one document.
+
+    All times are wall-clock times, in seconds. The time spent in the
+    parser itself ("tokenizing") isn't measured directly; it's the
+    time spent feeding the markup to the parser, minus the time spent
+    in the `BeautifulSoup` methods the parser calls to build the tree.
+    With the ``html5lib`` parser, most of the tree is built by
+    ``html5lib`` itself, so most of that work shows up as tokenizing.
+    """
+
+    #: The time spent in `BeautifulSoup` (not counting the time
+    #: spent looking up a `TreeBuilder`).
+    total_time: float = 0.0
+
+    #: The time spent guessing at the document's encoding and
+    #: converting it to Unicode, for all the strategies tried.
+    encoding_time: float = 0.0
+
+    #: The time spent parsing the markup with strategies that turned
+    #: out not to work (see `ParseStats.strategies_tried`).
+    rejected_time: float = 0.0
+
+    #: The time spent in the parser, for the strategy that worked.
+    tokenizing_time: float = 0.0
+
+    #: The time spent in the methods that add tags and strings to the
+    #: tree (`BeautifulSoup.handle_starttag`, `BeautifulSoup.endData`
+    #: and so on), not counting the `SoupReplacer`.
+    tree_building_time: float = 0.0
+
+    #: The time spent in the `SoupReplacer`, for the strategy that worked.
+    replacer_time: float = 0.0
+
+    #: How many times the `SoupReplacer` was called, for the strategy
+    #: that worked.
+    replacer_calls: int = 0
+
+    #: How many different ways of converting the markup to Unicode
+    #: were tried, including the one that worked.
+    strategies_tried: int = 0
+
+    #: The number of tags in the finished tree, not counting the
+    #: `BeautifulSoup` object itself.
+    tags: int = 0
+
+    #: The number of strings in the finished tree.
+    strings: int = 0
+
+    #: How deep the finished tree goes. A document with one tag in it
+    #: has a depth of 1.
+    max_depth: int = 0
+
+    #: The size of the markup passed in, if it was a bytestring; None
+    #: if it was a Unicode string.
+    bytes_in: Optional[int] = None
+
+    #: The total length of the strings in the finished tree.
+    characters_out: int = 0
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self._fields()
+        )
+        return "%s(%s)" % (self.__class__.__name__, fields)
+
+    @classmethod
+    def _fields(cls) -> List[str]:
+        return [
+            "total_time",
+            "encoding_time",
+            "rejected_time",
+            "tokenizing_time",
+            "tree_building_time",
+            "replacer_time",
+            "replacer_calls",
+            "strategies_tried",
+            "tags",
+            "strings",
+            "max_depth",
+            "bytes_in",
+            "characters_out",
+        ]
+
+
+class _StatsCollector(object):
+    """Fills out a `ParseStats` while a `BeautifulSoup` object parses
+    a document.
+
+    The timing is done by putting wrappers around the soup's
+    tree-building methods for the duration of the parse, so a soup
+    that isn't collecting statistics doesn't pay anything for them.
+
+    :meta private:
+    """
+
+    #: The methods a `TreeBuilder` calls to build the tree. Some of
+    #: them call each other; only the outermost call is timed.
+    TREE_BUILDING_METHODS = [
+        "handle_starttag",
+        "handle_endtag",
+        "handle_data",
+        "endData",
+        "object_was_parsed",
+        "new_tag",
+        "new_string",
+    ]
+
+    def __init__(self, soup: BeautifulSoup, markup: _RawMarkup):
+        self.soup = soup
+        self.stats = ParseStats()
+        if not isinstance(markup, str):
+            self.stats.bytes_in = len(markup)
+        self.start = perf_counter()
+        self.building = False
+        self.building_time = 0.0
+        self.replacer_time = 0.0
+        self.replacer_calls = 0
+        self.wrapped: List[str] = []
+        self.feed_start = 0.0
+
+    def strategy_found(self, seconds: float) -> None:
+        """`TreeBuilder.prepare_markup` took this long to come up with
+        a strategy, or to say it had no more of them.
+        """
+        self.stats.encoding_time += seconds
+
+    def start_feed(self) -> None:
+        """Wrap the tree-building methods, just before
+        `BeautifulSoup._feed` is called.
+
+        `BeautifulSoup._parse` calls ``_feed()`` itself, rather than
+        through a method of this class, so that warnings issued while
+        parsing don't get an extra stack frame.
+        """
+        soup = self.soup
+        self.stats.strategies_tried += 1
+        self.building_time = self.replacer_time = 0.0
+        self.replacer_calls = 0
+        self.wrapped = list(self.TREE_BUILDING_METHODS)
+        for name in self.wrapped:
+            setattr(soup, name, self._timed(getattr(soup, name)))
+        if soup.replacer:
+            self.wrapped.append("_apply_replacer")
+            setattr(
+                soup, "_apply_replacer", self._timed_replacer(soup._apply_replacer)
+            )
+        self.feed_start = perf_counter()
+
+    def end_feed(self, success: bool) -> None:
+        """Unwrap the tree-building methods once `BeautifulSoup._feed`
+        has finished.
+
+        :param success: Whether the markup was parsed. If not, the
+            time counts as time spent on rejected strategies.
+        """
+        feed_time = perf_counter() - self.feed_start
+        if success:
+            self.stats.tokenizing_time = feed_time - self.building_time
+            self.stats.tree_building_time = self.building_time - self.replacer_time
+            self.stats.replacer_time = self.replacer_time
+            self.stats.replacer_calls = self.replacer_calls
+        else:
+            self.stats.rejected_time += feed_time
+        for name in self.wrapped:
+            self.soup.__dict__.pop(name, None)
+
+    def finish(self) -> ParseStats:
+        """Count what's in the finished tree and fill in the rest of
+        the statistics.
+        """
+        stats = self.stats
+        tags = strings = characters = max_depth = 0
+        # Walk the tree by hand rather than using Tag.descendants, so
+        # that tags whose contents haven't been parsed yet (see
+        # Tag.is_lazy) can be skipped: even looking at their .contents
+        # would parse them.
+        stack: List[Tuple[PageElement, int]] = [
+            (child, 1) for child in self.soup.contents
+        ]
+        while stack:
+            element, depth = stack.pop()
+            if isinstance(element, Tag):
+                tags += 1
+                if depth > max_depth:
+                    max_depth = depth
+                if element._lazy_content is None:
+                    stack.extend((child, depth + 1) for child in element.contents)
+            else:
+                strings += 1
+                characters += len(cast(NavigableString, element))
+        stats.tags = tags
+        stats.strings = strings
+        stats.characters_out = characters
+        stats.max_depth = max_depth
+        stats.total_time = perf_counter() - self.start
+        return stats
+
+    def _timed(self, method: Callable[..., _T]) -> Callable[..., _T]:
+        def timed(*args: Any, **kwargs: Any) -> _T:
+            if self.building:
+                return method(*args, **kwargs)
+            self.building = True
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.building_time += perf_counter() - start
+                self.building = False
+
+        return timed
+
+    def _timed_replacer(self, method: Callable[[Tag], None]) -> Callable[[Tag], None]:
+        def timed(tag: Tag) -> None:
+            self.replacer_calls += 1
+            start = perf_counter()
+            try:
+                method(tag)
+            finally:
+                self.replacer_time += perf_counter() - start
+
+        return timed
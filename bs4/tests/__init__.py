@@ -7,6 +7,8 @@ __license__ = "MIT"
 import pickle
 import importlib
 import copy
+import subprocess
+import sys
 import warnings
 import pytest
 from bs4 import BeautifulSoup
@@ -51,6 +53,8 @@ except ImportError:
 
 HTML5LIB_PRESENT = importlib.util.find_spec("html5lib") is not None
 
+NUMPY_PRESENT = importlib.util.find_spec("numpy") is not None
+
 try:
     import lxml.etree
     LXML_PRESENT = True
@@ -61,6 +65,43 @@ except ImportError:
 
 default_builder: Type[TreeBuilder] = HTMLParserTreeBuilder
 
+# Counts the Python function calls made while parsing a document,
+# before and after running some other code.
+PARSE_COST_SCRIPT = """
+import sys
+from bs4 import BeautifulSoup
+
+def cost():
+    calls = 0
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event == "call":
+            calls += 1
+    sys.setprofile(profile)
+    BeautifulSoup("<div><p class='a'>text<b>bold</b></p>" * 20, "html.parser")
+    sys.setprofile(None)
+    return calls
+
+cost()
+before = cost()
+%s
+print(before, cost())
+"""
+
+
+def parse_cost_before_and_after(code: str) -> Tuple[int, int]:
+    """How many Python function calls it takes to parse a document,
+    in a fresh interpreter, before and after running ``code``.
+
+    Timing a parse is too noisy to tell whether something makes
+    every later parse slower, but counting calls isn't.
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-c", PARSE_COST_SCRIPT % code]
+    )
+    before, after = output.split()
+    return int(before), int(after)
+
 BAD_DOCUMENT: str = """A bare string
 <!DOCTYPE xsl:stylesheet SYSTEM "htmlent.dtd">
 <!DOCTYPE xsl:stylesheet PUBLIC "htmlent.dtd">
@@ -0,0 +1,153 @@
+"""Tests of bs4.aparse, which parses a document as it arrives."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import subprocess
+import sys
+import warnings
+
+from bs4 import (
+    BeautifulSoup,
+    aparse,
+)
+from bs4 import _async
+
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+)
+
+PARSERS = ["html.parser"]
+if LXML_PRESENT:
+    PARSERS.extend(["lxml", "xml"])
+if HTML5LIB_PRESENT:
+    PARSERS.append("html5lib")
+
+DOCUMENT = (
+    "<html><head><title>Caf\N{LATIN SMALL LETTER E WITH ACUTE}</title></head>"
+    "<body><p class='a b'>One <b>two</b> &amp; three</p>"
+    + "".join("<div id='d%d'>Snow\N{SNOWMAN} %d<br></div>" % (i, i) for i in range(500))
+    + "<pre>\n  kept  </pre><script>if (a < b) {}</script></body></html>"
+)
+
+
+async def stream(data, size):
+    """Yield pieces of ``data``, giving other tasks a chance to run."""
+    for i in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[i : i + size]
+
+
+def parse(data, size, features, **kwargs):
+    return asyncio.run(aparse(stream(data, size), features, **kwargs))
+
+
+class TestAparse:
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_same_tree_as_beautifulsoup(self, features):
+        expect = BeautifulSoup(DOCUMENT, features)
+        soup = parse(DOCUMENT, 100, features)
+        assert soup.decode() == expect.decode()
+        assert soup.original_encoding is None
+
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_bytes_split_inside_characters(self, features):
+        data = DOCUMENT.encode("utf8")
+        expect = BeautifulSoup(data, features, from_encoding="utf8")
+        # Seven-byte pieces split many multi-byte characters in two.
+        soup = parse(data, 7, features, from_encoding="utf8", chunk_size=50)
+        assert soup.decode() == expect.decode()
+        assert soup.original_encoding == "utf8"
+        assert soup.contains_replacement_characters is False
+
+    def test_encoding_detected_from_start_of_document(self):
+        data = (
+            '<html><head><meta charset="windows-1252"></head>'
+            "<body>Caf\N{LATIN SMALL LETTER E WITH ACUTE}"
+            "\N{EURO SIGN}</body></html>"
+        ).encode("windows-1252")
+        soup = parse(data, 10, "html.parser")
+        assert soup.original_encoding == "windows-1252"
+        assert soup.declared_html_encoding == "windows-1252"
+        assert soup.body.string == "Caf\N{LATIN SMALL LETTER E WITH ACUTE}\N{EURO SIGN}"
+
+        # A byte-order mark is stripped and used to pick the encoding.
+        data = "\ufeff<p>Snow\N{SNOWMAN}</p>".encode("utf-16-le")
+        soup = parse(data, 3, "html.parser")
+        assert soup.original_encoding == "utf-16le"
+        assert soup.p.string == "Snow\N{SNOWMAN}"
+
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_declared_encoding_does_not_cause_warnings(self, features):
+        data = (
+            '<html><head><meta charset="utf-8"></head>'
+            "<body>Snow\N{SNOWMAN}</body></html>"
+        ).encode("utf8")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            soup = parse(data, 10, features)
+        assert [] == w
+        assert soup.body.string == "Snow\N{SNOWMAN}"
+
+    def test_bad_bytes_later_in_document_are_replaced(self, monkeypatch):
+        monkeypatch.setattr(_async, "ENCODING_DETECTION_SIZE", 10)
+        data = b"<p>plain ascii here</p><p>bad \xff byte</p>"
+        soup = parse(data, 10, "html.parser", from_encoding="utf8")
+        assert soup.original_encoding == "utf8"
+        assert soup.find_all("p")[1].string == "bad \N{REPLACEMENT CHARACTER} byte"
+        assert soup.contains_replacement_characters is True
+
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_parse_in_executor(self, features):
+        expect = BeautifulSoup(DOCUMENT, features)
+        with ThreadPoolExecutor(1) as executor:
+            soup = parse(DOCUMENT, 1000, features, executor=executor)
+        assert soup.decode() == expect.decode()
+
+    def test_other_tasks_run_during_parse(self):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def main():
+            task = asyncio.create_task(ticker())
+            soup = await aparse(stream(DOCUMENT, len(DOCUMENT)), "html.parser", chunk_size=100)
+            task.cancel()
+            return soup
+
+        soup = asyncio.run(main())
+        assert len(soup.find_all("div")) == 500
+        # The whole document arrived at once, but the ticker still
+        # ran while it was being parsed.
+        assert len(ticks) > 10
+
+    def test_empty_stream(self):
+        soup = parse("", 1, "html.parser")
+        assert soup.decode() == ""
+
+    def test_mixed_stream_rejected(self):
+        async def mixed():
+            yield b"<p>"
+            yield "text"
+
+        with pytest.raises(TypeError):
+            asyncio.run(aparse(mixed(), "html.parser"))
+
+    def test_soup_can_be_reused(self):
+        # The tree builder is left in a state where it can parse
+        # another document in the usual way.
+        soup = parse("<p>one</p>", 3, "html.parser")
+        new = BeautifulSoup("<b>two</b>", builder=soup.builder)
+        assert new.decode() == "<b>two</b>"
+
+    def test_import_does_not_import_asyncio(self):
+        script = (
+            "import sys; import bs4; print('asyncio' in sys.modules); "
+            "bs4.aparse; print('asyncio' in sys.modules)"
+        )
+        output = subprocess.check_output([sys.executable, "-c", script])
+        assert output.split() == [b"False", b"True"]
@@ -0,0 +1,189 @@
+"""Tests of bs4.benchmarks, the benchmark suite."""
+
+import json
+import pytest
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from bs4.benchmarks import (
+    BENCHMARKS,
+    Result,
+    compare,
+    load,
+    run,
+    save,
+)
+from bs4.benchmarks.__main__ import main
+from bs4.benchmarks.corpus import (
+    format_size,
+    generate,
+    parse_size,
+)
+from bs4.benchmarks import (
+    chunks,
+    stress,
+)
+
+from . import LXML_PRESENT
+
+
+class TestCorpus:
+    def test_sizes(self):
+        assert parse_size("1KB") == 1024
+        assert parse_size("10 mb") == 10 * 1024 * 1024
+        assert parse_size("100M") == 100 * 1024 * 1024
+        assert parse_size("512") == 512
+        with pytest.raises(ValueError):
+            parse_size("lots")
+        assert format_size(1024) == "1KB"
+        assert format_size(100 * 1024 * 1024) == "100MB"
+        assert format_size(1000) == "1000B"
+
+    def test_generate_is_deterministic(self):
+        assert generate(5000, 1) == generate(5000, 1)
+        assert generate(5000, 1) != generate(5000, 2)
+        assert generate(5000, 1, xml=True) == generate(5000, 1, xml=True)
+
+    def test_generated_documents(self):
+        html = generate(10000)
+        assert 10000 <= len(html) < 11000
+        soup = BeautifulSoup(html, "html.parser")
+        assert len(soup.find_all("a")) > 10
+        assert soup.select("div.section p a")
+
+        xml = generate(10000, xml=True)
+        assert xml.startswith("<?xml")
+        assert 10000 <= len(xml) < 11000
+
+
+class TestRun:
+    def test_run(self):
+        reported = []
+        results = run(
+            parsers=["html.parser", "no-such-parser"],
+            sizes=[1024],
+            warmup=0,
+            repetitions=2,
+            report=reported.append,
+        )
+        assert results == reported
+        assert [r.benchmark for r in results] == ["parse"] + [
+            b.name for b in BENCHMARKS
+        ]
+        for result in results:
+            assert result.parser == "html.parser"
+            assert result.size == 1024
+            assert len(result.times) == 2
+            assert result.variance >= 0
+
+    def test_xml(self):
+        if not LXML_PRESENT:
+            pytest.skip("lxml is not installed")
+        [result] = run(["find_all"], ["lxml-xml"], [2048], repetitions=1)
+        assert result.parser == "lxml-xml"
+
+    def test_unknown_benchmark(self):
+        with pytest.raises(ValueError):
+            run(["no-such-benchmark"])
+
+    def test_save_and_load(self, tmp_path):
+        results = run(["parse", "decode"], ["html.parser"], [1024], repetitions=3)
+        filename = str(tmp_path / "results.json")
+        save(results, filename, seed=0)
+        data = json.load(open(filename))
+        assert data["seed"] == 0
+        assert set(data["results"][0]) >= {"warmup", "repetitions", "variance"}
+        assert load(filename) == results
+
+    def test_compare(self):
+        before = [
+            Result("parse", "lxml", 1024, 1, 3, [1.0, 1.0, 1.0]),
+            Result("decode", "lxml", 1024, 1, 3, [1.0, 1.0, 1.0]),
+        ]
+        after = [
+            Result("parse", "lxml", 1024, 1, 3, [1.05, 1.05, 1.05]),
+            Result("decode", "lxml", 1024, 1, 3, [2.0, 2.0, 2.0]),
+            Result("decode", "lxml", 2048, 1, 3, [5.0, 5.0, 5.0]),
+        ]
+        [regression] = compare(after, before)
+        assert regression.result is after[1]
+        assert regression.ratio == 2
+        assert "decode with lxml on 1KB" in str(regression)
+        assert len(compare(after, before, threshold=0.01)) == 2
+
+    def test_main(self, tmp_path, capsys):
+        filename = str(tmp_path / "results.json")
+        args = ["--parsers", "html.parser", "--sizes", "1KB", "--benchmarks"]
+        assert main(args + ["parse,get_text", "--output", filename]) == 0
+        assert len(load(filename)) == 2
+        assert main(args + ["parse", "--compare", filename]) in (0, 1)
+        assert "regression" in capsys.readouterr().out
+
+
+class TestStress:
+    def test_fit_exponent(self):
+        sizes = [10, 20, 40, 80]
+        assert stress.fit_exponent(sizes, [s * 3.0 for s in sizes]) == pytest.approx(1)
+        assert stress.fit_exponent(sizes, [s**2 for s in sizes]) == pytest.approx(2)
+        with pytest.raises(ValueError):
+            stress.fit_exponent([10], [1.0])
+        with pytest.raises(ValueError):
+            stress.fit_exponent([10, 10], [1.0, 2.0])
+
+    def test_pathologies_parse(self):
+        # Every pathology works with every parser, at a small size.
+        for pathology in stress.PATHOLOGIES:
+            for parser in ("html.parser", "html5lib", "lxml", "lxml-xml"):
+                if builder_registry.lookup(parser) is None:
+                    continue
+                pathology.operation(pathology.setup(20, parser))
+
+    def test_run(self):
+        reported = []
+        results = stress.run(
+            ["long_text", "extract_siblings"],
+            ["html.parser", "no-such-parser"],
+            sizes=[10, 20],
+            repetitions=1,
+            report=reported.append,
+        )
+        assert results == reported
+        assert [r.pathology for r in results] == ["long_text", "extract_siblings"]
+        assert results[0].sizes == [10, 20]
+        assert len(results[0].times) == 2
+        assert "long_text" in str(results[0])
+        with pytest.raises(ValueError):
+            stress.run(["no-such-pathology"])
+
+    def test_main(self, capsys):
+        args = ["--parsers", "html.parser", "--start", "10", "--steps", "2"]
+        assert stress.main(args + ["--pathologies", "decode_deep"]) in (0, 1)
+        assert "decode_deep" in capsys.readouterr().out
+
+
+class TestChunks:
+    def test_run(self):
+        if not LXML_PRESENT:
+            pytest.skip("lxml is not installed")
+        reported = []
+        results = chunks.run(
+            ["lxml-xml", "html.parser"],
+            sizes=[20000],
+            chunk_sizes=[512, 4096],
+            repetitions=1,
+            report=reported.append,
+        )
+        assert results == reported
+        # html.parser isn't fed in pieces, so it's skipped. The
+        # chunk size lxml-xml picks for this document is tried as well.
+        assert [r.chunk_size for r in results] == [512, 1250, 4096]
+        assert [r.adaptive for r in results] == [False, True, False]
+        assert results[0].throughput > 0
+        assert "lxml-xml" in str(results[1])
+
+    def test_main(self, capsys):
+        if not LXML_PRESENT:
+            pytest.skip("lxml is not installed")
+        args = ["--parsers", "lxml", "--sizes", "4KB", "--chunk-sizes", "1KB"]
+        assert chunks.main(args + ["--repetitions", "1"]) == 0
+        assert "per chunk" in capsys.readouterr().out
@@ -1,11 +1,15 @@
 """Tests of the builder registry."""
 
+import importlib
 import pytest
+import subprocess
+import sys
 import warnings
 from typing import Type
 
 from bs4 import BeautifulSoup
 from bs4.builder import (
+    _LAZY_BUILDERS,
     builder_registry as registry,
     TreeBuilder,
     TreeBuilderRegistry,
@@ -76,6 +80,26 @@ class TestBuiltInRegistry(object):
         with pytest.raises(ValueError):
             BeautifulSoup("", features="no-such-feature")
 
+    def test_lazy_builders_declare_their_features(self):
+        for module_name, class_name, features in _LAZY_BUILDERS:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            assert list(getattr(module, class_name).features) == features
+
+    def test_import_does_not_import_parsers(self):
+        # Importing Beautiful Soup and parsing with html.parser
+        # doesn't import lxml or html5lib.
+        script = (
+            "import sys; from bs4 import BeautifulSoup; "
+            "BeautifulSoup('<p>', 'html.parser'); "
+            "print([m for m in sys.modules if m.split('.')[0] in "
+            "('lxml', 'html5lib')])"
+        )
+        output = subprocess.check_output([sys.executable, "-c", script])
+        assert output.strip() == b"[]"
+
 
 class TestRegistry(object):
     """Test the TreeBuilderRegistry class in general."""
@@ -137,3 +161,24 @@ class TestRegistry(object):
         self.builder_for_features("foo", "bar")
         self.builder_for_features("foo", "baz")
         assert self.registry.lookup("bar", "baz") is None
+
+    def test_register_lazily(self):
+        self.registry.register_lazily(
+            "bs4.builder._htmlparser", "HTMLParserTreeBuilder", ["foo", "bar"]
+        )
+        assert self.registry.lookup("baz") is None
+        assert self.registry.lookup("foo") is HTMLParserTreeBuilder
+
+        # Once the module is imported, the placeholder is replaced
+        # everywhere.
+        assert self.registry.builders == [HTMLParserTreeBuilder]
+        assert self.registry.builders_for_feature["bar"] == [HTMLParserTreeBuilder]
+
+    def test_register_lazily_with_missing_module(self):
+        # If a lazily registered builder can't be imported, lookup()
+        # moves on to the next best builder.
+        fallback = self.builder_for_features("foo")
+        self.registry.register_lazily("no.such.module", "Builder", ["foo", "bar"])
+        assert self.registry.lookup() is fallback
+        assert self.registry.builders == [fallback]
+        assert self.registry.lookup("bar") is None
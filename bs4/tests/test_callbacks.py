@@ -0,0 +1,151 @@
+"""Tests of bs4.callbacks, which calls functions during parsing."""
+
+import pytest
+import warnings
+
+from bs4 import BeautifulSoup
+
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+    SOUP_SIEVE_PRESENT,
+)
+
+if SOUP_SIEVE_PRESENT:
+    from bs4.callbacks import (
+        SelectorCallbacks,
+        _CallbackSoup,
+    )
+
+PARSERS = ["html.parser"]
+if LXML_PRESENT:
+    PARSERS.append("lxml")
+if HTML5LIB_PRESENT:
+    PARSERS.append("html5lib")
+
+DOCUMENT = """<html><head><meta property="og:title" content="Title">
+<meta name="description" content="ignored"><meta property="og:type" content="website">
+</head><body><div id="main"><p>See <a href="/a">A <b>bold</b></a> and <a>no href</a>.</p></div>
+<p><a href="/c">C</a></p><div class="article"><a href="/d">D</a></div></body></html>"""
+
+
+@pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+class TestSelectorCallbacks:
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_handlers_called_with_complete_subtrees(self, features):
+        links = []
+        og = []
+        callbacks = SelectorCallbacks()
+        callbacks.on("a[href]", links.append)
+        callbacks.on("meta[property^='og:']", og.append)
+        callbacks.parse(DOCUMENT, features)
+
+        assert [str(x) for x in links] == [
+            '<a href="/a">A <b>bold</b></a>',
+            '<a href="/c">C</a>',
+            '<a href="/d">D</a>',
+        ]
+        assert [x["content"] for x in og] == ["Title", "website"]
+
+        # Once the handler returns, the tag is extracted from the
+        # tree, so it's not holding on to the rest of the document.
+        for tag in links + og:
+            assert tag.parent is None
+
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_results_same_as_select(self, features):
+        selectors = ["a", "div#main a", "body > p a", "div.article", "b"]
+        soup = BeautifulSoup(DOCUMENT, features)
+        for selector in selectors:
+            found = []
+            callbacks = SelectorCallbacks()
+            callbacks.on(selector, found.append)
+            callbacks.parse(DOCUMENT, features)
+            assert [str(x) for x in found] == [str(x) for x in soup.select(selector)]
+
+    def test_ancestor_conditions(self):
+        events = []
+        callbacks = SelectorCallbacks()
+        callbacks.on("div#main a", lambda tag: events.append(tag.get_text()))
+        callbacks.parse(DOCUMENT, "html.parser")
+        assert events == ["A bold", "no href"]
+
+    def test_handler_can_see_ancestors(self):
+        parents = []
+        callbacks = SelectorCallbacks()
+        callbacks.on(
+            "a[href]", lambda tag: parents.append([x.name for x in tag.parents])
+        )
+        callbacks.parse(DOCUMENT, "html.parser")
+        assert parents[0] == ["p", "div", "body", "html", "[document]"]
+
+    def test_nested_matches(self):
+        # Handlers for an inner tag are called first, and the outer tag
+        # still gets its complete subtree.
+        events = []
+        callbacks = SelectorCallbacks()
+        callbacks.on("div", lambda tag: events.append(("div", str(tag))))
+        callbacks.on("a", lambda tag: events.append(("a", str(tag))))
+        callbacks.on("div", lambda tag: events.append(("div2", tag.name)))
+        callbacks.parse('<div><a href="x">1</a><a>2</a></div>', "html.parser")
+        assert events == [
+            ("a", '<a href="x">1</a>'),
+            ("a", "<a>2</a>"),
+            ("div", '<div><a href="x">1</a><a>2</a></div>'),
+            ("div2", "div"),
+        ]
+
+    def test_unclosed_tags_are_handled_at_end_of_document(self):
+        found = []
+        callbacks = SelectorCallbacks()
+        callbacks.on("p", found.append)
+        callbacks.parse("<div><p>a</p><p>b", "html.parser")
+        assert [str(x) for x in found] == ["<p>a</p>", "<p>b</p>"]
+
+    def test_unmatched_content_is_discarded(self):
+        callbacks = SelectorCallbacks()
+        callbacks.on("b", lambda tag: None)
+        with warnings.catch_warnings():
+            soup = _CallbackSoup(
+                "<html><body><p>a <b>b</b> c</p><div>d</div></body></html>",
+                "html.parser",
+                callbacks=callbacks,
+            )
+        assert soup.contents == []
+
+        # While the document is being parsed, only the open tags and
+        # the matched regions are kept.
+        sizes = []
+
+        def handler(tag):
+            root = list(tag.parents)[-1]
+            sizes.append(len(list(root.descendants)))
+
+        callbacks = SelectorCallbacks()
+        callbacks.on("b", handler)
+        callbacks.parse(
+            "<div>" + "<p>text <i>i</i></p>" * 100 + "<p><b>x</b></p></div>",
+            "html.parser",
+        )
+        # [document] > div > p > b > "x"
+        assert sizes == [4]
+
+    def test_namespaces(self):
+        found = []
+        callbacks = SelectorCallbacks(namespaces=dict(ns="http://example.com/"))
+        callbacks.on("ns|tag", found.append)
+        if LXML_PRESENT:
+            callbacks.parse(
+                '<root xmlns:ns="http://example.com/"><ns:tag>1</ns:tag><tag>2</tag></root>',
+                "lxml-xml",
+            )
+            assert [x.string for x in found] == ["1"]
+
+    def test_precompiled_selector(self):
+        found = []
+        soup = BeautifulSoup("", "html.parser")
+        callbacks = SelectorCallbacks()
+        callbacks.on(soup.css.compile("a[href]"), found.append)
+        callbacks.parse(DOCUMENT, "html.parser")
+        assert len(found) == 3
+
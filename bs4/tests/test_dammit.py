@@ -1,6 +1,8 @@
 # encoding: utf-8
 import pytest
 import logging
+import subprocess
+import sys
 import warnings
 import bs4
 from bs4 import BeautifulSoup
@@ -286,6 +288,42 @@ class TestEntitySubstitution(object):
     def setup_method(self):
         self.sub = EntitySubstitution
 
+    def test_entity_tables_are_built_lazily(self):
+        # Parsing, even parsing entities, only builds
+        # HTML_ENTITY_TO_CHARACTER.
+        script = (
+            "from bs4 import BeautifulSoup; "
+            "from bs4.dammit import EntitySubstitution; "
+            "BeautifulSoup('<p>&eacute;</p>', 'html.parser'); "
+            "print(sorted(name for name, value in "
+            "vars(EntitySubstitution).items() "
+            "if type(value).__name__ == '_LazyClassVariable'))"
+        )
+        output = subprocess.check_output([sys.executable, "-c", script])
+        assert output.strip() == (
+            b"['CHARACTER_TO_HTML_ENTITY', 'CHARACTER_TO_HTML_ENTITY_RE', "
+            b"'CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE']"
+        )
+
+    def test_lazy_entity_tables_match_eagerly_built_tables(self):
+        class Eager(EntitySubstitution):
+            pass
+
+        Eager._populate_class_variables()
+        for name in (
+            "HTML_ENTITY_TO_CHARACTER",
+            "CHARACTER_TO_HTML_ENTITY",
+        ):
+            assert getattr(Eager, name) == getattr(EntitySubstitution, name)
+        for name in (
+            "CHARACTER_TO_HTML_ENTITY_RE",
+            "CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE",
+        ):
+            assert (
+                getattr(Eager, name).pattern
+                == getattr(EntitySubstitution, name).pattern
+            )
+
     @pytest.mark.parametrize(
         "original,substituted",
         [
@@ -0,0 +1,87 @@
+"""Tests of the memory profiling tools in bs4.diagnose."""
+
+import sys
+import tracemalloc
+
+from bs4 import BeautifulSoup
+from bs4.diagnose import (
+    MemoryUsage,
+    _memory_main,
+    memory_profile,
+    parse_memory,
+)
+
+
+class TestMemoryProfile:
+    def test_profile(self):
+        markup = (
+            '<div class="a b"><p id="x">text</p><!--comment-->'
+            '<script>x</script><p id="y">text</p></div>'
+        )
+        soup = BeautifulSoup(markup, "html.parser")
+        profile = memory_profile(soup)
+        assert profile.nodes["Tag"].objects == 4
+        assert profile.nodes["BeautifulSoup"].objects == 1
+        assert profile.nodes["NavigableString"].objects == 2
+        assert profile.nodes["Comment"].objects == 1
+        assert profile.nodes["Script"].objects == 1
+        assert profile.attribute_dicts.objects == 5
+        assert profile.contents_lists.objects == 5
+        assert profile.attribute_value_lists == MemoryUsage(
+            1, sys.getsizeof(soup.div["class"])
+        )
+        # Every tag and string has a __dict__.
+        assert profile.instance_dicts.objects == 9
+        assert profile.total_bytes > sum(
+            usage.bytes for usage in profile.nodes.values()
+        )
+        report = str(profile)
+        assert "Tag" in report
+        assert "duplicate strings" in report
+
+    def test_duplicate_strings(self):
+        # Two equal strings that aren't the same object.
+        name = "".join(["da", "ta"])
+        other = "".join(["dat", "a"])
+        soup = BeautifulSoup("<p></p>", "html.parser")
+        soup.p[name] = "1"
+        soup.p.append(soup.new_tag("b", attrs={other: "2"}))
+        profile = memory_profile(soup)
+        assert profile.duplicate_strings >= 1
+        assert profile.duplicate_string_bytes >= sys.getsizeof(name)
+
+    def test_part_of_a_tree(self):
+        soup = BeautifulSoup("<div><p>a</p></div><b>b</b>", "html.parser")
+        profile = memory_profile(soup.div)
+        assert profile.nodes["Tag"].objects == 2
+        assert "BeautifulSoup" not in profile.nodes
+        assert profile.nodes["NavigableString"].objects == 1
+
+    def test_lazy_tags_are_not_parsed(self):
+        soup = BeautifulSoup(
+            "<div><svg><g>a</g></svg></div>", "html.parser", lazy_tags=["svg"]
+        )
+        profile = memory_profile(soup)
+        assert profile.nodes["Tag"].objects == 2
+        assert "NavigableString" not in profile.nodes
+        assert profile.contents_lists.objects == 2
+        assert soup.div.contents[0].is_lazy
+
+
+class TestParseMemory:
+    def test_parse_memory(self):
+        results = parse_memory(b"<p>" * 100, ["html.parser", "no-such-parser"])
+        [usage] = results.values()
+        assert list(results) == ["html.parser"]
+        assert usage.peak >= usage.retained > 0
+        assert not tracemalloc.is_tracing()
+
+    def test_main(self, tmp_path, capsys):
+        filename = tmp_path / "doc.html"
+        filename.write_bytes(b"<p>Hello</p>")
+        assert _memory_main([str(filename)]) == 0
+        out = capsys.readouterr().out
+        assert "Memory used by the tree built by html.parser" in out
+        assert "NavigableString" in out
+        assert _memory_main(["--peak", "--parser", "html.parser", str(filename)]) == 0
+        assert "html.parser  peak" in capsys.readouterr().out
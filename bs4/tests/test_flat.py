@@ -0,0 +1,200 @@
+"""Tests of bs4.flat, the array-backed document representation."""
+
+import re
+import pytest
+
+from bs4 import BeautifulSoup
+from bs4.element import (
+    Comment,
+    Stylesheet,
+)
+from bs4.flat import (
+    FlatSoup,
+    FlatString,
+    FlatTag,
+)
+
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+)
+
+PARSERS = ["html.parser"]
+if LXML_PRESENT:
+    PARSERS.append("lxml")
+if HTML5LIB_PRESENT:
+    PARSERS.append("html5lib")
+
+DOCUMENT = (
+    "<html><head><title>A title</title><style>p {}</style></head>"
+    "<body><p class='a b' id='first'>One <b>two</b><!--a comment--> three</p>"
+    "<pre>\n  kept  </pre><p>Snow\N{SNOWMAN}</p>"
+    "<div><p class='b'><a href='/1'>1</a><a href='/2'>2</a></p></div></body></html>"
+)
+
+
+def same_node(flat, element):
+    """Does a node in a FlatSoup correspond to a node in a BeautifulSoup?"""
+    if isinstance(flat, FlatTag):
+        return flat.name == element.name and flat.attrs == element.attrs
+    return flat == element and flat.string_class is type(element)
+
+
+# An ending tag that doesn't match the current tag.
+MISNESTED = "<div><p>a</b>b</p>c</div>"
+
+
+class TestFlatSoup:
+    @pytest.mark.parametrize("features", PARSERS)
+    @pytest.mark.parametrize("markup", [DOCUMENT, MISNESTED])
+    def test_same_document_as_beautifulsoup(self, features, markup):
+        flat = FlatSoup(markup, features)
+        soup = BeautifulSoup(markup, features)
+        flat_nodes = list(flat.descendants)
+        nodes = list(soup.descendants)
+        assert len(flat_nodes) == len(nodes) == len(flat) - 1
+        for flat_node, node in zip(flat_nodes, nodes):
+            assert same_node(flat_node, node)
+            assert same_node(flat_node.parent, node.parent)
+        assert flat.get_text() == soup.get_text()
+        assert flat.root.to_tag().decode() == soup.decode()
+
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_find_all(self, features):
+        flat = FlatSoup(DOCUMENT, features)
+        soup = BeautifulSoup(DOCUMENT, features)
+        for args, kwargs in [
+            (("p",), {}),
+            ((True,), {}),
+            ((), {}),
+            (("p",), dict(class_="b")),
+            ((["a", "b"],), {}),
+            ((re.compile("^t"),), {}),
+            (("a",), dict(href="/2")),
+            ((), dict(string="two")),
+            ((), dict(string=re.compile("e"))),
+            (("p",), dict(string="Snow\N{SNOWMAN}")),
+            (("p",), dict(recursive=False)),
+            (("a",), dict(limit=1)),
+            ((lambda tag: tag.has_attr("id"),), {}),
+        ]:
+            expect = soup.find_all(*args, **kwargs)
+            found = flat.find_all(*args, **kwargs)
+            assert len(found) == len(expect)
+            for flat_node, node in zip(found, expect):
+                assert same_node(flat_node, node)
+
+    def test_tag(self):
+        flat = FlatSoup(DOCUMENT, "html.parser")
+        p = flat.p
+        assert isinstance(p, FlatTag)
+        assert p.name == "p"
+        assert p.prefix is None
+        assert p.attrs == {"class": ["a", "b"], "id": "first"}
+        assert p["id"] == "first"
+        assert p.get("class") == ["a", "b"]
+        assert p.get("missing", "default") == "default"
+        assert p.has_attr("id") and not p.has_attr("missing")
+        assert p == flat.find("p")
+        assert p != flat.find_all("p")[1]
+        assert {p, flat.find("p")} == {p}
+
+        assert [str(x) for x in p.contents] == [
+            "One ",
+            "<b>two</b>",
+            "a comment",
+            " three",
+        ]
+        assert p.b.string == "two"
+        assert p.string is None
+        assert flat.title.string == "A title"
+        assert p.get_text("|", strip=True) == "One|two|three"
+        assert p.text == "One two three"
+        assert list(p.stripped_strings) == ["One", "two", "three"]
+        assert p.get_text(types=Comment) == "a comment"
+        assert flat.style.get_text() == "p {}"
+        assert (
+            str(p) == '<p class="a b" id="first">One <b>two</b><!--a comment--> three</p>'
+        )
+
+        assert p.b.previous_sibling == "One "
+        assert p.b.next_sibling.string_class is Comment
+        assert p.next_sibling.name == "pre"
+        assert p.previous_sibling is None
+        assert flat.html.parent == flat.root
+        assert flat.root.parent is None
+
+    def test_string(self):
+        flat = FlatSoup(DOCUMENT, "html.parser")
+        string = flat.find(string="two")
+        assert isinstance(string, FlatString)
+        assert string == "two"
+        assert string.upper() == "TWO"
+        assert string.name is None
+        assert string.parent.name == "b"
+        assert string.next_sibling is None
+        assert flat.style.string.string_class is Stylesheet
+        assert string.node_index == flat.find("b").node_index + 1
+
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_text(self, features):
+        flat = FlatSoup(DOCUMENT, features)
+        assert flat.text == flat.root.text
+        assert flat.text == BeautifulSoup(DOCUMENT, features).text
+
+        # Attribute values are in the string pool, but they're not
+        # part of the text.
+        assert "first" in flat.string_pool
+        assert "first" not in flat.text
+
+    def test_to_tag(self):
+        flat = FlatSoup(DOCUMENT, "html.parser")
+        tag = flat.find("div").to_tag()
+        assert (
+            tag.decode()
+            == '<div><p class="b"><a href="/1">1</a><a href="/2">2</a></p></div>'
+        )
+        assert tag.p["class"] == ["b"]
+        assert flat.pre.to_tag().string == "\n  kept  "
+
+    @pytest.mark.parametrize("features", PARSERS)
+    def test_to_tag_keeps_whitespace(self, features):
+        # Whitespace is cleaned up once, when the document is parsed,
+        # and not again when a Tag is built.
+        markup = "<div><p>a<b>x</b>   <i>y</i>\n  \n<i>z</i></p></div>"
+        flat = FlatSoup(markup, features)
+        soup = BeautifulSoup(markup, features)
+        assert str(flat.find("p")) == str(soup.p)
+
+    def test_prefixed_names(self):
+        if not LXML_PRESENT:
+            pytest.skip("lxml is not installed")
+        markup = '<root xmlns:g="http://g/"><g:item g:a="1">x</g:item></root>'
+        flat = FlatSoup(markup, "xml")
+        soup = BeautifulSoup(markup, "xml")
+        item = flat.find("g:item")
+        assert item.name == "item"
+        assert item.prefix == "g"
+        assert item.attrs == soup.find("g:item").attrs
+        assert item.namespace == "http://g/"
+        assert item.to_tag().namespace == "http://g/"
+        assert flat.root.to_tag().decode() == soup.decode()
+
+    def test_names_are_shared(self):
+        flat = FlatSoup("<p class='x'>1</p>" * 100, "html.parser")
+        assert len(flat) == 201
+        assert flat.names == ["[document]", "p", "class"]
+        assert len(flat.find_all("p", class_="x")) == 100
+
+    def test_bytes(self):
+        flat = FlatSoup(DOCUMENT.encode("utf8"), "html.parser")
+        assert flat.original_encoding == "utf-8"
+        assert flat.find_all("p")[1].string == "Snow\N{SNOWMAN}"
+
+    def test_empty_document(self):
+        flat = FlatSoup("", "html.parser")
+        assert len(flat) == 1
+        assert flat.contents == []
+        assert flat.find_all(True) == []
+        assert flat.get_text() == ""
+        assert flat.p is None
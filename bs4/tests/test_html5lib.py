@@ -4,6 +4,7 @@ import pytest
 import warnings
 
 from bs4 import BeautifulSoup
+from bs4.element import TemplateString
 from bs4.filter import SoupStrainer
 from . import (
     HTML5LIB_PRESENT,
@@ -123,6 +124,40 @@ class TestHTML5LibBuilder(HTML5TreeBuilderSmokeTest):
         assert final_aftermath == target.next_element
         assert target == final_aftermath.previous_element
 
+    def test_strings_are_collected_before_going_into_the_tree(self):
+        # html5lib sends text in pieces. They're put together before
+        # a string is created, as with the other tree builders.
+        soup = self.soup("<p>a</a>b</a>c&amp;d</p>")
+        assert soup.p.contents == ["abc&d"]
+
+    def test_text_moved_out_of_a_table_keeps_its_container(self):
+        # The text in front of the table is foster parented into the
+        # <template>, where it joins the text already there.
+        soup = self.soup("<template>a<table>b</table></template>")
+        string, table = soup.template.contents
+        assert string == "ab"
+        assert isinstance(string, TemplateString)
+        assert table.name == "table"
+
+    @pytest.mark.parametrize(
+        "markup",
+        [
+            "<p><b><i>x</b>y</i>z</p>",
+            "<p><em>foo</p>\n<p>bar<a></a></em></p>",
+            "<table>a<tr><td>b</td></tr>c<tr>d</table>e",
+            "<b><table><i>x<td>y</b>z</table>w",
+            "<head></head><body><p>a</p><meta charset='utf-8'><p>b",
+            "<body><p>x</p></body></html><!--after-->y",
+            "<a><b><div>x</a>y</b>z</div>",
+        ],
+    )
+    def test_linkage_after_rearranging(self, markup):
+        # When html5lib rearranges the tree, the tags that are still
+        # open are tracked down before anything else is added.
+        soup = self.soup(markup)
+        self.linkage_validator(soup)
+        self.assertConnectedness(soup)
+
     def test_processing_instruction(self):
         """Processing instructions become comments."""
         markup = b"""<?PITarget PIContent?>"""
@@ -162,6 +197,20 @@ class TestHTML5LibBuilder(HTML5TreeBuilderSmokeTest):
 
         assert len(soup.find_all("p")) == 1
 
+    def test_identical_formatting_elements(self):
+        # When formatting elements are reopened, html5lib only reopens
+        # three with the same name and attributes. That depends on
+        # being able to compare attributes.
+        soup = self.soup("<p><b><b><b><b>x<p>y")
+        assert (
+            "<p><b><b><b><b>x</b></b></b></b></p><p><b><b><b>y</b></b></b></p>"
+            == "".join(p.decode() for p in soup.find_all("p"))
+        )
+        soup = self.soup('<p><b class="a"><b><b><b>x<p>y')
+        assert soup.find_all("p")[1].decode() == (
+            '<p><b class="a"><b><b><b>y</b></b></b></b></p>'
+        )
+
     def test_empty_comment(self):
         """
         Test that empty comment does not break structure.
@@ -198,12 +247,6 @@ class TestHTML5LibBuilder(HTML5TreeBuilderSmokeTest):
         assert None is soup.p.sourceline
         assert None is soup.p.sourcepos
 
-    def test_special_string_containers(self):
-        # The html5lib tree builder doesn't support this standard feature,
-        # because there's no way of knowing, when a string is created,
-        # where in the tree it will eventually end up.
-        pass
-
     def test_html5_attributes(self):
         # The html5lib TreeBuilder can convert any entity named in
         # the HTML5 spec to a sequence of Unicode characters, and
@@ -77,6 +77,196 @@ class TestHTMLParserTreeBuilder(HTMLTreeBuilderSmokeTest):
         assert None is soup.p.sourceline
         assert None is soup.p.sourcepos
 
+    def test_source_positions_are_stored_per_document(self):
+        markup = "<p>a</p>\n<p>b<b>c</b></p>"
+        soup = self.soup(markup)
+        first, second = soup.find_all("p")
+        positions = soup._document_positions
+        assert positions is not None
+        assert positions.elements == [first, second, soup.b]
+
+        # Nothing is stored on the tags themselves.
+        assert "_sourceline" not in first.__dict__
+        assert "_sourcepos" not in first.__dict__
+        assert len(first.__dict__) == len(soup.new_tag("p").__dict__)
+        assert list(positions.lines) == [1, 2, 2]
+        assert list(positions.columns) == [0, 0, 4]
+        assert list(positions.starts) == [0, 9, 13]
+        assert list(positions.ends) == [8, 25, 21]
+
+        # Line numbers can still be changed.
+        first.sourceline = 10
+        assert first.sourceline == 10
+        first.sourcepos = None
+        assert first.sourcepos is None
+
+        # The markup itself isn't kept unless you ask for it.
+        assert first.source_markup() is None
+
+    def test_source_markup(self):
+        markup = (
+            "<div id='x'>text <img src='a>b'/><br>"
+            "<p>1<i>2</i></P >3<section>open<b>bold"
+        )
+        soup = self.soup(markup, store_source_markup=True)
+        assert soup.div.source_markup() == markup
+        assert soup.img.source_markup() == "<img src='a>b'/>"
+        assert soup.br.source_markup() == "<br>"
+        assert soup.p.source_markup() == "<p>1<i>2</i></P >"
+        assert soup.i.source_markup() == "<i>2</i>"
+
+        # Tags that are never closed end at the end of the document.
+        assert soup.section.source_markup() == "<section>open<b>bold"
+        assert soup.b.source_markup() == "<b>bold"
+
+        # New tags and copies of tags don't have source markup.
+        assert soup.new_tag("a").source_markup() is None
+        assert soup.p.__copy__().source_markup() is None
+
+    def test_source_markup_for_bytes(self):
+        markup = "<p>caf\xe9 <b>x</b></p>"
+        soup = self.soup(markup.encode("utf8"), store_source_markup=True)
+        source = soup.b.source_markup()
+        assert isinstance(source, memoryview)
+        assert source.obj is soup._document_positions.raw_markup
+        assert bytes(source) == b"<b>x</b>"
+        assert bytes(soup.p.source_markup()) == markup.encode("utf8")
+
+        # A byte-order mark is accounted for.
+        soup = self.soup(
+            b"\xef\xbb\xbf" + markup.encode("utf8"), store_source_markup=True
+        )
+        assert bytes(soup.b.source_markup()) == b"<b>x</b>"
+
+        # A single-byte encoding.
+        soup = self.soup(
+            markup.encode("latin-1"),
+            from_encoding="latin-1",
+            store_source_markup=True,
+        )
+        assert bytes(soup.p.source_markup()) == markup.encode("latin-1")
+
+        # An encoding that needs a byte-order mark.
+        soup = self.soup(markup.encode("utf-16"), store_source_markup=True)
+        assert bytes(soup.b.source_markup()) == "<b>x</b>".encode("utf-16-le")
+
+    def test_source_markup_for_long_bytestring(self):
+        # Offsets are converted to byte offsets without encoding the
+        # whole document for every tag.
+        paragraphs = ["<p>caf\xe9 \u2603 <b>%d</b></p>" % i for i in range(500)]
+        soup = self.soup(
+            "".join(paragraphs).encode("utf8"), store_source_markup=True
+        )
+        positions = soup._document_positions
+        for p, expect in zip(soup.find_all("p"), paragraphs):
+            assert bytes(p.source_markup()) == expect.encode("utf8")
+        blocks = positions._block_offsets
+        assert len(blocks) == len(positions.markup) // positions.BLOCK_SIZE + 1
+
+    def test_source_positions_belong_to_the_document(self):
+        soup = self.soup("<p>a</p>\n<p>b</p>")
+        second = soup.find_all("p")[1]
+        assert second.sourceline == 2
+
+        loaded = pickle.loads(pickle.dumps(soup))
+        assert loaded.find_all("p")[1].sourceline == 2
+
+        # Once a tag is removed from its document, its position is
+        # no longer known.
+        second.extract()
+        assert second.sourceline is None
+
+    LAZY_MARKUP = """<html><body><p>a</p>
+<svg data-x="a>b"><g><svg><path d="x"/></svg><text>T &amp; U</text></g><!-- </svg> --></svg>
+<script>{"a": "<div>&amp;"}</script><pre><div class="big">
+ <b>x</b>  </div></pre><!-- <div> --><div><div>nested</div> tail</div><p>z</p></body></html>"""
+
+    def test_lazy_tags_produce_the_same_tree(self):
+        lazy_tags = ["svg", "script", "div"]
+        eager = self.soup(self.LAZY_MARKUP)
+        soup = self.soup(self.LAZY_MARKUP, lazy_tags=lazy_tags)
+        assert soup.decode() == eager.decode()
+
+        # Source positions refer to the original document.
+        soup = self.soup(
+            self.LAZY_MARKUP, lazy_tags=lazy_tags, store_source_markup=True
+        )
+        assert soup == eager
+        for tag, eager_tag in zip(soup.find_all(True), eager.find_all(True)):
+            assert (tag.sourceline, tag.sourcepos) == (
+                eager_tag.sourceline,
+                eager_tag.sourcepos,
+            )
+        assert soup.find("text").source_markup() == "<text>T &amp; U</text>"
+
+        # The contents of <script> and <pre> are handled as usual.
+        soup = self.soup(self.LAZY_MARKUP, lazy_tags=lazy_tags)
+        assert soup.script.contents == eager.script.contents
+        assert type(soup.script.contents[0]) is type(eager.script.contents[0])
+        assert soup.pre.div.contents == eager.pre.div.contents
+
+    def test_lazy_tags_are_parsed_when_needed(self):
+        soup = self.soup(self.LAZY_MARKUP, lazy_tags=["svg", "script"])
+        body = soup.html.contents[0]
+        svg, script = body.contents[2], body.contents[4]
+        assert svg.is_lazy and script.is_lazy
+        assert body.p.string == "a"
+        assert svg.is_lazy
+
+        # Looking at a tag's contents parses them, but tags within
+        # the contents stay lazy.
+        assert svg.contents[0].name == "g"
+        assert not svg.is_lazy
+        inner = svg.contents[0].contents[0]
+        assert inner.name == "svg" and inner.is_lazy
+
+        # So does any kind of search that goes inside the tag.
+        assert [x.name for x in inner.descendants] == ["path"]
+        assert script.is_lazy
+        assert soup.find_all(string=lambda x: "&amp;" in x) == [
+            '{"a": "<div>&amp;"}'
+        ]
+        assert not script.is_lazy
+
+        soup = self.soup(self.LAZY_MARKUP, lazy_tags=["svg"])
+        assert soup.find("p", string="z").find_previous("path")["d"] == "x"
+
+        soup = self.soup(self.LAZY_MARKUP, lazy_tags=["svg"])
+        assert soup.select("svg svg path") == [soup.find("path")]
+
+    def test_parsing_a_lazy_tag_does_not_change_the_tree(self):
+        soup = self.soup(self.LAZY_MARKUP, lazy_tags=["svg"])
+        changes = []
+        soup.add_mutation_listener(lambda element, change: changes.append(change))
+        generation = soup.generation
+        svg = soup.html.contents[0].contents[2]
+        assert svg.is_lazy
+        assert svg.contents[0].name == "g"
+        assert soup.generation == generation
+        assert changes == []
+
+        # The new elements are linked into the rest of the document.
+        eager = self.soup(self.LAZY_MARKUP)
+        assert [x.name for x in svg.next_elements] == [
+            x.name for x in eager.svg.next_elements
+        ]
+        script = soup.script
+        assert [x.name for x in script.previous_elements] == [
+            x.name for x in eager.script.previous_elements
+        ]
+
+    def test_lazy_tag_false_alarms(self):
+        # Things that look like a lazy tag, but aren't, are parsed
+        # as usual.
+        markup = "<!-- <svg> --><p>a</p><script>'<svg>'</script><svg/><p>b</p>"
+        soup = self.soup(markup, lazy_tags=["svg"])
+        assert soup.decode() == self.soup(markup).decode()
+        assert not any(x.is_lazy for x in soup.find_all(True))
+
+        # An unclosed lazy tag runs to the end of the document.
+        soup = self.soup("<svg><g>a<g>b", lazy_tags=["svg"])
+        assert soup.svg.decode() == "<svg><g>a<g>b</g></g></svg>"
+
     def test_on_duplicate_attribute(self):
         # The html.parser tree builder has a variety of ways of
         # handling a tag that contains the same attribute multiple times.
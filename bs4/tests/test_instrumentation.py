@@ -0,0 +1,187 @@
+"""Tests of bs4.instrumentation."""
+
+from contextlib import contextmanager
+import pytest
+import warnings
+
+from bs4 import (
+    BeautifulSoup,
+    SoupFactory,
+    UnicodeDammit,
+    XMLParsedAsHTMLWarning,
+    instrumentation,
+)
+from bs4.instrumentation import (
+    AggregatingSink,
+    Event,
+)
+
+
+@pytest.fixture
+def events():
+    events = []
+    instrumentation.add_sink(events.append)
+    yield events
+    instrumentation.remove_sink(events.append)
+
+
+class TestInstrumentation:
+    def test_disabled_by_default(self):
+        assert instrumentation.enabled is False
+
+    def test_parse(self, events):
+        markup = "<p>caf\N{LATIN SMALL LETTER E WITH ACUTE}</p>".encode("utf8")
+        soup = BeautifulSoup(markup, "html.parser")
+        detect_encoding, parse = sorted(events, key=lambda e: e.operation)
+        assert parse.operation == "parse"
+        assert parse.size == len(markup)
+        assert parse.outcome == "ok"
+        assert parse.details == dict(parser="html.parser")
+        assert detect_encoding.operation == "detect_encoding"
+        assert detect_encoding.details == dict(encoding="utf-8")
+        assert soup.original_encoding == "utf-8"
+
+        # The operations are finished in this order.
+        assert [e.operation for e in events] == ["detect_encoding", "parse"]
+        assert parse.seconds >= detect_encoding.seconds
+
+        # Searching the tree is an operation too.
+        assert soup.p.string == "caf\N{LATIN SMALL LETTER E WITH ACUTE}"
+        assert events[-1].operation == "find_all"
+
+        factory = SoupFactory("html.parser")
+        del events[:]
+        factory.parse("<p>")
+        assert [e.operation for e in events] == ["parse"]
+        assert UnicodeDammit(b"abc").unicode_markup == "abc"
+        assert events[-1].operation == "detect_encoding"
+
+    def test_queries(self, events):
+        soup = BeautifulSoup("<p><a>1</a><a>2</a></p>", "html.parser")
+        del events[:]
+        assert len(soup.find_all("a")) == 2
+        assert soup.find("p").name == "p"
+        assert len(soup.select("p a")) == 2
+        assert soup.select_one("b") is None
+        assert [(e.operation, e.size) for e in events] == [
+            ("find_all", 2),
+            ("find_all", 1),
+            ("select", 2),
+            ("select", 0),
+        ]
+        assert events[2].details == dict(selector="p a")
+
+    def test_serialization(self, events):
+        soup = BeautifulSoup("<p>\N{SNOWMAN}</p>", "html.parser")
+        del events[:]
+        assert soup.decode() == "<p>\N{SNOWMAN}</p>"
+        assert str(soup.p) == "<p>\N{SNOWMAN}</p>"
+        soup.find("p").encode("utf8")
+        soup.prettify()
+        # A decode() inside an encode() isn't reported separately.
+        assert [(e.operation, e.size) for e in events] == [
+            ("decode", 8),
+            ("find_all", 1),
+            ("decode", 8),
+            ("find_all", 1),
+            ("encode", 10),
+            ("decode", 12),
+        ]
+
+    def test_failure(self, events):
+        soup = BeautifulSoup("<p>", "html.parser")
+        del events[:]
+        with pytest.raises(Exception):
+            soup.select("p[")
+        [event] = events
+        assert event.outcome == "error"
+        assert event.size is None
+        assert "exception" in event.details
+
+    def test_warnings_point_at_the_caller(self, events):
+        soup = BeautifulSoup("<p>", "html.parser")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            soup.find_all(text="x")
+        [warning] = w
+        assert warning.filename == __file__
+
+        # Including warnings issued while parsing.
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            BeautifulSoup('<?xml version="1.0"?><root></root>', "html.parser")
+        [warning] = w
+        assert isinstance(warning.message, XMLParsedAsHTMLWarning)
+        assert warning.filename == __file__
+        assert events[-1].operation == "parse"
+
+    def test_span_factory(self):
+        spans = []
+
+        @contextmanager
+        def span(operation, details):
+            spans.append(("start", operation))
+            yield
+            spans.append(("end", operation, dict(details)))
+
+        instrumentation.add_span_factory(span)
+        try:
+            assert instrumentation.enabled
+            BeautifulSoup("<p>", "html.parser").find_all("p")
+        finally:
+            instrumentation.remove_span_factory(span)
+        assert not instrumentation.enabled
+        assert spans == [
+            ("start", "parse"),
+            ("end", "parse", dict(parser="html.parser")),
+            ("start", "find_all"),
+            ("end", "find_all", dict(tag="[document]")),
+        ]
+
+    def test_remove_unknown_sink(self):
+        with pytest.raises(ValueError):
+            instrumentation.remove_sink(print)
+
+
+class TestAggregatingSink:
+    def test_render(self):
+        sink = AggregatingSink(buckets=[0.5, 1])
+        sink(Event("parse", 0.25, 100, "ok", {}))
+        sink(Event("parse", 0.75, 50, "ok", {}))
+        sink(Event("find_all", 2, None, "error", {}))
+        assert sink.count("parse") == 2
+        assert sink.count("parse", "error") == 0
+        assert sink.render() == "\n".join(
+            [
+                "# HELP bs4_operation_seconds Time spent in Beautiful Soup operations.",
+                "# TYPE bs4_operation_seconds histogram",
+                'bs4_operation_seconds_bucket{operation="find_all",outcome="error",le="0.5"} 0',
+                'bs4_operation_seconds_bucket{operation="find_all",outcome="error",le="1.0"} 0',
+                'bs4_operation_seconds_bucket{operation="find_all",outcome="error",le="+Inf"} 1',
+                'bs4_operation_seconds_sum{operation="find_all",outcome="error"} 2.0',
+                'bs4_operation_seconds_count{operation="find_all",outcome="error"} 1',
+                'bs4_operation_seconds_bucket{operation="parse",outcome="ok",le="0.5"} 1',
+                'bs4_operation_seconds_bucket{operation="parse",outcome="ok",le="1.0"} 2',
+                'bs4_operation_seconds_bucket{operation="parse",outcome="ok",le="+Inf"} 2',
+                'bs4_operation_seconds_sum{operation="parse",outcome="ok"} 1.0',
+                'bs4_operation_seconds_count{operation="parse",outcome="ok"} 2',
+                "# HELP bs4_operation_size Size of the input or output of Beautiful Soup operations.",
+                "# TYPE bs4_operation_size summary",
+                'bs4_operation_size_sum{operation="find_all",outcome="error"} 0',
+                'bs4_operation_size_count{operation="find_all",outcome="error"} 1',
+                'bs4_operation_size_sum{operation="parse",outcome="ok"} 150',
+                'bs4_operation_size_count{operation="parse",outcome="ok"} 2',
+                "",
+            ]
+        )
+
+    def test_live(self):
+        sink = AggregatingSink()
+        instrumentation.add_sink(sink)
+        try:
+            BeautifulSoup("<p>", "html.parser").find_all("p")
+        finally:
+            instrumentation.remove_sink(sink)
+        assert sink.count("parse") == 1
+        assert sink.count("find_all") == 1
+        assert 'operation="find_all"' in sink.render()
@@ -0,0 +1,114 @@
+"""Tests of bs4.limits, limits on the resources used by parsing."""
+
+from io import BytesIO
+import pickle
+import pytest
+
+from bs4 import (
+    BeautifulSoup,
+    ParseLimitExceeded,
+    ParseLimits,
+    SoupFactory,
+)
+from bs4.builder import builder_registry
+
+PARSERS = [
+    parser
+    for parser in ("html.parser", "lxml", "lxml-xml", "html5lib")
+    if builder_registry.lookup(parser) is not None
+]
+
+MARKUP = "<div>" * 50 + "<p>x</p>" * 100
+
+
+class TestParseLimits:
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            ParseLimits(max_nodes=-1)
+        with pytest.raises(ValueError):
+            ParseLimits(on_breach="ignore")
+        with pytest.raises(ValueError):
+            ParseLimits(check_interval=0)
+        assert repr(ParseLimits(max_depth=3)) == (
+            "ParseLimits(max_depth=3, on_breach='raise')"
+        )
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    def test_within_limits(self, parser):
+        limits = ParseLimits(
+            max_nodes=1000, max_depth=100, max_input_bytes=10000, max_seconds=60
+        )
+        soup = BeautifulSoup(MARKUP, parser, limits=limits)
+        assert len(soup.find_all("p")) == 100
+        assert soup.parse_limit_exceeded is None
+        assert soup._limit_checker is None
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    @pytest.mark.parametrize(
+        "limit,value", [("max_nodes", 20), ("max_depth", 10), ("max_input_bytes", 30)]
+    )
+    def test_raise(self, parser, limit, value):
+        limits = ParseLimits(**{limit: value})
+        with pytest.raises(ParseLimitExceeded) as e:
+            BeautifulSoup(MARKUP, parser, limits=limits)
+        assert e.value.limit == limit
+        assert e.value.value == value
+        assert limit in str(e.value)
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    def test_truncate(self, parser):
+        limits = ParseLimits(max_nodes=20, on_breach=ParseLimits.TRUNCATE)
+        soup = BeautifulSoup(MARKUP, parser, limits=limits)
+        assert soup.parse_limit_exceeded.limit == "max_nodes"
+        assert len(list(soup.descendants)) == 20
+        # The partial tree is a normal, well-formed tree.
+        assert soup.find_all("div")[-1].next_element is None
+        assert BeautifulSoup(soup.decode(), parser).decode() == soup.decode()
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    def test_max_depth_truncate(self, parser):
+        limits = ParseLimits(max_depth=10, on_breach=ParseLimits.TRUNCATE)
+        soup = BeautifulSoup(MARKUP, parser, limits=limits)
+        assert soup.parse_limit_exceeded.limit == "max_depth"
+        assert not soup.find_all("p")
+        assert max(len(list(tag.parents)) for tag in soup.find_all(True)) <= 10
+
+    def test_max_nodes_counts_strings(self):
+        limits = ParseLimits(max_nodes=4)
+        BeautifulSoup("<p>a<!--b-->c</p>", "html.parser", limits=limits)
+        with pytest.raises(ParseLimitExceeded):
+            BeautifulSoup("<p>a<!--b-->c<b></b></p>", "html.parser", limits=limits)
+
+    def test_max_input_bytes(self):
+        limits = ParseLimits(max_input_bytes=10, on_breach=ParseLimits.TRUNCATE)
+        soup = BeautifulSoup(b"<p>abcdefghijklmnop</p>", "html.parser", limits=limits)
+        assert soup.p.string == "abcdefg"
+        assert soup.parse_limit_exceeded.limit == "max_input_bytes"
+
+        # Only as much of a file as is needed is read.
+        f = BytesIO(b"<p>abcdefghijklmnop</p>")
+        soup = BeautifulSoup(f, "html.parser", limits=limits)
+        assert f.tell() == 11
+        assert soup.p.string == "abcdefg"
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    def test_max_seconds(self, parser):
+        limits = ParseLimits(max_seconds=0, check_interval=1)
+        with pytest.raises(ParseLimitExceeded) as e:
+            BeautifulSoup(MARKUP, parser, limits=limits)
+        assert e.value.limit == "max_seconds"
+
+    def test_soup_factory(self):
+        factory = SoupFactory("html.parser", limits=ParseLimits(max_nodes=5))
+        assert factory.parse("<p>a</p>").p.string == "a"
+        with pytest.raises(ParseLimitExceeded):
+            factory.parse(MARKUP)
+        with pytest.raises(ParseLimitExceeded):
+            factory.parse(BytesIO(MARKUP.encode("utf8")))
+
+    def test_pickle(self):
+        limits = ParseLimits(max_nodes=5, on_breach=ParseLimits.TRUNCATE)
+        soup = BeautifulSoup(MARKUP, "html.parser", limits=limits)
+        copy = pickle.loads(pickle.dumps(soup))
+        assert copy.decode() == soup.decode()
+        assert copy.parse_limit_exceeded.limit == "max_nodes"
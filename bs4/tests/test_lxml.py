@@ -1,5 +1,6 @@
 """Tests to ensure that the lxml tree builder generates good trees."""
 
+import mmap
 import pickle
 import pytest
 import warnings
@@ -9,8 +10,10 @@ if LXML_PRESENT:
     from bs4.builder._lxml import LXMLTreeBuilder, LXMLTreeBuilderForXML
 
 from bs4 import (
+    BeautifulSoup,
     BeautifulStoneSoup,
 )
+from bs4.limits import ParseLimits
 from . import (
     HTMLTreeBuilderSmokeTest,
     XMLTreeBuilderSmokeTest,
@@ -194,3 +197,68 @@ class TestLXMLXMLTreeBuilder(XMLTreeBuilderSmokeTest):
         assert "some markup" == unpickled.a.string
         assert unpickled.builder != soup.builder
         assert isinstance(unpickled.builder, self.default_builder)
+
+
+@pytest.mark.skipif(
+    not LXML_PRESENT,
+    reason="lxml seems not to be present, not testing how it's fed.",
+)
+class TestLXMLFeeding:
+    """Tests of how a document is fed to lxml, a piece at a time."""
+
+    # Enough markup for several pieces, with multibyte characters
+    # that end up split between pieces.
+    MARKUP = (
+        "<root>"
+        + "<p>caf\N{LATIN SMALL LETTER E WITH ACUTE} \N{SNOWMAN}</p>" * 2000
+        + "</root>"
+    )
+
+    def test_chunk_size(self):
+        builder = LXMLTreeBuilderForXML()
+        assert builder.chunk_size(0) == builder.CHUNK_SIZE
+        assert builder.chunk_size(1024 * 1024) == 64 * 1024
+        assert builder.chunk_size(1024**3) == builder.MAX_CHUNK_SIZE
+
+    @pytest.mark.parametrize("parser", ["lxml", "lxml-xml"])
+    def test_buffers(self, parser, tmp_path):
+        data = self.MARKUP.encode("utf8")
+        expect = BeautifulSoup(data, parser).decode()
+        assert len(BeautifulSoup(data, parser).find_all("p")) == 2000
+        assert BeautifulSoup(self.MARKUP, parser).decode() == expect
+        assert BeautifulSoup(memoryview(data), parser).decode() == expect
+        assert BeautifulSoup(bytearray(data), parser).decode() == expect
+
+        path = tmp_path / "doc.xml"
+        path.write_bytes(data)
+        with open(path, "rb") as f:
+            assert BeautifulSoup(f, parser).decode() == expect
+            # The file was mapped into memory rather than read, but
+            # it's left where reading it would have left it.
+            assert f.tell() == len(data)
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                assert BeautifulSoup(mapped, parser).decode() == expect
+
+    def test_mapped_file_with_limit(self, tmp_path):
+        path = tmp_path / "doc.xml"
+        path.write_bytes(self.MARKUP.encode("utf8"))
+        limits = ParseLimits(max_input_bytes=1000, on_breach=ParseLimits.TRUNCATE)
+        with open(path, "rb") as f:
+            soup = BeautifulSoup(f, "lxml-xml", limits=limits)
+            assert f.tell() == 1001
+        assert soup.parse_limit_exceeded.limit == "max_input_bytes"
+        assert 0 < len(soup.find_all("p")) < 100
+
+    def test_file_that_cant_be_mapped(self, tmp_path):
+        # An empty file can't be mapped, so it's read instead.
+        path = tmp_path / "empty.xml"
+        path.write_bytes(b"")
+        with open(path, "rb") as f:
+            soup = BeautifulSoup(f, "lxml-xml")
+        assert soup.contents == []
+
+    def test_buffer_is_copied_for_other_parsers(self):
+        data = memoryview(b"<p>caf\xc3\xa9</p>")
+        soup = BeautifulSoup(data, "html.parser")
+        assert soup.p.string == "caf\N{LATIN SMALL LETTER E WITH ACUTE}"
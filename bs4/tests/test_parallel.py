@@ -0,0 +1,254 @@
+"""Tests of bs4.parallel, which parses documents in worker processes."""
+
+import os
+import pytest
+import subprocess
+import sys
+
+from bs4 import (
+    BeautifulSoup,
+    Tag,
+    parse_many,
+)
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.exceptions import ParserRejectedMarkup
+from bs4.parallel import (
+    ParseResult,
+    _find_records,
+    _plan_chunks,
+    parse_records,
+)
+
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+)
+
+
+def title(soup):
+    return soup.title.string
+
+
+def worker_and_title(soup):
+    return os.getpid(), soup.title.string
+
+
+def tag_names(soup):
+    return [tag.name for tag in soup.find_all(True)]
+
+
+class PickyTreeBuilder(HTMLParserTreeBuilder):
+    """Rejects any document that mentions the word 'reject'."""
+
+    def feed(self, markup):
+        if "reject" in markup:
+            raise ParserRejectedMarkup("I don't like this document.")
+        super(PickyTreeBuilder, self).feed(markup)
+
+
+def documents(count):
+    for i in range(count):
+        yield "<html><title>Document %d</title><p>text</p></html>" % i
+
+
+class TestParseMany:
+    @pytest.mark.parametrize("chunksize", [1, 3, 100])
+    def test_results_in_input_order(self, chunksize):
+        results = list(
+            parse_many(
+                documents(20),
+                "html.parser",
+                extract=title,
+                processes=2,
+                chunksize=chunksize,
+            )
+        )
+        assert [r.index for r in results] == list(range(20))
+        assert [r.value for r in results] == ["Document %d" % i for i in range(20)]
+        assert all(r.ok for r in results)
+
+    def test_results_in_completion_order(self):
+        results = list(
+            parse_many(documents(20), "html.parser", extract=title, processes=3, ordered=False)
+        )
+        assert sorted(r.index for r in results) == list(range(20))
+        for r in results:
+            assert r.value == "Document %d" % r.index
+
+    def test_work_is_spread_across_processes(self):
+        results = parse_many(
+            documents(50), "html.parser", extract=worker_and_title, processes=2
+        )
+        pids = set(r.value[0] for r in results)
+        assert os.getpid() not in pids
+        assert 1 <= len(pids) <= 2
+
+    def test_builder_configuration_passed_to_workers(self):
+        markups = ["<p><b>bold</b></p>", b"<p>\xe9</p>"]
+        [a, b] = parse_many(
+            markups,
+            builder=HTMLParserTreeBuilder,
+            extract=tag_names,
+            processes=1,
+            from_encoding="latin-1",
+        )
+        assert a.value == ["p", "b"]
+        assert b.value == ["p"]
+
+    def test_rejected_markup_reported_per_item(self):
+        markups = ["<title>one</title>", "<title>reject</title>", "<title>three</title>"]
+        results = list(
+            parse_many(markups, builder=PickyTreeBuilder, extract=title, processes=2)
+        )
+        assert [r.value for r in results] == ["one", None, "three"]
+        assert [r.ok for r in results] == [True, False, True]
+        assert isinstance(results[1].error, ParserRejectedMarkup)
+        assert "I don't like this document." in str(results[1].error)
+
+    def test_import_does_not_import_multiprocessing(self):
+        script = (
+            "import sys; import bs4; print('multiprocessing' in sys.modules); "
+            "bs4.parse_many; print('multiprocessing' in sys.modules)"
+        )
+        output = subprocess.check_output([sys.executable, "-c", script])
+        assert output.split() == [b"False", b"True"]
+
+    def test_other_exceptions_propagate(self):
+        # <p> has no <title>, so title() raises AttributeError.
+        with pytest.raises(AttributeError):
+            list(parse_many(["<p>"], "html.parser", extract=title, processes=1))
+
+    def test_extract_is_required(self):
+        with pytest.raises(TypeError):
+            parse_many(["<p>"], "html.parser")
+
+    def test_empty_input(self):
+        assert list(parse_many([], "html.parser", extract=title, processes=1)) == []
+
+    def test_repr(self):
+        assert repr(ParseResult(1, "value")) == "<ParseResult 1: 'value'>"
+
+
+CATALOG = (
+    "<html><head><title>Catalog</title></head><body><table id='catalog'>"
+    + "".join(
+        "\n <tr class='row r%d'><td>Widget &amp; %d<!-- <tr> --></td>"
+        "<td><script>if (a < b) { '<tr>' }</script><br>%d.99</td></tr>" % (i, i, i)
+        for i in range(200)
+    )
+    + "<tr><td>last</td></tr>\n</table><p>Footer</p></body></html>"
+)
+
+XML_CATALOG = (
+    '<?xml version="1.0" encoding="utf-8"?>\n<catalog xmlns:g="http://g/">\n'
+    + "".join(
+        '<g:item g:id="%d"><name xmlns:h="http://h/"><h:n>%d</h:n></name></g:item>\n' % (i, i)
+        for i in range(200)
+    )
+    + "</catalog>"
+)
+
+
+def element_chain(soup):
+    """Describe every element in document order, following both
+    .next_element and .previous_element, and make sure they agree.
+    """
+    forward = []
+    element = soup.contents[0] if soup.contents else None
+    while element is not None:
+        forward.append(element)
+        element = element.next_element
+    backward = []
+    element = soup._last_descendant()
+    while element is not None and element is not soup:
+        backward.append(element)
+        element = element.previous_element
+    assert forward == list(reversed(backward))
+    assert forward == list(soup.descendants)
+    for element in forward:
+        siblings = element.parent.contents
+        index = element.parent.index(element)
+        expect_previous = siblings[index - 1] if index > 0 else None
+        expect_next = siblings[index + 1] if index + 1 < len(siblings) else None
+        assert element.previous_sibling is expect_previous
+        assert element.next_sibling is expect_next
+    return [(type(x), getattr(x, "name", None) or str(x)) for x in forward]
+
+
+class TestParseRecords:
+    @pytest.mark.parametrize(
+        "features,markup,record_tag",
+        [("html.parser", CATALOG, "tr")]
+        + (
+            [("lxml", CATALOG, "TR"), ("xml", XML_CATALOG, "g:item")]
+            if LXML_PRESENT
+            else []
+        ),
+        ids=lambda x: x if len(x) < 20 else None,
+    )
+    def test_same_tree_as_serial_parse(self, features, markup, record_tag):
+        for data in (markup, markup.encode("utf8")):
+            expect = BeautifulSoup(data, features)
+            soup = parse_records(data, record_tag, features, processes=2)
+            assert soup.decode() == expect.decode()
+            assert element_chain(soup) == element_chain(expect)
+            assert soup.original_encoding == expect.original_encoding
+            assert soup._namespaces == expect._namespaces
+
+    def test_records_were_split(self):
+        records = _find_records(CATALOG, "tr", False)
+        # The <tr> inside the comment and the script are ignored.
+        assert len(records) == 201
+        assert len(_plan_chunks(CATALOG, records, 8)) == 8
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_namespaces_usable_in_selectors(self):
+        soup = parse_records(XML_CATALOG, "g:item", "xml", processes=2)
+        assert len(soup.select("g|item")) == 200
+        assert soup.select_one("g|item:nth-of-type(150) h|n").string == "149"
+
+    def test_configuration_applied_to_every_record(self):
+        class MyTag(Tag):
+            pass
+
+        soup = parse_records(
+            CATALOG,
+            "tr",
+            "html.parser",
+            processes=2,
+            element_classes={Tag: MyTag},
+            multi_valued_attributes=None,
+        )
+        rows = soup.find_all("tr")
+        assert all(isinstance(row, MyTag) for row in rows)
+        assert rows[150]["class"] == "row r150"
+        assert rows[150].script.string.__class__.__name__ == "Script"
+
+    @pytest.mark.parametrize(
+        "markup,record_tag",
+        [
+            # The records aren't closed.
+            ("<table>" + "<tr><td>x" * 20 + "</table>", "tr"),
+            # Something other than whitespace separates the records.
+            ("<div>" + "<p>x</p><hr>" * 20 + "</div>", "p"),
+            # There's only one top-level record.
+            ("<div>" + "<div><div>x</div></div>" * 20 + "</div>", "div"),
+            # No records at all.
+            ("<p>no records</p>", "tr"),
+        ],
+    )
+    def test_fallback_to_serial_parse(self, markup, record_tag):
+        expect = BeautifulSoup(markup, "html.parser")
+        soup = parse_records(markup, record_tag, "html.parser", processes=2)
+        assert soup.decode() == expect.decode()
+
+    @pytest.mark.skipif(not HTML5LIB_PRESENT, reason="html5lib not installed")
+    def test_html5lib_parses_serially(self):
+        expect = BeautifulSoup(CATALOG, "html5lib")
+        soup = parse_records(CATALOG, "tr", "html5lib", processes=2)
+        assert soup.decode() == expect.decode()
+
+    def test_nested_records_are_not_split(self):
+        markup = "<div>" + "<div><div>x</div></div>\n" * 20 + "</div>"
+        records = _find_records(markup, "div", False)
+        assert records == [(0, len(markup))]
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Tests of Beautiful Soup as a whole."""
 
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import pickle
 import pytest
@@ -9,9 +10,11 @@ from typing import Iterable
 from bs4 import (
     BeautifulSoup,
     GuessedAtParserWarning,
+    SoupFactory,
     dammit,
 )
 from bs4.builder import (
+    HTMLParserTreeBuilder,
     TreeBuilder,
 )
 from bs4.element import (
@@ -23,11 +26,14 @@ from bs4.element import (
     NavigableString,
 )
 from bs4.filter import SoupStrainer
+from bs4.replacer import SoupReplacer
 from bs4.exceptions import (
+    FrozenTreeError,
     ParserRejectedMarkup,
 )
 from bs4._warnings import (
     MarkupResemblesLocatorWarning,
+    XMLParsedAsHTMLWarning,
 )
 
 
@@ -35,6 +41,7 @@ from . import (
     default_builder,
     LXML_PRESENT,
     SoupTest,
+    parse_cost_before_and_after,
 )
 import warnings
 from typing import Type
@@ -527,6 +534,158 @@ class TestNewString(SoupTest):
         assert isinstance(s, Comment)
 
 
+class TestSoupFactory(SoupTest):
+    def test_same_results_as_constructor(self):
+        factory = SoupFactory(builder=self.default_builder)
+        for markup in ["<p>one</p>", b"<b>two &amp; three</b>", "", "plain text"]:
+            soup = factory.parse(markup)
+            assert isinstance(soup, BeautifulSoup)
+            assert soup.decode() == self.soup(markup).decode()
+        # Each document gets its own BeautifulSoup object, but they
+        # all share the factory's tree builder.
+        a = factory.parse("<a>")
+        b = factory.parse("<b>")
+        assert a.builder is b.builder is factory.builder
+        assert a.find("a") is not None and a.find("b") is None
+        assert a.builder.soup is None
+
+    def test_configuration_applies_to_every_document(self):
+        class MyTag(Tag):
+            pass
+
+        factory = SoupFactory(
+            "html.parser",
+            parse_only=SoupStrainer("b"),
+            element_classes={Tag: MyTag},
+            replacer=SoupReplacer("b", "strong"),
+            multi_valued_attributes=None,
+        )
+        for markup in ['<p>x<b class="a b">y</b></p>', '<b class="c d">z</b>']:
+            soup = factory.parse(markup)
+            tag = soup.contents[0]
+            assert isinstance(tag, MyTag)
+            assert tag.name == "strong"
+            assert isinstance(tag["class"], str)
+
+    def test_arguments_checked_once(self):
+        with warnings.catch_warnings(record=True) as w:
+            factory = SoupFactory("html.parser", convertEntities=True)
+            factory.parse("<p>")
+            factory.parse("http://example.com/")
+        # The warning about the argument is issued when the factory is
+        # created, and there's no check for markup that looks like
+        # a URL.
+        assert len(w) == 1
+        assert "convertEntities" in str(w[0].message)
+
+    def test_encoding(self):
+        factory = SoupFactory("html.parser")
+        soup = factory.parse(
+            "<p>Sacr\N{LATIN SMALL LETTER E WITH ACUTE} bleu</p>".encode("latin-1"),
+            from_encoding="latin-1",
+        )
+        assert soup.original_encoding == "latin-1"
+        assert soup.p.string == "Sacr\N{LATIN SMALL LETTER E WITH ACUTE} bleu"
+
+    def test_invalid_markup_type(self):
+        with pytest.raises(TypeError):
+            SoupFactory("html.parser").parse(3)
+
+
+class TestParseStats(SoupTest):
+    def test_stats_not_collected_by_default(self):
+        soup = self.soup("<p>a</p>")
+        assert soup.parse_stats is None
+        assert "handle_starttag" not in soup.__dict__
+
+    def test_stats(self):
+        markup = "<div><p>ab<b>cd</b></p><!--e--></div>"
+        soup = BeautifulSoup(
+            markup.encode("utf8"), "html.parser", collect_stats=True
+        )
+        stats = soup.parse_stats
+        assert stats.strategies_tried == 1
+        assert (stats.tags, stats.strings, stats.max_depth) == (3, 3, 3)
+        assert stats.bytes_in == len(markup)
+        assert stats.characters_out == 5
+        assert stats.replacer_calls == 0
+        for time in (
+            stats.total_time,
+            stats.encoding_time,
+            stats.tokenizing_time,
+            stats.tree_building_time,
+        ):
+            assert 0 <= time <= stats.total_time
+        assert stats.rejected_time == 0
+        assert "tags=3" in repr(stats)
+
+        # The timing wrappers are gone once parsing is done.
+        assert "handle_starttag" not in soup.__dict__
+        pickle.loads(pickle.dumps(soup))
+
+        stats = BeautifulSoup(markup, "html.parser", collect_stats=True).parse_stats
+        assert stats.bytes_in is None
+
+    def test_replacer_calls(self):
+        soup = BeautifulSoup(
+            "<p><b>a</b><b>b</b></p>",
+            "html.parser",
+            replacer=SoupReplacer("b", "i"),
+            collect_stats=True,
+        )
+        assert soup.find_all("i") == soup.find_all(True)[1:]
+        # Each tag is seen once at its start tag and once at its end tag.
+        assert soup.parse_stats.replacer_calls == 6
+        assert soup.parse_stats.replacer_time <= soup.parse_stats.total_time
+
+    def test_rejected_strategies(self):
+        class Picky(HTMLParserTreeBuilder):
+            def prepare_markup(self, markup, *args, **kwargs):
+                yield "reject me", None, None, False
+                yield markup, None, None, False
+
+            def feed(self, markup):
+                if markup == "reject me":
+                    raise ParserRejectedMarkup("Nope.")
+                super(Picky, self).feed(markup)
+
+        soup = BeautifulSoup("<p>a</p>", builder=Picky, collect_stats=True)
+        assert soup.p.string == "a"
+        assert soup.parse_stats.strategies_tried == 2
+        assert soup.parse_stats.rejected_time > 0
+
+    def test_lazy_tags_are_not_parsed(self):
+        soup = BeautifulSoup(
+            "<div><table><tr><td>a</td></tr></table></div>",
+            "html.parser",
+            lazy_tags=["table"],
+            collect_stats=True,
+        )
+        # The <table> is counted, but what's inside it isn't parsed.
+        assert soup.parse_stats.tags == 2
+        assert soup.div.contents[0].is_lazy
+        assert soup.find("td").string == "a"
+
+    @pytest.mark.parametrize("root", ["<root/>", "<root></root>"])
+    def test_warnings_point_at_the_caller(self, root):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            BeautifulSoup(
+                '<?xml version="1.0"?>' + root, "html.parser", collect_stats=True
+            )
+        [warning] = w
+        assert isinstance(warning.message, XMLParsedAsHTMLWarning)
+        assert warning.filename == __file__
+
+    def test_factory(self):
+        factory = SoupFactory("html.parser", collect_stats=True)
+        first = factory.parse("<p>a</p>")
+        second = factory.parse("<p>a</p><p>b</p>")
+        assert first.parse_stats.tags == 1
+        assert second.parse_stats.tags == 2
+        assert SoupFactory("html.parser").parse("<p>").parse_stats is None
+
+
 class TestPickle(SoupTest):
     # Test our ability to pickle the BeautifulSoup object itself.
 
@@ -546,6 +705,128 @@ class TestPickle(SoupTest):
         assert "some markup" == unpickled.string
 
 
+class TestFreeze(SoupTest):
+    MARKUP = (
+        '<div id="main" class="a b"><p class="a">1 <b>bold</b></p>'
+        '<p id="x">2</p></div><div class="b"><p>3</p><b id="x">4</b></div>'
+    )
+
+    def test_frozen_tree_cannot_be_modified(self):
+        soup = self.soup(self.MARKUP)
+        original = soup.decode()
+        assert not soup.is_frozen
+        soup.freeze()
+        assert soup.is_frozen
+        p = soup.p
+        new = soup.new_tag("i")
+        for mutate in (
+            lambda: p.extract(),
+            lambda: p.decompose(),
+            lambda: p.b.string.extract(),
+            lambda: p.insert(0, new),
+            lambda: p.append("text"),
+            lambda: p.insert_before(new),
+            lambda: p.insert_after(new),
+            lambda: p.replace_with(new),
+            lambda: p.b.unwrap(),
+            lambda: p.wrap(new),
+            lambda: p.clear(),
+            lambda: p.smooth(),
+            lambda: p.__setitem__("id", "y"),
+            lambda: p.__delitem__("class"),
+            lambda: setattr(p.b, "string", "new"),
+            lambda: setattr(p, "name", "q"),
+            lambda: setattr(p, "attrs", {}),
+            lambda: new.append(p),
+        ):
+            with pytest.raises(FrozenTreeError):
+                mutate()
+        assert soup.decode() == original
+        assert new.contents == []
+
+        # Other trees can still be modified.
+        other = self.soup(self.MARKUP)
+        other.p.name = "q"
+        other.q["id"] = "y"
+        other.q.extract()
+        new.append("text")
+
+        # A copy of a frozen tree isn't frozen.
+        copied = soup.__copy__()
+        assert not copied.is_frozen
+        copied.p.extract()
+
+    def test_freezing_does_not_slow_down_other_trees(self):
+        before, after = parse_cost_before_and_after(
+            "BeautifulSoup('<p>', 'html.parser').freeze()"
+        )
+        assert before == after
+
+    def test_find_all_uses_indexes(self):
+        soup = self.soup(self.MARKUP)
+        unfrozen = self.soup(self.MARKUP)
+        soup.freeze()
+        searches = [
+            dict(name="p"),
+            dict(name="b"),
+            dict(name="p", limit=1),
+            dict(id="x"),
+            dict(name="b", id="x"),
+            dict(class_="a"),
+            dict(class_="a b"),
+            dict(attrs={"class": "b"}),
+            dict(attrs="b"),
+            dict(name="p", string="2"),
+            dict(name="nosuchtag"),
+            dict(name=["p", "b"]),
+            dict(string="3"),
+        ]
+        for kwargs in searches:
+            expect = [str(x) for x in unfrozen.find_all(**kwargs)]
+            assert [str(x) for x in soup.find_all(**kwargs)] == expect
+            expect = [str(x) for x in unfrozen.div.find_all(**kwargs)]
+            assert [str(x) for x in soup.div.find_all(**kwargs)] == expect
+
+        index = soup._frozen
+        p = soup.p
+        assert index.candidates(soup.div, "p", {}, {}) == soup.div.find_all("p")
+        assert index.position(p) == index.position(soup.div) + 1
+        assert index.candidates(soup.div, None, {}, {}) is None
+
+    def test_frozen_tree_caches_text(self):
+        soup = self.soup(self.MARKUP)
+        soup.freeze(text_cache_min_size=0)
+        assert soup.get_text() == "1 bold234"
+        assert soup._text_cache is not None
+
+    def test_lazy_tags_are_parsed_when_frozen(self):
+        soup = self.soup(
+            "<div><p>a</p></div>", builder=HTMLParserTreeBuilder(lazy_tags=["div"])
+        )
+        soup.freeze()
+        assert soup.find("p").string == "a"
+
+    def test_pickled_frozen_tree_is_frozen(self):
+        soup = self.soup(self.MARKUP)
+        soup.freeze()
+        unpickled = pickle.loads(pickle.dumps(soup))
+        assert unpickled.is_frozen
+        assert unpickled.find(id="x").string == "2"
+        with pytest.raises(FrozenTreeError):
+            unpickled.p.extract()
+
+    def test_concurrent_reads(self):
+        soup = self.soup(self.MARKUP * 50)
+        soup.freeze()
+        selectors = ["p", "div.b > b", "#x", "div p b"] * 10
+        expect = [[str(x) for x in soup.select(s)] for s in selectors]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(lambda s: [str(x) for x in soup.select(s)], selectors)
+            )
+        assert results == expect
+
+
 class TestEncodingConversion(SoupTest):
     # Test Beautiful Soup's ability to decode and encode from various
     # encodings.
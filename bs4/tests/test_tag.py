@@ -1,9 +1,17 @@
+import pytest
+import sys
 import warnings
+
+from bs4 import sort_document_order
 from bs4.element import (
     Comment,
     NavigableString,
+    Tag,
+)
+from . import (
+    SoupTest,
+    parse_cost_before_and_after,
 )
-from . import SoupTest
 
 
 class TestTag(SoupTest):
@@ -175,6 +183,402 @@ class TestTag(SoupTest):
         assert list(script.div.script.strings) == ["<!--a comment-->Some text"]
 
 
+
+class TestTextCache(SoupTest):
+    """Test the opt-in cache used by get_text() and friends."""
+
+    def test_cached_text_matches_uncached_text(self):
+        markup = "<div><p>a<b>r</b>  </p><!--c--><p> t </p><script>s</script></div>"
+        uncached = self.soup(markup)
+        cached = self.soup(markup)
+        cached.enable_text_cache(min_size=0)
+        for args in [
+            dict(),
+            dict(separator=","),
+            dict(strip=True),
+            dict(separator="|", strip=True),
+            dict(types=None),
+            dict(types=(NavigableString, Comment)),
+        ]:
+            assert cached.get_text(**args) == uncached.get_text(**args)
+            assert cached.div.get_text(**args) == uncached.div.get_text(**args)
+        assert list(cached.strings) == list(uncached.strings)
+        assert list(cached.stripped_strings) == list(uncached.stripped_strings)
+
+    def test_text_is_cached(self):
+        soup = self.soup("<div><p>a</p><p>b</p></div>")
+        soup.enable_text_cache(min_size=0)
+        assert soup.div._text_cache is None
+        assert soup.div.get_text() == "ab"
+        assert ("", False, frozenset(soup.div.interesting_string_types)) in (
+            soup.div._text_cache
+        )
+
+        # The cache is used the next time around.
+        key = ("", False, frozenset(soup.div.interesting_string_types))
+        soup.div._text_cache[key] = "from the cache"
+        assert soup.div.get_text() == "from the cache"
+
+    def test_small_subtrees_are_not_cached(self):
+        soup = self.soup("<div><p>a</p><p>b<i>c</i>d</p></div>")
+        soup.enable_text_cache(min_size=4)
+        assert soup.div.get_text() == "abcd"
+        assert soup.div.p.get_text() == "a"
+
+        # The div has seven descendants, so its text was cached. The
+        # first p has only one descendant, so its text was not.
+        assert soup.div._text_cache is not None
+        assert soup.div.p._text_cache is None
+
+    def test_cache_only_applies_beneath_the_tag_where_it_was_enabled(self):
+        soup = self.soup("<div><p>a</p></div><div><p>b</p></div>")
+        first, second = soup.find_all("div")
+        first.enable_text_cache(min_size=0)
+        assert first.get_text() == "a"
+        assert second.get_text() == "b"
+        assert first._text_cache is not None
+        assert second._text_cache is None
+        assert soup._text_cache is None
+
+    def test_modification_invalidates_cache_of_all_parents(self):
+        soup = self.soup("<div><p><b>a</b></p><p>b</p></div>")
+        soup.enable_text_cache(min_size=0)
+        b = soup.b
+        assert soup.get_text() == "ab"
+        assert soup.div.get_text() == "ab"
+        assert b.get_text() == "a"
+
+        b.string = "new"
+        assert soup.get_text() == "newb"
+        assert soup.div.get_text() == "newb"
+        assert b.get_text() == "new"
+
+        soup.find_all("p")[1].extract()
+        assert soup.get_text() == "new"
+        assert list(soup.div.strings) == ["new"]
+
+        soup.div.append("!")
+        assert soup.get_text(",") == "new,!"
+
+        b.unwrap()
+        assert soup.p.get_text() == "new"
+
+        soup.div.insert(0, soup.new_tag("i", string="i"))
+        assert soup.get_text() == "inew!"
+
+    def test_disable_text_cache(self):
+        soup = self.soup("<div><p>a</p></div>")
+        soup.enable_text_cache(min_size=0)
+        soup.get_text()
+        soup.div.get_text()
+        soup.disable_text_cache()
+        assert soup._text_cache is None
+        assert soup.div._text_cache is None
+        soup.div.get_text()
+        assert soup.div._text_cache is None
+
+    def test_disable_text_cache_beneath_a_tag_with_caching_enabled(self):
+        soup = self.soup("<div><p><b>a</b></p></div>")
+        soup.enable_text_cache(min_size=0)
+        soup.p.get_text()
+        soup.p.disable_text_cache()
+        assert soup.p._text_cache is None
+
+        # The setting on the BeautifulSoup object doesn't apply to
+        # the <p> tag or anything beneath it, but it still applies
+        # everywhere else.
+        assert soup.p.get_text() == "a"
+        assert soup.b.get_text() == "a"
+        assert soup.p._text_cache is None
+        assert soup.b._text_cache is None
+        assert soup.div.get_text() == "a"
+        assert soup.div._text_cache is not None
+
+        # Caching can be turned back on beneath the <p> tag.
+        soup.b.enable_text_cache(min_size=0)
+        soup.b.get_text()
+        assert soup.b._text_cache is not None
+
+    def test_invalid_min_size(self):
+        soup = self.soup("<div></div>")
+        with pytest.raises(ValueError):
+            soup.enable_text_cache(min_size=-1)
+
+class TestDocumentOrder(SoupTest):
+    """Test Tag.contains and sort_document_order, which share a
+    numbering of the tree.
+    """
+
+    def test_contains(self):
+        soup = self.soup("<div><p><b>1</b></p><p>2</p></div><i>3</i>")
+        first, second = soup.find_all("p")
+        b = soup.b
+        assert soup.div.contains(b)
+        assert soup.div.contains(b.string)
+        assert soup.contains(soup.i.string)
+        assert first.contains(first)
+        assert not second.contains(b)
+        assert not b.contains(soup.div)
+        assert not soup.i.contains(soup.div)
+
+        # An element in a different tree is never contained.
+        other = self.soup("<div><p><b>1</b></p></div>")
+        assert not soup.div.contains(other.b)
+
+    def test_numbering_is_reused_until_tree_changes(self):
+        soup = self.soup("<div><p><b>1</b></p><p>2</p></div>")
+        first, second = soup.find_all("p")
+        assert soup._order is None
+        assert soup.div.contains(soup.b)
+        order = soup._order
+        assert order is not None
+        assert not second.contains(soup.b)
+        assert soup._order is order
+
+        # The numbering is only stored on the root of the tree.
+        for element in soup.descendants:
+            assert "_order" not in element.__dict__
+
+        # Tag.descendants uses the numbering to find where to stop.
+        assert list(first.descendants) == [soup.b, soup.b.string]
+        assert list(second.descendants) == [second.string]
+
+        second.append(soup.b)
+        assert not order.valid
+        assert second.contains(soup.b)
+        assert not first.contains(soup.b)
+
+        soup.b.string = "new"
+        assert second.contains(soup.b.string)
+
+    def test_moving_trees(self):
+        soup = self.soup("<div></div><i></i>")
+        x = soup.new_tag("x")
+        y = soup.new_tag("y")
+        x.append(y)
+        assert x.contains(y)
+
+        # The numbering kept on x is forgotten when x becomes part of
+        # a bigger tree, and when it's taken out again.
+        soup.div.append(x)
+        assert soup.div.contains(y)
+        assert not soup.i.contains(y)
+        soup.i.append(x)
+        assert soup.i.contains(y)
+        x.extract()
+        assert not soup.i.contains(y)
+        assert x.contains(y)
+
+    def test_frozen_tree(self):
+        soup = self.soup("<div><p><b>1</b></p></div><i>2</i>")
+        soup.freeze()
+        assert soup.div.contains(soup.b)
+        assert not soup.i.contains(soup.b)
+        assert soup.b._document_order() is soup._frozen
+        assert "_order" not in soup.b.__dict__
+
+    @classmethod
+    def _calls(cls, function):
+        """Count the Python function calls made by calling ``function``."""
+        calls = 0
+
+        def profile(frame, event, arg):
+            nonlocal calls
+            if event == "call":
+                calls += 1
+
+        sys.setprofile(profile)
+        try:
+            function()
+        finally:
+            sys.setprofile(None)
+        return calls
+
+    def test_ancestor_queries_do_not_use_the_numbering(self):
+        # find_parent(), find_parents() and CSS closest() look at each
+        # of an element's parents once, so the work they do depends on
+        # how deep the element is, not on how big the tree is.
+        # Numbering the tree would make them depend on the size of the
+        # tree, so they don't use it.
+        nested = "<section><div class='x'><p><b>deep</b></p></div></section>"
+        small = self.soup(nested)
+        big = self.soup("<i>filler</i>" * 500 + nested + "<i>filler</i>" * 500)
+
+        def queries(soup):
+            b = soup.b
+            return lambda: (
+                b.find_parent("div"),
+                b.find_parents("section"),
+                b.css.closest("div.x"),
+            )
+
+        for soup in (small, big):
+            b = soup.b
+            assert b.find_parent("div") is soup.div
+            assert b.find_parents("section") == [soup.section]
+            assert b.css.closest("div.x") is soup.div
+            assert soup._order is None
+
+        assert self._calls(queries(small)) == self._calls(queries(big))
+
+    def test_sort_document_order(self):
+        soup = self.soup("<div><p><b>1</b></p><p>2</p></div><i>3</i>")
+        first, second = soup.find_all("p")
+        b = soup.b
+        elements = [soup.i, b.string, second, soup.div, b, first]
+        assert sort_document_order(elements) == [
+            soup.div,
+            first,
+            b,
+            b.string,
+            second,
+            soup.i,
+        ]
+        assert sort_document_order([]) == []
+
+        # Elements from different trees are kept apart.
+        other = self.soup("<a></a><b></b>")
+        assert sort_document_order([other.b, soup.i, other.a, soup.div]) == [
+            other.a,
+            other.b,
+            soup.div,
+            soup.i,
+        ]
+
+
+class TestQueryCache(SoupTest):
+    """Test the opt-in cache used by find_all(), select() and friends."""
+
+    def test_results_are_cached(self):
+        soup = self.soup("<div><p class='a'>1</p><p>2</p><a href='x'>3</a></div>")
+        soup.enable_query_cache()
+        first = soup.find_all("p")
+        second = soup.find_all("p")
+        assert first == second
+        assert first is not second
+        assert first.source is second.source
+        assert soup.query_cache_info() == (1, 1, Tag.DEFAULT_QUERY_CACHE_SIZE, 1)
+
+        # Modifying the cached ResultSet doesn't affect the cache.
+        second.pop()
+        assert len(soup.find_all("p")) == 2
+
+        # find(), select() and select_one() are cached too. (So is
+        # navigation like soup.div, since that calls find().)
+        soup.disable_query_cache()
+        div = soup.div
+        a = soup.a
+        soup.enable_query_cache()
+        assert div.find("p", class_="a").string == "1"
+        assert div.find("p", class_="a").string == "1"
+        assert soup.select("div > a") == soup.select("div > a") == [a]
+        assert soup.select_one("a") is soup.select_one("a") is a
+        assert soup.select_one("b") is None
+        assert soup.select_one("b") is None
+        assert soup.query_cache_info() == (4, 4, Tag.DEFAULT_QUERY_CACHE_SIZE, 4)
+
+    def test_different_arguments_are_different_searches(self):
+        soup = self.soup("<div><p x='1'>1</p><p x>2</p></div>")
+        soup.enable_query_cache()
+        assert len(soup.find_all("p", x="1")) == 1
+        assert len(soup.find_all("p", x=True)) == 2
+        assert len(soup.find_all("p", limit=1)) == 1
+        assert len(soup.find_all(["p", "div"])) == 3
+        assert len(soup.find_all("p", recursive=False)) == 0
+        assert len(soup.div.find_all("p")) == 2
+        assert soup.query_cache_info().hits == 0
+
+        # Lists and dictionaries with the same contents are the same
+        # search.
+        assert len(soup.find_all("p", attrs={"x": ["1"]})) == 1
+        assert len(soup.find_all("p", attrs={"x": ["1"]})) == 1
+        assert soup.query_cache_info().hits == 1
+
+    def test_modification_invalidates_cache(self):
+        soup = self.soup("<div><p>1</p><p>2</p></div>")
+        soup.div.enable_query_cache()
+        assert len(soup.div.find_all("p")) == 2
+        soup.p.extract()
+        assert len(soup.div.find_all("p")) == 1
+        soup.div.append(soup.new_tag("p"))
+        assert len(soup.div.find_all("p")) == 2
+        soup.p["class"] = "new"
+        assert soup.div.select("p.new") == [soup.p]
+        soup.p.name = "b"
+        assert len(soup.div.find_all("p")) == 1
+        assert soup.div.query_cache_info().hits == 0
+
+        # Changes anywhere in the tree invalidate the cache.
+        soup.append(soup.new_tag("i"))
+        assert soup.div.query_cache_info().size == 0
+
+    def test_in_place_attribute_changes_are_not_noticed(self):
+        # This is a documented limitation of the cache.
+        soup = self.soup("<p class='a'>1</p><p>2</p>")
+        soup.enable_query_cache()
+        assert soup.find_all(class_="b") == []
+        soup.p["class"].append("b")
+        soup.find_all("p")[1].attrs["class"] = "b"
+        assert soup.find_all(class_="b") == []
+
+        # Setting the attribute through the Tag is noticed, and so is
+        # starting over with a new cache.
+        soup.enable_query_cache()
+        assert len(soup.find_all(class_="b")) == 2
+        soup.p["class"] = "c"
+        assert len(soup.find_all(class_="b")) == 1
+
+    def test_enabling_a_cache_does_not_slow_down_parsing(self):
+        before, after = parse_cost_before_and_after(
+            "BeautifulSoup('<p>', 'html.parser').enable_query_cache()"
+        )
+        assert before == after
+
+    def test_cache_only_applies_beneath_the_tag_where_it_was_enabled(self):
+        soup = self.soup("<div><p>a</p></div><div><p>b</p></div>")
+        first, second = soup.find_all("div")
+        first.enable_query_cache()
+        first.contents[0].find_all(string=True)
+        second.find_all("p")
+        assert first.query_cache_info().misses == 1
+        assert second.query_cache_info() is None
+        assert soup.query_cache_info() is None
+
+    def test_least_recently_used_results_are_forgotten(self):
+        soup = self.soup("<a></a><b></b><i></i>")
+        soup.enable_query_cache(max_size=2)
+        soup.find_all("a")
+        soup.find_all("b")
+        soup.find_all("a")
+        soup.find_all("i")
+        assert soup.query_cache_info().size == 2
+        soup.find_all("a")
+        soup.find_all("b")
+        assert soup.query_cache_info().hits == 2
+
+    def test_deprecated_arguments_still_warn(self):
+        soup = self.soup("<p>a</p>")
+        soup.enable_query_cache()
+        for i in range(2):
+            with warnings.catch_warnings(record=True) as w:
+                assert soup.find_all(text="a") == ["a"]
+            assert len(w) == 1
+
+    def test_disable_query_cache(self):
+        soup = self.soup("<p>a</p>")
+        soup.enable_query_cache()
+        soup.find_all("p")
+        soup.disable_query_cache()
+        assert soup.query_cache_info() is None
+        assert soup._query_cache is None
+        soup.find_all("p")
+
+    def test_invalid_max_size(self):
+        soup = self.soup("<div></div>")
+        with pytest.raises(ValueError):
+            soup.enable_query_cache(max_size=-1)
+
+
 class TestMultiValuedAttributes(SoupTest):
     """Test the behavior of multi-valued attributes like 'class'.
 
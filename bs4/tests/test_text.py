@@ -0,0 +1,126 @@
+"""Tests of bs4.text, which extracts text without building a tree."""
+
+import pytest
+import warnings
+
+from bs4 import (
+    BeautifulSoup,
+    extract_text,
+)
+from bs4.element import Script
+from bs4.exceptions import FeatureNotFound
+from bs4.text import TextExtractor
+from bs4.builder import HTMLParserTreeBuilder
+
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+)
+
+PARSERS = ["html.parser"]
+if LXML_PRESENT:
+    PARSERS.extend(["lxml", "lxml-xml"])
+if HTML5LIB_PRESENT:
+    PARSERS.append("html5lib")
+
+DOCUMENTS = [
+    "<html><head><title>T</title><script>var x</script><style>p{}</style></head>"
+    "<body><p>Hello <b>there</b></p>\n<!-- a comment --><pre>  a  </pre>"
+    "<div>x<br>y</div><template>t</template></body></html>",
+    '<?xml version="1.0" encoding="utf-8"?><a><b>x</b> <c/>y</a>',
+    "<p>unclosed <i>x<p>more</i>tail",
+    "<br></br><p/>a &amp; b &#147;<![CDATA[cdata]]>",
+    "",
+]
+
+
+class TestExtractText:
+    @pytest.mark.parametrize("features", PARSERS)
+    @pytest.mark.parametrize("markup", DOCUMENTS)
+    @pytest.mark.parametrize("separator,strip", [("", False), ("|", True)])
+    def test_same_as_get_text(self, features, markup, separator, strip):
+        # Without block tags or skip tags, extract_text() gives the
+        # same result as get_text().
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expect = BeautifulSoup(markup, features).get_text(separator, strip)
+            text = extract_text(
+                markup,
+                features,
+                block_tags=(),
+                skip_tags=(),
+                separator=separator,
+                strip=strip,
+            )
+        assert text == expect
+
+    def test_block_tags(self):
+        markup = "<title>T</title><p>Hello <b>there</b></p><div>x<br>y</div>"
+        assert extract_text(markup, "html.parser") == "T\nHello there\nx\ny"
+        assert (
+            extract_text(markup, "html.parser", block_tags=["p"], block_separator="--")
+            == "T--Hello there--xy"
+        )
+
+    def test_empty_blocks_are_ignored(self):
+        markup = "<div><p></p><p>a</p>\n<p> </p><p>b</p></div>"
+        assert extract_text(markup, "html.parser", strip=True) == "a\nb"
+
+        # Without strip, a block that's nothing but whitespace is kept.
+        markup = "<p></p><p>a</p><p> </p><p>b</p>"
+        assert extract_text(markup, "html.parser") == "a\n \nb"
+
+    def test_skip_tags(self):
+        markup = "<p>a<span>b<i>c</i></span>d</p><noscript>e</noscript>"
+        assert extract_text(markup, "html.parser", skip_tags=["span"]) == "ad\ne"
+        assert (
+            extract_text(markup, "html.parser", skip_tags=["noscript", "i"]) == "abd"
+        )
+
+    def test_script_and_style_are_classified(self):
+        # Even if they're not skipped, the contents of <script> and
+        # <style> tags are not text, just as with get_text().
+        markup = "<p>a</p><script>b</script><style>c</style>"
+        assert extract_text(markup, "html.parser", skip_tags=()) == "a"
+
+        found = []
+
+        class Collector(TextExtractor):
+            def string_found(self, string, container):
+                found.append((string, container))
+
+        Collector(HTMLParserTreeBuilder()).parse(markup)
+        assert ("b", Script) in found
+
+    def test_whitespace_is_preserved_in_pre(self):
+        markup = "<p> </p><pre> </pre>"
+        assert extract_text(markup, "html.parser", block_tags=()) == "  "
+        markup = "<p>\n\n</p><pre>\n\n</pre>"
+        assert extract_text(markup, "html.parser", block_tags=()) == "\n\n\n"
+
+    def test_bytes_are_decoded(self):
+        markup = '<meta charset="iso-8859-1"><p>caf\xe9</p>'.encode("latin-1")
+        assert extract_text(markup, "html.parser", strip=True) == "caf\xe9"
+        assert (
+            extract_text(
+                "<p>caf\xe9</p>".encode("utf-16"), "html.parser", strip=True
+            )
+            == "caf\xe9"
+        )
+
+    def test_filehandle(self, tmp_path):
+        path = tmp_path / "doc.html"
+        path.write_text("<p>a</p><p>b</p>")
+        with open(path) as fh:
+            assert extract_text(fh, "html.parser") == "a\nb"
+
+    def test_extractor_can_be_reused(self):
+        extractor = TextExtractor(HTMLParserTreeBuilder())
+        extractor.parse("<p>a</p>")
+        assert extractor.text == "a"
+        extractor.parse("<p>b</p>")
+        assert extractor.text == "b"
+
+    def test_unknown_features(self):
+        with pytest.raises(FeatureNotFound):
+            extract_text("<p>a</p>", "no-such-parser")
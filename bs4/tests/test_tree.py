@@ -24,6 +24,7 @@ from bs4.element import (
 from bs4.filter import SoupStrainer
 from . import (
     SoupTest,
+    parse_cost_before_and_after,
 )
 
 
@@ -446,6 +447,22 @@ class TestIndex(SoupTest):
         with pytest.raises(ValueError):
             tree.index(1)
 
+    def test_index_after_modification(self):
+        # Tag.index remembers where it last found a child; that must
+        # never give a wrong answer once the children move around.
+        soup = self.soup("<div>" + "".join("<b>%d</b>" % i for i in range(10)) + "</div>")
+        div = soup.div
+        children = list(div.contents)
+        assert div.index(children[9]) == 9
+        for child in reversed(children[5:]):
+            child.extract()
+        assert div.index(children[4]) == 4
+        for child in children[:4]:
+            div.insert(0, child)
+        assert [div.index(child) for child in children[:5]] == [3, 2, 1, 0, 4]
+        with pytest.raises(ValueError):
+            div.index(children[9])
+
 
 class TestParentOperations(SoupTest):
     """Test navigation and searching through an element's parents."""
@@ -1388,6 +1405,124 @@ class TestTreeModification(SoupTest):
         assert isinstance(soup.a.string, CData)
 
 
+class TestMutationTracking(SoupTest):
+    """Test PageElement.generation and Tag.add_mutation_listener."""
+
+    def listen(self, tag):
+        events = []
+        tag.add_mutation_listener(lambda element, kind: events.append((element, kind)))
+        return events
+
+    def test_generation_changes_with_every_modification(self):
+        soup = self.soup("<div><p>a<b>b</b></p></div>")
+        generation = soup.generation
+        assert soup.b.string.generation == generation
+
+        def changed():
+            nonlocal generation
+            new = soup.generation
+            result = new != generation
+            generation = new
+            return result
+
+        soup.b.wrap(soup.new_tag("i"))
+        assert changed()
+        soup.i.unwrap()
+        assert changed()
+        soup.p["class"] = "x"
+        assert changed()
+        del soup.p["class"]
+        assert changed()
+        soup.p.attrs = {"id": "y"}
+        assert changed()
+        soup.p.name = "q"
+        assert changed()
+        soup.q.string = "new"
+        assert changed()
+        soup.div.append("a")
+        soup.div.append("b")
+        soup.div.smooth()
+        assert changed()
+        soup.q.replace_with("c")
+        assert changed()
+        soup.div.clear()
+        assert changed()
+
+        # Looking at the tree doesn't change it.
+        soup.find_all(True)
+        soup.decode()
+        assert not changed()
+
+    def test_events(self):
+        soup = self.soup("<div><p>a<b>b</b></p></div>")
+        events = self.listen(soup)
+        b = soup.b
+        i = soup.new_tag("i")
+        b.wrap(i)
+        assert events == [
+            (b, Tag.EXTRACTED),
+            (i, Tag.INSERTED),
+            (b, Tag.INSERTED),
+        ]
+
+        del events[:]
+        soup.p["class"] = "x"
+        soup.p.name = "q"
+        assert events == [
+            (soup.q, Tag.ATTRIBUTES_CHANGED),
+            (soup.q, Tag.RENAMED),
+        ]
+
+    def test_listener_only_hears_about_its_subtree(self):
+        soup = self.soup("<div><p>a</p></div><span></span>")
+        div_events = self.listen(soup.div)
+        soup_events = self.listen(soup)
+
+        soup.span["id"] = "1"
+        assert div_events == []
+        assert soup_events == [(soup.span, Tag.ATTRIBUTES_CHANGED)]
+
+        # A tag extracted from the subtree is reported to its former
+        # ancestors.
+        p = soup.p.extract()
+        assert div_events == [(p, Tag.EXTRACTED)]
+        soup.span.append(p)
+        assert div_events == [(p, Tag.EXTRACTED)]
+        assert soup_events[-1] == (p, Tag.INSERTED)
+
+    def test_remove_mutation_listener(self):
+        soup = self.soup("<p></p>")
+        events = []
+        listener = lambda element, kind: events.append(kind)  # noqa: E731
+        soup.p.add_mutation_listener(listener)
+        soup.p["a"] = "b"
+        soup.p.remove_mutation_listener(listener)
+        soup.p["a"] = "c"
+        assert events == [Tag.ATTRIBUTES_CHANGED]
+        assert soup.p._mutation_listeners is None
+        with pytest.raises(ValueError):
+            soup.p.remove_mutation_listener(listener)
+
+    def test_tracking_one_tree_does_not_slow_down_parsing(self):
+        # Once anyone asks for a generation, renaming a tag has to be
+        # noticed, but that mustn't make building other trees cost
+        # more.
+        before, after = parse_cost_before_and_after(
+            "BeautifulSoup('<p>', 'html.parser').generation"
+        )
+        assert before == after
+
+    def test_separate_trees_have_separate_generations(self):
+        soup = self.soup("<p></p>")
+        tag = soup.new_tag("b")
+        generation = soup.generation
+        tag["x"] = "y"
+        assert soup.generation == generation
+        soup.p.append(tag)
+        assert soup.generation != generation
+        assert tag.generation == soup.generation
+
+
 all_find_type_methods = [
     "find",
     "find_all",
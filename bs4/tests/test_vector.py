@@ -0,0 +1,134 @@
+"""Tests of bs4.vector, which searches a document with NumPy."""
+
+import re
+import pytest
+
+from bs4 import BeautifulSoup
+from bs4.filter import SoupStrainer
+from bs4.flat import FlatSoup
+
+from . import (
+    LXML_PRESENT,
+    NUMPY_PRESENT,
+)
+
+if NUMPY_PRESENT:
+    import numpy
+    from bs4.vector import columnize
+
+DOCUMENT = (
+    "<html><head><title>A title</title></head><body>"
+    + "".join(
+        "<div class='row r%d' id='d%d'><p>Item %d <b>bold</b></p>"
+        "<a href='/%d' rel='nofollow'>link</a><!--c%d--></div>" % (i % 3, i, i, i, i)
+        for i in range(30)
+    )
+    + "<p id=''>last</p></body></html>"
+)
+
+QUERIES = [
+    ((), {}),
+    ((True,), {}),
+    (("p",), {}),
+    ((["a", "b"],), {}),
+    ((re.compile("^(t|b)"),), {}),
+    (("div",), dict(class_="r1")),
+    (("div",), dict(class_="row r2")),
+    ((), dict(class_=re.compile("^r[12]$"))),
+    (("a",), dict(rel="nofollow")),
+    ((), dict(id=True)),
+    (("p",), dict(id=False)),
+    (("p",), dict(id="")),
+    (("div",), dict(attrs={"id": re.compile("1$")})),
+    ((), dict(string="bold")),
+    ((), dict(string=re.compile("^c1"))),
+    (("p",), dict(string="last")),
+    (("b",), dict(string=re.compile("o"))),
+    ((lambda tag: tag.name == "a" and tag["href"] == "/7",), {}),
+    (("div",), dict(recursive=False)),
+    (("p",), dict(limit=3)),
+    ((), dict(string=re.compile("Item"), limit=2)),
+    ((SoupStrainer("a", href="/3"),), {}),
+    (("nosuchtag",), {}),
+    (("p",), dict(nosuchattribute="x")),
+]
+
+
+def same_results(found, expect):
+    return len(found) == len(expect) and all(
+        a is b for a, b in zip(found, expect)
+    )
+
+
+@pytest.mark.skipif(not NUMPY_PRESENT, reason="NumPy is not installed")
+class TestColumns:
+    @pytest.mark.parametrize("args,kwargs", QUERIES)
+    def test_same_results_as_find_all(self, args, kwargs):
+        soup = BeautifulSoup(DOCUMENT, "html.parser")
+        columns = columnize(soup)
+        assert same_results(
+            columns.find_all(*args, **kwargs), soup.find_all(*args, **kwargs)
+        )
+
+        # Searching part of the tree works the same way.
+        body = soup.body
+        assert same_results(
+            columnize(body).find_all(*args, **kwargs), body.find_all(*args, **kwargs)
+        )
+
+    @pytest.mark.parametrize("args,kwargs", QUERIES)
+    def test_flat_soup(self, args, kwargs):
+        flat = FlatSoup(DOCUMENT, "html.parser")
+        columns = columnize(flat)
+        assert columns.find_all(*args, **kwargs) == flat.find_all(*args, **kwargs)
+
+    def test_columns(self):
+        soup = BeautifulSoup("<p><b>1</b>2</p><i></i>", "html.parser")
+        columns = columnize(soup)
+        assert len(columns) == 6
+        assert [columns.node(i) for i in range(len(columns))] == list(
+            [soup] + list(soup.descendants)
+        )
+        assert columns.parent.tolist() == [-1, 0, 1, 2, 1, 0]
+        assert columns.end.tolist() == [6, 5, 4, 4, 5, 6]
+        assert columns.depth.tolist() == [0, 1, 2, 3, 2, 1]
+        assert columns.is_tag.tolist() == [True, True, True, False, False, True]
+        assert columns.names == [
+            ("[document]", None),
+            ("p", None),
+            ("b", None),
+            ("i", None),
+        ]
+
+    def test_indices_within(self):
+        soup = BeautifulSoup(DOCUMENT, "html.parser")
+        columns = columnize(soup)
+        divs = columns.indices("div", class_="r1")
+        assert len(divs) == 10
+
+        links = columns.indices("a", within=divs)
+        assert [columns.node(i)["href"] for i in links] == [
+            "/%d" % i for i in range(1, 30, 3)
+        ]
+        assert len(columns.indices("b", within=divs, recursive=False)) == 0
+        assert len(columns.indices("p", within=divs, recursive=False)) == 10
+
+        first = int(divs[0])
+        assert columns.find_all(True, within=first) == soup.find(
+            "div", class_="r1"
+        ).find_all(True)
+
+        # Nested nodes in ``within`` don't produce duplicates.
+        nested = numpy.concatenate([divs, columns.indices("p", within=divs)])
+        assert len(columns.indices("b", within=nested)) == 10
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml is not installed")
+    def test_prefixed_names(self):
+        markup = (
+            '<root xmlns:g="http://g/"><g:item>1</g:item><item>2</item>'
+            "<h:item>3</h:item></root>"
+        )
+        soup = BeautifulSoup(markup, "xml")
+        columns = columnize(soup)
+        for name in ["item", "g:item", "h:item", re.compile("^g:"), ["g:item", "root"]]:
+            assert same_results(columns.find_all(name), soup.find_all(name))
@@ -0,0 +1,369 @@
+"""Search a large document with vectorized operations, using NumPy.
+
+`columnize` turns a parsed document--a `BeautifulSoup` object, any
+`Tag`, or a `bs4.flat.FlatSoup`--into a `Columns` object: a set of
+NumPy arrays with one entry per node. `Columns.find_all` takes the
+same arguments as `Tag.find_all` and finds the same things, but
+instead of testing the nodes one at a time, it tests each distinct
+tag name and each distinct attribute value once, and then selects
+the matching nodes with array operations. This is much faster when
+you need to run many searches over a document with many nodes.
+
+This module requires NumPy. Nothing else in Beautiful Soup uses it.
+"""
+from __future__ import annotations
+
+# Use of this source code is governed by the MIT license.
+__license__ = "MIT"
+
+__all__ = [
+    "Columns",
+    "columnize",
+]
+
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy
+
+from bs4.element import (
+    ResultSet,
+    Tag,
+)
+from bs4.filter import (
+    SoupStrainer,
+    TagNameMatchRule,
+)
+from bs4.flat import (
+    FlatSoup,
+    FlatTag,
+)
+from bs4._typing import (
+    _AttributeValue,
+    _StrainableAttribute,
+    _StrainableAttributes,
+    _StrainableElement,
+    _StrainableString,
+)
+
+#: The kinds of object `columnize` knows how to take apart.
+_Source = Union[Tag, FlatSoup, FlatTag]
+
+#: A node, or a set of nodes, identified by their positions in a
+#: `Columns` object.
+_Within = Union[int, numpy.ndarray]
+
+
+class Columns(object):
+    """A document, stored as NumPy arrays.
+
+    The nodes of the document (tags and strings) are numbered in
+    document order, starting with the tag that was passed into
+    `columnize`, which is node 0. Since a tag's descendants come
+    right after it, the descendants of node ``i`` are exactly the
+    nodes numbered from ``i + 1`` up to (but not including)
+    ``end[i]``, so "is this node inside that one?" is a comparison
+    of two numbers.
+
+    Don't instantiate this class yourself; call `columnize`.
+    """
+
+    #: For each node, the number of its parent, or -1 for node 0.
+    parent: numpy.ndarray
+
+    #: For each node, the number of the first node that's not one of
+    #: its descendants.
+    end: numpy.ndarray
+
+    #: For each node, how far it is from node 0.
+    depth: numpy.ndarray
+
+    #: For each node, whether it's a tag (as opposed to a string).
+    is_tag: numpy.ndarray
+
+    #: For each tag, its position in `Columns.names`; -1 for strings.
+    name_id: numpy.ndarray
+
+    #: Every distinct (name, prefix) pair in the document.
+    names: List[Tuple[str, Optional[str]]]
+
+    #: The attribute table. Each entry connects a tag, an attribute
+    #: name (a position in `Columns.keys`) and a value (a position in
+    #: `Columns.values`).
+    attribute_node: numpy.ndarray
+    attribute_key: numpy.ndarray
+    attribute_value: numpy.ndarray
+
+    #: Every distinct attribute name in the document.
+    keys: List[str]
+
+    #: Every distinct attribute value in the document, as it would be
+    #: returned by `Tag.get`.
+    values: List[_AttributeValue]
+
+    def __init__(self, nodes: List[Any]):
+        self._nodes = nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def node(self, index: int) -> Any:
+        """Get the object (`Tag`, `NavigableString`, `bs4.flat.FlatTag`
+        or `bs4.flat.FlatString`) for a node number.
+        """
+        return self._nodes[index]
+
+    def indices(
+        self,
+        name: Optional[Union[_StrainableElement, SoupStrainer]] = None,
+        attrs: _StrainableAttributes = {},
+        recursive: bool = True,
+        string: Optional[_StrainableString] = None,
+        limit: Optional[int] = None,
+        within: _Within = 0,
+        **kwargs: _StrainableAttribute,
+    ) -> numpy.ndarray:
+        """Find the numbers of the nodes that `Tag.find_all` would
+        find, in document order.
+
+        :param within: The number of the node to look inside. This
+            can also be an array of node numbers, in which case nodes
+            inside any of them will be found.
+
+        The other arguments are the same as for `Tag.find_all`.
+        """
+        strainer = _strainer(name, attrs, string, **kwargs)
+        return self._search(strainer, recursive, limit, within)
+
+    def find_all(
+        self,
+        name: Optional[Union[_StrainableElement, SoupStrainer]] = None,
+        attrs: _StrainableAttributes = {},
+        recursive: bool = True,
+        string: Optional[_StrainableString] = None,
+        limit: Optional[int] = None,
+        within: _Within = 0,
+        **kwargs: _StrainableAttribute,
+    ) -> ResultSet[Any]:
+        """Find the same nodes `Tag.find_all` would find.
+
+        The arguments are the same as for `Columns.indices`.
+
+        :return: A `ResultSet` of the matching objects.
+        """
+        strainer = _strainer(name, attrs, string, **kwargs)
+        found = self._search(strainer, recursive, limit, within)
+        nodes = self._nodes
+        return ResultSet(strainer, [nodes[index] for index in found])
+
+    def _search(
+        self,
+        strainer: SoupStrainer,
+        recursive: bool,
+        limit: Optional[int],
+        within: _Within,
+    ) -> numpy.ndarray:
+        """Find the numbers of the nodes that match a `SoupStrainer`."""
+        match_tags = bool(strainer.name_rules or strainer.attribute_rules)
+        if match_tags or not strainer.string_rules:
+            mask = self.is_tag & self._scope(within, recursive)
+        else:
+            mask = ~self.is_tag & self._scope(within, recursive)
+
+        # Some parts of a match can't be decided by looking at the
+        # columns; those are checked one node at a time at the end.
+        check_each_node = False
+        if match_tags:
+            if any(rule.function is not None for rule in strainer.name_rules):
+                check_each_node = True
+            elif strainer.name_rules:
+                mask &= self._matching_names(strainer.name_rules)[self.name_id]
+            for key, rules in strainer.attribute_rules.items():
+                mask &= self._matching_attribute(strainer, key, rules)
+            if strainer.string_rules:
+                check_each_node = True
+        elif strainer.string_rules:
+            check_each_node = True
+
+        found = numpy.flatnonzero(mask)
+        if check_each_node:
+            keep = []
+            for index in found:
+                node = self._nodes[index]
+                if match_tags:
+                    matched = strainer.matches_tag(node)
+                else:
+                    matched = strainer.matches_any_string_rule(node)
+                if matched:
+                    keep.append(index)
+                    if limit and len(keep) >= limit:
+                        break
+            found = numpy.array(keep, dtype=numpy.intp)
+        if limit:
+            found = found[:limit]
+        return found
+
+    def _scope(self, within: _Within, recursive: bool) -> numpy.ndarray:
+        """Which nodes are beneath the node(s) in ``within``?"""
+        if not recursive:
+            if isinstance(within, numpy.ndarray):
+                return numpy.isin(self.parent, within)
+            return self.parent == within
+        if not isinstance(within, numpy.ndarray):
+            scope = numpy.zeros(len(self), dtype=bool)
+            scope[within + 1 : self.end[within]] = True
+            return scope
+
+        # Each node in ``within`` covers an interval of node numbers.
+        # Count how many intervals cover each node.
+        coverage = numpy.zeros(len(self) + 1, dtype=numpy.intp)
+        numpy.add.at(coverage, within + 1, 1)
+        numpy.add.at(coverage, self.end[within], -1)
+        return numpy.cumsum(coverage[:-1]) > 0
+
+    def _matching_names(self, rules: List[TagNameMatchRule]) -> numpy.ndarray:
+        """Check the name rules against every distinct tag name.
+
+        :return: An array with one entry for each item in
+            `Columns.names`, plus a False entry at the end so that it
+            can be indexed with `Columns.name_id`.
+        """
+        matches = numpy.zeros(len(self.names) + 1, dtype=bool)
+        for i, (name, prefix) in enumerate(self.names):
+            prefixed_name = None
+            if prefix:
+                prefixed_name = f"{prefix}:{name}"
+            for rule in rules:
+                if rule._base_match(name) or (
+                    prefixed_name is not None and rule.matches_string(prefixed_name)
+                ):
+                    matches[i] = True
+                    break
+        return matches
+
+    def _matching_attribute(
+        self, strainer: SoupStrainer, key: str, rules: Any
+    ) -> numpy.ndarray:
+        """Which tags have a value for the ``key`` attribute that
+        matches the rules?
+        """
+        # A tag without the attribute is treated as having the value None.
+        matches = numpy.full(len(self), strainer._attribute_match(None, rules))
+        try:
+            key_id = self.keys.index(key)
+        except ValueError:
+            return matches
+        entries = self.attribute_key == key_id
+        value_ids = self.attribute_value[entries]
+        value_matches = numpy.zeros(len(self.values), dtype=bool)
+        for value_id in numpy.unique(value_ids):
+            value_matches[value_id] = strainer._attribute_match(
+                self.values[value_id], rules
+            )
+        matches[self.attribute_node[entries]] = value_matches[value_ids]
+        return matches
+
+
+def _strainer(
+    name: Optional[Union[_StrainableElement, SoupStrainer]],
+    attrs: _StrainableAttributes,
+    string: Optional[_StrainableString],
+    **kwargs: _StrainableAttribute,
+) -> SoupStrainer:
+    """Turn the arguments to a find_all()-type method into a `SoupStrainer`."""
+    if isinstance(name, SoupStrainer):
+        return name
+    return SoupStrainer(name, attrs, string, **kwargs)
+
+
+def columnize(source: _Source) -> Columns:
+    """Convert a document, or part of one, into a `Columns` object.
+
+    :param source: A `BeautifulSoup` object, a `Tag`, or a
+        `bs4.flat.FlatSoup`. The `Columns` object will refer to the
+        objects in this tree, so `Columns.find_all` returns the same
+        kind of objects as the source's own ``find_all``.
+    """
+    if isinstance(source, FlatSoup):
+        source = source.root
+
+    nodes: List[Any] = []
+    parents: List[int] = []
+    depths: List[int] = []
+    name_ids: List[int] = []
+    names: List[Tuple[str, Optional[str]]] = []
+    name_lookup: Dict[Tuple[str, Optional[str]], int] = {}
+    attribute_node: List[int] = []
+    attribute_key: List[int] = []
+    attribute_value: List[int] = []
+    keys: List[str] = []
+    key_lookup: Dict[str, int] = {}
+    values: List[_AttributeValue] = []
+    value_lookup: Dict[Any, int] = {}
+
+    stack: List[Tuple[Any, int, int]] = [(source, -1, 0)]
+    while stack:
+        node, parent, depth = stack.pop()
+        index = len(nodes)
+        nodes.append(node)
+        parents.append(parent)
+        depths.append(depth)
+        if not isinstance(node, (Tag, FlatTag)):
+            name_ids.append(-1)
+            continue
+
+        qualified = (node.name, node.prefix)
+        name_id = name_lookup.get(qualified)
+        if name_id is None:
+            name_id = name_lookup[qualified] = len(names)
+            names.append(qualified)
+        name_ids.append(name_id)
+
+        for key, value in node.attrs.items():
+            key_id = key_lookup.get(key)
+            if key_id is None:
+                key_id = key_lookup[key] = len(keys)
+                keys.append(key)
+            # Multi-valued attributes are lists, which can't be
+            # dictionary keys.
+            hashable = tuple(value) if isinstance(value, list) else value
+            value_id = value_lookup.get(hashable)
+            if value_id is None:
+                value_id = value_lookup[hashable] = len(values)
+                values.append(value)
+            attribute_node.append(index)
+            attribute_key.append(key_id)
+            attribute_value.append(value_id)
+
+        # Push the children in reverse, so they come off the stack
+        # in document order.
+        children = list(node.children)
+        for child in reversed(children):
+            stack.append((child, index, depth + 1))
+
+    # A node's subtree ends where its last descendant's subtree ends.
+    ends = list(range(1, len(nodes) + 1))
+    for index in range(len(nodes) - 1, 0, -1):
+        parent = parents[index]
+        if ends[index] > ends[parent]:
+            ends[parent] = ends[index]
+
+    columns = Columns(nodes)
+    columns.parent = numpy.array(parents, dtype=numpy.intp)
+    columns.end = numpy.array(ends, dtype=numpy.intp)
+    columns.depth = numpy.array(depths, dtype=numpy.intp)
+    columns.name_id = numpy.array(name_ids, dtype=numpy.intp)
+    columns.is_tag = columns.name_id >= 0
+    columns.names = names
+    columns.attribute_node = numpy.array(attribute_node, dtype=numpy.intp)
+    columns.attribute_key = numpy.array(attribute_key, dtype=numpy.intp)
+    columns.attribute_value = numpy.array(attribute_value, dtype=numpy.intp)
+    columns.keys = keys
+    columns.values = values
+    return columns